@@ -0,0 +1,163 @@
+"""
+Per-worker admission control: caps on concurrent sessions, streaming STT threads and TTS calls.
+Flash coaching calls are gated by app.coaching.FLASH_LIMITER alone (priority-ordered).
+Over capacity, new WebSockets get a fast `busy` reject (or wait briefly when ADMISSION_QUEUE_SEC > 0)
+instead of every live session degrading at once. /health reports load() so the platform can route away.
+A limit of 0 means unlimited.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+MAX_SESSIONS = int(os.environ.get("MAX_SESSIONS", "20"))
+MAX_STT_STREAMS = int(os.environ.get("MAX_STT_STREAMS", "20"))
+MAX_TTS_CALLS = int(os.environ.get("MAX_TTS_CALLS", "8"))
+ADMISSION_QUEUE_SEC = float(os.environ.get("ADMISSION_QUEUE_SEC", "0"))
+BUSY_RETRY_AFTER_MS = int(os.environ.get("BUSY_RETRY_AFTER_MS", "3000"))
+# How long a whisper waits for a TTS slot before degrading to text-only.
+CALL_SLOT_WAIT_SEC = float(os.environ.get("CALL_SLOT_WAIT_SEC", "2.0"))
+
+
+class CapacitySlots:
+    """
+    Counting limiter (like asyncio.Semaphore) that also reports in-use and waiting counts.
+    Waiters are plain futures on the caller's loop, so one instance is safe to share process-wide.
+    """
+
+    def __init__(self, name: str, limit: int) -> None:
+        self.name = name
+        self.limit = limit
+        self.in_use = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for f in self._waiters if not f.done())
+
+    @property
+    def full(self) -> bool:
+        return 0 < self.limit <= self.in_use
+
+    def try_acquire(self) -> bool:
+        if self.full:
+            return False
+        self.in_use += 1
+        return True
+
+    async def acquire(self, timeout: float | None = None) -> bool:
+        """Wait up to timeout seconds (None = forever) for a slot. Returns False on timeout."""
+        if not self._waiters and self.try_acquire():
+            return True
+        if timeout is not None and timeout <= 0:
+            return False
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            # wait_for can time out after release() already handed us the slot (same loop tick); keep it.
+            return fut.done() and not fut.cancelled()
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot was handed over just as we were cancelled; pass it on.
+                self.release()
+            raise
+        finally:
+            try:
+                self._waiters.remove(fut)
+            except ValueError:
+                pass
+        return True
+
+    def release(self) -> None:
+        """Hand the slot to the oldest live waiter, or return it to the pool."""
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            try:
+                fut.set_result(None)  # in_use stays the same: ownership moves to the waiter
+                return
+            except RuntimeError:
+                continue  # waiter's loop is gone
+        self.in_use = max(0, self.in_use - 1)
+
+    @asynccontextmanager
+    async def slot(self, timeout: float | None = None) -> AsyncIterator[bool]:
+        """async with slots.slot(t) as acquired: ... — releases only if acquired."""
+        acquired = await self.acquire(timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release()
+
+    def snapshot(self) -> dict[str, int]:
+        return {"in_use": self.in_use, "limit": self.limit, "waiting": self.waiting}
+
+
+class AdmissionController:
+    """Worker-wide capacity limits shared by the /ws endpoint and every CopilotSession."""
+
+    def __init__(
+        self,
+        max_sessions: int = MAX_SESSIONS,
+        max_stt_streams: int = MAX_STT_STREAMS,
+        max_tts_calls: int = MAX_TTS_CALLS,
+        queue_sec: float = ADMISSION_QUEUE_SEC,
+    ) -> None:
+        self.sessions = CapacitySlots("sessions", max_sessions)
+        self.stt = CapacitySlots("stt_streams", max_stt_streams)
+        self.tts = CapacitySlots("tts_calls", max_tts_calls)
+        self.queue_sec = queue_sec
+        self.rejected = 0
+        self.draining = False  # set by app.drain on SIGTERM: no new sessions on this worker
+
+    async def admit_session(self) -> bool:
+        """Take a session slot, waiting up to queue_sec. Returns False when the worker is full."""
+        if await self.sessions.acquire(self.queue_sec):
+            return True
+        self.rejected += 1
+        logger.warning("Admission: rejecting session (%d/%d active)", self.sessions.in_use, self.sessions.limit)
+        return False
+
+    def release_session(self) -> None:
+        self.sessions.release()
+
+    def busy_message(self, queued: bool = False) -> dict[str, Any]:
+        msg = {
+            "type": "busy",
+            "queued": queued,
+            "retry_after_ms": BUSY_RETRY_AFTER_MS,
+            "sessions": self.sessions.in_use,
+            "max_sessions": self.sessions.limit,
+        }
+        if self.draining:
+            msg["draining"] = True
+            msg["retry_after_ms"] = 0  # another instance can take it right away
+        return msg
+
+    def utilization(self) -> float:
+        """Highest fill ratio across bounded resources (0..1)."""
+        ratios = [s.in_use / s.limit for s in (self.sessions, self.stt, self.tts) if s.limit > 0]
+        return round(min(1.0, max(ratios, default=0.0)), 3)
+
+    def load(self) -> dict[str, Any]:
+        return {
+            "status": "draining" if self.draining else "busy" if self.sessions.full else "ok",
+            "utilization": self.utilization(),
+            "sessions": self.sessions.snapshot(),
+            "stt_streams": self.stt.snapshot(),
+            "tts_calls": self.tts.snapshot(),
+            "rejected_sessions": self.rejected,
+        }
+
+
+ADMISSION = AdmissionController()
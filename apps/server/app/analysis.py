@@ -0,0 +1,204 @@
+"""
+Offline tension analysis: the server's per-session signal pipeline run on virtual time over a
+recording, for re-scoring past calls in bulk (scripts/batch_analyze.py fans files out over a
+process pool).
+
+A CopilotSession is driven directly, without a socket or loops: each 40 ms chunk goes through
+chunk_telemetry (client RMS -> EMA -> silence/speech flags), the tension tick drains them into
+compute_tension_from_telemetry every 0.5 s, transcript text goes through TranscriptState.append
+(marker scan, semantic pressure), and the whisper tick asks due_trigger every 0.25 s, exactly as
+the handler's loops do. Upstream-dependent parts (Live barge-in, coaching text, backchannels,
+style whispers) are not simulated.
+
+Inputs:
+  .wav              16-bit PCM, any rate/channels (mixed to mono; RMS per 40 ms)
+  .pcm / .raw       PCM16 LE mono 16 kHz
+  .jsonl(.gz)       session recording (app.recorder): client telemetry and the transcript sent
+An audio file may have a transcript sidecar <name>.txt: one "<seconds> <text>" line per
+utterance (seconds = when the text was recognized).
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import sys
+import wave
+from array import array
+from typing import Any, Iterable, Iterator
+
+from app.recorder import load_recording
+from app.tension import compute_tension_from_telemetry
+
+CHUNK_SEC = 0.04
+TENSION_TICK_SEC = 0.5
+WHISPER_TICK_SEC = 0.25
+# Virtual wall clock origin: the handler's timers compare against epoch-style timestamps
+# (e.g. last_whisper_ts starts at 0), so offsets must not start near zero.
+EPOCH = 1_000_000_000.0
+
+AUDIO_SUFFIXES = (".wav", ".pcm", ".raw")
+RECORDING_SUFFIXES = (".jsonl.gz", ".jsonl")
+
+# Events fed to the pipeline: (offset_sec, "chunk", {"rms": ..}, raw_len) or (offset_sec, "text", str, 0)
+Event = tuple[float, str, Any, int]
+
+
+def is_input(path: str) -> bool:
+    return path.endswith(AUDIO_SUFFIXES + RECORDING_SUFFIXES)
+
+
+def find_inputs(paths: Iterable[str]) -> list[str]:
+    """Files given directly plus supported files found recursively under directories, sorted."""
+    found: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                found.extend(os.path.join(root, n) for n in names if is_input(n))
+        else:
+            found.append(path)
+    return sorted(set(found))
+
+
+def _samples(path: str) -> tuple[array, int]:
+    """Mono PCM16 samples and their rate."""
+    if not path.endswith(".wav"):
+        raw = array("h")
+        with open(path, "rb") as f:
+            data = f.read()
+        raw.frombytes(data[: len(data) - len(data) % 2])
+        if sys.byteorder == "big":
+            raw.byteswap()
+        return raw, 16000
+    with wave.open(path, "rb") as w:
+        if w.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+        channels, rate = w.getnchannels(), w.getframerate()
+        raw = array("h")
+        raw.frombytes(w.readframes(w.getnframes()))
+    if sys.byteorder == "big":
+        raw.byteswap()
+    if channels > 1:
+        raw = array("h", (sum(raw[i:i + channels]) // channels for i in range(0, len(raw), channels)))
+    return raw, rate
+
+
+def _rms(samples: Any) -> float:
+    return min(1.0, math.sqrt(sum(s * s for s in samples) / len(samples)) / 32768.0) if len(samples) else 0.0
+
+
+def _sidecar_transcript(path: str) -> list[Event]:
+    stem = path[: -len(".wav")] if path.endswith(".wav") else os.path.splitext(path)[0]
+    sidecar = stem + ".txt"
+    if not os.path.exists(sidecar):
+        return []
+    events: list[Event] = []
+    with open(sidecar, encoding="utf-8") as f:
+        for line in f:
+            ts, _, text = line.strip().partition(" ")
+            try:
+                events.append((float(ts), "text", text.strip(), 0))
+            except ValueError:
+                continue
+    return events
+
+
+def audio_events(path: str) -> list[Event]:
+    """40 ms chunks with RMS as the web app computes it, plus the sidecar transcript if any."""
+    samples, rate = _samples(path)
+    step = max(1, int(rate * CHUNK_SEC))
+    events: list[Event] = [
+        (i / rate, "chunk", {"rms": _rms(samples[i:i + step])}, step * 2)
+        for i in range(0, len(samples) - step + 1, step)
+    ]
+    return events + _sidecar_transcript(path)
+
+
+def recording_events(path: str) -> list[Event]:
+    """Inbound audio telemetry and outbound transcript deltas of a session recording."""
+    _, records = load_recording(path)
+    events: list[Event] = []
+    for rec in records:
+        if rec["k"] == "in":
+            try:
+                msg = json.loads(rec["raw"])
+            except json.JSONDecodeError:
+                continue
+            if isinstance(msg, dict) and msg.get("type") == "audio":
+                audio = msg.get("base64") or msg.get("pcm_base64") or ""
+                events.append((rec["t"], "chunk", msg.get("telemetry") or {}, len(audio) * 3 // 4))
+        elif rec["k"] == "out" and rec.get("type") == "transcript" and rec.get("delta"):
+            events.append((rec["t"], "text", rec["delta"].strip(), 0))
+    return events
+
+
+def _ticks(end: float, step: float) -> Iterator[float]:
+    n = 1
+    while n * step <= end + step:
+        yield n * step
+        n += 1
+
+
+def analyze_events(events: list[Event]) -> dict[str, Any]:
+    """Run the pipeline over (offset, kind, payload, size) events; returns timeline and triggers."""
+    from app.websocket_handler import CopilotSession
+
+    session = CopilotSession(websocket=None)
+    tension, transcript, whisper = session.tension, session.transcript, session.whisper
+    end = max((e[0] for e in events), default=0.0)
+    # Order: inputs at an offset are seen before that offset's ticks, as queued input precedes a timer tick.
+    ticks = [(t, "tension", None, 0) for t in _ticks(end, TENSION_TICK_SEC)]
+    ticks += [(t, "whisper", None, 0) for t in _ticks(end, WHISPER_TICK_SEC)]
+    rank = {"chunk": 0, "text": 0, "tension": 1, "whisper": 2}
+    timeline: list[dict[str, Any]] = []
+    triggers: list[dict[str, Any]] = []
+    pending = []
+    for offset, kind, payload, size in sorted(events + ticks, key=lambda e: (e[0], rank[e[1]])):
+        now = EPOCH + offset
+        if kind == "chunk":
+            pending.append(session.chunk_telemetry(size, payload, now))
+        elif kind == "text":
+            transcript.append(payload)
+        elif kind == "tension":
+            score = None
+            for telemetry in pending:
+                score = compute_tension_from_telemetry(telemetry, tension.state)
+            pending.clear()
+            if score is not None:
+                tension.record_score(score, now)
+                timeline.append({
+                    "t": round(offset, 2),
+                    "tension": score,
+                    "semantic_pressure": round(transcript.semantic_pressure, 3),
+                    "style": transcript.conversation_style,
+                })
+        else:
+            trigger = session.due_trigger(now, transcript.text())
+            if trigger is not None:
+                # What _send_coaching_whisper records before generating.
+                whisper.last_whisper_ts = now
+                tension.prev_score = tension.last_score
+                triggers.append({
+                    "t": round(offset, 2),
+                    "trigger": trigger,
+                    "tension": tension.last_score,
+                    "semantic_pressure": round(transcript.semantic_pressure, 3),
+                    "transcript_chars": len(transcript.text()),
+                })
+    scores = [p["tension"] for p in timeline]
+    return {
+        "duration_sec": round(end, 2),
+        "chunks": sum(1 for e in events if e[1] == "chunk"),
+        "transcript_events": sum(1 for e in events if e[1] == "text"),
+        "tension_max": max(scores, default=0),
+        "tension_mean": round(sum(scores) / len(scores), 1) if scores else 0.0,
+        "triggers": triggers,
+        "timeline": timeline,
+    }
+
+
+def analyze_file(path: str) -> dict[str, Any]:
+    """Analyze one recording or audio file (picklable entry point for process pools)."""
+    events = recording_events(path) if path.endswith(RECORDING_SUFFIXES) else audio_events(path)
+    return {"path": path, **analyze_events(events)}
+
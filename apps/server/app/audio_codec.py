@@ -0,0 +1,210 @@
+"""
+Compact encodings for whisper/backchannel audio sent to the browser (PCM16 24 kHz mono in).
+  pcm16: unchanged (default)
+  mulaw: G.711 μ-law, 8 bits/sample (2x smaller)
+  adpcm: IMA ADPCM, 4 bits/sample (4x smaller); one stream from predictor 0 / step index 0,
+         first sample of each byte in the low nibble
+The client picks one in `start` (config.audio_codec); the server confirms it in `ready`.
+Pure Python so there are no extra dependencies; encode off the event loop for long clips.
+Also holds the process-wide TTS audio cache, which keeps PCM and every encoded form per phrase.
+"""
+from __future__ import annotations
+
+import array
+import base64
+import logging
+import os
+import sys
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+AUDIO_CODECS: tuple[str, ...] = ("pcm16", "mulaw", "adpcm")
+TTS_AUDIO_CACHE_SIZE = int(os.environ.get("TTS_AUDIO_CACHE_SIZE", "128"))
+
+# --- μ-law (G.711) ---
+
+_MULAW_BIAS = 0x84
+_MULAW_CLIP = 32635
+_mulaw_table: bytes | None = None
+
+
+def _mulaw_encode_sample(sample: int) -> int:
+    sign = 0x80 if sample < 0 else 0
+    if sample < 0:
+        sample = -sample
+    sample = min(sample, _MULAW_CLIP) + _MULAW_BIAS
+    exponent = 7
+    mask = 0x4000
+    while exponent > 0 and not sample & mask:
+        exponent -= 1
+        mask >>= 1
+    mantissa = (sample >> (exponent + 3)) & 0x0F
+    return ~(sign | (exponent << 4) | mantissa) & 0xFF
+
+
+def _mulaw_lookup() -> bytes:
+    """65536-entry table indexed by the unsigned 16-bit view of a sample (built once, lazily)."""
+    global _mulaw_table
+    if _mulaw_table is None:
+        _mulaw_table = bytes(_mulaw_encode_sample(i - 65536 if i >= 32768 else i) for i in range(65536))
+    return _mulaw_table
+
+
+def _samples(pcm: bytes, typecode: str) -> array.array:
+    samples = array.array(typecode)
+    samples.frombytes(pcm[: len(pcm) - (len(pcm) % 2)])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
+
+
+def mulaw_encode(pcm: bytes) -> bytes:
+    table = _mulaw_lookup()
+    return bytes(map(table.__getitem__, _samples(pcm, "H")))
+
+
+def mulaw_decode(data: bytes) -> bytes:
+    out = array.array("h")
+    for byte in data:
+        byte = ~byte & 0xFF
+        exponent = (byte >> 4) & 0x07
+        magnitude = (((byte & 0x0F) << 3) + _MULAW_BIAS) << exponent
+        out.append(_MULAW_BIAS - magnitude if byte & 0x80 else magnitude - _MULAW_BIAS)
+    if sys.byteorder == "big":
+        out.byteswap()
+    return out.tobytes()
+
+
+# --- IMA ADPCM ---
+
+_IMA_INDEX = (-1, -1, -1, -1, 2, 4, 6, 8, -1, -1, -1, -1, 2, 4, 6, 8)
+_IMA_STEPS = (
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45, 50, 55, 60, 66,
+    73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230, 253, 279, 307, 337, 371, 408, 449,
+    494, 544, 598, 658, 724, 796, 876, 963, 1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272,
+    2499, 2749, 3024, 3327, 3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493,
+    10442, 11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794, 32767,
+)
+
+
+def adpcm_encode(pcm: bytes) -> bytes:
+    predicted, index = 0, 0
+    nibbles = bytearray()
+    steps, index_table = _IMA_STEPS, _IMA_INDEX
+    for sample in _samples(pcm, "h"):
+        step = steps[index]
+        diff = sample - predicted
+        code = 0
+        if diff < 0:
+            code = 8
+            diff = -diff
+        delta = step >> 3
+        if diff >= step:
+            code |= 4
+            diff -= step
+            delta += step
+        step >>= 1
+        if diff >= step:
+            code |= 2
+            diff -= step
+            delta += step
+        step >>= 1
+        if diff >= step:
+            code |= 1
+            delta += step
+        predicted = predicted - delta if code & 8 else predicted + delta
+        predicted = -32768 if predicted < -32768 else 32767 if predicted > 32767 else predicted
+        index += index_table[code]
+        index = 0 if index < 0 else 88 if index > 88 else index
+        nibbles.append(code)
+    if len(nibbles) % 2:
+        nibbles.append(0)
+    return bytes(nibbles[i] | (nibbles[i + 1] << 4) for i in range(0, len(nibbles), 2))
+
+
+def adpcm_decode(data: bytes, samples: int | None = None) -> bytes:
+    predicted, index = 0, 0
+    out = array.array("h")
+    for byte in data:
+        for code in (byte & 0x0F, byte >> 4):
+            step = _IMA_STEPS[index]
+            delta = step >> 3
+            if code & 4:
+                delta += step
+            if code & 2:
+                delta += step >> 1
+            if code & 1:
+                delta += step >> 2
+            predicted = predicted - delta if code & 8 else predicted + delta
+            predicted = max(-32768, min(32767, predicted))
+            index = max(0, min(88, index + _IMA_INDEX[code]))
+            out.append(predicted)
+    if samples is not None:
+        del out[samples:]
+    if sys.byteorder == "big":
+        out.byteswap()
+    return out.tobytes()
+
+
+# --- negotiation / base64 helpers ---
+
+
+def negotiate(requested: object) -> str:
+    """Codec to use for a session: the client's choice if supported, else pcm16."""
+    if isinstance(requested, str) and requested.strip().lower() in AUDIO_CODECS:
+        return requested.strip().lower()
+    return "pcm16"
+
+
+def encode_pcm(pcm: bytes, codec: str) -> bytes:
+    if codec == "mulaw":
+        return mulaw_encode(pcm)
+    if codec == "adpcm":
+        return adpcm_encode(pcm)
+    return pcm
+
+
+def encode_b64(pcm_b64: str, codec: str) -> str:
+    """Re-encode base64 PCM16 as base64 `codec`. CPU-bound for long clips: call off the loop."""
+    if codec == "pcm16":
+        return pcm_b64
+    return base64.b64encode(encode_pcm(base64.b64decode(pcm_b64), codec)).decode("ascii")
+
+
+class TtsAudioCache:
+    """LRU of synthesized phrases: (kind, text) -> {codec: base64 audio}. Backchannels and cached whispers repeat."""
+
+    def __init__(self, max_entries: int = TTS_AUDIO_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], dict[str, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind: str, text: str, codec: str) -> str | None:
+        forms = self._entries.get((kind, text))
+        if forms is not None and codec in forms:
+            self._entries.move_to_end((kind, text))
+            self.hits += 1
+            return forms[codec]
+        self.misses += 1
+        return None
+
+    def pcm(self, kind: str, text: str) -> str | None:
+        forms = self._entries.get((kind, text))
+        return forms.get("pcm16") if forms else None
+
+    def put(self, kind: str, text: str, codec: str, audio_b64: str) -> None:
+        if self.max_entries <= 0:
+            return
+        key = (kind, text)
+        self._entries.setdefault(key, {})[codec] = audio_b64
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+TTS_AUDIO_CACHE = TtsAudioCache()
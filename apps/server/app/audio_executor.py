@@ -0,0 +1,107 @@
+"""
+Executor for CPU-bound audio work (whisper effect, WAV handling, re-encoding, base64 of large
+buffers) so one long whisper render does not stall telemetry for every other session.
+  process (default): spawn-based process pool, started at app startup (warm); buffers are pickled
+           across. The only mode that takes the work off the loop: the whisper effect is pure Python.
+  thread:  small thread pool. Gives no isolation for pure-Python work, which holds the GIL the whole
+           time and so blocks the loop about as long as running inline; only useful for C code that
+           releases the GIL.
+  inline:  run on the calling thread (old behaviour)
+Jobs under AUDIO_INLINE_MAX_BYTES always run inline: handing off costs more than the work.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import importlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXECUTOR = os.environ.get("AUDIO_EXECUTOR", "process").strip().lower()
+AUDIO_EXECUTOR_WORKERS = int(os.environ.get("AUDIO_EXECUTOR_WORKERS", "2"))
+AUDIO_INLINE_MAX_BYTES = int(os.environ.get("AUDIO_INLINE_MAX_BYTES", str(16 * 1024)))
+
+T = TypeVar("T")
+
+
+def _warm_up(modules: tuple[str, ...]) -> int:
+    """Runs in a pool process: import what the jobs will need, so the first real job is fast."""
+    for module in modules:
+        importlib.import_module(module)
+    return os.getpid()
+
+
+class AudioExecutor:
+    """Lazily created pool; run() decides per job whether offloading is worth it."""
+
+    def __init__(
+        self,
+        mode: str = AUDIO_EXECUTOR,
+        workers: int = AUDIO_EXECUTOR_WORKERS,
+        inline_max_bytes: int = AUDIO_INLINE_MAX_BYTES,
+    ) -> None:
+        if mode not in ("thread", "process", "inline"):
+            logger.warning("Unknown AUDIO_EXECUTOR %r; using process", mode)
+            mode = "process"
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.inline_max_bytes = inline_max_bytes
+        self._pool: Executor | None = None
+        self.inline = 0
+        self.offloaded = 0
+        self.in_flight = 0
+
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                # spawn: forking a process that runs an event loop and gRPC threads is unsafe.
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="audio")
+        return self._pool
+
+    def warm(self, *modules: str) -> None:
+        """process mode: start the worker processes now (spawn + imports take ~0.4 s) instead of on
+        the first whisper. Does not wait; a failed warm-up only means the first job pays for it."""
+        if self.mode != "process":
+            return
+        try:
+            pool = self._executor()
+            for _ in range(self.workers):
+                pool.submit(_warm_up, modules)
+        except Exception as e:
+            logger.warning("Audio process pool warm-up failed: %s", e)
+
+    async def run(self, fn: Callable[..., T], *args: Any, size: int = 0) -> T:
+        """fn(*args), offloaded when size (bytes of input) is at least inline_max_bytes."""
+        if self.mode == "inline" or size < self.inline_max_bytes:
+            self.inline += 1
+            return fn(*args)
+        self.offloaded += 1
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor(), functools.partial(fn, *args))
+        except BrokenProcessPool:
+            logger.warning("Audio process pool broke; recreating it and running this job inline")
+            self._pool = None
+            return fn(*args)
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict[str, Any]:
+        return {"mode": self.mode, "inline": self.inline, "offloaded": self.offloaded, "in_flight": self.in_flight}
+
+
+AUDIO_POOL = AudioExecutor()
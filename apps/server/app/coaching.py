@@ -1,11 +1,28 @@
 """
 Coaching moves: deterministic triggers + Gemini-generated contextual whispers.
-Falls back to fixed 8-12 word phrases if generation fails.
+Falls back to the local phrase-bank generator (app.local_coach) if generation fails.
 Grounded in Nonviolent Communication (NVC) and active listening principles.
 """
+import asyncio
 import base64
+import hashlib
 import logging
 import os
+import time
+from typing import Any, Awaitable, Callable
+
+from app import fakes
+from app.audio_codec import TTS_AUDIO_CACHE, encode_b64
+from app.audio_executor import AUDIO_POOL
+from app.coaching_batch import BatchItem, CoachingBatcher
+from app.coaching_cache import COACHING_CACHE, COACHING_RESPONSE_CACHE, make_key
+from app.limiter import PriorityLimiter
+from app.local_coach import LOCAL_COACH, detect_cue
+from app.metrics import FLASH_ERRORS, FLASH_LATENCY_SECONDS
+from app.prompts import COACHING_TRANSCRIPT_MAX_CHARS, build_coaching_tail, build_system_instruction
+from app.tracing import TRACER
+from app.tts_race import TtsRacer
+from app.vision import PreparedFrame
 
 logger = logging.getLogger(__name__)
 
@@ -38,50 +55,72 @@ FALLBACK_MOVES: dict[str, str] = {
     "post_escalation_silence": "clarify_intent",
 }
 
-COACHING_SYSTEM_PROMPT = """\
-You are "Sage" — a calm, empathetic conversation coach who whispers guidance \
-during difficult conversations. Your personality: warm but direct, emotionally \
-intelligent, gently encouraging. Think of a trusted mentor who speaks softly \
-but with clarity. You use Nonviolent Communication (NVC) and active listening.
-
-The user is in a difficult conversation RIGHT NOW. Based on the transcript, \
-tension level, trigger, and optionally their webcam image, generate ONE \
-coaching whisper.
-
-Rules:
-- Exactly 8 to 12 words, no more
-- Use NVC principles: observations, feelings, needs, requests
-- Use active listening: reflect, validate, invite perspective
-- Never diagnose, label, or judge either party
-- Speak directly to the user in second person ("you")
-- Be warm and concise — you're whispering in their ear during a live conversation
-- IMPORTANT: Vary your phrasing. Don't start every whisper with "You look" or \
-"You seem." Use diverse openings: questions, gentle imperatives, observations, \
-reflections (e.g. "Try asking...", "Notice how...", "What if you...", \
-"Their tone shifted — pause here.", "Share what you need right now.")
-- If a webcam image is provided, read specific body language cues:
-  * Facial tension (furrowed brow, clenched jaw, tight lips)
-  * Posture (leaning forward aggressively, crossed arms, slumped shoulders)
-  * Hand gestures (pointing, clenched fists, open palms)
-  * Eye contact patterns (looking away, staring down)
-  Reference these SPECIFICALLY, not generically. Say "Your jaw is tight — soften it" \
-  not "You look tense."
-- Output ONLY the whisper phrase, nothing else
-
-Trigger types:
-- tension_cross: tension just rose above threshold (conversation heating up)
-- barge_in: 2+ interruptions detected (turn-taking friction)
-- post_escalation_silence: awkward silence after high tension\
-"""
+# (trigger, transcript cue) -> move, where what was said calls for something other than the
+# trigger's FALLBACK_MOVES entry (cues from app.local_coach.detect_cue).
+CUE_MOVES: dict[tuple[str, str], str] = {
+    ("tension_cross", "dismissive"): "deescalate_tone",
+    ("tension_cross", "grievance"): "deescalate_tone",
+    ("barge_in", "dismissive"): "deescalate_tone",
+    ("barge_in", "repair"): "invite_perspective",
+    ("post_escalation_silence", "dismissive"): "invite_perspective",
+    ("post_escalation_silence", "grievance"): "invite_perspective",
+}
 
+COACHING_MODEL = "gemini-2.0-flash"
 COACHING_GROUNDING = os.environ.get("COACHING_GROUNDING", "0").strip().lower() in ("1", "true", "yes")
 
+# Process-wide bound on Flash calls so simultaneous escalations across sessions don't stampede the API.
+COACHING_MAX_CONCURRENCY = int(os.environ.get("COACHING_MAX_CONCURRENCY", "4"))
+COACHING_RATE_PER_SEC = float(os.environ.get("COACHING_RATE_PER_SEC", "5"))
+COACHING_BURST = int(os.environ.get("COACHING_BURST", "10"))
+COACHING_MAX_QUEUE = int(os.environ.get("COACHING_MAX_QUEUE", "32"))
+COACHING_DEADLINE_SEC = float(os.environ.get("COACHING_DEADLINE_SEC", "4.0"))
+
+# Lower number = served first when calls queue up.
+TRIGGER_PRIORITY: dict[str, int] = {
+    "barge_in": 0,
+    "tension_cross": 1,
+    "post_escalation_silence": 2,
+}
+
+FLASH_LIMITER = PriorityLimiter(
+    max_concurrency=COACHING_MAX_CONCURRENCY,
+    rate_per_sec=COACHING_RATE_PER_SEC,
+    burst=COACHING_BURST,
+    max_queue=COACHING_MAX_QUEUE,
+)
+
+# Serve whispers from the local generator without calling Flash (offline demos, tight latency budgets).
+COACHING_LOCAL_FIRST = os.environ.get("COACHING_LOCAL_FIRST", "0").strip().lower() in ("1", "true", "yes")
+
+# Latency budget per whisper: past this the local whisper is sent, and the model's whisper may
+# replace it if it lands within COACHING_UPGRADE_WINDOW_SEC. 0 = wait (up to COACHING_DEADLINE_SEC).
+COACHING_BUDGET_MS = float(os.environ.get("COACHING_BUDGET_MS", "0"))
+COACHING_LATE_UPGRADE = os.environ.get("COACHING_LATE_UPGRADE", "1").strip().lower() in ("1", "true", "yes")
+COACHING_UPGRADE_WINDOW_SEC = float(os.environ.get("COACHING_UPGRADE_WINDOW_SEC", "3.0"))
+
+LateWhisper = Callable[[dict[str, str]], Awaitable[None]]
+
+# Optional cross-session micro-batching of text-only coaching requests (see coaching_batch.py).
+COACHING_BATCH = os.environ.get("COACHING_BATCH", "0").strip().lower() in ("1", "true", "yes")
+COACHING_BATCH_WINDOW_MS = float(os.environ.get("COACHING_BATCH_WINDOW_MS", "15"))
+COACHING_BATCH_MAX = int(os.environ.get("COACHING_BATCH_MAX", "8"))
+
+COACHING_BATCH_INSTRUCTION = """
+
+Batch mode: the user message contains several numbered, independent conversations. \
+Write one whisper per item following all rules above, without mixing context between items. \
+Output ONLY a JSON array of strings, one whisper per item, in item order.\
+"""
+
 _flash_client = None
 
 
 def _get_flash_client():
     """Build a google.genai.Client for standard (non-Live) generate_content calls."""
     global _flash_client
+    if fakes.enabled("flash"):
+        return fakes.GENAI_CLIENT
     if _flash_client is not None:
         return _flash_client
     try:
@@ -117,48 +156,175 @@ async def generate_coaching(
     transcript_buffer: str,
     last_whisper: str = "",
     image_b64: str = "",
+    image: PreparedFrame | None = None,
 ) -> dict[str, str]:
     """
     Call gemini-2.0-flash to produce a contextual coaching whisper.
     Returns {"move": trigger, "text": "..."}.
 
-    When image_b64 is provided (webcam frame), includes it so coaching can
-    reference visual cues (body language, facial expression, posture).
+    When a webcam frame is provided, includes it so coaching can reference
+    visual cues (body language, facial expression, posture). Prefer `image`
+    (a PreparedFrame from app.vision: downscaled, Part cached); `image_b64`
+    is decoded on every call and kept for callers without a pipeline.
     When COACHING_GROUNDING is enabled, adds google_search tool so whispers
     can be grounded in NVC/conflict resolution research.
 
-    Falls back to fixed phrase on any failure.
+    The call goes through FLASH_LIMITER (priority by trigger, COACHING_DEADLINE_SEC
+    deadline, coalescing of identical requests).
+    Falls back to fixed phrase on any failure, timeout or full limiter queue.
+    With COACHING_BATCH=1, text-only requests are micro-batched across sessions.
+
+    The prompt comes from app.prompts: vision rules only with a frame, and only the fired
+    trigger's description.
+    With COACHING_CACHE=1, a cached whisper for the same context (other than last_whisper)
+    is returned without calling Flash. With COACHING_LOCAL_FIRST=1 the local generator
+    answers directly.
+    """
+    result = await _coaching_result(
+        trigger, tension_score, transcript_buffer, last_whisper, image_b64, image
+    )
+    return {"move": result["move"], "text": result["text"]}
+
+
+async def _coaching_result(
+    trigger: str,
+    tension_score: int,
+    transcript_buffer: str,
+    last_whisper: str = "",
+    image_b64: str = "",
+    image: PreparedFrame | None = None,
+) -> dict[str, str]:
+    """generate_coaching plus "source": "local", "cache", "ai" or "fallback"."""
+    if COACHING_LOCAL_FIRST:
+        return {**fallback_coaching(trigger, tension_score, transcript_buffer, last_whisper), "source": "local"}
+    cache_key = None
+    if COACHING_CACHE:
+        image_hash = image.digest if image is not None else (
+            hashlib.sha1(image_b64.encode("ascii", "ignore")).hexdigest() if image_b64 else ""
+        )
+        cache_key = make_key(trigger, tension_score, transcript_buffer, image_hash)
+        cached = COACHING_RESPONSE_CACHE.get(cache_key, last_whisper)
+        if cached is not None:
+            logger.info("AI coaching [%s] (cached): %s", trigger, cached)
+            return {"move": trigger, "text": cached, "source": "cache"}
+    result = await _generate_coaching_uncached(
+        trigger, tension_score, transcript_buffer, last_whisper, image_b64, image
+    )
+    if cache_key is not None and result.get("source") == "ai":
+        COACHING_RESPONSE_CACHE.put(cache_key, result["text"])
+    return result
+
+
+async def generate_coaching_hedged(
+    trigger: str,
+    tension_score: int,
+    transcript_buffer: str,
+    last_whisper: str = "",
+    image: PreparedFrame | None = None,
+    budget_ms: float | None = None,
+    on_late: LateWhisper | None = None,
+) -> dict[str, Any]:
+    """
+    generate_coaching under a latency budget (COACHING_BUDGET_MS; 0 = just wait for it). The budget
+    covers queueing for FLASH_LIMITER too, and a late call keeps its limiter slot until it finishes.
+    If Flash has not answered within the budget, the local whisper is returned at once with
+    "provisional": True. When the model's whisper still arrives within COACHING_UPGRADE_WINDOW_SEC,
+    on_late(result) is scheduled so the caller can replace the provisional whisper.
     """
+    budget = COACHING_BUDGET_MS if budget_ms is None else budget_ms
+    if budget <= 0:
+        return await generate_coaching(
+            trigger, tension_score, transcript_buffer, last_whisper, image=image
+        )
+    task = asyncio.ensure_future(
+        _coaching_result(trigger, tension_score, transcript_buffer, last_whisper, image=image)
+    )
+    try:
+        result = await asyncio.wait_for(asyncio.shield(task), budget / 1000.0)
+        return {"move": result["move"], "text": result["text"]}
+    except asyncio.TimeoutError:
+        pass
+    provisional_at = time.monotonic()
+    logger.info("Coaching [%s] over %.0f ms budget; sending local whisper", trigger, budget)
+    upgrade = on_late is not None and COACHING_LATE_UPGRADE
+    if not upgrade and not COACHING_CACHE:
+        task.cancel()  # nobody will use the late answer
+    else:
+        def _on_done(t: asyncio.Task) -> None:
+            if t.cancelled() or t.exception() is not None:
+                return
+            late = t.result()
+            if not upgrade or late.get("source") != "ai":
+                return
+            if time.monotonic() - provisional_at > COACHING_UPGRADE_WINDOW_SEC:
+                return
+            asyncio.ensure_future(on_late({"move": late["move"], "text": late["text"]}))
+
+        task.add_done_callback(_on_done)
+    return {**fallback_coaching(trigger, tension_score, transcript_buffer, last_whisper), "provisional": True}
+
+
+async def _run_flash(kind: str, factory: Callable[[], Awaitable[Any]], **kwargs: Any) -> Any:
+    """FLASH_LIMITER.run plus latency/error metrics (kind: whisper or batch)."""
+    start = time.perf_counter()
     try:
+        with TRACER.span("flash", kind=kind, model=COACHING_MODEL):
+            response = await FLASH_LIMITER.run(factory, **kwargs)
+    except Exception:
+        FLASH_ERRORS.inc(kind=kind)
+        raise
+    FLASH_LATENCY_SECONDS.observe(time.perf_counter() - start, kind=kind)
+    return response
+
+
+async def _generate_coaching_uncached(
+    trigger: str,
+    tension_score: int,
+    transcript_buffer: str,
+    last_whisper: str,
+    image_b64: str,
+    image: PreparedFrame | None,
+) -> dict[str, str]:
+    """Flash (or batched Flash) generation; the result's "source" is "ai" or "fallback"."""
+    try:
+        if COACHING_BATCH and not image_b64 and image is None:
+            text = await COACHING_BATCHER.submit(
+                BatchItem(trigger, tension_score, transcript_buffer[-COACHING_TRANSCRIPT_MAX_CHARS:], last_whisper)
+            )
+            if text is None:
+                raise ValueError("batched coaching returned no whisper")
+            text = _clean_whisper(text)
+            logger.info("AI coaching [%s] (batched): %s", trigger, text)
+            return {"move": trigger, "text": text, "source": "ai"}
+
         from google import genai
 
         client = _get_flash_client()
-        avoid_line = ""
-        if last_whisper:
-            avoid_line = f"\nPrevious whisper (DO NOT repeat): \"{last_whisper}\"\n"
-        user_prompt_text = (
-            f"Trigger: {trigger}\n"
-            f"Current tension: {tension_score}/100\n"
-            f"Recent transcript:\n{transcript_buffer[-500:]}\n"
-            f"{avoid_line}\n"
-            f"Generate one coaching whisper (8-12 words):"
+        user_prompt_text = build_coaching_tail(
+            trigger, tension_score, transcript_buffer[-COACHING_TRANSCRIPT_MAX_CHARS:], last_whisper
         )
 
         # Build content parts: text + optional vision frame
         content_parts: list = [user_prompt_text]
-        if image_b64:
+        image_id = ""
+        if image is not None:
+            content_parts.append(image.part())
+            image_id = image.digest
+            logger.info("Coaching with vision frame (%dx%d, %d KB)", image.width, image.height, len(image.jpeg) // 1024)
+        elif image_b64:
             try:
                 image_bytes = base64.b64decode(image_b64)
                 content_parts.append(
                     genai.types.Part.from_bytes(data=image_bytes, mime_type="image/jpeg")
                 )
+                image_id = hashlib.sha1(image_bytes).hexdigest()
                 logger.info("Coaching with vision frame (%d KB)", len(image_bytes) // 1024)
             except Exception as img_err:
                 logger.warning("Failed to decode vision frame, proceeding text-only: %s", img_err)
 
         # Build config with optional google_search grounding
         config_kwargs: dict = {
-            "system_instruction": COACHING_SYSTEM_PROMPT,
+            "system_instruction": build_system_instruction(vision=len(content_parts) > 1),
             "max_output_tokens": 30,
             "temperature": 0.7,
         }
@@ -166,22 +332,117 @@ async def generate_coaching(
             config_kwargs["tools"] = [genai.types.Tool(google_search=genai.types.GoogleSearch())]
             logger.debug("Coaching with Google Search grounding enabled")
 
-        response = await client.aio.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=content_parts,
-            config=genai.types.GenerateContentConfig(**config_kwargs),
+        # Identical requests in flight (e.g. scripted demos) share one Flash call.
+        coalesce_key = hashlib.sha1(
+            "\x1f".join((trigger, user_prompt_text, image_id)).encode("utf-8")
+        ).hexdigest()
+        response = await _run_flash(
+            "whisper",
+            lambda: client.aio.models.generate_content(
+                model=COACHING_MODEL,
+                contents=content_parts,
+                config=genai.types.GenerateContentConfig(**config_kwargs),
+            ),
+            priority=TRIGGER_PRIORITY.get(trigger, 1),
+            deadline=COACHING_DEADLINE_SEC,
+            key=coalesce_key,
         )
-        text = response.text.strip().strip('"').strip("'")
-        word_count = len(text.split())
-        if word_count < 4 or word_count > 20:
-            raise ValueError(f"Unexpected word count: {word_count}")
+        text = _clean_whisper(response.text)
         logger.info("AI coaching [%s]: %s", trigger, text)
-        return {"move": trigger, "text": text}
+        return {"move": trigger, "text": text, "source": "ai"}
     except Exception as e:
         logger.warning("Coaching generation failed, using fallback: %s", e)
-        fallback_id = FALLBACK_MOVES.get(trigger, "slow_down")
-        entry = get_move_by_id(fallback_id)
-        return entry or COACHING_MOVES[0]
+        return {**fallback_coaching(trigger, tension_score, transcript_buffer, last_whisper), "source": "fallback"}
+
+
+def _clean_whisper(text: str) -> str:
+    """Strip quotes/whitespace and reject replies that are clearly not an 8-12 word whisper."""
+    text = text.strip().strip('"').strip("'")
+    word_count = len(text.split())
+    if word_count < 4 or word_count > 20:
+        raise ValueError(f"Unexpected word count: {word_count}")
+    return text
+
+
+def _build_batch_prompt(items: list[BatchItem]) -> str:
+    parts = [f"{len(items)} conversations. Generate one coaching whisper (8-12 words) for each.\n"]
+    for i, item in enumerate(items, 1):
+        avoid = f'Previous whisper (DO NOT repeat): "{item.last_whisper}"\n' if item.last_whisper else ""
+        parts.append(
+            f"### Item {i}\n"
+            f"Trigger: {item.trigger}\n"
+            f"Current tension: {item.tension_score}/100\n"
+            f"Recent transcript:\n{item.transcript}\n"
+            f"{avoid}"
+        )
+    return "\n".join(parts)
+
+
+def _split_batch_response(text: str, n: int) -> list[str | None]:
+    """Parse the JSON array reply into n whispers; invalid or missing entries become None."""
+    import json
+
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end < start:
+        raise ValueError("batch reply is not a JSON array")
+    values = json.loads(text[start:end + 1])
+    results: list[str | None] = []
+    for i in range(n):
+        value = values[i] if i < len(values) else None
+        results.append(value if isinstance(value, str) and value.strip() else None)
+    return results
+
+
+async def _generate_coaching_batch(items: list[BatchItem]) -> list[str | None]:
+    """One Flash call for a whole batch, under the same limiter as single requests."""
+    from google import genai
+
+    client = _get_flash_client()
+    config_kwargs: dict = {
+        "system_instruction": build_system_instruction(trigger_types=True) + COACHING_BATCH_INSTRUCTION,
+        "max_output_tokens": 40 * len(items),
+        "temperature": 0.7,
+    }
+    if COACHING_GROUNDING:
+        config_kwargs["tools"] = [genai.types.Tool(google_search=genai.types.GoogleSearch())]
+    else:
+        # JSON mode is not available together with search grounding; the parser tolerates both.
+        config_kwargs["response_mime_type"] = "application/json"
+    response = await _run_flash(
+        "batch",
+        lambda: client.aio.models.generate_content(
+            model=COACHING_MODEL,
+            contents=[_build_batch_prompt(items)],
+            config=genai.types.GenerateContentConfig(**config_kwargs),
+        ),
+        priority=min(TRIGGER_PRIORITY.get(item.trigger, 1) for item in items),
+        deadline=COACHING_DEADLINE_SEC,
+    )
+    logger.info("AI coaching batch of %d generated", len(items))
+    return _split_batch_response(response.text, len(items))
+
+
+COACHING_BATCHER = CoachingBatcher(
+    _generate_coaching_batch, window_ms=COACHING_BATCH_WINDOW_MS, max_batch=COACHING_BATCH_MAX
+)
+
+
+def fallback_move(trigger: str, transcript: str = "") -> str:
+    """Coaching move for a trigger, refined by the marker cue in the recent transcript."""
+    cue = detect_cue(transcript)
+    default = FALLBACK_MOVES.get(trigger, "slow_down")
+    return CUE_MOVES.get((trigger, cue), default) if cue else default
+
+
+def fallback_coaching(
+    trigger: str,
+    tension_score: int = 0,
+    transcript: str = "",
+    last_whisper: str = "",
+) -> dict[str, str]:
+    """Local whisper for a trigger (used when generation fails or is skipped). No network."""
+    move = fallback_move(trigger, transcript)
+    return {"move": move, "text": LOCAL_COACH.compose(move, tension_score, transcript, avoid=(last_whisper,))}
 
 
 def get_move_by_id(move_id: str) -> dict[str, str] | None:
@@ -194,6 +455,24 @@ def get_move_by_id(move_id: str) -> dict[str, str] | None:
 # --- Whisper audio via Google Cloud Text-to-Speech ---
 
 COACHING_LIVE_AUDIO = os.environ.get("COACHING_LIVE_AUDIO", "0").strip().lower() in ("1", "true", "yes")
+# Start Cloud TTS after Live TTS has run this long and take whichever finishes first. 0 = sequential.
+COACHING_TTS_HEDGE_MS = float(os.environ.get("COACHING_TTS_HEDGE_MS", "0"))
+# sequential | hedged | parallel | auto (see app.tts_race); hedged by default when a hedge delay is set.
+TTS_STRATEGY = os.environ.get(
+    "TTS_STRATEGY", "hedged" if COACHING_TTS_HEDGE_MS > 0 else "sequential"
+).strip().lower()
+
+# Backends are looked up at call time so they can be patched in tests.
+WHISPER_TTS = TtsRacer(
+    [("live", lambda t: _generate_whisper_audio_live(t)), ("cloud", lambda t: _generate_whisper_audio_cloud_tts(t))],
+    strategy=TTS_STRATEGY,
+    hedge_ms=COACHING_TTS_HEDGE_MS,
+)
+BACKCHANNEL_TTS = TtsRacer(
+    [("live", lambda t: _generate_whisper_audio_live(t)), ("cloud", lambda t: _generate_backchannel_cloud_tts(t))],
+    strategy=TTS_STRATEGY,
+    hedge_ms=COACHING_TTS_HEDGE_MS,
+)
 
 _tts_client = None
 
@@ -201,6 +480,8 @@ _tts_client = None
 def _get_tts_client():
     """Build a Google Cloud TTS client (lazy singleton)."""
     global _tts_client
+    if fakes.enabled("tts"):
+        return fakes.TTS_CLIENT
     if _tts_client is not None:
         return _tts_client
     try:
@@ -254,6 +535,30 @@ def _apply_whisper_effect(pcm_bytes: bytes) -> bytes:
     return struct.pack(f"<{num_samples}h", *result)
 
 
+def _strip_wav_header(audio: bytes) -> bytes:
+    """PCM payload of a RIFF/WAVE buffer (walks the chunks to "data"); other input is returned as-is."""
+    if len(audio) < 12 or audio[:4] != b"RIFF" or audio[8:12] != b"WAVE":
+        return audio
+    pos = 12
+    while pos + 8 <= len(audio):
+        chunk_id = audio[pos:pos + 4]
+        size = int.from_bytes(audio[pos + 4:pos + 8], "little")
+        if chunk_id == b"data":
+            return audio[pos + 8:pos + 8 + size]
+        pos += 8 + size + (size & 1)
+    return audio[44:]
+
+
+def render_whisper_audio(audio: bytes) -> str:
+    """TTS output (raw PCM16 or WAV) -> whisper-processed base64 PCM16. CPU-bound; runs via AUDIO_POOL."""
+    return base64.b64encode(_apply_whisper_effect(_strip_wav_header(audio))).decode("ascii")
+
+
+async def _render_whisper(audio: bytes) -> str:
+    with TRACER.span("whisper_effect", bytes=len(audio)):
+        return await AUDIO_POOL.run(render_whisper_audio, audio, size=len(audio))
+
+
 async def _generate_whisper_audio_live(text: str) -> str | None:
     """
     Generate whisper audio via a SHORT-LIVED Gemini Live session.
@@ -269,7 +574,7 @@ async def _generate_whisper_audio_live(text: str) -> str | None:
         import asyncio
         from app.gemini_live_client import _make_genai_client
 
-        client = _make_genai_client()
+        client = fakes.GENAI_CLIENT if fakes.enabled("tts") else _make_genai_client()
         model = os.environ.get("GEMINI_MODEL", "gemini-live-2.5-flash-native-audio")
 
         live_config = {
@@ -334,8 +639,7 @@ async def _generate_whisper_audio_live(text: str) -> str | None:
                 return None
 
             audio_bytes = b"".join(audio_chunks)
-            audio_bytes = _apply_whisper_effect(audio_bytes)
-            b64 = base64.b64encode(audio_bytes).decode("ascii")
+            b64 = await _render_whisper(audio_bytes)
             logger.info("Gemini Live TTS whisper generated: %d bytes PCM16 24kHz", len(audio_bytes))
             return b64
 
@@ -388,20 +692,33 @@ async def _generate_whisper_audio_cloud_tts(text: str) -> str | None:
 
         response = await client.synthesize_speech(request=request)
         audio_bytes = response.audio_content
-
-        if len(audio_bytes) > 44 and audio_bytes[:4] == b'RIFF':
-            audio_bytes = audio_bytes[44:]
-
-        audio_bytes = _apply_whisper_effect(audio_bytes)
-        b64 = base64.b64encode(audio_bytes).decode("ascii")
-        logger.info("Cloud TTS whisper generated: %d bytes PCM16 24kHz", len(audio_bytes))
+        b64 = await _render_whisper(audio_bytes)
+        logger.info("Cloud TTS whisper generated: %d bytes 24kHz", len(audio_bytes))
         return b64
     except Exception as e:
         logger.warning("Cloud TTS whisper failed: %s", e)
         return None
 
 
-async def generate_whisper_audio(text: str) -> str | None:
+async def _cached_audio(kind: str, text: str, codec: str, racer: TtsRacer) -> str | None:
+    """Synthesize via racer (or reuse cached PCM for the same phrase), then encode for the client."""
+    hit = TTS_AUDIO_CACHE.get(kind, text, codec)
+    if hit is not None:
+        return hit
+    pcm_b64 = TTS_AUDIO_CACHE.pcm(kind, text)
+    if pcm_b64 is None:
+        pcm_b64 = await racer.synthesize(text)
+        if not pcm_b64:
+            return None
+        TTS_AUDIO_CACHE.put(kind, text, "pcm16", pcm_b64)
+    if codec == "pcm16":
+        return pcm_b64
+    encoded = await AUDIO_POOL.run(encode_b64, pcm_b64, codec, size=len(pcm_b64))
+    TTS_AUDIO_CACHE.put(kind, text, codec, encoded)
+    return encoded
+
+
+async def generate_whisper_audio(text: str, codec: str = "pcm16") -> str | None:
     """
     Generate whisper audio for coaching text.
 
@@ -409,15 +726,13 @@ async def generate_whisper_audio(text: str) -> str | None:
     fall back to Cloud TTS (Studio voice + SSML), then browser Web Speech API
     (handled by frontend when audio_base64 is None).
 
-    Returns base64-encoded PCM16 24kHz mono audio, or None on failure.
-    """
-    # Try Gemini Live TTS first — most natural sounding
-    b64 = await _generate_whisper_audio_live(text)
-    if b64:
-        return b64
+    TTS_STRATEGY (app.tts_race) decides whether Cloud TTS waits for Live TTS to fail,
+    starts after COACHING_TTS_HEDGE_MS, or races it from the start.
+    Audio for repeated phrases (local/cached whispers) comes from TTS_AUDIO_CACHE.
 
-    # Fall back to Cloud TTS
-    b64 = await _generate_whisper_audio_cloud_tts(text)
+    Returns base64 24kHz mono audio in `codec` (app.audio_codec; PCM16 by default), or None on failure.
+    """
+    b64 = await _cached_audio("whisper", text, codec, WHISPER_TTS)
     if b64:
         return b64
 
@@ -425,23 +740,18 @@ async def generate_whisper_audio(text: str) -> str | None:
     return None
 
 
-async def generate_backchannel_audio(text: str) -> str | None:
+async def generate_backchannel_audio(text: str, codec: str = "pcm16") -> str | None:
     """
     Generate short backchannel audio ("Ok.", "I see.") using the same Gemini Live
     TTS voice (Puck) as coaching whispers, so backchannel and whisper share one
     consistent persona. Falls back to Cloud TTS if Live TTS fails.
+    The handful of backchannel phrases are synthesized once and then served from TTS_AUDIO_CACHE.
 
-    Returns base64-encoded PCM16 24kHz mono audio, or None on failure.
+    Returns base64 24kHz mono audio in `codec` (PCM16 by default), or None on failure.
     """
-    # Try Gemini Live TTS first — same Puck voice as whisper
-    b64 = await _generate_whisper_audio_live(text)
-    if b64:
-        logger.info("Live TTS backchannel generated, text=%s", text)
-        return b64
-
-    # Fall back to Cloud TTS
-    b64 = await _generate_backchannel_cloud_tts(text)
+    b64 = await _cached_audio("backchannel", text, codec, BACKCHANNEL_TTS)
     if b64:
+        logger.info("Backchannel audio ready, text=%s", text)
         return b64
 
     logger.warning("All backchannel TTS methods failed for: %s", text)
@@ -483,15 +793,9 @@ async def _generate_backchannel_cloud_tts(text: str) -> str | None:
         response = await client.synthesize_speech(request=request)
         audio_bytes = response.audio_content
 
-        # Strip WAV header if present
-        if len(audio_bytes) > 44 and audio_bytes[:4] == b'RIFF':
-            audio_bytes = audio_bytes[44:]
-
-        # Apply same whisper post-processing (smoothing + amplitude reduction)
-        audio_bytes = _apply_whisper_effect(audio_bytes)
-
-        b64 = base64.b64encode(audio_bytes).decode("ascii")
-        logger.info("Cloud TTS backchannel generated: %d bytes PCM16 24kHz, text=%s", len(audio_bytes), text)
+        # Same whisper post-processing (WAV header strip, smoothing + amplitude reduction)
+        b64 = await _render_whisper(audio_bytes)
+        logger.info("Cloud TTS backchannel generated: %d bytes 24kHz, text=%s", len(audio_bytes), text)
         return b64
     except Exception as e:
         logger.warning("Cloud TTS backchannel failed: %s", e)
@@ -0,0 +1,93 @@
+"""
+Micro-batching for coaching generation: requests from many sessions arriving within a few
+milliseconds are sent as one multi-item Flash prompt and the results split back per caller.
+Optional (COACHING_BATCH=1); adds at most COACHING_BATCH_WINDOW_MS of latency per whisper.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    """One session's coaching request (text-only; vision requests are not batched)."""
+    trigger: str
+    tension_score: int
+    transcript: str
+    last_whisper: str = ""
+
+
+SendBatch = Callable[[list[BatchItem]], Awaitable[list[str | None]]]
+
+
+class CoachingBatcher:
+    """
+    Collect BatchItems for up to window_ms (or until max_batch), then call send_batch once.
+    Identical items share one slot in the batch. send_batch returns one result per item, in order;
+    None means that item failed and the caller should fall back.
+    """
+
+    def __init__(self, send_batch: SendBatch, window_ms: float = 15.0, max_batch: int = 8) -> None:
+        self._send_batch = send_batch
+        self.window_sec = window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._pending: dict[BatchItem, list[asyncio.Future[str | None]]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        # The loop keeps only weak references to tasks: hold in-flight batches until they finish.
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: BatchItem) -> str | None:
+        fut: asyncio.Future[str | None] = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(item, []).append(fut)
+        self.items += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window_sec, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self.batches += 1
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[BatchItem, list[asyncio.Future[str | None]]]) -> None:
+        items = list(batch)
+        try:
+            results = await self._send_batch(items)
+            if len(results) != len(items):
+                raise ValueError(f"batch returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            logger.warning("Coaching batch of %d failed: %s", len(items), e)
+            results = [None] * len(items)
+        for item, result in zip(items, results):
+            for fut in batch[item]:
+                if not fut.done():
+                    fut.set_result(result)
+
+    async def close(self) -> None:
+        """Send anything still waiting for its window and wait for every in-flight batch."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
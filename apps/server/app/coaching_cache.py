@@ -0,0 +1,133 @@
+"""
+Optional response cache for coaching whispers (COACHING_CACHE=1).
+Scripted demos and training scenarios hit the same trigger with near-identical transcripts over
+and over; a hit returns a previously generated whisper without calling Flash. Keys bucket the
+tension score and hash a normalized transcript tail, so punctuation/case/interim-result noise
+does not defeat the cache. Each key keeps a few candidate whispers and never hands a session
+the whisper it just heard.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+COACHING_CACHE = os.environ.get("COACHING_CACHE", "0").strip().lower() in ("1", "true", "yes")
+COACHING_CACHE_SIZE = int(os.environ.get("COACHING_CACHE_SIZE", "512"))
+COACHING_CACHE_TTL_SEC = float(os.environ.get("COACHING_CACHE_TTL_SEC", "600"))
+# Whispers kept per key; a hit rotates through them so repeat visitors don't hear one phrase.
+COACHING_CACHE_CANDIDATES = int(os.environ.get("COACHING_CACHE_CANDIDATES", "3"))
+COACHING_CACHE_TAIL_CHARS = int(os.environ.get("COACHING_CACHE_TAIL_CHARS", "200"))
+COACHING_CACHE_TENSION_BUCKET = int(os.environ.get("COACHING_CACHE_TENSION_BUCKET", "10"))
+
+_NON_WORD = re.compile(r"[^\w\s']+")
+_SPACES = re.compile(r"\s+")
+
+
+class CacheKey(NamedTuple):
+    trigger: str
+    tension_bucket: int
+    transcript_hash: str
+    image_hash: str
+
+
+def normalize_transcript(text: str, tail_chars: int = COACHING_CACHE_TAIL_CHARS) -> str:
+    """Lowercase, drop punctuation, collapse whitespace, keep the last tail_chars (whole words)."""
+    norm = _SPACES.sub(" ", _NON_WORD.sub(" ", text.lower())).strip()
+    if len(norm) > tail_chars:
+        norm = norm[-tail_chars:]
+        norm = norm[norm.find(" ") + 1:] if " " in norm else norm
+    return norm
+
+
+def make_key(
+    trigger: str,
+    tension_score: int,
+    transcript: str,
+    image_hash: str = "",
+    bucket: int = COACHING_CACHE_TENSION_BUCKET,
+) -> CacheKey:
+    digest = hashlib.sha1(normalize_transcript(transcript).encode("utf-8")).hexdigest()
+    return CacheKey(trigger, int(tension_score) // max(1, bucket), digest, image_hash)
+
+
+def _same_whisper(a: str, b: str) -> bool:
+    return normalize_transcript(a, 10_000) == normalize_transcript(b, 10_000)
+
+
+class _Entry:
+    __slots__ = ("candidates", "expires_at", "next_index")
+
+    def __init__(self, expires_at: float) -> None:
+        self.candidates: list[str] = []
+        self.expires_at = expires_at
+        self.next_index = 0
+
+
+class CoachingCache:
+    """LRU + TTL map from CacheKey to a small rotation of whispers. Not thread-safe (event loop only)."""
+
+    def __init__(
+        self,
+        max_entries: int = COACHING_CACHE_SIZE,
+        ttl_sec: float = COACHING_CACHE_TTL_SEC,
+        candidates: int = COACHING_CACHE_CANDIDATES,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_sec = ttl_sec
+        self.max_candidates = max(1, candidates)
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey, last_whisper: str = "", now: float | None = None) -> str | None:
+        """A cached whisper for key other than last_whisper, or None (caller should generate)."""
+        now = time.monotonic() if now is None else now
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            del self._entries[key]
+            entry = None
+        if entry is not None:
+            n = len(entry.candidates)
+            for i in range(n):
+                text = entry.candidates[(entry.next_index + i) % n]
+                if not last_whisper or not _same_whisper(text, last_whisper):
+                    entry.next_index = (entry.next_index + i + 1) % n
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return text
+        self.misses += 1
+        return None
+
+    def put(self, key: CacheKey, text: str, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= now:
+            entry = _Entry(now + self.ttl_sec)
+            self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if any(_same_whisper(text, c) for c in entry.candidates):
+            return
+        entry.candidates.append(text)
+        if len(entry.candidates) > self.max_candidates:
+            entry.candidates.pop(0)
+            entry.next_index %= len(entry.candidates)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+COACHING_RESPONSE_CACHE = CoachingCache()
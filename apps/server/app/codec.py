@@ -0,0 +1,71 @@
+"""
+JSON codec for the WebSocket protocol (inbound frames and outbound server messages).
+Uses orjson when installed; falls back to stdlib json. Override with WS_JSON_CODEC=orjson|json.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+WS_JSON_CODEC = os.environ.get("WS_JSON_CODEC", "auto").strip().lower()
+
+
+@dataclass(frozen=True)
+class JsonCodec:
+    """One JSON backend. loads accepts str or bytes; dumps always returns str (text frames)."""
+    name: str
+    loads: Callable[[str | bytes], Any]
+    dumps: Callable[[Any], str]
+
+
+def _stdlib_codec() -> JsonCodec:
+    # Same settings as Starlette's WebSocket.send_json, so output is byte-identical.
+    def dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+    return JsonCodec(name="json", loads=json.loads, dumps=dumps)
+
+
+def _orjson_codec() -> JsonCodec | None:
+    try:
+        import orjson
+    except ImportError:
+        return None
+    _dumps = orjson.dumps
+
+    def dumps(obj: Any) -> str:
+        return _dumps(obj).decode("utf-8")
+
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch one type.
+    return JsonCodec(name="orjson", loads=orjson.loads, dumps=dumps)
+
+
+def get_codec(name: str = "auto") -> JsonCodec:
+    """Return the requested codec; 'auto' prefers orjson. Unknown/missing backends fall back to stdlib."""
+    if name in ("auto", "orjson"):
+        codec = _orjson_codec()
+        if codec is not None:
+            return codec
+        if name == "orjson":
+            logger.warning("WS_JSON_CODEC=orjson but orjson is not installed; using stdlib json")
+    elif name != "json":
+        logger.warning("Unknown WS_JSON_CODEC=%r; using stdlib json", name)
+    return _stdlib_codec()
+
+
+CODEC = get_codec(WS_JSON_CODEC)
+
+
+def loads(raw: str | bytes) -> Any:
+    """Decode one inbound frame. Raises json.JSONDecodeError (or subclass) on invalid JSON."""
+    return CODEC.loads(raw)
+
+
+def dumps(obj: Any) -> str:
+    """Encode one outbound message as compact JSON text."""
+    return CODEC.dumps(obj)
@@ -0,0 +1,117 @@
+"""
+Graceful worker drain on SIGTERM (Cloud Run scale-in, rolling deploys).
+
+uvicorn's own shutdown closes every WebSocket with 1012 the moment the signal lands, cutting users off
+mid-whisper. With DRAIN_ON_SIGTERM (default on) the worker's lifespan puts this handler in front of
+uvicorn's: new sessions are turned away (`busy` with `draining`), every connected client gets a
+`reconnect` message, in-flight whispers may finish for up to DRAIN_DEADLINE_SEC, the sockets are closed
+with 1012, and only then is the signal passed on to uvicorn. A second SIGTERM skips the wait.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import signal
+import threading
+import time
+from typing import Any, Iterable
+
+from app.admission import ADMISSION
+
+logger = logging.getLogger(__name__)
+
+DRAIN_ON_SIGTERM = os.environ.get("DRAIN_ON_SIGTERM", "1").strip().lower() in ("1", "true", "yes")
+# Cloud Run sends SIGKILL 10 s after SIGTERM; leave time for uvicorn's own shutdown.
+DRAIN_DEADLINE_SEC = float(os.environ.get("DRAIN_DEADLINE_SEC", "8"))
+DRAIN_RETRY_AFTER_MS = int(os.environ.get("DRAIN_RETRY_AFTER_MS", "500"))
+DRAIN_POLL_SEC = 0.05
+
+
+class Drainer:
+    """Runs the drain sequence once per worker and chains to the signal handler it replaced."""
+
+    def __init__(self, deadline_sec: float = DRAIN_DEADLINE_SEC, retry_after_ms: int = DRAIN_RETRY_AFTER_MS) -> None:
+        self.deadline_sec = deadline_sec
+        self.retry_after_ms = retry_after_ms
+        self.started_ts: float | None = None
+        self.result: dict[str, Any] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._previous: Any = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def draining(self) -> bool:
+        return self.started_ts is not None
+
+    async def drain(self, sessions: Iterable[Any] | None = None) -> dict[str, Any]:
+        """Stop admitting, notify clients, wait for in-flight whispers (up to the deadline), close sockets."""
+        if sessions is None:
+            from app.websocket_handler import SESSIONS as sessions
+        ADMISSION.draining = True
+        self.started_ts = time.time()
+        start = time.monotonic()
+        live = list(sessions)
+        logger.info("Draining %d session(s), deadline %.1fs", len(live), self.deadline_sec)
+        for session in live:
+            await session.begin_drain(self.retry_after_ms)
+        deadline = start + self.deadline_sec
+        while any(s.whisper.in_flight for s in live) and time.monotonic() < deadline:
+            await asyncio.sleep(DRAIN_POLL_SEC)
+        cut = sum(1 for s in live if s.whisper.in_flight)
+        for session in live:
+            await session.end_drain()
+        self.result = {
+            "sessions": len(live),
+            "whispers_cut": cut,
+            "sec": round(time.monotonic() - start, 2),
+        }
+        if cut:
+            logger.warning("Drain deadline hit with %d whisper(s) in flight", cut)
+        logger.info("Drain done: %s", self.result)
+        return self.result
+
+    def install(self, loop: asyncio.AbstractEventLoop) -> bool:
+        """Put the drain in front of the current SIGTERM handler (uvicorn's). Main thread only."""
+        if not DRAIN_ON_SIGTERM or threading.current_thread() is not threading.main_thread():
+            return False
+        self._loop = loop
+        self._previous = signal.signal(signal.SIGTERM, self._on_signal)
+        return True
+
+    def uninstall(self) -> None:
+        if self._loop is not None and signal.getsignal(signal.SIGTERM) == self._on_signal:
+            signal.signal(signal.SIGTERM, self._previous)
+        self._loop = None
+
+    def _on_signal(self, sig: int, frame: Any) -> None:
+        if self._task is not None or self._loop is None:
+            self._forward(sig, frame)  # second signal: stop waiting
+            return
+        self._loop.call_soon_threadsafe(self._start, sig, frame)
+
+    def _start(self, sig: int, frame: Any) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._drain_then_forward(sig, frame))
+
+    async def _drain_then_forward(self, sig: int, frame: Any) -> None:
+        try:
+            await self.drain()
+        except Exception as e:
+            logger.exception("Drain failed: %s", e)
+        finally:
+            self._forward(sig, frame)
+
+    def _forward(self, sig: int, frame: Any) -> None:
+        previous = self._previous
+        if callable(previous):
+            previous(sig, frame)
+        else:
+            signal.signal(sig, previous if previous is not None else signal.SIG_DFL)
+            signal.raise_signal(sig)
+
+    def stats(self) -> dict[str, Any]:
+        return {"draining": self.draining, **self.result}
+
+
+DRAINER = Drainer()
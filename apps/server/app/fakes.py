@@ -0,0 +1,470 @@
+"""
+Local stand-ins for the four upstreams (Gemini Live, Flash, Speech-to-Text, TTS) with latency and
+fault injection, so reconnect, fallback and timeout paths can be exercised offline.
+
+FAKE_UPSTREAMS selects which upstreams are faked: "all" or a comma list of live, flash, stt, tts.
+The fakes replace the upstream *clients* at the existing factories (get_gemini_client,
+_get_flash_client, _get_tts_client, the Live TTS client, the Speech client), so everything above
+them — limiter, batcher, caches, TTS racer, STT thread, reconnect loop, metrics — runs unchanged.
+
+Per upstream (<UP> = LIVE, FLASH, STT, TTS):
+  FAKE_<UP>_LATENCY_MS   "250" fixed, "100-400" uniform, or "ln:300:0.5" log-normal (median ms, sigma)
+  FAKE_<UP>_ERROR_RATE   probability that a call (connect, generate, synthesize, final result) fails
+  FAKE_<UP>_DISCONNECT_SEC  mean seconds until a mid-stream disconnect (live, stt; 0 = never)
+
+Transcripts: each utterance (a burst of speech found by an energy VAD over the received PCM)
+becomes the next line of FAKE_TRANSCRIPT_FILE (one line per utterance; default: a short argument).
+FAKE_SEED makes latency/error draws reproducible.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import datetime
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import re
+import struct
+import time
+from array import array
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Iterable, Iterator
+
+from app.gemini_live_client import (
+    IGeminiLiveClient,
+    IGeminiLiveSession,
+    LiveEvent,
+    LiveSessionConfig,
+    StubGeminiLiveSession,
+)
+
+logger = logging.getLogger(__name__)
+
+UPSTREAMS = ("live", "flash", "stt", "tts")
+
+
+def _parse_upstreams(value: str) -> frozenset[str]:
+    names = {v.strip().lower() for v in value.split(",") if v.strip()}
+    if "all" in names or "1" in names or "true" in names:
+        return frozenset(UPSTREAMS)
+    unknown = names - set(UPSTREAMS)
+    if unknown:
+        logger.warning("FAKE_UPSTREAMS: ignoring unknown upstream(s) %s", ", ".join(sorted(unknown)))
+    return frozenset(names & set(UPSTREAMS))
+
+
+FAKE_UPSTREAMS = _parse_upstreams(os.environ.get("FAKE_UPSTREAMS", ""))
+FAKE_TRANSCRIPT_FILE = os.environ.get("FAKE_TRANSCRIPT_FILE", "").strip()
+FAKE_SEED = os.environ.get("FAKE_SEED", "").strip()
+# Energy VAD used to turn received audio into utterances.
+FAKE_VAD_THRESHOLD = float(os.environ.get("FAKE_VAD_THRESHOLD", "0.02"))
+FAKE_VAD_HANGOVER_MS = float(os.environ.get("FAKE_VAD_HANGOVER_MS", "400"))
+
+# Default latencies are in the range seen from the real services.
+_DEFAULT_LATENCY_MS = {"live": "ln:350:0.4", "flash": "ln:600:0.5", "stt": "ln:250:0.4", "tts": "ln:700:0.4"}
+
+DEFAULT_TRANSCRIPT = (
+    "you never listen to what I say",
+    "that's not fair, I listened last time",
+    "you always ignore my deadlines and it is ridiculous",
+    "whatever, I don't care anymore",
+    "can we just get on the same page about the plan",
+    "every single time we talk about this you blame me",
+    "I'm sorry, I want a plan that works for both of us",
+    "okay, let's try that this week",
+)
+
+FAKE_WHISPERS = (
+    "Slow down and name what you both want here",
+    "Try reflecting their point back before you answer it",
+    "Breathe first, then ask what would feel fair to them",
+    "Acknowledge the frustration before you defend the plan",
+    "Ask one open question instead of repeating your point",
+    "Lower your voice and focus on the shared goal",
+)
+
+_rng = random.Random(int(FAKE_SEED) if FAKE_SEED.lstrip("-").isdigit() else None)
+
+
+def enabled(upstream: str) -> bool:
+    """True when `upstream` (live, flash, stt, tts) is served by the local fake."""
+    return upstream in FAKE_UPSTREAMS
+
+
+class FakeUpstreamError(ConnectionError):
+    """Injected failure from a fake upstream."""
+
+
+class Latency:
+    """Latency distribution parsed from a spec: "250", "100-400" or "ln:<median_ms>:<sigma>"."""
+
+    def __init__(self, spec: str = "0") -> None:
+        self.spec = spec.strip() or "0"
+        try:
+            if self.spec.startswith("ln:"):
+                _, median, sigma = self.spec.split(":")
+                self._kind, self._a, self._b = "ln", math.log(max(float(median), 1e-3)), float(sigma)
+            elif "-" in self.spec.lstrip("-"):
+                low, high = self.spec.split("-", 1)
+                self._kind, self._a, self._b = "uniform", float(low), float(high)
+            else:
+                self._kind, self._a, self._b = "fixed", float(self.spec), 0.0
+        except ValueError as e:
+            raise ValueError(f"invalid latency spec {spec!r} (use 250, 100-400 or ln:300:0.5)") from e
+
+    def sample(self, rng: random.Random = _rng) -> float:
+        """One draw in seconds."""
+        if self._kind == "ln":
+            ms = rng.lognormvariate(self._a, self._b)
+        elif self._kind == "uniform":
+            ms = rng.uniform(self._a, self._b)
+        else:
+            ms = self._a
+        return max(0.0, ms) / 1000.0
+
+
+class Fault:
+    """Latency, error rate and mean time to disconnect for one fake upstream."""
+
+    def __init__(
+        self,
+        name: str,
+        latency: str = "0",
+        error_rate: float = 0.0,
+        disconnect_sec: float = 0.0,
+        rng: random.Random = _rng,
+    ) -> None:
+        self.name = name
+        self.latency = Latency(latency)
+        self.error_rate = error_rate
+        self.disconnect_sec = disconnect_sec
+        self._rng = rng
+        self.calls = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls, name: str) -> "Fault":
+        up = name.upper()
+        return cls(
+            name,
+            latency=os.environ.get(f"FAKE_{up}_LATENCY_MS", _DEFAULT_LATENCY_MS[name]),
+            error_rate=float(os.environ.get(f"FAKE_{up}_ERROR_RATE", "0")),
+            disconnect_sec=float(os.environ.get(f"FAKE_{up}_DISCONNECT_SEC", "0")),
+        )
+
+    def delay(self) -> float:
+        return self.latency.sample(self._rng)
+
+    def _check(self, what: str) -> None:
+        self.calls += 1
+        if self.error_rate > 0 and self._rng.random() < self.error_rate:
+            self.errors += 1
+            raise FakeUpstreamError(f"fake {self.name}: injected {what} failure")
+
+    async def wait(self, what: str) -> None:
+        """Sleep one latency draw, then fail with probability error_rate."""
+        await asyncio.sleep(self.delay())
+        self._check(what)
+
+    def wait_sync(self, what: str) -> None:
+        """wait() for upstreams driven from a worker thread (STT)."""
+        time.sleep(self.delay())
+        self._check(what)
+
+    def time_to_disconnect(self) -> float | None:
+        """Seconds until this stream should drop (exponential around disconnect_sec), or None."""
+        if self.disconnect_sec <= 0:
+            return None
+        return self._rng.expovariate(1.0 / self.disconnect_sec)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "latency_ms": self.latency.spec,
+            "error_rate": self.error_rate,
+            "disconnect_sec": self.disconnect_sec,
+            "calls": self.calls,
+            "errors": self.errors,
+        }
+
+
+FAULTS: dict[str, Fault] = {name: Fault.from_env(name) for name in UPSTREAMS}
+
+
+def load_transcript(path: str) -> tuple[str, ...]:
+    """Script file -> utterance lines (blank lines and # comments skipped)."""
+    with open(path, encoding="utf-8") as f:
+        lines = tuple(line.strip() for line in f if line.strip() and not line.lstrip().startswith("#"))
+    if not lines:
+        raise ValueError(f"{path}: transcript script is empty")
+    return lines
+
+
+TRANSCRIPT_LINES = load_transcript(FAKE_TRANSCRIPT_FILE) if FAKE_TRANSCRIPT_FILE else DEFAULT_TRANSCRIPT
+
+
+class Utterances:
+    """
+    Energy VAD over PCM16 mono chunks. feed() returns "end" when a burst of speech is followed by
+    FAKE_VAD_HANGOVER_MS of silence, so fakes answer at the points a real recognizer would.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        threshold: float = FAKE_VAD_THRESHOLD,
+        hangover_ms: float = FAKE_VAD_HANGOVER_MS,
+        min_speech_ms: float = 150.0,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.threshold = threshold * 32768.0
+        self.hangover_sec = hangover_ms / 1000.0
+        self.min_speech_sec = min_speech_ms / 1000.0
+        self.offset_sec = 0.0  # audio time consumed so far
+        self.speech_sec = 0.0  # voiced time in the current utterance
+        self._silence_sec = 0.0
+
+    def feed(self, pcm: bytes) -> str | None:
+        samples = array("h")
+        samples.frombytes(pcm[: len(pcm) - len(pcm) % 2])
+        if not samples:
+            return None
+        duration = len(samples) / self.sample_rate
+        self.offset_sec += duration
+        rms = math.sqrt(sum(s * s for s in samples) / len(samples))
+        if rms >= self.threshold:
+            self.speech_sec += duration
+            self._silence_sec = 0.0
+            return None
+        if self.speech_sec <= 0:
+            return None
+        self._silence_sec += duration
+        if self._silence_sec < self.hangover_sec:
+            return None
+        voiced, self.speech_sec = self.speech_sec, 0.0
+        return "end" if voiced >= self.min_speech_sec else None
+
+
+# --- Gemini Live ---
+
+
+class FakeGeminiLiveSession(StubGeminiLiveSession):
+    """Stub session that transcribes utterances from the script and can drop mid-stream."""
+
+    def __init__(self, config: LiveSessionConfig, fault: Fault, lines: Iterable[str] = TRANSCRIPT_LINES) -> None:
+        super().__init__(config)
+        self._fault = fault
+        self._lines = itertools.cycle(lines)
+        self._vad = Utterances()
+        self._tasks: set[asyncio.Task] = set()
+        self._drop_handle: asyncio.TimerHandle | None = None
+        after = fault.time_to_disconnect()
+        if after is not None:
+            self._drop_handle = asyncio.get_running_loop().call_later(after, self._drop)
+
+    async def send_audio(self, pcm_base64: str) -> None:
+        if self._closed:
+            return
+        if self._vad.feed(base64.b64decode(pcm_base64)) == "end":
+            task = asyncio.ensure_future(self._transcribe(next(self._lines)))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _transcribe(self, line: str) -> None:
+        """Input transcription arrives a latency draw after the utterance, in a few word deltas."""
+        await asyncio.sleep(self._fault.delay())
+        words = line.split()
+        for i in range(0, len(words), 3):
+            if self._closed:
+                return
+            await self._event_queue.put(LiveEvent(kind="user_transcript_delta", text=" " + " ".join(words[i:i + 3])))
+
+    def _drop(self) -> None:
+        if self._closed:
+            return
+        logger.info("fake live: injected mid-stream disconnect")
+        self._closed = True
+        self._event_queue.put_nowait(None)
+
+    async def close(self) -> None:
+        if self._drop_handle is not None:
+            self._drop_handle.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        await super().close()
+
+
+class FakeGeminiLiveClient(IGeminiLiveClient):
+    async def connect(self, config: LiveSessionConfig) -> IGeminiLiveSession:
+        fault = FAULTS["live"]
+        await fault.wait("connect")
+        return FakeGeminiLiveSession(config, fault)
+
+
+# --- TTS audio ---
+
+TTS_RATE = 24000
+_TONE_PERIOD = struct.pack(
+    "<120h", *(int(3000 * math.sin(2 * math.pi * i / 120)) for i in range(120))
+)  # 200 Hz at 24 kHz
+
+
+def speech_audio(text: str, sample_rate: int = TTS_RATE) -> bytes:
+    """PCM16 tone lasting about as long as `text` takes to say (2.5 words/s, at least 0.4 s)."""
+    seconds = max(0.4, len(text.split()) / 2.5)
+    nbytes = int(seconds * sample_rate) * 2
+    return (_TONE_PERIOD * (nbytes // len(_TONE_PERIOD) + 1))[:nbytes]
+
+
+def wav(pcm: bytes, sample_rate: int = TTS_RATE) -> bytes:
+    """44-byte RIFF/WAVE header + PCM16 mono, as Cloud TTS returns for LINEAR16."""
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(pcm), b"WAVE", b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16, b"data", len(pcm),
+    )
+    return header + pcm
+
+
+def request_text(request: Any) -> str:
+    source = getattr(request, "input", None)
+    text = getattr(source, "text", "") or getattr(source, "ssml", "") or ""
+    return re.sub(r"<[^>]+>", " ", text).strip()
+
+
+class FakeTextToSpeechClient:
+    """Stand-in for texttospeech.TextToSpeechAsyncClient: LINEAR16 WAV sized to the text."""
+
+    async def synthesize_speech(self, request: Any = None, **kwargs: Any) -> SimpleNamespace:
+        await FAULTS["tts"].wait("synthesize_speech")
+        return SimpleNamespace(audio_content=wav(speech_audio(request_text(request))))
+
+
+class FakeLiveTtsSession:
+    """client.aio.live.connect() for Live TTS: speaks the text of the last client turn."""
+
+    def __init__(self) -> None:
+        self._text = ""
+
+    async def __aenter__(self) -> "FakeLiveTtsSession":
+        await FAULTS["tts"].wait("live connect")
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+    async def send_client_content(self, turns: Any = None, turn_complete: bool = True) -> None:
+        parts = getattr(turns, "parts", None) or []
+        self._text = " ".join(getattr(p, "text", "") or "" for p in parts)
+
+    async def receive(self) -> AsyncIterator[SimpleNamespace]:
+        await asyncio.sleep(FAULTS["tts"].delay())
+        pcm = speech_audio(self._text)
+        step = TTS_RATE * 2 // 10  # 100 ms parts
+        for i in range(0, len(pcm), step):
+            inline = SimpleNamespace(data=pcm[i:i + step], mime_type=f"audio/pcm;rate={TTS_RATE}")
+            turn = SimpleNamespace(parts=[SimpleNamespace(text=None, inline_data=inline)])
+            yield SimpleNamespace(server_content=SimpleNamespace(model_turn=turn, turn_complete=False))
+        yield SimpleNamespace(server_content=SimpleNamespace(model_turn=None, turn_complete=True))
+
+
+# --- Flash (google.genai client surface used by coaching and prompts) ---
+
+
+class _FakeModels:
+    def __init__(self) -> None:
+        self._whispers = itertools.cycle(FAKE_WHISPERS)
+
+    async def generate_content(self, model: str = "", contents: Any = None, config: Any = None) -> SimpleNamespace:
+        await FAULTS["flash"].wait("generate_content")
+        system = str(getattr(config, "system_instruction", "") or "")
+        if "Batch mode" in system:
+            prompt = contents[0] if contents and isinstance(contents[0], str) else ""
+            return SimpleNamespace(text=json.dumps([next(self._whispers) for _ in range(prompt.count("### Item "))]))
+        return SimpleNamespace(text=next(self._whispers))
+
+
+class _FakeLive:
+    def connect(self, model: str = "", config: Any = None) -> FakeLiveTtsSession:
+        return FakeLiveTtsSession()
+
+
+class FakeGenaiClient:
+    """The google.genai.Client surface the server uses: aio.models and aio.live (TTS)."""
+
+    def __init__(self) -> None:
+        self.aio = SimpleNamespace(models=_FakeModels(), live=_FakeLive())
+
+
+# --- Speech-to-Text (google.cloud.speech surface used by app.streaming_stt) ---
+
+
+class FakeSpeechClient:
+    """
+    Stand-in for speech.SpeechClient. streaming_recognize yields cumulative interims while an
+    utterance is voiced and a final (after a latency draw) when it ends; a disconnect or injected
+    error raises out of the stream, as a real aborted stream does.
+    """
+
+    def __init__(self, lines: Iterable[str] = TRANSCRIPT_LINES) -> None:
+        self._lines = tuple(lines)
+
+    def streaming_recognize(self, config: Any = None, requests: Iterable[Any] = ()) -> Iterator[SimpleNamespace]:
+        rate = getattr(getattr(config, "config", None), "sample_rate_hertz", 16000) or 16000
+        return self._responses(requests, rate)
+
+    def _responses(self, requests: Iterable[Any], sample_rate: int) -> Iterator[SimpleNamespace]:
+        fault = FAULTS["stt"]
+        lines = itertools.cycle(self._lines)
+        vad = Utterances(sample_rate=sample_rate)
+        drop_at = fault.time_to_disconnect()
+        line = next(lines)
+        shown = 0
+        for request in requests:
+            audio = getattr(request, "audio_content", None)
+            if not audio:
+                continue
+            ended = vad.feed(audio)
+            if drop_at is not None and vad.offset_sec >= drop_at:
+                raise FakeUpstreamError("fake stt: injected stream disconnect")
+            if ended == "end":
+                fault.wait_sync("recognize")
+                yield speech_response(line, True, vad.offset_sec)
+                line, shown = next(lines), 0
+            elif vad.speech_sec > 0:
+                words = line.split()
+                n = min(len(words) - 1, int(vad.speech_sec * 2.5))
+                if n > shown:
+                    shown = n
+                    yield speech_response(" ".join(words[:n]), False, vad.offset_sec)
+
+
+def speech_response(text: str, is_final: bool, end_sec: float) -> SimpleNamespace:
+    result = SimpleNamespace(
+        alternatives=[SimpleNamespace(transcript=text)],
+        is_final=is_final,
+        result_end_time=datetime.timedelta(seconds=end_sec),
+    )
+    return SimpleNamespace(results=[result])
+
+
+# Request/config message types for the fake Speech client (keyword constructors, like the real ones).
+SpeechMessage = SimpleNamespace
+
+# Instances handed out by the factories; app.replay swaps in recording-driven ones.
+LIVE_CLIENT: IGeminiLiveClient = FakeGeminiLiveClient()
+GENAI_CLIENT: Any = FakeGenaiClient()
+TTS_CLIENT: Any = FakeTextToSpeechClient()
+SPEECH_CLIENT: Any = FakeSpeechClient()
+
+
+def speech_client() -> Any:
+    """Constructor stand-in for speech.SpeechClient (returns the current fake)."""
+    return SPEECH_CLIENT
+
+
+def stats() -> dict[str, Any]:
+    """Enabled fakes and their fault counters (for /health)."""
+    return {name: FAULTS[name].stats() for name in sorted(FAKE_UPSTREAMS)}
@@ -380,7 +380,12 @@ class StubGeminiLiveClient(IGeminiLiveClient):
 # --- Factory ---
 
 def get_gemini_client() -> IGeminiLiveClient:
-    """Return real client when GOOGLE_CLOUD_PROJECT or API key is set; otherwise stub. Handler uses stub when MOCK=1."""
+    """Return real client when GOOGLE_CLOUD_PROJECT or API key is set; otherwise stub. Handler uses stub when MOCK=1.
+    With FAKE_UPSTREAMS including "live", returns the local fake (app.fakes)."""
+    from app import fakes
+
+    if fakes.enabled("live"):
+        return fakes.LIVE_CLIENT
     if GOOGLE_CLOUD_PROJECT or GOOGLE_API_KEY:
         return RealGeminiLiveClient()
     return StubGeminiLiveClient()
@@ -0,0 +1,169 @@
+"""
+Process-wide async limiter for upstream model calls: bounded concurrency + token-bucket rate,
+priority ordering of waiters, per-call deadline and coalescing of identical in-flight requests.
+Used by coaching.py so bursts of whispers across sessions do not stampede Gemini Flash.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LimiterFull(RuntimeError):
+    """Raised when the wait queue is at capacity; callers should degrade immediately."""
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens/sec, at most `burst` stored. rate <= 0 disables limiting."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until_token(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        return 0.0 if self._tokens >= 1.0 else (1.0 - self._tokens) / self.rate
+
+    def take(self) -> None:
+        if self.rate > 0:
+            self._refill()
+            self._tokens -= 1.0
+
+
+class PriorityLimiter:
+    """
+    Admit at most `max_concurrency` calls at once, no faster than the token bucket allows.
+    Waiters are served lowest priority number first, then FIFO. max_concurrency <= 0 = unbounded.
+    """
+
+    def __init__(self, max_concurrency: int, rate_per_sec: float = 0.0, burst: int = 1, max_queue: int = 0) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.bucket = TokenBucket(rate_per_sec, burst)
+        self.in_flight = 0
+        self._heap: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._coalesce: dict[Hashable, asyncio.Future[Any]] = {}
+        self.completed = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, f in self._heap if not f.done())
+
+    def _has_capacity(self) -> bool:
+        return self.max_concurrency <= 0 or self.in_flight < self.max_concurrency
+
+    def _dispatch(self) -> None:
+        """Grant slots to the best waiters while capacity and tokens allow."""
+        self._timer = None
+        while self._heap and self._has_capacity():
+            _, _, fut = self._heap[0]
+            if fut.done():
+                heapq.heappop(self._heap)
+                continue
+            wait = self.bucket.time_until_token()
+            if wait > 0:
+                self._timer = fut.get_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._heap)
+            self.bucket.take()
+            self.in_flight += 1
+            fut.set_result(None)
+
+    async def _acquire(self, priority: int) -> None:
+        if not self._heap and self._has_capacity() and self.bucket.time_until_token() <= 0:
+            self.bucket.take()
+            self.in_flight += 1
+            return
+        if self.max_queue > 0 and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise LimiterFull(f"limiter queue full ({self.max_queue} waiting)")
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._seq), fut))
+        if self._timer is None:
+            self._dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release()  # slot was granted as we were cancelled
+            raise
+
+    def _release(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        if self._timer is None:
+            self._dispatch()
+
+    async def _run(self, factory: Callable[[], Awaitable[T]], priority: int) -> T:
+        await self._acquire(priority)
+        try:
+            return await factory()
+        finally:
+            self.completed += 1
+            self._release()
+
+    async def run(
+        self,
+        factory: Callable[[], Awaitable[T]],
+        priority: int = 1,
+        deadline: float | None = None,
+        key: Hashable | None = None,
+    ) -> T:
+        """
+        Run factory() under the limiter. deadline (seconds) bounds queueing + the call itself and
+        raises asyncio.TimeoutError when exceeded. Calls with the same key while one is in flight
+        share its result instead of issuing a second request.
+        """
+        if key is None:
+            coro: Awaitable[T] = self._run(factory, priority)
+        else:
+            shared = self._coalesce.get(key)
+            if shared is None:
+                shared = asyncio.ensure_future(self._run(factory, priority))
+                self._coalesce[key] = shared
+                shared.add_done_callback(lambda f, k=key: self._forget(k, f))
+            else:
+                self.coalesced += 1
+            coro = asyncio.shield(shared)
+        try:
+            return await asyncio.wait_for(coro, deadline)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+
+    def _forget(self, key: Hashable, fut: asyncio.Future[Any]) -> None:
+        if self._coalesce.get(key) is fut:
+            del self._coalesce[key]
+        if not fut.cancelled():
+            fut.exception()  # mark retrieved; every waiter already saw it (or gave up)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "completed": self.completed,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,217 @@
+"""
+Local whisper generator: rule/template based, no network, answers in microseconds.
+Picks a phrase for a coaching move from a phrase bank keyed by what was said (marker cues like
+absolutes or dismissive words), else by tension band, and rotates so a session does not hear the
+same phrase twice in a row. Used when Flash fails or is saturated, and as the primary path with
+COACHING_LOCAL_FIRST=1.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+# Tension at or above this uses the "high" phrase set.
+HIGH_TENSION_BAND = 70
+# Only the recent part of the transcript decides the cue.
+CUE_WINDOW_CHARS = 300
+
+# Transcript markers shared with the tension tracker (app.websocket_handler scores semantic pressure
+# with ESCALATION_MARKERS / CALMING_MARKERS), grouped by the cue they signal.
+ESCALATION_CUES: dict[str, tuple[str, ...]] = {
+    "dismissive": ("ridiculous",),
+    "absolute": ("you always", "you never", "never listen"),
+    "grievance": ("ignore my deadlines", "only one taking"),
+}
+ESCALATION_MARKERS: tuple[str, ...] = tuple(m for markers in ESCALATION_CUES.values() for m in markers)
+CALMING_MARKERS: tuple[str, ...] = (
+    "i don't want this to turn into a fight",
+    "i dont want this to turn into a fight",
+    "clear about expectations",
+    "plan that works for both of us",
+    "on the same page",
+    "check in about the last project",
+)
+
+# Marker phrase -> cue. Checked as substrings of the lowercased recent transcript.
+CUE_MARKERS: dict[str, tuple[str, ...]] = {
+    "absolute": ESCALATION_CUES["absolute"] + ("every time", "every single time"),
+    "dismissive": ESCALATION_CUES["dismissive"] + (
+        "whatever", "i don't care", "i dont care", "shut up", "calm down", "not my problem",
+    ),
+    "grievance": ESCALATION_CUES["grievance"] + ("your fault", "not fair", "left me", "blame"),
+    "repair": CALMING_MARKERS + ("i hear you", "i'm sorry", "im sorry"),
+}
+
+# (move, cue or band) -> phrases. Every phrase is 8-12 words, second person, no labels or diagnoses.
+# Cue sets exist only for the (move, cue) pairs app.coaching.fallback_move can pick.
+PHRASES: dict[tuple[str, str], tuple[str, ...]] = {
+    # --- slow_down ---
+    ("slow_down", "rising"): (
+        "Taking a breath before the next sentence can help.",
+        "Let the pause sit for a moment before you answer.",
+        "Slow your pace a little; there's no need to rush.",
+        "Try finishing one thought fully before starting the next one.",
+    ),
+    ("slow_down", "high"): (
+        "Pause here. One slow breath before you say anything else.",
+        "Drop your pace and volume; let your next words land softly.",
+        "Stop for a beat. You don't have to answer right away.",
+        "Breathe out slowly, then choose just one point to make.",
+    ),
+    ("slow_down", "absolute"): (
+        "Pause before answering that always; ask for one specific example.",
+        "Breathe first, then name the one moment that matters most.",
+    ),
+    ("slow_down", "repair"): (
+        "That opening helps. Keep this slower pace while you talk it through.",
+        "Good reset. Stay slow and let them finish their thought.",
+    ),
+    # --- reflect_back ---
+    ("reflect_back", "rising"): (
+        "It sounds like this is really important to you right now.",
+        "Try repeating back what you heard before adding your view.",
+        "Reflect their last point in your own words, then continue.",
+        "Say what you heard them say; check if you got it.",
+    ),
+    ("reflect_back", "high"): (
+        "Let them finish, then tell them what you just heard.",
+        "Before replying, reflect their feeling back: sounds like you're frustrated.",
+        "You're both talking at once. Pause and summarize their point.",
+        "Name what they seem to feel before making your own point.",
+    ),
+    ("reflect_back", "absolute"): (
+        "Try saying: it sounds like this keeps happening for you.",
+        "Reflect the pattern they feel, then ask about one example.",
+    ),
+    ("reflect_back", "grievance"): (
+        "Reflect their concern first: it sounds like that felt unfair.",
+        "Acknowledge how that affected them before explaining your side.",
+    ),
+    # --- clarify_intent ---
+    ("clarify_intent", "rising"): (
+        "Would it help to say what you're hoping they take away?",
+        "Share the outcome you want from this conversation in one sentence.",
+        "What do you actually need here? Try saying it plainly.",
+        "Make one clear request instead of listing everything that's wrong.",
+    ),
+    ("clarify_intent", "high"): (
+        "The silence is okay. Say what you need, simply and calmly.",
+        "Break the silence gently: tell them what you're hoping for.",
+        "Name your goal for this talk; it may reset the tone.",
+        "Use this pause to make one specific, doable request.",
+    ),
+    ("clarify_intent", "absolute"): (
+        "Swap always for one concrete example and what you need.",
+        "Name one specific moment and the change you're asking for.",
+    ),
+    ("clarify_intent", "repair"): (
+        "Good moment to agree on one next step together, out loud.",
+        "Confirm what you both want before moving to the details.",
+    ),
+    # --- deescalate_tone ---
+    ("deescalate_tone", "rising"): (
+        "A softer tone might make it easier for them to hear you.",
+        "Lower your voice slightly; it invites them to lower theirs.",
+        "Relax your shoulders and let your voice settle a little.",
+        "Keep your tone curious rather than corrective for a moment.",
+    ),
+    ("deescalate_tone", "high"): (
+        "Voices are rising. Soften yours first and see what changes.",
+        "Unclench, lower your volume, and speak a little more slowly.",
+        "Try a calmer tone; you can be firm without being loud.",
+        "Let the heat drop: quieter voice, open hands, slower words.",
+    ),
+    ("deescalate_tone", "dismissive"): (
+        "That felt dismissive. Respond calmly instead of matching the tone.",
+        "Don't match the sharpness; keep your voice steady and warm.",
+    ),
+    ("deescalate_tone", "grievance"): (
+        "Describe the impact on you without assigning blame to them.",
+        "Try I felt instead of you did; it lowers defenses.",
+    ),
+    # --- invite_perspective ---
+    ("invite_perspective", "rising"): (
+        "You could ask how they're seeing it so far.",
+        "Ask what this looks like from their side before continuing.",
+        "Invite their view: what would make this work for you?",
+        "Try asking what they need from you right now.",
+    ),
+    ("invite_perspective", "high"): (
+        "Stop persuading for a moment and ask what they think.",
+        "Ask one open question, then really listen to the answer.",
+        "Hand them the floor: what feels most important to you?",
+        "Try asking what they heard you say so far.",
+    ),
+    ("invite_perspective", "dismissive"): (
+        "Ask what's making this feel not worth discussing for them.",
+        "Ask gently what they'd need to keep talking about this.",
+    ),
+    ("invite_perspective", "grievance"): (
+        "Ask how they saw that situation before deciding who's right.",
+        "Invite their side: what was going on for you then?",
+    ),
+    ("invite_perspective", "repair"): (
+        "Ask what a good outcome would look like for them.",
+        "Invite their ideas for the plan before offering your own.",
+    ),
+}
+
+MOVES: tuple[str, ...] = ("slow_down", "reflect_back", "clarify_intent", "deescalate_tone", "invite_perspective")
+
+
+def detect_cue(transcript: str) -> str | None:
+    """Strongest marker cue in the recent transcript (most hits wins, CUE_MARKERS order breaks ties)."""
+    if not transcript:
+        return None
+    lower = transcript[-CUE_WINDOW_CHARS:].lower()
+    best, best_hits = None, 0
+    for cue, markers in CUE_MARKERS.items():
+        hits = sum(1 for m in markers if m in lower)
+        if hits > best_hits:
+            best, best_hits = cue, hits
+    return best
+
+
+def tension_band(tension_score: int) -> str:
+    return "high" if tension_score >= HIGH_TENSION_BAND else "rising"
+
+
+class LocalCoach:
+    """Phrase selection with per-bucket rotation. Pure Python, safe to call on the event loop."""
+
+    def __init__(self, phrases: dict[tuple[str, str], tuple[str, ...]] = PHRASES) -> None:
+        self.phrases = phrases
+        self._cursor: dict[tuple[str, str], int] = {}
+        self.served = 0
+
+    def candidates(self, move: str, tension_score: int, transcript: str = "") -> list[str]:
+        """Phrases for the move: cue-specific first, then the tension band's set."""
+        keys = []
+        cue = detect_cue(transcript)
+        if cue:
+            keys.append((move, cue))
+        keys.append((move, tension_band(tension_score)))
+        out: list[str] = []
+        for key in keys:
+            out.extend(self.phrases.get(key, ()))
+        return out
+
+    def compose(self, move: str, tension_score: int = 0, transcript: str = "", avoid: Iterable[str] = ()) -> str:
+        """Next phrase in rotation for this context, skipping anything in avoid (e.g. last_whisper)."""
+        if move not in MOVES:
+            move = "slow_down"
+        cue = detect_cue(transcript)
+        key = (move, cue or tension_band(tension_score))
+        pool = self.candidates(move, tension_score, transcript)
+        skip = {a.strip().lower() for a in avoid if a}
+        start = self._cursor.get(key, 0)
+        for i in range(len(pool)):
+            text = pool[(start + i) % len(pool)]
+            if text.lower() not in skip:
+                self._cursor[key] = (start + i + 1) % len(pool)
+                self.served += 1
+                return text
+        self.served += 1
+        return pool[start % len(pool)]
+
+
+LOCAL_COACH = LocalCoach()
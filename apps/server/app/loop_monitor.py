@@ -0,0 +1,129 @@
+"""
+Event-loop health: a watchdog thread pings the asyncio loop every LOOP_MONITOR_INTERVAL_SEC with
+call_soon_threadsafe and measures how long the ping waits to run (scheduling lag). When a ping
+has not run after LOOP_SLOW_CALLBACK_MS, something is blocking the loop: the watchdog grabs the
+loop thread's stack right then (sys._current_frames), so the log shows the culprit (a sync
+client constructor, a lazy import, a big json.loads, ...) rather than where the loop resumed.
+Lag percentiles go to /health, lag and stall counts to /metrics.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any
+
+from app.metrics import LOOP_LAG_SECONDS, LOOP_STALLS
+
+logger = logging.getLogger(__name__)
+
+# Ping period; 0 disables the monitor.
+LOOP_MONITOR_INTERVAL_SEC = float(os.environ.get("LOOP_MONITOR_INTERVAL_SEC", "0.25"))
+LOOP_SLOW_CALLBACK_MS = float(os.environ.get("LOOP_SLOW_CALLBACK_MS", "100"))
+# Lag samples kept for percentiles (~5 min at the default interval).
+LOOP_LAG_WINDOW = 1200
+STALL_STACK_FRAMES = 12
+
+
+def _percentile(ordered: list[float], q: float) -> float | None:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LoopMonitor:
+    def __init__(
+        self,
+        interval_sec: float = LOOP_MONITOR_INTERVAL_SEC,
+        slow_ms: float = LOOP_SLOW_CALLBACK_MS,
+        window: int = LOOP_LAG_WINDOW,
+    ) -> None:
+        self.interval_sec = interval_sec
+        self.slow_sec = slow_ms / 1000.0
+        self.lags: deque[float] = deque(maxlen=window)
+        self.stalls: deque[dict[str, Any]] = deque(maxlen=20)
+        self.stall_count = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        """Start watching loop (default: the running loop). Must be called from the loop's thread."""
+        if self.running or self.interval_sec <= 0:
+            return
+        self._loop = loop or asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _pong(self, sent: float, done: threading.Event) -> None:
+        lag = time.monotonic() - sent
+        self.lags.append(lag)
+        LOOP_LAG_SECONDS.observe(lag)
+        done.set()
+
+    def _loop_stack(self) -> list[str]:
+        frame = sys._current_frames().get(self._loop_thread_id) if self._loop_thread_id else None
+        return traceback.format_stack(frame)[-STALL_STACK_FRAMES:] if frame is not None else []
+
+    def _watch(self) -> None:
+        loop = self._loop
+        while not self._stop.is_set() and loop is not None and not loop.is_closed():
+            sent = time.monotonic()
+            done = threading.Event()
+            try:
+                loop.call_soon_threadsafe(self._pong, sent, done)
+            except RuntimeError:
+                return  # loop closed
+            if not done.wait(self.slow_sec):
+                stack = self._loop_stack()
+                while not done.wait(0.05):
+                    if self._stop.is_set() or loop.is_closed():
+                        return
+                self._record_stall(time.monotonic() - sent, stack)
+            self._stop.wait(self.interval_sec)
+
+    def _record_stall(self, duration: float, stack: list[str]) -> None:
+        self.stall_count += 1
+        LOOP_STALLS.inc()
+        self.stalls.append({"ts": time.time(), "duration_ms": round(duration * 1000.0, 1), "stack": stack})
+        logger.warning(
+            "Event loop blocked for %.0f ms; loop thread was at:\n%s", duration * 1000.0, "".join(stack).rstrip()
+        )
+
+    def stats(self) -> dict[str, Any]:
+        ordered = sorted(self.lags)
+
+        def ms(v: float | None) -> float | None:
+            return round(v * 1000.0, 2) if v is not None else None
+
+        return {
+            "running": self.running,
+            "samples": len(ordered),
+            "p50_ms": ms(_percentile(ordered, 0.5)),
+            "p90_ms": ms(_percentile(ordered, 0.9)),
+            "p99_ms": ms(_percentile(ordered, 0.99)),
+            "max_ms": ms(ordered[-1] if ordered else None),
+            "stalls": self.stall_count,
+            "last_stall_ms": self.stalls[-1]["duration_ms"] if self.stalls else None,
+        }
+
+
+LOOP_MONITOR = LoopMonitor()
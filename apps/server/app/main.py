@@ -2,53 +2,128 @@
 Empathic Co-Pilot backend – FastAPI app and WebSocket endpoint.
 """
 from contextlib import asynccontextmanager
-import json
+import asyncio
 import logging
 import os
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from app.startup import STARTUP
 
-from app.websocket_handler import handle_websocket
+# Time the imports below for GET /startup; the import hook is removed as soon as they finish.
+STARTUP.begin()
+try:
+    from fastapi import FastAPI, Response, WebSocket, WebSocketDisconnect
+
+    from app import fakes, session_store
+    from app.admission import ADMISSION
+    from app.audio_codec import TTS_AUDIO_CACHE
+    from app.audio_executor import AUDIO_POOL
+    from app.coaching import COACHING_BATCHER, FLASH_LIMITER, WHISPER_TTS
+    from app.coaching_cache import COACHING_CACHE, COACHING_RESPONSE_CACHE
+    from app.drain import DRAINER
+    from app.loop_monitor import LOOP_MONITOR
+    from app.metrics import ACTIVE_SESSIONS, CONTENT_TYPE, REGISTRY
+    from app.tts_race import all_backend_stats
+    from app.vision import MAX_INBOUND_CHARS
+    from app.websocket_handler import handle_websocket, send_json
+finally:
+    STARTUP.end()
 
 # Configure logging when app loads (Cloud Run runs uvicorn app.main:app, so run.py is never executed)
 _level = os.environ.get("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(level=getattr(logging, _level, logging.INFO))
 
 logger = logging.getLogger(__name__)
+STARTUP.mark("app_imported")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: e.g. init Gemini client pool if needed
+    # Startup: import the heavy SDKs off the event loop while the first connection is accepted
+    STARTUP.mark("lifespan_started")
+    STARTUP.start_preload()
+    AUDIO_POOL.warm("app.coaching")
+    LOOP_MONITOR.start()
+    DRAINER.install(asyncio.get_running_loop())
     yield
     # Shutdown
-    pass
+    DRAINER.uninstall()
+    LOOP_MONITOR.stop()
+    await COACHING_BATCHER.close()
+    AUDIO_POOL.shutdown()
 
 
 app = FastAPI(title="Empathic Co-Pilot", lifespan=lifespan)
+ACTIVE_SESSIONS.set_function(lambda: ADMISSION.sessions.in_use)
 
 
 @app.get("/health")
-def health():
-    return {"status": "ok"}
+async def health():
+    # async: runs on the event loop, so the stats below never iterate loop-owned state from a threadpool.
+    # Load lets the platform/load balancer see saturation; status is "busy" when no session slots remain.
+    health = {**ADMISSION.load(), "flash": FLASH_LIMITER.stats()}
+    health["tts"] = {**WHISPER_TTS.stats(), "backends": all_backend_stats(), "audio_cache": TTS_AUDIO_CACHE.stats()}
+    health["audio_executor"] = AUDIO_POOL.stats()
+    health["loop"] = LOOP_MONITOR.stats()
+    if DRAINER.draining:
+        health["drain"] = DRAINER.stats()
+    if session_store.STORE is not None:
+        health["session_store"] = session_store.STORE.stats()
+    if COACHING_CACHE:
+        health["coaching_cache"] = COACHING_RESPONSE_CACHE.stats()
+    if fakes.FAKE_UPSTREAMS:
+        health["fakes"] = fakes.stats()
+    return health
+
+
+@app.get("/metrics")
+async def metrics():
+    # Prometheus text format; per-instance, so scrape every Cloud Run instance (or push via a sidecar).
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+async def _admit(websocket: WebSocket) -> bool:
+    """Take a session slot or tell the client to retry elsewhere. Fast reject unless queueing is enabled."""
+    if ADMISSION.draining:
+        await send_json(websocket, ADMISSION.busy_message())
+        await websocket.close(code=1012)  # Service Restart
+        return False
+    if ADMISSION.queue_sec > 0 and ADMISSION.sessions.full:
+        await send_json(websocket, ADMISSION.busy_message(queued=True))
+    if await ADMISSION.admit_session():
+        return True
+    await send_json(websocket, ADMISSION.busy_message())
+    await websocket.close(code=1013)  # Try Again Later
+    return False
+
+
+@app.get("/startup")
+async def startup():
+    # Cold-start profile of this worker: milestones, background preload results, slowest imports.
+    return STARTUP.profile()
 
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
+    STARTUP.mark("first_connect")
     await websocket.accept()
+    try:
+        if not await _admit(websocket):
+            return
+    except WebSocketDisconnect:
+        return
     try:
         await handle_websocket(websocket)
     except WebSocketDisconnect:
         logger.info("Client disconnected")
     except Exception as e:
         logger.exception("WebSocket error: %s", e)
-        try:
-            await websocket.send_json({"type": "error", "message": str(e)})
-        except Exception:
-            pass
+        await send_json(websocket, {"type": "error", "message": str(e)})  # logs instead of raising
+    finally:
+        ADMISSION.release_session()
 
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.environ.get("PORT", "8765"))
-    uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=True)
+    reload = os.environ.get("RELOAD", "").lower() in ("1", "true", "yes")
+    uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=reload, ws_max_size=MAX_INBOUND_CHARS)
@@ -0,0 +1,229 @@
+"""
+Process-wide metrics in the Prometheus text exposition format (GET /metrics), for capacity
+planning across Cloud Run instances. Small self-contained registry (no client library):
+counters, gauges and fixed-bucket histograms with optional labels. Gauges that mirror state
+kept elsewhere (active sessions, queue depths) are read at scrape time through callbacks.
+Updates take a lock because the STT thread and the audio executor observe from other threads.
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+from typing import Callable, Iterable, Sequence
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; fine at the low end for per-chunk work, up to 10 s for model calls.
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelValues = tuple[str, ...]
+GaugeCallback = Callable[[], "float | Iterable[tuple[dict[str, str], float]]"]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[LabelValues, float] = {} if labelnames else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Set directly, or give set_function() a callback returning a value (or (labels, value) pairs)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[LabelValues, float] = {}
+        self._callback: GaugeCallback | None = None
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, fn: GaugeCallback) -> None:
+        self._callback = fn
+
+    def collect(self) -> list[tuple[LabelValues, float]]:
+        if self._callback is not None:
+            try:
+                result = self._callback()
+            except Exception as e:
+                logger.debug("Gauge %s callback failed: %s", self.name, e)
+                return []
+            if isinstance(result, (int, float)):
+                return [((), float(result))]
+            return [(self._key(labels), float(v)) for labels, v in result]
+        with self._lock:
+            return sorted(self._values.items())
+
+    def _samples(self) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in self.collect()]
+
+
+class _HistogramValues:
+    __slots__ = ("counts", "total", "sum")
+
+    def __init__(self, n: int) -> None:
+        self.counts = [0] * n
+        self.total = 0
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    """Fixed buckets (upper bounds, seconds); rendered cumulatively as Prometheus expects."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: dict[LabelValues, _HistogramValues] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            h = self._values.get(key)
+            if h is None:
+                h = self._values[key] = _HistogramValues(len(self.buckets) + 1)
+            h.counts[bisect.bisect_left(self.buckets, value)] += 1
+            h.total += 1
+            h.sum += value
+
+    def count(self, **labels: str) -> int:
+        h = self._values.get(self._key(labels))
+        return h.total if h else 0
+
+    def _samples(self) -> list[str]:
+        lines: list[str] = []
+        with self._lock:
+            items = sorted((k, (list(h.counts), h.total, h.sum)) for k, h in self._values.items())
+        for key, (counts, total, total_sum) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total_sum)}")
+            lines.append(f"{self.name}_count{labels} {total}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help_text, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+AUDIO_CHUNKS = REGISTRY.counter("copilot_audio_chunks_total", "Audio chunks received from clients.")
+AUDIO_CHUNKS_DROPPED = REGISTRY.counter(
+    "copilot_audio_chunks_dropped_total", "Audio chunks dropped (invalid base64, full telemetry or STT queue).", ("reason",)
+)
+AUDIO_DECODE_SECONDS = REGISTRY.histogram("copilot_audio_decode_seconds", "Base64 decode time per inbound audio chunk.")
+TENSION_COMPUTE_SECONDS = REGISTRY.histogram(
+    "copilot_tension_compute_seconds", "Time to drain telemetry and compute one tension score."
+)
+STT_LATENCY_SECONDS = REGISTRY.histogram(
+    "copilot_stt_latency_seconds", "Streaming STT: end of the recognized audio to result arrival.", ("final",)
+)
+FLASH_LATENCY_SECONDS = REGISTRY.histogram(
+    "copilot_flash_latency_seconds", "Flash coaching call time including limiter queueing.", ("kind",)
+)
+FLASH_ERRORS = REGISTRY.counter("copilot_flash_errors_total", "Flash coaching calls that failed or timed out.", ("kind",))
+TTS_LATENCY_SECONDS = REGISTRY.histogram(
+    "copilot_tts_latency_seconds", "TTS backend attempt time.", ("backend", "outcome")
+)
+LIVE_RECONNECTS = REGISTRY.counter("copilot_live_reconnects_total", "Gemini Live session reconnects.")
+ACTIVE_SESSIONS = REGISTRY.gauge("copilot_active_sessions", "WebSocket sessions holding a slot.")
+QUEUE_DEPTH = REGISTRY.gauge("copilot_queue_depth", "Items waiting, summed over sessions.", ("queue",))
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "copilot_event_loop_lag_seconds", "How long a callback scheduled by the loop monitor waited to run."
+)
+LOOP_STALLS = REGISTRY.counter(
+    "copilot_event_loop_stalls_total", "Times the event loop was blocked longer than LOOP_SLOW_CALLBACK_MS."
+)
+
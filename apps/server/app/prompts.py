@@ -0,0 +1,82 @@
+"""
+Coaching prompt construction for Gemini Flash.
+Each whisper sends only the instructions that call needs: the webcam body-language rules only when
+a frame is attached, and only the description of the trigger that fired (in the per-call tail)
+instead of all of them. The tail carries trigger, tension and the last
+COACHING_TRANSCRIPT_MAX_CHARS of transcript. Flash calls are stateless, so the full recent window
+is always sent; the system prompt is far below Gemini's context-cache minimum, so it is sent inline.
+"""
+from __future__ import annotations
+
+import os
+
+COACHING_TRANSCRIPT_MAX_CHARS = int(os.environ.get("COACHING_TRANSCRIPT_MAX_CHARS", "500"))
+
+_PERSONA = """\
+You are "Sage" — a calm, empathetic conversation coach who whispers guidance \
+during difficult conversations. Your personality: warm but direct, emotionally \
+intelligent, gently encouraging. Think of a trusted mentor who speaks softly \
+but with clarity. You use Nonviolent Communication (NVC) and active listening.
+
+The user is in a difficult conversation RIGHT NOW. Based on the transcript, \
+tension level, trigger, and optionally their webcam image, generate ONE \
+coaching whisper.
+
+Rules:
+- Exactly 8 to 12 words, no more
+- Use NVC principles: observations, feelings, needs, requests
+- Use active listening: reflect, validate, invite perspective
+- Never diagnose, label, or judge either party
+- Speak directly to the user in second person ("you")
+- Be warm and concise — you're whispering in their ear during a live conversation
+- IMPORTANT: Vary your phrasing. Don't start every whisper with "You look" or \
+"You seem." Use diverse openings: questions, gentle imperatives, observations, \
+reflections (e.g. "Try asking...", "Notice how...", "What if you...", \
+"Their tone shifted — pause here.", "Share what you need right now.")
+"""
+
+_VISION_RULES = """\
+- If a webcam image is provided, read specific body language cues:
+  * Facial tension (furrowed brow, clenched jaw, tight lips)
+  * Posture (leaning forward aggressively, crossed arms, slumped shoulders)
+  * Hand gestures (pointing, clenched fists, open palms)
+  * Eye contact patterns (looking away, staring down)
+  Reference these SPECIFICALLY, not generically. Say "Your jaw is tight — soften it" \
+  not "You look tense."
+"""
+
+_OUTPUT_RULE = "- Output ONLY the whisper phrase, nothing else"
+
+TRIGGER_DESCRIPTIONS: dict[str, str] = {
+    "tension_cross": "tension just rose above threshold (conversation heating up)",
+    "barge_in": "2+ interruptions detected (turn-taking friction)",
+    "post_escalation_silence": "awkward silence after high tension",
+}
+
+
+def build_system_instruction(vision: bool = False, trigger_types: bool = False) -> str:
+    """System prompt with the vision rules only for calls carrying a frame, and the list of trigger
+    types only when the tail does not describe its own (batched calls)."""
+    parts = [_PERSONA]
+    if vision:
+        parts.append(_VISION_RULES)
+    parts.append(_OUTPUT_RULE)
+    if trigger_types:
+        parts.append("\n\nTrigger types:\n")
+        parts.append("\n".join(f"- {name}: {desc}" for name, desc in TRIGGER_DESCRIPTIONS.items()))
+    return "".join(parts)
+
+
+# Everything at once: batched calls (any trigger) and callers that want the original full prompt.
+COACHING_SYSTEM_PROMPT = build_system_instruction(vision=True, trigger_types=True)
+
+
+def build_coaching_tail(trigger: str, tension_score: int, transcript: str, last_whisper: str = "") -> str:
+    """The per-call user prompt: trigger (with its description), tension, transcript, don't-repeat line."""
+    desc = TRIGGER_DESCRIPTIONS.get(trigger)
+    label = f"{trigger} ({desc})" if desc else trigger
+    parts = [f"Trigger: {label}\nCurrent tension: {tension_score}/100\nRecent transcript:\n{transcript}\n"]
+    if last_whisper:
+        parts.append(f'Previous whisper (DO NOT repeat): "{last_whisper}"\n')
+    parts.append("Generate one coaching whisper (8-12 words):")
+    return "".join(parts)
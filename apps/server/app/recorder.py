@@ -0,0 +1,156 @@
+"""
+Opt-in session recorder. With RECORD_DIR set, each /ws session appends one gzip JSON-lines file:
+every inbound frame, every outbound message and the upstream results the session consumed, each
+stamped with monotonic seconds since the session started. app.replay feeds a recording back
+through handle_websocket against app.fakes.
+
+Records ("k" = kind, "t" = seconds since session start):
+  in            {"raw"}                           inbound text frame, verbatim
+  out           outbound message                  audio fields replaced by "audio_bytes"
+  live          {"kind", "text", "message"}       Live event (audio replaced by "audio_bytes")
+  live_connect  {"ok", "error"?}                  Live connect / reconnect outcome
+  live_closed   {}                                the Live stream ended (handler reconnects)
+  stt           {"text", "final"}                 streaming STT result; text null = stream ended
+  coaching      {"move", "text", "ms", "provisional"?}
+  tts           {"kind", "text", "ok", "ms"}      whisper / backchannel audio outcome
+The first line is a header: {"v", "session", "started"}. Serialization happens on the loop;
+compression and file IO run on a single writer thread, in order.
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import random
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+RECORD_DIR = os.environ.get("RECORD_DIR", "").strip()
+RECORD_SAMPLE = float(os.environ.get("RECORD_SAMPLE", "1"))  # fraction of sessions recorded
+RECORD_FLUSH_EVERY = int(os.environ.get("RECORD_FLUSH_EVERY", "64"))  # records buffered per write
+
+FORMAT_VERSION = 1
+AUDIO_FIELDS = ("audio_base64",)
+
+_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recorder")
+
+
+class NullRecorder:
+    """Recorder used when recording is off: every call is a no-op."""
+
+    enabled = False
+    path = ""
+
+    def record(self, kind: str, /, **fields: Any) -> None:
+        return None
+
+    def outbound(self, msg: dict[str, Any]) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+
+NULL_RECORDER = NullRecorder()
+
+
+class SessionRecorder(NullRecorder):
+    """Append-only recording of one session (see module docstring for the record kinds)."""
+
+    enabled = True
+
+    def __init__(self, path: str, session_id: str, flush_every: int = RECORD_FLUSH_EVERY) -> None:
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self.records = 0
+        self._t0 = time.monotonic()
+        self._buf: list[str] = []
+        self._file: Any = None
+        self._closed = False
+        self._write({"v": FORMAT_VERSION, "session": session_id, "started": round(time.time(), 3)})
+
+    def record(self, kind: str, /, **fields: Any) -> None:
+        if self._closed:
+            return
+        self._write({"t": round(time.monotonic() - self._t0, 4), "k": kind, **fields})
+
+    def outbound(self, msg: dict[str, Any]) -> None:
+        fields = {k: v for k, v in msg.items() if k not in AUDIO_FIELDS}
+        if msg.get("audio_base64"):
+            fields["audio_bytes"] = len(msg["audio_base64"]) * 3 // 4
+        self.record("out", **fields)
+
+    def _write(self, obj: dict[str, Any]) -> None:
+        self._buf.append(json.dumps(obj, separators=(",", ":"), ensure_ascii=False))
+        self.records += 1
+        if len(self._buf) >= self.flush_every:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buf:
+            lines, self._buf = self._buf, []
+            _WRITER.submit(self._append, lines)
+
+    def _append(self, lines: list[str]) -> None:
+        # Writer thread.
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = gzip.open(self.path, "ab")
+            self._file.write(("\n".join(lines) + "\n").encode("utf-8"))
+        except OSError as e:
+            logger.warning("Recording %s: write failed: %s", self.path, e)
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def close(self) -> None:
+        """Flush buffered records and close the file (waits for the writer thread)."""
+        if self._closed:
+            return
+        self._closed = True
+        self._flush()
+        await asyncio.wrap_future(_WRITER.submit(self._close_file))
+        logger.info("Recorded %d records to %s", self.records, self.path)
+
+
+def open_recorder(session_id: str) -> NullRecorder:
+    """SessionRecorder for this session when RECORD_DIR is set (and the session is sampled), else NULL_RECORDER."""
+    if not RECORD_DIR or (RECORD_SAMPLE < 1 and random.random() >= RECORD_SAMPLE):
+        return NULL_RECORDER
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{session_id[:12]}.jsonl.gz"
+    return SessionRecorder(os.path.join(RECORD_DIR, name), session_id)
+
+
+def iter_records(path: str) -> Iterator[dict[str, Any]]:
+    """Records of a recording (.jsonl.gz or plain .jsonl), header first. A truncated tail (crash) is ignored."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Recording %s: skipping unreadable line", path)
+        except (EOFError, zlib.error, gzip.BadGzipFile):
+            logger.warning("Recording %s is truncated; replaying what was written", path)
+
+
+def load_recording(path: str) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """(header, records) of a recording."""
+    records = iter_records(path)
+    header = next(records, None)
+    if not isinstance(header, dict) or header.get("v") != FORMAT_VERSION:
+        raise ValueError(f"{path}: not a session recording (format v{FORMAT_VERSION})")
+    return header, list(records)
@@ -0,0 +1,313 @@
+"""
+Deterministic replay of a session recording (app.recorder) through handle_websocket.
+
+The recorded inbound frames are fed to a real CopilotSession through a stand-in WebSocket, and
+the upstreams are served by app.fakes in recording-driven form: Live events, Live connect
+failures/disconnects and STT results are released at their recorded offsets, Flash returns the
+recorded whispers in order, TTS succeeds or fails as recorded. Recorded upstream latencies
+(coaching/TTS "ms") are reproduced.
+
+speed=1.0 replays in real time and reproduces the session's behaviour. Other speeds scale the
+pacing of frames and upstream events; speed=0 ("max") sends frames back to back, which measures
+the CPU cost of processing the traffic. Handler timers (cooldowns, tension ticks) run on the wall
+clock, so time-based decisions are only faithful at 1.0.
+"""
+from __future__ import annotations
+
+import asyncio
+import html
+import importlib
+import json
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Iterable, Iterator
+
+from fastapi import WebSocketDisconnect
+
+from app import fakes
+from app.gemini_live_client import (
+    IGeminiLiveClient,
+    IGeminiLiveSession,
+    LiveEvent,
+    LiveSessionConfig,
+    StubGeminiLiveSession,
+)
+from app.recorder import load_recording
+
+
+class ReplayClock:
+    """Recording time for the replay. speed <= 0: virtual time, advanced as frames are delivered."""
+
+    def __init__(self, speed: float = 1.0) -> None:
+        self.speed = speed
+        self._t0 = time.monotonic()
+        self._virtual = 0.0
+        self._advanced = asyncio.Event()
+
+    @property
+    def max_speed(self) -> bool:
+        return self.speed <= 0
+
+    def start(self) -> None:
+        self._t0 = time.monotonic()
+
+    def now(self) -> float:
+        """Current recording offset in seconds (safe to read from the STT thread)."""
+        if self.max_speed:
+            return self._virtual
+        return (time.monotonic() - self._t0) * self.speed
+
+    async def wait_until(self, t: float) -> None:
+        if self.max_speed:
+            while self._virtual < t:
+                self._advanced.clear()
+                await self._advanced.wait()
+            return
+        delay = t / self.speed - (time.monotonic() - self._t0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def reach(self, t: float) -> None:
+        """Inbound frame at offset t: wait for it (real time) or jump to it (max speed)."""
+        if not self.max_speed:
+            await self.wait_until(t)
+            return
+        if t > self._virtual:
+            self._virtual = t
+            self._advanced.set()
+        await asyncio.sleep(0)  # let released upstream events run before the next frame
+
+    async def latency(self, ms: float | None) -> None:
+        """Sleep a recorded upstream latency, scaled (skipped at max speed)."""
+        if ms and not self.max_speed:
+            await asyncio.sleep(ms / 1000.0 / self.speed)
+
+
+class Recording:
+    """A loaded recording split into per-source queues."""
+
+    def __init__(self, header: dict[str, Any], records: list[dict[str, Any]]) -> None:
+        self.header = header
+        self.records = records
+        self.inbound = [r for r in records if r["k"] == "in"]
+        self.outbound = [r for r in records if r["k"] == "out"]
+        self.duration = records[-1]["t"] if records else 0.0
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        return cls(*load_recording(path))
+
+    def of(self, *kinds: str) -> deque[dict[str, Any]]:
+        return deque(r for r in self.records if r["k"] in kinds)
+
+
+class ReplayWebSocket:
+    """WebSocket stand-in: receive_text returns recorded frames on the replay clock; sends are collected."""
+
+    def __init__(self, frames: Iterable[dict[str, Any]], clock: ReplayClock) -> None:
+        self._frames = deque(frames)
+        self.clock = clock
+        self.sent: list[tuple[float, dict[str, Any]]] = []
+
+    async def receive_text(self) -> str:
+        if not self._frames:
+            raise WebSocketDisconnect(code=1000)
+        frame = self._frames.popleft()
+        await self.clock.reach(frame["t"])
+        return frame["raw"]
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append((round(self.clock.now(), 4), json.loads(text)))
+
+    async def send_json(self, obj: dict[str, Any]) -> None:
+        self.sent.append((round(self.clock.now(), 4), obj))
+
+
+# --- recording-driven upstreams ---
+
+
+class ReplayLiveSession(StubGeminiLiveSession):
+    """Yields the recorded Live events at their offsets; a recorded live_closed ends the stream."""
+
+    def __init__(self, config: LiveSessionConfig, events: deque[dict[str, Any]], clock: ReplayClock) -> None:
+        super().__init__(config)
+        self._events = events
+        self._clock = clock
+
+    async def recv_events(self) -> AsyncIterator[LiveEvent]:
+        while not self._closed:
+            if not self._events:
+                await asyncio.sleep(0.1)
+                continue
+            await self._clock.wait_until(self._events[0]["t"])
+            if self._closed:
+                return
+            rec = self._events.popleft()
+            if rec["k"] == "live_closed":
+                return
+            yield LiveEvent(kind=rec["kind"], text=rec.get("text", ""), message=rec.get("message", ""))
+
+
+class ReplayLiveClient(IGeminiLiveClient):
+    def __init__(self, recording: Recording, clock: ReplayClock) -> None:
+        self._connects = recording.of("live_connect")
+        self._events = recording.of("live", "live_closed")
+        self._clock = clock
+
+    async def connect(self, config: LiveSessionConfig) -> IGeminiLiveSession:
+        rec = self._connects.popleft() if self._connects else {"ok": True}
+        if not rec["ok"]:
+            raise fakes.FakeUpstreamError(rec.get("error") or "recorded connect failure")
+        return ReplayLiveSession(config, self._events, self._clock)
+
+
+class ReplaySpeechClient:
+    """Releases recorded STT results as the stream consumes audio past their offsets."""
+
+    def __init__(self, recording: Recording, clock: ReplayClock) -> None:
+        self._results = recording.of("stt")
+        self._clock = clock
+
+    def streaming_recognize(self, config: Any = None, requests: Iterable[Any] = ()) -> Iterator[SimpleNamespace]:
+        for _ in requests:
+            now = self._clock.now()
+            while self._results and self._results[0]["t"] <= now:
+                rec = self._results.popleft()
+                if rec["text"] is None:
+                    return
+                yield fakes.speech_response(rec["text"], rec["final"], rec["t"])
+
+
+class _ReplayModels:
+    def __init__(self, coaching: deque[dict[str, Any]], clock: ReplayClock) -> None:
+        self._coaching = coaching
+        self._clock = clock
+
+    def _next(self) -> dict[str, Any]:
+        if not self._coaching:
+            raise fakes.FakeUpstreamError("replay: recording has no more coaching results")
+        return self._coaching.popleft()
+
+    async def generate_content(self, model: str = "", contents: Any = None, config: Any = None) -> SimpleNamespace:
+        system = str(getattr(config, "system_instruction", "") or "")
+        if "Batch mode" in system:
+            prompt = contents[0] if contents and isinstance(contents[0], str) else ""
+            recs = [self._next() for _ in range(prompt.count("### Item "))]
+            await self._clock.latency(max((r.get("ms") or 0 for r in recs), default=0))
+            return SimpleNamespace(text=json.dumps([r["text"] for r in recs]))
+        rec = self._next()
+        await self._clock.latency(rec.get("ms"))
+        return SimpleNamespace(text=rec["text"])
+
+
+class _ReplayTts:
+    """Recorded TTS outcomes, matched by the spoken text (several backends may ask for one whisper)."""
+
+    def __init__(self, recording: Recording, clock: ReplayClock) -> None:
+        self._outcomes: dict[str, deque[dict[str, Any]]] = {}
+        for rec in recording.of("tts"):
+            self._outcomes.setdefault(rec["text"], deque()).append(rec)
+        self._clock = clock
+
+    async def speak(self, requested: str) -> bytes:
+        requested = html.unescape(requested)
+        text = next((t for t in self._outcomes if t and t in requested), None)
+        outcomes = self._outcomes.get(text) if text is not None else None
+        if not outcomes:
+            raise fakes.FakeUpstreamError("replay: no recorded TTS for this text")
+        rec = outcomes.popleft()
+        await self._clock.latency(rec.get("ms"))
+        if not rec["ok"]:
+            raise fakes.FakeUpstreamError("replay: recorded TTS failure")
+        return fakes.speech_audio(text)
+
+    async def synthesize_speech(self, request: Any = None, **kwargs: Any) -> SimpleNamespace:
+        return SimpleNamespace(audio_content=fakes.wav(await self.speak(fakes.request_text(request))))
+
+
+class _ReplayLiveTtsSession(fakes.FakeLiveTtsSession):
+    def __init__(self, tts: _ReplayTts) -> None:
+        super().__init__()
+        self._tts = tts
+
+    async def __aenter__(self) -> "_ReplayLiveTtsSession":
+        return self
+
+    async def receive(self) -> AsyncIterator[SimpleNamespace]:
+        pcm = await self._tts.speak(self._text)
+        inline = SimpleNamespace(data=pcm, mime_type=f"audio/pcm;rate={fakes.TTS_RATE}")
+        turn = SimpleNamespace(parts=[SimpleNamespace(text=None, inline_data=inline)])
+        yield SimpleNamespace(server_content=SimpleNamespace(model_turn=turn, turn_complete=True))
+
+
+class ReplayGenaiClient:
+    """genai.Client surface backed by the recording: Flash whispers in order, Live TTS outcomes by text."""
+
+    def __init__(self, recording: Recording, clock: ReplayClock, tts: _ReplayTts) -> None:
+        live = SimpleNamespace(connect=lambda model="", config=None: _ReplayLiveTtsSession(tts))
+        self.aio = SimpleNamespace(
+            models=_ReplayModels(recording.of("coaching"), clock), live=live
+        )
+
+
+@contextmanager
+def replay_upstreams(recording: Recording, clock: ReplayClock) -> Iterator[None]:
+    """Serve every upstream from the recording for the duration of the block."""
+    tts = _ReplayTts(recording, clock)
+    saved = (fakes.FAKE_UPSTREAMS, fakes.LIVE_CLIENT, fakes.GENAI_CLIENT, fakes.TTS_CLIENT, fakes.SPEECH_CLIENT)
+    fakes.FAKE_UPSTREAMS = frozenset(fakes.UPSTREAMS)
+    fakes.LIVE_CLIENT = ReplayLiveClient(recording, clock)
+    fakes.GENAI_CLIENT = ReplayGenaiClient(recording, clock, tts)
+    fakes.TTS_CLIENT = tts
+    fakes.SPEECH_CLIENT = ReplaySpeechClient(recording, clock)
+    try:
+        yield
+    finally:
+        fakes.FAKE_UPSTREAMS, fakes.LIVE_CLIENT, fakes.GENAI_CLIENT, fakes.TTS_CLIENT, fakes.SPEECH_CLIENT = saved
+
+
+def _whispers(messages: Iterable[tuple[float, dict[str, Any]]]) -> list[dict[str, Any]]:
+    return [{"t": t, "move": m.get("move"), "text": m.get("text")} for t, m in messages if m.get("type") == "whisper"]
+
+
+def _preload_sdks() -> None:
+    """Import the Google SDKs the upstream paths import lazily. Recorded latencies already include
+    the server's first-use import cost, so paying it again mid-replay would skew the timeline."""
+    for module in ("google.genai", "google.cloud.texttospeech_v1"):
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+
+async def replay(recording: Recording, speed: float = 1.0) -> dict[str, Any]:
+    """Run the recording through handle_websocket; returns timings and recorded-vs-replayed output."""
+    from app.websocket_handler import handle_websocket
+
+    _preload_sdks()
+    clock = ReplayClock(speed)
+    websocket = ReplayWebSocket(recording.inbound, clock)
+    with replay_upstreams(recording, clock):
+        wall, cpu = time.perf_counter(), time.process_time()
+        clock.start()
+        try:
+            await handle_websocket(websocket)
+        except WebSocketDisconnect:
+            pass
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    recorded = [(r["t"], r) for r in recording.outbound]
+    return {
+        "session": recording.header.get("session"),
+        "speed": "max" if clock.max_speed else speed,
+        "recorded_sec": round(recording.duration, 3),
+        "wall_sec": round(wall, 3),
+        "cpu_sec": round(cpu, 3),
+        "frames": len(recording.inbound),
+        "frames_per_cpu_sec": round(len(recording.inbound) / cpu, 1) if cpu > 0 else None,
+        "recorded_out": dict(Counter(m.get("type") for _, m in recorded)),
+        "replayed_out": dict(Counter(m.get("type") for _, m in websocket.sent)),
+        "recorded_whispers": _whispers(recorded),
+        "replayed_whispers": _whispers(websocket.sent),
+    }
@@ -0,0 +1,196 @@
+"""
+Resumable session snapshots. `ready` carries a single-use resume_token; when the browser socket
+drops, the session's coaching state (tension, transcript context, semantic pressure, whisper
+cooldowns, current webcam frame) is stored under it as zlib-compressed JSON, and a `start` with
+that token restores it, so coaching continues where it left off instead of starting cold.
+
+SESSION_STORE picks the backend: "memory" (default; per worker process), "sqlite:<path>" (shared
+by the workers and instances that can reach the file) or "off". For stores shared across Cloud Run
+instances (Redis, Firestore, ...) implement SessionStore and assign it to app.session_store.STORE.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+SESSION_STORE = os.environ.get("SESSION_STORE", "memory").strip()
+SESSION_RESUME_TTL_SEC = float(os.environ.get("SESSION_RESUME_TTL_SEC", "300"))
+SESSION_STORE_MAX = int(os.environ.get("SESSION_STORE_MAX", "1000"))  # memory store: snapshots kept
+# Also snapshot running sessions every N seconds (0 = only on disconnect); for shared stores, so a
+# session survives its instance dying without a clean close.
+SESSION_SNAPSHOT_SEC = float(os.environ.get("SESSION_SNAPSHOT_SEC", "0"))
+
+SNAPSHOT_VERSION = 1
+
+
+def new_token() -> str:
+    return secrets.token_urlsafe(18)
+
+
+def encode_snapshot(snapshot: dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(snapshot, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), 6)
+
+
+def decode_snapshot(blob: bytes) -> dict[str, Any] | None:
+    """Snapshot dict, or None when the blob is unreadable or from another format version."""
+    try:
+        snapshot = json.loads(zlib.decompress(blob))
+    except (zlib.error, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("v") != SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
+class SessionStore(ABC):
+    """Token -> snapshot blob with expiry. Tokens are single-use: take() returns and removes."""
+
+    name = "base"
+
+    def __init__(self) -> None:
+        self.saved = 0
+        self.resumed = 0
+        self.missed = 0
+
+    @abstractmethod
+    async def put(self, token: str, blob: bytes, ttl_sec: float = SESSION_RESUME_TTL_SEC) -> None:
+        """Store (or replace) the snapshot for token."""
+
+    @abstractmethod
+    async def take(self, token: str) -> bytes | None:
+        """Snapshot for token if present and not expired, removing it; else None."""
+
+    @abstractmethod
+    async def discard(self, token: str) -> None:
+        """Remove the snapshot for token, if any (the session ended on purpose)."""
+
+    async def close(self) -> None:
+        return None
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": self.name, "saved": self.saved, "resumed": self.resumed, "missed": self.missed}
+
+
+class InMemorySessionStore(SessionStore):
+    """Per-process store: resumes work for reconnects that land on the same worker."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = SESSION_STORE_MAX) -> None:
+        super().__init__()
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def put(self, token: str, blob: bytes, ttl_sec: float = SESSION_RESUME_TTL_SEC) -> None:
+        self._entries.pop(token, None)
+        self._entries[token] = (time.time() + ttl_sec, blob)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.saved += 1
+
+    async def take(self, token: str) -> bytes | None:
+        entry = self._entries.pop(token, None)
+        if entry is None or entry[0] < time.time():
+            self.missed += 1
+            return None
+        self.resumed += 1
+        return entry[1]
+
+    async def discard(self, token: str) -> None:
+        self._entries.pop(token, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, Any]:
+        return {**super().stats(), "entries": len(self._entries)}
+
+
+class SQLiteSessionStore(SessionStore):
+    """Store in a SQLite file, shared by every process that opens it. Queries run off the loop."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots (token TEXT PRIMARY KEY, expires REAL NOT NULL, blob BLOB NOT NULL)"
+        )
+
+    def _put(self, token: str, blob: bytes, expires: float) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)", (token, expires, blob))
+            self._db.execute("DELETE FROM snapshots WHERE expires < ?", (time.time(),))
+
+    def _take(self, token: str) -> bytes | None:
+        with self._lock:
+            # IMMEDIATE: another process cannot take the same token between the read and the delete.
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute("SELECT expires, blob FROM snapshots WHERE token = ?", (token,)).fetchone()
+                if row is not None:
+                    self._db.execute("DELETE FROM snapshots WHERE token = ?", (token,))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        if row is None or row[0] < time.time():
+            return None
+        return bytes(row[1])
+
+    def _discard(self, token: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM snapshots WHERE token = ?", (token,))
+
+    async def put(self, token: str, blob: bytes, ttl_sec: float = SESSION_RESUME_TTL_SEC) -> None:
+        await asyncio.to_thread(self._put, token, blob, time.time() + ttl_sec)
+        self.saved += 1
+
+    async def take(self, token: str) -> bytes | None:
+        blob = await asyncio.to_thread(self._take, token)
+        if blob is None:
+            self.missed += 1
+        else:
+            self.resumed += 1
+        return blob
+
+    async def discard(self, token: str) -> None:
+        await asyncio.to_thread(self._discard, token)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def make_store(spec: str = SESSION_STORE) -> SessionStore | None:
+    """Store for a SESSION_STORE value; None disables resume."""
+    spec = spec.strip()
+    if spec.lower() in ("", "off", "0", "none"):
+        return None
+    if spec.lower() == "memory":
+        return InMemorySessionStore()
+    if spec.lower().startswith("sqlite:"):
+        return SQLiteSessionStore(spec[len("sqlite:"):] or "sessions.db")
+    logger.warning("Unknown SESSION_STORE %r; using the in-memory store", spec)
+    return InMemorySessionStore()
+
+
+STORE: SessionStore | None = make_store()
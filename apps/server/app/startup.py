@@ -0,0 +1,204 @@
+"""
+Cold-start profile and background imports.
+
+Imported first by app.main, this module times every module the app imports (self and cumulative
+milliseconds, via a builtins.__import__ wrapper that app.main installs around its imports and
+removes in a finally). At lifespan start it imports the heavy SDKs the first session needs (google.genai,
+Cloud Speech, Cloud TTS) on a background thread, so neither the first Live connect nor the first
+audio chunk (streaming STT) imports them on the event loop. Sessions that arrive earlier wait for
+the preload asynchronously (wait) or skip work until it is done (pending) instead of blocking the
+loop on the import lock.
+
+Milestones are seconds since the process started (from /proc when available): app_imported,
+lifespan_started, preload_done, first_connect and first_ready (time to the first `ready`). GET
+/startup returns the whole profile.
+"""
+from __future__ import annotations
+
+import asyncio
+import builtins
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+STARTUP_PRELOAD = os.environ.get("STARTUP_PRELOAD", "1").strip().lower() in ("1", "true", "yes")
+STARTUP_PRELOAD_MODULES = tuple(
+    m.strip()
+    for m in os.environ.get(
+        "STARTUP_PRELOAD_MODULES", "google.genai,google.cloud.speech,google.cloud.texttospeech_v1"
+    ).split(",")
+    if m.strip()
+)
+STARTUP_PROFILE_IMPORTS = os.environ.get("STARTUP_PROFILE_IMPORTS", "1").strip().lower() in ("1", "true", "yes")
+STARTUP_PROFILE_TOP = 25  # slowest imports reported
+# How long a session waits for a module still being preloaded before importing it itself.
+STARTUP_IMPORT_WAIT_SEC = float(os.environ.get("STARTUP_IMPORT_WAIT_SEC", "10"))
+
+
+def _process_age_sec() -> float | None:
+    """Seconds since this process started (Linux /proc), or None."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ImportProfile:
+    """Wall time per newly imported module: self (minus nested new imports), cumulative, and the
+    importing thread."""
+
+    def __init__(self) -> None:
+        self.modules: dict[str, tuple[float, float, str]] = {}  # name -> (self_sec, cumulative_sec, thread)
+        self._original: Any = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def installed(self) -> bool:
+        return self._original is not None
+
+    def install(self) -> None:
+        if self._original is None:
+            self._original = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        if self._original is not None and builtins.__import__ == self._import:
+            builtins.__import__ = self._original
+        self._original = None
+
+    def _import(self, name: str, globals: Any = None, locals: Any = None, fromlist: Any = (), level: int = 0) -> Any:
+        original = self._original or _BUILTIN_IMPORT
+        key = name
+        if level and globals:
+            package = globals.get("__package__") or ""
+            key = f"{package.rsplit('.', level - 1)[0]}.{name}" if name else package
+        if key in sys.modules:
+            key = self._new_submodule(key, fromlist)
+            if key is None:
+                return original(name, globals, locals, fromlist, level)
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            total = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += total
+            with self._lock:
+                self.modules.setdefault(key, (total - nested, total, threading.current_thread().name))
+
+    @staticmethod
+    def _new_submodule(package: str, fromlist: Any) -> str | None:
+        """For `from package import sub` with package loaded: the first submodule not imported yet."""
+        module = sys.modules[package]
+        if not fromlist or not hasattr(module, "__path__"):
+            return None
+        for item in fromlist:
+            if item != "*" and not hasattr(module, item) and f"{package}.{item}" not in sys.modules:
+                return f"{package}.{item}"
+        return None
+
+    def top(self, n: int = STARTUP_PROFILE_TOP) -> list[dict[str, Any]]:
+        slowest = sorted(self.modules.items(), key=lambda kv: kv[1][0], reverse=True)[:n]
+        return [
+            {"module": m, "self_ms": round(s * 1000, 1), "cumulative_ms": round(c * 1000, 1), "thread": thread}
+            for m, (s, c, thread) in slowest
+        ]
+
+
+_BUILTIN_IMPORT = builtins.__import__
+
+
+class StartupProfile:
+    """Per-process startup milestones, the import profile and the background preload."""
+
+    def __init__(self, preload_modules: tuple[str, ...] = STARTUP_PRELOAD_MODULES) -> None:
+        age = _process_age_sec()
+        self.process_start = time.time() - age if age is not None else time.time()
+        self.preload_modules = preload_modules
+        self.marks: dict[str, float] = {}
+        self.preload: dict[str, dict[str, Any]] = {}
+        self.imports = ImportProfile()
+        self._done: dict[str, threading.Event] = {}
+        self._thread: threading.Thread | None = None
+
+    def begin(self) -> None:
+        """Start profiling imports (STARTUP_PROFILE_IMPORTS); app.main calls end() right after its imports."""
+        if STARTUP_PROFILE_IMPORTS:
+            self.imports.install()
+
+    def end(self) -> None:
+        """Stop profiling imports; later imports run through the original __import__."""
+        self.imports.uninstall()
+
+    def since_start(self) -> float:
+        return time.time() - self.process_start
+
+    def mark(self, name: str) -> None:
+        """Record a milestone (first occurrence only)."""
+        if name not in self.marks:
+            self.marks[name] = round(self.since_start(), 3)
+            logger.info("Startup: %s at %.3fs", name, self.marks[name])
+
+    # --- background preload ---
+
+    def start_preload(self) -> None:
+        """Import preload_modules on a daemon thread (once per process)."""
+        if self._thread is not None or not STARTUP_PRELOAD or not self.preload_modules:
+            return
+        self._done = {m: threading.Event() for m in self.preload_modules}
+        self._thread = threading.Thread(target=self._preload, name="startup-preload", daemon=True)
+        self._thread.start()
+
+    def _preload(self) -> None:
+        for module in self.preload_modules:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(module)
+                self.preload[module] = {"ok": True, "ms": round((time.perf_counter() - start) * 1000, 1)}
+            except Exception as e:  # optional SDKs may be missing
+                self.preload[module] = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            finally:
+                self._done[module].set()
+        self.mark("preload_done")
+
+    def pending(self, module: str) -> bool:
+        """True while module is still being imported in the background (importing it now would block)."""
+        event = self._done.get(module)
+        return event is not None and not event.is_set()
+
+    async def wait(self, module: str, timeout: float = STARTUP_IMPORT_WAIT_SEC) -> bool:
+        """Wait without blocking the loop until module's preload finished; False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self.pending(module):
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.02)
+        return True
+
+    def profile(self) -> dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "uptime_sec": round(self.since_start(), 3),
+            "marks": dict(self.marks),
+            "preload": {m: self.preload.get(m, {"pending": True}) for m in self._done} if self._done else {},
+            "imports": self.imports.top(),
+        }
+
+
+STARTUP = StartupProfile()
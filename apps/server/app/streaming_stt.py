@@ -8,39 +8,58 @@ import logging
 import queue
 import threading
 import time
-from typing import Any
+from typing import Any, Callable, NamedTuple
+
+from app import fakes
+from app.metrics import STT_LATENCY_SECONDS
 
 logger = logging.getLogger(__name__)
 
+
+class SpeechApi(NamedTuple):
+    """The Speech-to-Text constructors one stream uses."""
+
+    client: Callable[[], Any]
+    request: Any
+    streaming_config: Any
+    recognition_config: Any
+    encoding: Any
+
+
+# app.fakes stand-in; fakes.speech_client returns whichever fake is current when a stream starts.
+_FAKE_SPEECH_API = SpeechApi(fakes.speech_client, fakes.SpeechMessage, fakes.SpeechMessage, fakes.SpeechMessage, "LINEAR16")
 # Optional: only used when LIVE_STT_STREAMING=1 and google-cloud-speech is installed
-_SpeechClient: Any = None
-_StreamingRecognizeRequest: Any = None
-_StreamingRecognitionConfig: Any = None
-_RecognitionConfig: Any = None
-_AudioEncoding: Any = None
+_SPEECH_API: SpeechApi | None = None
 
 
-def _ensure_speech_client() -> bool:
-    global _SpeechClient, _StreamingRecognizeRequest, _StreamingRecognitionConfig, _RecognitionConfig, _AudioEncoding
-    if _SpeechClient is not None:
-        return True
+def _speech_api() -> SpeechApi | None:
+    """The API for a new stream: the fake while FAKE_UPSTREAMS includes stt (decided per call, so a
+    faked session or replay never changes later ones), else google-cloud-speech; None if missing."""
+    global _SPEECH_API
+    if fakes.enabled("stt"):
+        return _FAKE_SPEECH_API
+    if _SPEECH_API is not None:
+        return _SPEECH_API
     try:
         from google.cloud import speech
 
-        _SpeechClient = speech.SpeechClient  # type: ignore[assignment]
-        _StreamingRecognizeRequest = speech.StreamingRecognizeRequest  # type: ignore[assignment]
-        _StreamingRecognitionConfig = speech.StreamingRecognitionConfig  # type: ignore[assignment]
-        _RecognitionConfig = speech.RecognitionConfig  # type: ignore[assignment]
-        _AudioEncoding = speech.RecognitionConfig.AudioEncoding.LINEAR16  # type: ignore[assignment]
-        return True
+        _SPEECH_API = SpeechApi(
+            speech.SpeechClient,
+            speech.StreamingRecognizeRequest,
+            speech.StreamingRecognitionConfig,
+            speech.RecognitionConfig,
+            speech.RecognitionConfig.AudioEncoding.LINEAR16,
+        )
+        return _SPEECH_API
     except Exception as e:
         logger.debug("streaming_stt: google-cloud-speech not available: %s", e)
-        return False
+        return None
 
 
 def _audio_only_generator(
     audio_queue: queue.Queue[bytes | None],
     chunk_counter: list[int],
+    request: Any,
 ) -> Any:
     """Yield StreamingRecognizeRequest with audio_content only (no config). For v2 API."""
     while True:
@@ -49,23 +68,37 @@ def _audio_only_generator(
             return
         if chunk:
             chunk_counter[0] += 1
-            yield _StreamingRecognizeRequest(audio_content=chunk)
+            yield request(audio_content=chunk)
 
 
 def _audio_request_generator_legacy(
     audio_queue: queue.Queue[bytes | None],
     streaming_config: Any,
     chunk_counter: list[int],
+    request: Any,
 ) -> Any:
     """Yield StreamingRecognizeRequest starting with config, then audio chunks. For v1 API."""
-    yield _StreamingRecognizeRequest(streaming_config=streaming_config)
+    yield request(streaming_config=streaming_config)
     while True:
         chunk = audio_queue.get()
         if chunk is None:
             return
         if chunk:
             chunk_counter[0] += 1
-            yield _StreamingRecognizeRequest(audio_content=chunk)
+            yield request(audio_content=chunk)
+
+
+def _observe_latency(result: Any, audio_start_ts: float) -> None:
+    """STT latency = now - wall time of the end of the recognized audio.
+
+    The thread starts on the session's first audio chunk and the browser streams in real time,
+    so audio offset 0 is ~audio_start_ts (skewed only if chunks were dropped on a full queue).
+    """
+    end = getattr(result, "result_end_time", None) or getattr(result, "result_end_offset", None)
+    if end is None or not hasattr(end, "total_seconds"):
+        return
+    latency = time.time() - (audio_start_ts + end.total_seconds())
+    STT_LATENCY_SECONDS.observe(max(0.0, latency), final="true" if result.is_final else "false")
 
 
 def run_streaming_stt(
@@ -73,13 +106,15 @@ def run_streaming_stt(
     result_queue: queue.Queue[tuple[str | None, bool]],
     sample_rate_hz: int = 16000,
     language_code: str = "en-US",
+    api: SpeechApi | None = None,
 ) -> None:
     """
     Run in a dedicated thread. Consume PCM chunks from audio_queue,
     stream to Speech-to-Text, push (transcript, is_final) to result_queue.
     Put None in audio_queue to stop; then (None, False) is put in result_queue.
     """
-    if not _ensure_speech_client():
+    api = api or _speech_api()
+    if api is None:
         result_queue.put((None, False))
         return
 
@@ -88,23 +123,23 @@ def run_streaming_stt(
     start_ts = time.time()
 
     try:
-        client = _SpeechClient()
-        config = _RecognitionConfig(
-            encoding=_AudioEncoding,
+        client = api.client()
+        config = api.recognition_config(
+            encoding=api.encoding,
             sample_rate_hertz=sample_rate_hz,
             language_code=language_code,
         )
-        streaming_config = _StreamingRecognitionConfig(config=config, interim_results=True)
+        streaming_config = api.streaming_config(config=config, interim_results=True)
 
         # SpeechHelpers.streaming_recognize expects (config, requests).
         # The requests iterable should yield StreamingRecognizeRequest(audio_content=...) only.
-        requests = _audio_only_generator(audio_queue, chunk_counter)
+        requests = _audio_only_generator(audio_queue, chunk_counter, api.request)
         try:
             responses = client.streaming_recognize(config=streaming_config, requests=requests)
         except TypeError as e:
             # Legacy API: config inside the first request.
             logger.info("Streaming STT falling back to legacy API: %s", e)
-            requests = _audio_request_generator_legacy(audio_queue, streaming_config, chunk_counter)
+            requests = _audio_request_generator_legacy(audio_queue, streaming_config, chunk_counter, api.request)
             responses = client.streaming_recognize(requests=requests)
 
         logger.info(
@@ -142,6 +177,7 @@ def run_streaming_stt(
                     result.is_final,
                     transcript[:120],
                 )
+                _observe_latency(result, start_ts)
                 result_queue.put((transcript, result.is_final))
     except Exception as e:
         logger.warning(
@@ -169,7 +205,8 @@ def start_streaming_stt_thread(
     Start the streaming STT thread. Returns (thread, audio_queue, result_queue)
     or None if Speech-to-Text is unavailable.
     """
-    if not _ensure_speech_client():
+    api = _speech_api()
+    if api is None:
         return None
     # Bounded so we drop audio if the recognizer falls behind (avoids unbounded memory).
     audio_queue: queue.Queue[bytes | None] = queue.Queue(maxsize=128)
@@ -177,7 +214,7 @@ def start_streaming_stt_thread(
     thread = threading.Thread(
         target=run_streaming_stt,
         args=(audio_queue, result_queue),
-        kwargs={"sample_rate_hz": sample_rate_hz, "language_code": language_code},
+        kwargs={"sample_rate_hz": sample_rate_hz, "language_code": language_code, "api": api},
         daemon=True,
     )
     thread.start()
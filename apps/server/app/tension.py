@@ -10,8 +10,16 @@ import time
 from dataclasses import dataclass, field
 from typing import Callable
 
+from app.metrics import TENSION_COMPUTE_SECONDS
+
 SPEECH_RMS_FLOOR = 0.01  # RMS below this is considered silence/noise, not speech
 
+# Score weights (volume is primary; silence and overlap secondary). Module-level so offline
+# re-scoring (scripts/batch_analyze.py --set tension.RMS_WEIGHT=...) can try new values.
+RMS_WEIGHT = 0.55
+SILENCE_WEIGHT = 0.25
+OVERLAP_WEIGHT = 0.20
+
 # --- Telemetry (to be filled by audio pipeline) ---
 
 
@@ -82,7 +90,7 @@ def compute_tension_from_telemetry(telemetry: AudioTelemetry, state: TensionStat
 
     # Combined: weighted average, then 0–100
     # Volume is primary signal; silence and overlap are secondary
-    combined = 0.55 * rms_score + 0.25 * silence_score + 0.20 * overlap_score
+    combined = RMS_WEIGHT * rms_score + SILENCE_WEIGHT * silence_score + OVERLAP_WEIGHT * overlap_score
     return int(min(100, max(0, combined * 100)))
 
 
@@ -102,6 +110,7 @@ async def compute_tension_loop(
         while True:
             # Drain ALL queued telemetry — each item updates state (recent_rms, silence, overlap)
             score = None
+            compute_start = time.perf_counter()
             while True:
                 try:
                     t = telemetry_queue.get_nowait()
@@ -111,6 +120,7 @@ async def compute_tension_loop(
                 except asyncio.QueueEmpty:
                     break
             if score is not None:
+                TENSION_COMPUTE_SECONDS.observe(time.perf_counter() - compute_start)
                 on_tension(score)
             await asyncio.sleep(interval_sec)
     except asyncio.CancelledError:
@@ -0,0 +1,200 @@
+"""
+Lightweight per-stage tracing for whispers, backchannels and Live reconnects.
+  off    (default): no-op spans, nothing recorded
+  memory: finished spans kept in an in-memory exporter (tests, /debug inspection)
+  log:    one log line per finished span
+  otel:   delegate to the OpenTelemetry API (optional dependency; configure an SDK/exporter
+          as usual, e.g. with opentelemetry-instrument). Falls back to off when not installed.
+IDs follow W3C trace context (32/16 hex chars) and timestamps are epoch ns, so spans map 1:1
+onto OpenTelemetry. The current span is carried in a contextvar, so child spans nest across
+awaits and tasks spawned inside a span.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import secrets
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+TRACING = os.environ.get("TRACING", "off").strip().lower()
+TRACING_MEMORY_SPANS = int(os.environ.get("TRACING_MEMORY_SPANS", "2048"))
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # optional
+    otel_trace = None
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("copilot_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, start_ns: int, attributes: dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = start_ns
+        self.end_ns = 0
+        self.attributes = attributes
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6 if self.end_ns else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": dict(self.attributes),
+        }
+
+
+class _NoopSpan:
+    trace_id = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class InMemoryExporter:
+    """Keeps the most recent finished spans."""
+
+    def __init__(self, max_spans: int = TRACING_MEMORY_SPANS) -> None:
+        self._spans: deque[Span] = deque(maxlen=max_spans)
+
+    def export(self, span: Span) -> None:
+        self._spans.append(span)
+
+    def spans(self, trace_id: str | None = None) -> list[Span]:
+        return [s for s in self._spans if trace_id is None or s.trace_id == trace_id]
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+class LogExporter:
+    def export(self, span: Span) -> None:
+        logger.info(
+            "span %s trace=%s %.1fms status=%s %s", span.name, span.trace_id, span.duration_ms, span.status, span.attributes
+        )
+
+
+class Tracer:
+    """trace() opens a root span (new trace ID); span() opens a child of the current span."""
+
+    def __init__(self, exporter: Any = None) -> None:
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def trace(self, name: str, start_ns: int | None = None, **attributes: Any):
+        return self.span(name, root=True, start_ns=start_ns, **attributes)
+
+    @contextmanager
+    def span(self, name: str, root: bool = False, start_ns: int | None = None, **attributes: Any) -> Iterator[Any]:
+        if self.exporter is None:
+            yield NOOP_SPAN
+            return
+        parent = None if root else _current_span.get()
+        span = Span(
+            name,
+            parent.trace_id if parent else secrets.token_hex(16),
+            parent.span_id if parent else None,
+            start_ns or time.time_ns(),
+            attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            self.exporter.export(span)
+
+    def record(self, name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+        """Add an already-finished child span of the current span (e.g. work timed before the trace began)."""
+        parent = _current_span.get()
+        if self.exporter is None or parent is None:
+            return
+        span = Span(name, parent.trace_id, parent.span_id, start_ns, attributes)
+        span.end_ns = end_ns
+        self.exporter.export(span)
+
+
+class _OtelSpan:
+    __slots__ = ("span", "trace_id")
+
+    def __init__(self, span: Any) -> None:
+        self.span = span
+        ctx = span.get_span_context()
+        self.trace_id = format(ctx.trace_id, "032x") if ctx.trace_id else ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.span.set_attribute(key, value)
+
+
+class OtelTracer(Tracer):
+    """Same interface, backed by opentelemetry.trace (whatever SDK/exporter the process configured)."""
+
+    def __init__(self) -> None:
+        super().__init__(exporter=None)
+        self._tracer = otel_trace.get_tracer("empathic-copilot")
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    @contextmanager
+    def span(self, name: str, root: bool = False, start_ns: int | None = None, **attributes: Any) -> Iterator[Any]:
+        context = otel_trace.set_span_in_context(otel_trace.INVALID_SPAN) if root else None
+        with self._tracer.start_as_current_span(
+            name, context=context, start_time=start_ns, attributes=attributes
+        ) as span:
+            yield _OtelSpan(span)
+
+    def record(self, name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+        self._tracer.start_span(name, start_time=start_ns, attributes=attributes).end(end_time=end_ns)
+
+
+def make_tracer(mode: str = TRACING) -> Tracer:
+    if mode == "memory":
+        return Tracer(InMemoryExporter())
+    if mode == "log":
+        return Tracer(LogExporter())
+    if mode == "otel":
+        if otel_trace is not None:
+            return OtelTracer()
+        logger.warning("TRACING=otel but opentelemetry-api is not installed; tracing disabled")
+    elif mode != "off":
+        logger.warning("Unknown TRACING mode %r; tracing disabled", mode)
+    return Tracer()
+
+
+TRACER = make_tracer()
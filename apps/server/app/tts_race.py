@@ -0,0 +1,208 @@
+"""
+Racing strategies for whisper/backchannel TTS backends (Gemini Live TTS, Cloud TTS).
+  sequential: primary, then the next backend only after it fails (previous behaviour)
+  hedged:     start the next backend if the current one has not answered after hedge_ms
+  parallel:   start all at once; first audio wins, the rest are cancelled
+  auto:       order backends by recent health and median latency, hedge after the primary's p90
+Per-backend latency histograms are kept process-wide and shared by every racer that uses
+the same backend name.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Sequence
+
+from app.metrics import TTS_LATENCY_SECONDS
+from app.tracing import TRACER
+
+logger = logging.getLogger(__name__)
+
+# Hard cap per backend attempt; Live TTS only checks its own 8 s deadline between messages.
+TTS_BACKEND_TIMEOUT_SEC = float(os.environ.get("TTS_BACKEND_TIMEOUT_SEC", "8.0"))
+# auto: never hedge sooner than this, and treat a backend as unhealthy below this recent success rate.
+TTS_AUTO_MIN_HEDGE_MS = float(os.environ.get("TTS_AUTO_MIN_HEDGE_MS", "300"))
+TTS_AUTO_MIN_SUCCESS = float(os.environ.get("TTS_AUTO_MIN_SUCCESS", "0.5"))
+
+STRATEGIES = ("sequential", "hedged", "parallel", "auto")
+
+# Upper bounds in ms; the last bucket is everything slower.
+LATENCY_BUCKETS_MS: tuple[float, ...] = (50, 100, 250, 500, 750, 1000, 1500, 2000, 3000, 5000, 8000)
+
+Synthesize = Callable[[str], Awaitable["str | None"]]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (ms) with quantile estimates from bucket upper bounds."""
+
+    __slots__ = ("bounds", "counts", "total", "sum_ms")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS_MS) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+
+    def quantile(self, q: float) -> float | None:
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[i] if i < len(self.bounds) else self.bounds[-1] * 2
+        return self.bounds[-1] * 2
+
+
+class BackendStats:
+    """Latency of successful calls plus a sliding window of recent outcomes for one backend."""
+
+    __slots__ = ("name", "latency", "recent", "successes", "failures", "cancelled")
+
+    def __init__(self, name: str, window: int = 20) -> None:
+        self.name = name
+        self.latency = LatencyHistogram()
+        self.recent: deque[bool] = deque(maxlen=window)
+        self.successes = 0
+        self.failures = 0
+        self.cancelled = 0
+
+    def record(self, ok: bool, ms: float) -> None:
+        self.recent.append(ok)
+        if ok:
+            self.successes += 1
+            self.latency.observe(ms)
+        else:
+            self.failures += 1
+
+    @property
+    def success_rate(self) -> float:
+        return sum(self.recent) / len(self.recent) if self.recent else 1.0
+
+    def snapshot(self) -> dict[str, float | int | None]:
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "cancelled": self.cancelled,
+            "success_rate": round(self.success_rate, 3),
+            "p50_ms": self.latency.quantile(0.5),
+            "p90_ms": self.latency.quantile(0.9),
+            "p99_ms": self.latency.quantile(0.99),
+        }
+
+
+_STATS: dict[str, BackendStats] = {}
+
+
+def backend_stats(name: str) -> BackendStats:
+    """Shared stats object for a backend name (e.g. Live TTS used for whispers and backchannels)."""
+    stats = _STATS.get(name)
+    if stats is None:
+        stats = _STATS[name] = BackendStats(name)
+    return stats
+
+
+def all_backend_stats() -> dict[str, dict[str, float | int | None]]:
+    return {name: s.snapshot() for name, s in _STATS.items()}
+
+
+class TtsRacer:
+    """Run text through an ordered list of (name, synthesize) backends using one of STRATEGIES."""
+
+    def __init__(
+        self,
+        backends: Sequence[tuple[str, Synthesize]],
+        strategy: str = "sequential",
+        hedge_ms: float = 0.0,
+        timeout_sec: float = TTS_BACKEND_TIMEOUT_SEC,
+    ) -> None:
+        if strategy not in STRATEGIES:
+            logger.warning("Unknown TTS strategy %r; using sequential", strategy)
+            strategy = "sequential"
+        self.backends = list(backends)
+        self.strategy = strategy
+        self.hedge_ms = hedge_ms
+        self.timeout_sec = timeout_sec
+        self.wins: dict[str, int] = {name: 0 for name, _ in self.backends}
+
+    def _ordered(self) -> list[tuple[str, Synthesize]]:
+        """auto: healthy backends first, then by median latency (unknown latency keeps config order)."""
+        def key(item: tuple[int, tuple[str, Synthesize]]) -> tuple[int, float, int]:
+            index, (name, _) = item
+            stats = backend_stats(name)
+            healthy = stats.success_rate >= TTS_AUTO_MIN_SUCCESS
+            p50 = stats.latency.quantile(0.5)
+            return (0 if healthy else 1, p50 if p50 is not None else math.inf, index)
+
+        return [b for _, b in sorted(enumerate(self.backends), key=key)]
+
+    def _hedge_sec(self, order: list[tuple[str, Synthesize]]) -> float | None:
+        """Seconds to wait on a backend before starting the next one; None = only after it fails."""
+        if self.strategy == "parallel":
+            return 0.0
+        if self.strategy == "hedged" and self.hedge_ms > 0:
+            return self.hedge_ms / 1000.0
+        if self.strategy == "auto":
+            p90 = backend_stats(order[0][0]).latency.quantile(0.9)
+            return max(TTS_AUTO_MIN_HEDGE_MS, p90 or self.hedge_ms or TTS_AUTO_MIN_HEDGE_MS) / 1000.0
+        return None
+
+    async def _attempt(self, name: str, fn: Synthesize, text: str) -> str | None:
+        stats = backend_stats(name)
+        start = time.perf_counter()
+        with TRACER.span("tts_backend", backend=name, chars=len(text)) as span:
+            try:
+                audio = await asyncio.wait_for(fn(text), self.timeout_sec)
+            except asyncio.CancelledError:
+                stats.cancelled += 1
+                raise
+            except Exception as e:
+                logger.warning("TTS backend %s failed: %s", name, e)
+                audio = None
+            span.set_attribute("ok", bool(audio))
+        elapsed = time.perf_counter() - start
+        stats.record(bool(audio), elapsed * 1000.0)
+        TTS_LATENCY_SECONDS.observe(elapsed, backend=name, outcome="ok" if audio else "error")
+        return audio
+
+    async def synthesize(self, text: str) -> str | None:
+        """First non-empty audio according to the strategy, or None if every backend failed."""
+        if not self.backends:
+            return None
+        order = self._ordered() if self.strategy == "auto" else self.backends
+        hedge = self._hedge_sec(order)
+        running: dict[asyncio.Future, str] = {}
+        remaining = list(order)
+        try:
+            while remaining or running:
+                if remaining and (not running or hedge is not None):
+                    name, fn = remaining.pop(0)
+                    running[asyncio.ensure_future(self._attempt(name, fn, text))] = name
+                    if hedge == 0.0 and remaining:
+                        continue  # parallel: launch everything before waiting
+                timeout = hedge if remaining and hedge is not None else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    name = running.pop(fut)
+                    audio = fut.result()
+                    if audio:
+                        self.wins[name] = self.wins.get(name, 0) + 1
+                        return audio
+            return None
+        finally:
+            for fut in running:
+                fut.cancel()
+
+    def stats(self) -> dict[str, object]:
+        return {"strategy": self.strategy, "wins": dict(self.wins)}
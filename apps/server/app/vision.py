@@ -0,0 +1,262 @@
+"""
+Webcam frame pipeline for vision-aware coaching.
+Frames are decoded once on arrival, downscaled/recompressed off the event loop (Pillow, optional),
+near-duplicates are skipped via a 64-bit difference hash, and the Flash Part is built once per frame.
+Without Pillow, frames pass through unchanged and only exact duplicates are skipped.
+Frames are admitted only under FRAME_MAX_BYTES / FRAME_MAX_FPS, and the server tells the client
+how often to send them (`frame_policy`).
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import math
+import os
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+VISION_MAX_DIM = int(os.environ.get("VISION_MAX_DIM", "512"))
+VISION_JPEG_QUALITY = int(os.environ.get("VISION_JPEG_QUALITY", "70"))
+# Frames with more pixels than this are rejected from the header, before decoding (decompression bombs).
+VISION_MAX_PIXELS = int(os.environ.get("VISION_MAX_PIXELS", str(4096 * 4096)))
+# Frames whose dHash differs by <= this many bits (of 64) from the current one are skipped.
+VISION_DEDUP_DISTANCE = int(os.environ.get("VISION_DEDUP_DISTANCE", "4"))
+
+# Frame admission: per-frame size cap (decoded bytes) and per-session rate cap.
+FRAME_MAX_BYTES = int(os.environ.get("FRAME_MAX_BYTES", str(512 * 1024)))
+# Largest inbound WebSocket text message worth reading: a max-size base64 frame plus its envelope.
+# Passed to uvicorn as ws_max_size (run.py), so bigger messages are refused before being buffered.
+MAX_INBOUND_CHARS = FRAME_MAX_BYTES * 4 // 3 + 4096
+FRAME_MAX_FPS = float(os.environ.get("FRAME_MAX_FPS", "1.0"))
+# Sampling the server asks the client for: "fixed" (every FRAME_INTERVAL_MS) or "tension"
+# (slow FRAME_IDLE_INTERVAL_MS while calm, FRAME_INTERVAL_MS once tension reaches the whisper threshold).
+FRAME_SAMPLING = os.environ.get("FRAME_SAMPLING", "fixed").strip().lower()
+FRAME_INTERVAL_MS = int(os.environ.get("FRAME_INTERVAL_MS", "5000"))
+FRAME_IDLE_INTERVAL_MS = int(os.environ.get("FRAME_IDLE_INTERVAL_MS", "30000"))
+
+
+def _load_pil() -> Any:
+    try:
+        from PIL import Image
+        return Image
+    except ImportError:
+        return None
+
+
+class PreparedFrame:
+    """A frame ready to send to Flash: compact JPEG, perceptual hash, lazily built (cached) Part."""
+
+    __slots__ = ("jpeg", "width", "height", "dhash", "digest", "_part")
+
+    def __init__(self, jpeg: bytes, width: int = 0, height: int = 0, dhash: int | None = None) -> None:
+        self.jpeg = jpeg
+        self.width = width
+        self.height = height
+        self.dhash = dhash
+        self.digest = hashlib.sha1(jpeg).hexdigest()
+        self._part: Any = None
+
+    def part(self) -> Any:
+        """google.genai Part for this frame (built on first use, then reused for every whisper)."""
+        if self._part is None:
+            from google.genai import types
+            self._part = types.Part.from_bytes(data=self.jpeg, mime_type="image/jpeg")
+        return self._part
+
+    def is_near_duplicate(self, other: "PreparedFrame | None", max_distance: int = VISION_DEDUP_DISTANCE) -> bool:
+        if other is None:
+            return False
+        if self.digest == other.digest:
+            return True
+        if self.dhash is None or other.dhash is None:
+            return False
+        return bin(self.dhash ^ other.dhash).count("1") <= max_distance
+
+
+def _dhash(image: Any, Image: Any) -> int:
+    """64-bit difference hash: grayscale 9x8, one bit per horizontal neighbour comparison."""
+    small = image.convert("L").resize((9, 8), Image.BILINEAR)
+    px = small.tobytes()
+    bits = 0
+    for row in range(8):
+        base = row * 9
+        for col in range(8):
+            bits = (bits << 1) | (px[base + col] > px[base + col + 1])
+    return bits
+
+
+def prepare_frame(
+    raw: bytes,
+    max_dim: int = VISION_MAX_DIM,
+    quality: int = VISION_JPEG_QUALITY,
+    max_pixels: int = VISION_MAX_PIXELS,
+) -> PreparedFrame:
+    """Downscale to max_dim (longest side) and re-encode as JPEG. CPU-bound: call off the event loop."""
+    Image = _load_pil()
+    if Image is None:
+        if not raw.startswith(b"\xff\xd8"):
+            raise ValueError("not a JPEG (Pillow is needed to convert other formats)")
+        return PreparedFrame(raw)
+    with Image.open(io.BytesIO(raw)) as img:  # reads the header only
+        source_format, source_size = img.format, img.size
+        if source_size[0] * source_size[1] > max_pixels:
+            raise ValueError(f"frame is {source_size[0]}x{source_size[1]}, over {max_pixels} pixels")
+        scale = min(1.0, max_dim / max(source_size))
+        # JPEG: decode straight at the smallest 1/2^n scale that still covers the target size.
+        img.draft("RGB", (math.ceil(source_size[0] * scale), math.ceil(source_size[1] * scale)))
+        img = img.convert("RGB")
+        dhash = _dhash(img, Image)
+        if max(img.size) > max_dim:
+            img.thumbnail((max_dim, max_dim), Image.LANCZOS)
+        out = io.BytesIO()
+        img.save(out, format="JPEG", quality=quality, optimize=True)
+        jpeg = out.getvalue()
+        width, height = img.size
+    # Never send a bigger payload than the client's original, when that original is a usable JPEG.
+    if source_format == "JPEG" and len(jpeg) >= len(raw) and max(source_size) <= max_dim:
+        jpeg = raw
+    return PreparedFrame(jpeg, width, height, dhash)
+
+
+class FramePipeline:
+    """
+    Per-session frame state. submit() is cheap and non-blocking; the newest frame wins if
+    several arrive while one is being processed. current is the frame coaching should use.
+    """
+
+    __slots__ = (
+        "current",
+        "_latest_raw",
+        "_last_raw_digest",
+        "_task",
+        "_last_accept_ts",
+        "received",
+        "processed",
+        "skipped",
+        "failed",
+        "rejected_size",
+        "rejected_rate",
+    )
+
+    def __init__(self) -> None:
+        self.current: PreparedFrame | None = None
+        self._latest_raw: bytes | None = None
+        self._last_raw_digest: str = ""
+        self._task: asyncio.Task | None = None
+        self._last_accept_ts: float = 0.0
+        self.received = 0
+        self.processed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.rejected_size = 0
+        self.rejected_rate = 0
+
+    def admit(self, frame_b64: str, now: float) -> bool:
+        """Size and rate admission, checked before any decoding."""
+        if len(frame_b64) * 3 // 4 > FRAME_MAX_BYTES:
+            self.rejected_size += 1
+            return False
+        if FRAME_MAX_FPS > 0 and now - self._last_accept_ts < 1.0 / FRAME_MAX_FPS:
+            self.rejected_rate += 1
+            return False
+        self._last_accept_ts = now
+        return True
+
+    def submit(self, frame_b64: str, now: float | None = None) -> bool:
+        """Queue a base64 JPEG for processing. Returns False if rejected, invalid or an exact repeat."""
+        if not self.admit(frame_b64, time.monotonic() if now is None else now):
+            return False
+        try:
+            raw = base64.b64decode(frame_b64, validate=True)
+        except (binascii.Error, ValueError):
+            self.failed += 1
+            return False
+        self.received += 1
+        digest = hashlib.sha1(raw).hexdigest()
+        if digest == self._last_raw_digest:
+            self.skipped += 1
+            return False
+        self._last_raw_digest = digest
+        self._latest_raw = raw
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+        return True
+
+    async def _drain(self) -> None:
+        while self._latest_raw is not None:
+            raw, self._latest_raw = self._latest_raw, None
+            try:
+                frame = await asyncio.to_thread(prepare_frame, raw)
+            except Exception as e:
+                self.failed += 1
+                logger.warning("Vision frame rejected (not a decodable image): %s", e)
+                continue
+            if frame.is_near_duplicate(self.current):
+                self.skipped += 1
+                continue
+            self.current = frame
+            self.processed += 1
+            logger.debug(
+                "Vision frame ready: %dx%d, %d KB (from %d KB)",
+                frame.width, frame.height, len(frame.jpeg) // 1024, len(raw) // 1024,
+            )
+
+    async def close(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "rejected_size": self.rejected_size,
+            "rejected_rate": self.rejected_rate,
+        }
+
+
+class FrameSampling:
+    """Frame cadence the server requests from the client via `frame_policy` control messages."""
+
+    __slots__ = ("mode", "interval_ms")
+
+    def __init__(self, mode: str = FRAME_SAMPLING) -> None:
+        self.mode = mode if mode in ("fixed", "tension") else "fixed"
+        self.interval_ms: int | None = None
+
+    def _message(self, interval_ms: int) -> dict[str, Any] | None:
+        if interval_ms == self.interval_ms:
+            return None
+        self.interval_ms = interval_ms
+        return {
+            "type": "frame_policy",
+            "interval_ms": interval_ms,
+            "max_bytes": FRAME_MAX_BYTES,
+            "max_width": VISION_MAX_DIM,
+        }
+
+    def initial(self) -> dict[str, Any]:
+        """Starting policy, sent inside `ready`."""
+        self.interval_ms = None
+        msg = self._message(FRAME_IDLE_INTERVAL_MS if self.mode == "tension" else FRAME_INTERVAL_MS)
+        assert msg is not None
+        del msg["type"]
+        return msg
+
+    def on_tension(self, score: int, threshold: int) -> dict[str, Any] | None:
+        """New policy message when the requested cadence changes, else None."""
+        if self.mode != "tension":
+            return None
+        return self._message(FRAME_INTERVAL_MS if score >= threshold else FRAME_IDLE_INTERVAL_MS)
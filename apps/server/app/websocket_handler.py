@@ -1,5 +1,6 @@
 """
 WebSocket handler: protocol (start/stop/audio), tension loop, coaching whispers.
+Each connection is one CopilotSession (slotted state + background loops), tracked in SESSIONS.
 Barge-in: when user sends audio while agent is generating, we call stop_generation() on the Live session.
 """
 import asyncio
@@ -9,19 +10,41 @@ import logging
 import os
 import queue
 import time
-from typing import Any
+import uuid
+from collections import deque
+from typing import Any, Iterator
 
 from fastapi import WebSocket
 
-from app.coaching import COACHING_MOVES, get_move_by_id, generate_coaching, generate_whisper_audio, generate_backchannel_audio
+from app import codec, session_store
+from app.admission import ADMISSION, CALL_SLOT_WAIT_SEC
+from app.audio_codec import negotiate
+from app.coaching import (
+    COACHING_MOVES,
+    generate_backchannel_audio,
+    generate_coaching_hedged,
+    generate_whisper_audio,
+)
 from app.gemini_live_client import (
     AgentTurn,
     IGeminiLiveSession,
     LiveSessionConfig,
     get_gemini_client,
 )
+from app.local_coach import CALMING_MARKERS, ESCALATION_MARKERS
+from app.metrics import (
+    AUDIO_CHUNKS,
+    AUDIO_CHUNKS_DROPPED,
+    AUDIO_DECODE_SECONDS,
+    LIVE_RECONNECTS,
+    QUEUE_DEPTH,
+)
+from app.recorder import open_recorder
+from app.startup import STARTUP
 from app.streaming_stt import start_streaming_stt_thread
+from app.tracing import TRACER
 from app.tension import AudioTelemetry, TensionState, compute_tension_loop
+from app.vision import MAX_INBOUND_CHARS, FramePipeline, FrameSampling, PreparedFrame
 
 logger = logging.getLogger(__name__)
 
@@ -55,205 +78,363 @@ STYLE_WHISPERS: dict[str, str] = {
     "calm": "Nice reset. Stay collaborative and confirm next steps together.",
 }
 
-ESCALATION_MARKERS: tuple[str, ...] = (
-    "ridiculous",
-    "you always",
-    "you never",
-    "never listen",
-    "ignore my deadlines",
-    "only one taking",
-)
-
-CALMING_MARKERS: tuple[str, ...] = (
-    "i don't want this to turn into a fight",
-    "i dont want this to turn into a fight",
-    "clear about expectations",
-    "plan that works for both of us",
-    "on the same page",
-    "check in about the last project",
-)
-
 
 async def send_json(ws: WebSocket, obj: dict[str, Any]) -> None:
     try:
-        await ws.send_json(obj)
+        await ws.send_text(codec.dumps(obj))
     except Exception as e:
         logger.warning("Send failed: %s", e)
 
 
-async def handle_websocket(websocket: WebSocket) -> None:
-    session: IGeminiLiveSession | None = None
-    tension_state = TensionState()
-    telemetry_queue: asyncio.Queue[AudioTelemetry | None] = asyncio.Queue()
-    tension_task: asyncio.Task | None = None
-    agent_task: asyncio.Task | None = None
-    events_task: asyncio.Task | None = None
-    whisper_task: asyncio.Task | None = None
-    agent_output_started: bool = False
-    degraded_mode: bool = False  # True when Gemini connect failed; tension + whisper_loop still run
-    running = True
-    rms_ema_ref: list[float] = [0.0]
-    last_tension_score: int = 0
-    prev_tension_score: int = 0
-    tension_history: list[tuple[float, int]] = []
-    last_whisper_ts: float = 0.0
-    last_whisper_text: str = ""
-    last_style_whisper_ts: float = 0.0
-    pending_style_whisper: str | None = None
-    conversation_style: str = "unknown"
-    semantic_pressure: float = 0.0
-    interrupted_events: list[float] = []
-    transcript_buffer: list[str] = []
-    transcript_context: str = ""  # Full transcript context for coaching
-    tension_crossed_up: bool = False  # Flag: tension just crossed upward past threshold
-    last_speech_ts: float = 0.0
-    backchannel_armed: bool = False
-    last_backchannel_ts: float = 0.0
-    last_model_backchannel_ts: float = 0.0
-    audio_replay_buffer: list[str] = []  # Audio chunks buffered during reconnect
-    MAX_REPLAY_CHUNKS = 50  # ~2 seconds of audio at 25 chunks/sec
-    last_frame_b64: str = ""  # Latest webcam frame (JPEG base64) for vision-aware coaching
-    # STT state
-    stt_thread: Any = None
-    stt_audio_queue: Any = None
-    stt_result_queue: Any = None
-    stt_reader_task: asyncio.Task | None = None
-    stt_active: bool = False
-
-    async def stop_stt() -> None:
-        """Best-effort stop for streaming STT resources."""
-        nonlocal stt_audio_queue, stt_result_queue, stt_reader_task, stt_thread, stt_active
-        q = stt_audio_queue
-        if q is not None:
-            try:
-                q.put_nowait(None)
-            except queue.Full:
-                # Free one slot, then signal shutdown.
-                try:
-                    q.get_nowait()
-                    q.put_nowait(None)
-                except Exception:
-                    pass
-            except Exception:
-                pass
-        if stt_reader_task and not stt_reader_task.done():
-            stt_reader_task.cancel()
-            try:
-                await stt_reader_task
-            except asyncio.CancelledError:
-                pass
-        stt_reader_task = None
-        stt_audio_queue = None
-        stt_result_queue = None
-        stt_thread = None
-        stt_active = False
-
-    def on_tension(score: int) -> None:
-        nonlocal last_tension_score, prev_tension_score, tension_history, tension_crossed_up
-        prev_tension_score = last_tension_score
-        last_tension_score = score
+MAX_REPLAY_CHUNKS = 50  # ~2 seconds of audio at 25 chunks/sec, buffered during reconnect
+MAX_LIVE_RECONNECTS = 20
+
+
+class TensionTracker:
+    """Audio-derived signals for one session: RMS EMA, tension score history, threshold crossings."""
+
+    __slots__ = (
+        "state",
+        "telemetry_queue",
+        "rms_ema",
+        "last_score",
+        "prev_score",
+        "history",
+        "crossed_up",
+        "interrupted_events",
+    )
+
+    def __init__(self) -> None:
+        self.state = TensionState()
+        self.telemetry_queue: asyncio.Queue[AudioTelemetry | None] = asyncio.Queue()
+        self.rms_ema: float = 0.0
+        self.last_score: int = 0
+        self.prev_score: int = 0
+        self.history: deque[tuple[float, int]] = deque()
+        self.crossed_up: bool = False  # Flag: tension just crossed upward past threshold
+        self.interrupted_events: deque[float] = deque()
+
+    def update_rms(self, rms_raw: float) -> float:
+        """Fold one chunk's RMS into the EMA and return the smoothed value."""
+        self.rms_ema = (1.0 - RMS_EMA_ALPHA) * self.rms_ema + RMS_EMA_ALPHA * rms_raw
+        return self.rms_ema
+
+    def record_score(self, score: int, now: float) -> None:
+        self.prev_score = self.last_score
+        self.last_score = score
         # Detect upward crossing of whisper threshold
-        if prev_tension_score < TENSION_WHISPER_THRESHOLD <= score:
-            tension_crossed_up = True
+        if self.prev_score < TENSION_WHISPER_THRESHOLD <= score:
+            self.crossed_up = True
         # Clear flag if tension dropped back below threshold (prevents stale triggers)
         if score < TENSION_WHISPER_THRESHOLD:
-            tension_crossed_up = False
-        now = time.time()
-        tension_history.append((now, score))
-        while tension_history and now - tension_history[0][0] > TENSION_HIGH_WINDOW_SEC:
-            tension_history.pop(0)
-        asyncio.create_task(
-            send_json(websocket, {"type": "tension", "score": score, "ts": int(now * 1000)})
-        )
+            self.crossed_up = False
+        self.history.append((now, score))
+        while self.history and now - self.history[0][0] > TENSION_HIGH_WINDOW_SEC:
+            self.history.popleft()
+
+    def record_interruption(self, now: float) -> None:
+        self.interrupted_events.append(now)
+        while self.interrupted_events and now - self.interrupted_events[0] > OVERLAP_WINDOW_SEC:
+            self.interrupted_events.popleft()
+
+
+class TranscriptState:
+    """Rolling transcript context plus semantic pressure/style derived from it."""
+
+    __slots__ = ("buffer", "context", "semantic_pressure", "conversation_style", "pending_style_whisper")
 
-    def update_semantic_state(_unused: str = "") -> None:
-        """Update semantic pressure/style by scanning the full transcript_context.
+    def __init__(self) -> None:
+        self.buffer: list[str] = []
+        self.context: str = ""  # Full transcript context for coaching
+        self.semantic_pressure: float = 0.0
+        self.conversation_style: str = "unknown"
+        self.pending_style_whisper: str | None = None
+
+    def append(self, text: str, to_buffer: bool = True) -> None:
+        """Add text to the coaching context (and optionally the delta buffer), then rescan markers."""
+        self.context = (self.context + " " + text).strip()[-TRANSCRIPT_CONTEXT_MAX_CHARS:]
+        if to_buffer:
+            self.buffer.append(text)
+        self.update_semantic_state()
+
+    def text(self) -> str:
+        return (self.context or "".join(self.buffer)).strip()
+
+    def update_semantic_state(self) -> None:
+        """Update semantic pressure/style by scanning the full transcript context.
 
         Always scans the full recent transcript (last 500 chars) for markers,
         not just deltas. This ensures multi-word markers like 'you always' and
         'never listen' are detected even when words arrive across multiple STT
         interim updates.
         """
-        nonlocal semantic_pressure, conversation_style, pending_style_whisper
-        # Scan the full recent transcript context for markers
-        lower = transcript_context[-500:].lower() if transcript_context else ""
+        lower = self.context[-500:].lower() if self.context else ""
         if not lower:
             return
         escalation_hits = sum(1 for m in ESCALATION_MARKERS if m in lower)
         calming_hits = sum(1 for m in CALMING_MARKERS if m in lower)
-        new_style = conversation_style
+        new_style = self.conversation_style
 
         if escalation_hits > 0:
-            semantic_pressure = min(1.0, max(semantic_pressure * 0.7, 0.45 + 0.12 * escalation_hits))
+            self.semantic_pressure = min(1.0, max(self.semantic_pressure * 0.7, 0.45 + 0.12 * escalation_hits))
             new_style = "escalated"
         elif calming_hits > 0:
-            semantic_pressure = max(0.0, semantic_pressure - (0.35 + 0.10 * calming_hits))
+            self.semantic_pressure = max(0.0, self.semantic_pressure - (0.35 + 0.10 * calming_hits))
             new_style = "calm"
         else:
-            semantic_pressure = max(0.0, semantic_pressure - 0.04)
-            if semantic_pressure <= 0.15 and len(lower.split()) >= 6:
+            self.semantic_pressure = max(0.0, self.semantic_pressure - 0.04)
+            if self.semantic_pressure <= 0.15 and len(lower.split()) >= 6:
                 new_style = "normal"
 
-        if new_style != conversation_style:
-            conversation_style = new_style
+        if new_style != self.conversation_style:
+            self.conversation_style = new_style
             if STYLE_WHISPERS_ENABLED and new_style in STYLE_WHISPERS:
-                pending_style_whisper = new_style
+                self.pending_style_whisper = new_style
+
+
+class SttStream:
+    """Streaming Speech-to-Text thread and its queues (lazy-started on the first audio chunk)."""
+
+    __slots__ = ("thread", "audio_queue", "result_queue", "reader_task", "active", "holds_slot")
+
+    def __init__(self) -> None:
+        self.thread: Any = None
+        self.audio_queue: Any = None
+        self.result_queue: Any = None
+        self.reader_task: asyncio.Task | None = None
+        self.active: bool = False
+        self.holds_slot: bool = False  # True while this stream counts against ADMISSION.stt
+
+    def feed(self, raw_bytes: bytes) -> None:
+        if self.audio_queue is not None:
+            try:
+                self.audio_queue.put(raw_bytes, block=False)
+            except queue.Full:
+                AUDIO_CHUNKS_DROPPED.inc(reason="stt_queue_full")
+
+    def detach(self) -> None:
+        self.active = False
+        self.audio_queue = None
+        self.result_queue = None
+        if self.holds_slot:
+            self.holds_slot = False
+            ADMISSION.stt.release()
+
+    async def stop(self) -> None:
+        """Best-effort stop for streaming STT resources."""
+        q = self.audio_queue
+        if q is not None:
+            try:
+                q.put_nowait(None)
+            except queue.Full:
+                # Free one slot, then signal shutdown.
+                try:
+                    q.get_nowait()
+                    q.put_nowait(None)
+                except Exception:
+                    pass
+            except Exception:
+                pass
+        if self.reader_task and not self.reader_task.done():
+            self.reader_task.cancel()
+            try:
+                await self.reader_task
+            except asyncio.CancelledError:
+                pass
+        self.reader_task = None
+        self.thread = None
+        self.detach()
+
+
+class LiveLink:
+    """Gemini Live connection state: current session, degraded flag, reconnect replay buffer."""
+
+    __slots__ = ("session", "degraded", "agent_output_started", "replay_buffer", "reconnect_count")
+
+    def __init__(self) -> None:
+        self.session: IGeminiLiveSession | None = None
+        self.degraded: bool = False  # True when Gemini connect failed; tension + whisper_loop still run
+        self.agent_output_started: bool = False
+        self.replay_buffer: deque[str] = deque(maxlen=MAX_REPLAY_CHUNKS)  # Audio chunks buffered during reconnect
+        self.reconnect_count: int = 0
+
+    @property
+    def usable(self) -> bool:
+        return self.session is not None and not getattr(self.session, "_closed", False)
+
+
+class WhisperScheduler:
+    """Cooldown and pacing state for whispers and backchannels."""
+
+    __slots__ = (
+        "last_whisper_ts",
+        "last_whisper_text",
+        "last_style_whisper_ts",
+        "last_speech_ts",
+        "backchannel_armed",
+        "last_backchannel_ts",
+        "last_model_backchannel_ts",
+        "last_sent_ts",
+        "pending_upgrade",
+        "in_flight",
+    )
+
+    def __init__(self) -> None:
+        self.last_whisper_ts: float = 0.0
+        self.last_whisper_text: str = ""
+        self.last_style_whisper_ts: float = 0.0
+        self.last_speech_ts: float = 0.0
+        self.backchannel_armed: bool = False
+        self.last_backchannel_ts: float = 0.0
+        self.last_model_backchannel_ts: float = 0.0
+        self.last_sent_ts: float = 0.0  # last_whisper_ts of the whisper actually delivered
+        self.pending_upgrade: dict[str, str] | None = None  # model whisper that beat its provisional to the client
+        self.in_flight: bool = False  # a coaching whisper is being generated/sent (drain waits for it)
+
+
+class CopilotSession:
+    """
+    All per-connection state and background loops for one browser WebSocket.
+    handle_websocket drives run(); the process-wide SESSIONS registry tracks live instances.
+    """
+
+    __slots__ = (
+        "id",
+        "websocket",
+        "created_ts",
+        "running",
+        "draining",
+        "tension",
+        "transcript",
+        "stt",
+        "live",
+        "whisper",
+        "frames",
+        "frame_sampling",
+        "prompt",
+        "audio_codec",
+        "recorder",
+        "resume_token",
+        "_tasks",
+    )
+
+    def __init__(self, websocket: WebSocket) -> None:
+        self.id = uuid.uuid4().hex
+        self.websocket = websocket
+        self.created_ts = time.time()
+        self.running = True
+        self.draining = False  # worker shutting down: no new whispers (app.drain)
+        self.tension = TensionTracker()
+        self.transcript = TranscriptState()
+        self.stt = SttStream()
+        self.live = LiveLink()
+        self.whisper = WhisperScheduler()
+        self.frames = FramePipeline()  # Latest webcam frame, prepared for vision-aware coaching
+        self.frame_sampling = FrameSampling()
+        self.audio_codec = "pcm16"  # Encoding for whisper/backchannel audio, negotiated at start
+        self.recorder = open_recorder(self.id)  # No-op unless RECORD_DIR is set (app.recorder)
+        self.resume_token: str | None = None  # issued in ready; the snapshot is stored under it on disconnect
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    # --- introspection ---
+
+    def describe(self) -> dict[str, Any]:
+        """Small JSON-safe summary for logs and diagnostics."""
+        return {
+            "id": self.id,
+            "age_sec": round(time.time() - self.created_ts, 1),
+            "started": bool(self._tasks),
+            "degraded": self.live.degraded,
+            "tension": self.tension.last_score,
+            "semantic_pressure": round(self.transcript.semantic_pressure, 2),
+            "style": self.transcript.conversation_style,
+            "transcript_chars": len(self.transcript.context),
+            "stt_active": self.stt.active,
+            "frames": self.frames.stats(),
+            "reconnects": self.live.reconnect_count,
+            "tasks": sorted(name for name, task in self._tasks.items() if not task.done()),
+        }
+
+    # --- helpers ---
+
+    async def send(self, obj: dict[str, Any]) -> None:
+        self.recorder.outbound(obj)
+        await send_json(self.websocket, obj)
+
+    def _spawn(self, name: str, coro: Any) -> None:
+        self._tasks[name] = asyncio.create_task(coro)
+
+    async def _cancel(self, name: str) -> None:
+        task = self._tasks.pop(name, None)
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    # --- tension ---
+
+    def on_tension(self, score: int) -> None:
+        now = time.time()
+        self.tension.record_score(score, now)
+        asyncio.create_task(self.send({"type": "tension", "score": score, "ts": int(now * 1000)}))
+        policy = self.frame_sampling.on_tension(score, TENSION_WHISPER_THRESHOLD)
+        if policy is not None:
+            asyncio.create_task(self.send(policy))
 
-    async def run_tension_loop() -> None:
-        await compute_tension_loop(telemetry_queue, tension_state, on_tension, interval_sec=0.5)
+    async def run_tension_loop(self) -> None:
+        await compute_tension_loop(self.tension.telemetry_queue, self.tension.state, self.on_tension, interval_sec=0.5)
 
-    async def consume_agent_turns() -> None:
+    # --- Gemini Live ---
+
+    async def consume_agent_turns(self) -> None:
         """Stub only: forward injected turns as whispers (coaching still from coaching.py)."""
-        nonlocal session
-        if session is None:
-            return
-        if not hasattr(session, "agent_turns"):
+        session = self.live.session
+        if session is None or not hasattr(session, "agent_turns"):
             return
         try:
             async for turn in session.agent_turns():
-                if not running:
+                if not self.running:
                     return
                 if turn.text:
-                    await send_json(
-                        websocket,
+                    await self.send(
                         {
                             "type": "whisper",
                             "text": turn.text,
                             "move": getattr(turn, "move", ""),
                             "ts": int(time.time() * 1000),
-                        },
+                        }
                     )
         except asyncio.CancelledError:
             pass
         except Exception as e:
             logger.exception("Agent turn consumer error: %s", e)
 
-    async def _consume_one_session() -> None:
+    async def _consume_one_session(self) -> None:
         """Drain recv_events from the current session until it ends."""
-        nonlocal agent_output_started, transcript_context, last_model_backchannel_ts
+        session = self.live.session
         if session is None or not hasattr(session, "recv_events"):
             return
         async for ev in session.recv_events():
-            if not running:
+            if not self.running:
                 return
+            if self.recorder.enabled:
+                self.recorder.record("live", kind=ev.kind, text=ev.text, message=ev.message,
+                                     audio_bytes=len(ev.audio_base64) * 3 // 4)
             if ev.kind == "agent_output_started":
-                agent_output_started = True
+                self.live.agent_output_started = True
             elif ev.kind == "agent_output_stopped":
-                agent_output_started = False
+                self.live.agent_output_started = False
             elif ev.kind == "user_transcript_delta" and ev.text:
                 # Keep one transcript source at a time: when STT is active, suppress
                 # Gemini user transcript deltas to avoid duplicate UI text.
-                if stt_active:
+                if self.stt.active:
                     continue
-                transcript_buffer.append(ev.text)
-                transcript_context = (transcript_context + " " + ev.text).strip()[-TRANSCRIPT_CONTEXT_MAX_CHARS:]
-                update_semantic_state()
-                await send_json(
-                    websocket,
-                    {"type": "transcript", "delta": ev.text, "ts": int(time.time() * 1000)},
-                )
+                self.transcript.append(ev.text)
+                await self.send({"type": "transcript", "delta": ev.text, "ts": int(time.time() * 1000)})
             elif ev.kind == "backchannel_audio" and ev.audio_base64:
-                last_model_backchannel_ts = time.time()
+                self.whisper.last_model_backchannel_ts = time.time()
                 # Suppress ALL model backchannel audio. The native-audio model
                 # generates unwanted audio that destabilises the Live session —
                 # every burst of forwarded backchannel audio correlates with an
@@ -264,49 +445,79 @@ async def handle_websocket(websocket: WebSocket) -> None:
                 # Model backchannel text — log but don't show in transcript
                 logger.debug("Agent backchannel text: %s", ev.text[:80])
             elif ev.kind == "error":
-                await send_json(websocket, {"type": "error", "message": ev.message or ev.text})
+                await self.send({"type": "error", "message": ev.message or ev.text})
 
-    async def consume_recv_events() -> None:
+    async def consume_recv_events(self) -> None:
         """Consume recv_events with auto-reconnect. When Gemini Live session ends, reconnect and continue."""
-        nonlocal session, agent_output_started
-        reconnect_count = 0
-        max_reconnects = 20
-        while running and reconnect_count <= max_reconnects:
+        while self.running and self.live.reconnect_count <= MAX_LIVE_RECONNECTS:
             try:
-                await _consume_one_session()
+                await self._consume_one_session()
             except asyncio.CancelledError:
                 return
             except Exception as e:
                 logger.exception("recv_events error: %s", e)
-            if not running:
+            if not self.running:
                 return
+            self.recorder.record("live_closed")
             # Session ended — reconnect
-            reconnect_count += 1
-            logger.info("Gemini Live session ended, reconnecting (%d/%d)...", reconnect_count, max_reconnects)
-            agent_output_started = False
-            try:
-                old = session
-                if old:
-                    try:
-                        await old.close()
-                    except Exception:
-                        pass
-                client = get_gemini_client()
-                session = await client.connect(LiveSessionConfig())
-                logger.info("Gemini Live reconnected successfully")
-            except Exception as e:
-                logger.warning("Gemini Live reconnect failed: %s", e)
-                await asyncio.sleep(2.0)  # back off before retry
+            self.live.reconnect_count += 1
+            LIVE_RECONNECTS.inc()
+            logger.info(
+                "Gemini Live session ended, reconnecting (%d/%d)...", self.live.reconnect_count, MAX_LIVE_RECONNECTS
+            )
+            self.live.agent_output_started = False
+            with TRACER.trace("live_reconnect", session=self.id, attempt=self.live.reconnect_count) as trace:
+                try:
+                    old = self.live.session
+                    if old:
+                        with TRACER.span("close"):
+                            try:
+                                await old.close()
+                            except Exception:
+                                pass
+                    with TRACER.span("connect"):
+                        client = get_gemini_client()
+                        self.live.session = await client.connect(LiveSessionConfig())
+                    self.recorder.record("live_connect", ok=True)
+                    logger.info("Gemini Live reconnected successfully")
+                except Exception as e:
+                    self.recorder.record("live_connect", ok=False, error=str(e))
+                    trace.set_attribute("error", type(e).__name__)
+                    logger.warning("Gemini Live reconnect failed: %s", e)
+                    with TRACER.span("backoff"):
+                        await asyncio.sleep(2.0)  # back off before retry
+
+    # --- streaming STT ---
 
-    async def stt_result_reader_loop() -> None:
-        """Read streaming STT results and send transcript to UI; update transcript_context.
+    def _maybe_start_stt(self) -> None:
+        """Lazy-start streaming STT on the first audio chunk."""
+        if not LIVE_STT_STREAMING or self.stt.audio_queue is not None or self.stt.active:
+            return
+        if STARTUP.pending("google.cloud.speech"):
+            # Still importing in the background; importing here would block the loop. Next chunk retries.
+            return
+        if not ADMISSION.stt.try_acquire():
+            # Worker is at its STT cap; Gemini Live transcription still feeds the transcript.
+            return
+        stt_ctx = start_streaming_stt_thread(sample_rate_hz=16000, language_code="en-US")
+        if stt_ctx is None:
+            ADMISSION.stt.release()
+        else:
+            self.stt.holds_slot = True
+            self.stt.active = True
+            self.stt.thread, self.stt.audio_queue, self.stt.result_queue = stt_ctx
+            self.stt.reader_task = asyncio.create_task(self.stt_result_reader_loop())
+            logger.info("Streaming STT started on first audio chunk")
+
+    async def stt_result_reader_loop(self) -> None:
+        """Read streaming STT results and send transcript to UI; update transcript context.
 
         Google Cloud STT interims are cumulative (each contains full text since last final).
         We track how much interim text we've already shown and only send the delta,
         so the UI transcript builds up progressively without duplication.
         """
-        nonlocal transcript_context, stt_active, stt_audio_queue, stt_result_queue
-        if stt_result_queue is None:
+        result_queue = self.stt.result_queue
+        if result_queue is None:
             return
         loop = asyncio.get_event_loop()
         last_final_text = ""
@@ -314,16 +525,17 @@ async def handle_websocket(websocket: WebSocket) -> None:
 
         def get_result():
             try:
-                return stt_result_queue.get(timeout=0.25)
+                return result_queue.get(timeout=0.25)
             except queue.Empty:
                 return None
 
         try:
-            while running and stt_result_queue is not None:
+            while self.running and self.stt.result_queue is not None:
                 item = await loop.run_in_executor(None, get_result)
                 if item is None:
                     continue
                 transcript_text, is_final = item
+                self.recorder.record("stt", text=transcript_text, final=is_final)
                 if transcript_text is None:
                     break
                 t = transcript_text.strip()
@@ -338,17 +550,11 @@ async def handle_websocket(websocket: WebSocket) -> None:
                     delta = t[shown_interim_len:].strip() if len(t) > shown_interim_len else ""
                     shown_interim_len = 0  # Reset for next utterance
                     if delta:
-                        transcript_context = (transcript_context + " " + delta).strip()[-TRANSCRIPT_CONTEXT_MAX_CHARS:]
-                        transcript_buffer.append(delta)
-                        update_semantic_state()
-                        await send_json(
-                            websocket,
-                            {"type": "transcript", "delta": delta + " ", "ts": int(time.time() * 1000)},
-                        )
+                        self.transcript.append(delta)
+                        await self.send({"type": "transcript", "delta": delta + " ", "ts": int(time.time() * 1000)})
                     else:
                         # Final matches what we already showed — still update context
-                        transcript_context = (transcript_context + " " + t).strip()[-TRANSCRIPT_CONTEXT_MAX_CHARS:]
-                        update_semantic_state()
+                        self.transcript.append(t, to_buffer=False)
                 else:
                     # Interim: Google STT interims are cumulative and may revise.
                     # When interim shrinks (revision), reset shown_interim_len.
@@ -358,344 +564,613 @@ async def handle_websocket(websocket: WebSocket) -> None:
                     if len(t) > shown_interim_len:
                         delta = t[shown_interim_len:]
                         shown_interim_len = len(t)
-                        transcript_context = (transcript_context + " " + delta).strip()[-TRANSCRIPT_CONTEXT_MAX_CHARS:]
-                        transcript_buffer.append(delta)
-                        update_semantic_state()
-                        await send_json(
-                            websocket,
-                            {"type": "transcript", "delta": delta, "ts": int(time.time() * 1000)},
-                        )
+                        self.transcript.append(delta)
+                        await self.send({"type": "transcript", "delta": delta, "ts": int(time.time() * 1000)})
         finally:
             logger.info("STT reader loop exited")
-            stt_active = False
-            stt_audio_queue = None
-            stt_result_queue = None
+            self.stt.detach()
+
+    # --- whispers ---
+
+    def due_trigger(self, now: float, transcript_text: str) -> str | None:
+        """Whisper gating for one whisper_loop tick: cooldown, transcript length, speech pause, escalation, then rules."""
+        w = self.whisper
+        if now - w.last_whisper_ts < WHISPER_COOLDOWN_SEC:
+            return None
+        if len(transcript_text) < WHISPER_MIN_TRANSCRIPT_CHARS:
+            return None
+        if w.last_speech_ts > 0 and now - w.last_speech_ts < WHISPER_AFTER_SPEECH_PAUSE_SEC:
+            return None
+        if ESCALATION_REQUIRED_FOR_WHISPER and self.transcript.semantic_pressure < ESCALATION_SEMANTIC_THRESHOLD:
+            return None
+        return self._select_trigger(now)
 
-    async def whisper_loop() -> None:
+    def _select_trigger(self, now: float) -> str | None:
+        """Deterministic whisper trigger for this tick, or None."""
+        if ESCALATION_REQUIRED_FOR_WHISPER:
+            return "tension_cross"
+        tension = self.tension
+        trigger = None
+        # Legacy deterministic trigger path when escalation-only mode is disabled.
+        # (a) Tension crossed upward into >= threshold
+        if tension.crossed_up and tension.last_score >= TENSION_WHISPER_THRESHOLD:
+            tension.crossed_up = False
+            trigger = "tension_cross"
+        elif tension.crossed_up:
+            tension.crossed_up = False  # discard stale flag
+        # (b) Overlap heuristic: high interruption rate in last 5s
+        if trigger is None:
+            recent = [t for t in tension.interrupted_events if now - t <= OVERLAP_WINDOW_SEC]
+            if len(recent) >= OVERLAP_MIN_COUNT:
+                trigger = "barge_in"
+        # (c) Silence >2.5s and tension was >=50 in last 10s
+        if trigger is None and tension.state.silence_start is not None:
+            silence_sec = now - tension.state.silence_start
+            if silence_sec >= SILENCE_THRESHOLD_SEC:
+                high_in_window = any(s >= 50 for ts, s in tension.history if now - ts <= TENSION_HIGH_WINDOW_SEC)
+                if high_in_window:
+                    trigger = "post_escalation_silence"
+        return trigger
+
+    async def _maybe_backchannel(self, now: float) -> None:
+        w = self.whisper
+        if not (LIVE_BACKCHANNEL and w.backchannel_armed and not self.live.agent_output_started):
+            return
+        # Disarm if silence lasted too long (no point saying "ok" after 5s of quiet)
+        if w.last_speech_ts > 0 and now - w.last_speech_ts > 5.0:
+            w.backchannel_armed = False
+        elif (
+            now - w.last_speech_ts >= BACKCHANNEL_PAUSE_SEC
+            and now - w.last_backchannel_ts >= BACKCHANNEL_COOLDOWN_SEC
+            and now - w.last_model_backchannel_ts >= 2.0
+            and now - w.last_whisper_ts >= 8.0
+        ):
+            w.backchannel_armed = False
+            w.last_backchannel_ts = now
+            text = BACKCHANNEL_TEXT_OPTIONS[int(now * 1000) % len(BACKCHANNEL_TEXT_OPTIONS)]
+            with TRACER.trace("backchannel", session=self.id):
+                # Generate TTS audio for the backchannel phrase; skip audio rather than queue when TTS is saturated
+                bc_audio_b64 = None
+                with TRACER.span("tts"):
+                    async with ADMISSION.tts.slot(timeout=0) as acquired:
+                        if acquired:
+                            tts_start = time.perf_counter()
+                            bc_audio_b64 = await generate_backchannel_audio(text, self.audio_codec)
+                            self._record_tts("backchannel", text, bc_audio_b64, tts_start)
+                with TRACER.span("send"):
+                    if bc_audio_b64:
+                        await self.send(self._audio_fields({"type": "backchannel_audio"}, bc_audio_b64))
+                    await self.send({"type": "backchannel_text", "text": text, "ts": int(now * 1000)})
+
+    async def _maybe_style_whisper(self, now: float, transcript_text: str) -> bool:
+        """Send a pending style whisper if due. Returns True when one was sent."""
+        w, tr = self.whisper, self.transcript
+        if not (
+            STYLE_WHISPERS_ENABLED
+            and tr.pending_style_whisper is not None
+            and len(transcript_text) >= WHISPER_MIN_TRANSCRIPT_CHARS
+            and now - w.last_style_whisper_ts >= STYLE_WHISPER_COOLDOWN_SEC
+            and now - w.last_whisper_ts >= 2.0
+        ):
+            return False
+        style = tr.pending_style_whisper
+        tr.pending_style_whisper = None
+        style_text = STYLE_WHISPERS.get(style)
+        if not style_text:
+            return False
+        w.last_style_whisper_ts = now
+        w.last_whisper_ts = now
+        w.last_whisper_text = style_text
+        await self.send({"type": "whisper", "text": style_text, "move": f"style_{style}", "ts": int(now * 1000)})
+        return True
+
+    async def _send_coaching_whisper(
+        self, trigger: str, now: float, transcript_text: str, eval_start_ns: int | None = None
+    ) -> None:
+        w = self.whisper
+        w.last_whisper_ts = now
+        w.pending_upgrade = None
+        w.in_flight = True
+        self.tension.prev_score = self.tension.last_score
+        logger.info(
+            "Whisper triggered: %s, tension=%d, transcript_len=%d", trigger, self.tension.last_score, len(transcript_text)
+        )
+        with TRACER.trace("whisper", start_ns=eval_start_ns, trigger=trigger, session=self.id) as trace:
+            if eval_start_ns is not None:
+                TRACER.record("trigger_eval", eval_start_ns, time.time_ns())
+            try:
+                coaching_start = time.perf_counter()
+                with TRACER.span("coaching"):
+                    # FLASH_LIMITER (inside) is the only gate: priority-ordered, and it degrades to the
+                    # local whisper when saturated, so the budget also covers queueing for it.
+                    coaching_result = await generate_coaching_hedged(
+                        trigger=trigger,
+                        tension_score=self.tension.last_score,
+                        transcript_buffer=transcript_text,
+                        last_whisper=w.last_whisper_text,
+                        image=self.frames.current,
+                        on_late=lambda late: self._upgrade_whisper(now, late),
+                    )
+                if self.recorder.enabled:
+                    self.recorder.record(
+                        "coaching", move=coaching_result["move"], text=coaching_result["text"],
+                        ms=round((time.perf_counter() - coaching_start) * 1000, 1),
+                        **({"provisional": True} if coaching_result.get("provisional") else {}),
+                    )
+                w.last_whisper_text = coaching_result["text"]
+                # Generate TTS whisper audio (returns None if disabled, saturated or failed)
+                audio_b64 = None
+                with TRACER.span("tts"):
+                    async with ADMISSION.tts.slot(timeout=CALL_SLOT_WAIT_SEC) as acquired:
+                        if acquired:
+                            tts_start = time.perf_counter()
+                            audio_b64 = await generate_whisper_audio(coaching_result["text"], self.audio_codec)
+                            self._record_tts("whisper", coaching_result["text"], audio_b64, tts_start)
+                whisper_msg: dict[str, Any] = {
+                    "type": "whisper",
+                    "text": coaching_result["text"],
+                    "move": coaching_result["move"],
+                    "ts": int(now * 1000),
+                }
+                if coaching_result.get("provisional"):
+                    whisper_msg["provisional"] = True
+                if trace.trace_id:
+                    whisper_msg["trace_id"] = trace.trace_id
+                if audio_b64:
+                    self._audio_fields(whisper_msg, audio_b64)
+                    logger.info("Whisper sending with TTS audio: move=%s, text=%s, semantic_pressure=%.2f",
+                                coaching_result["move"], coaching_result["text"][:80], self.transcript.semantic_pressure)
+                else:
+                    logger.info("Whisper sending (text-only, browser TTS): move=%s, text=%s, semantic_pressure=%.2f",
+                                coaching_result["move"], coaching_result["text"][:80], self.transcript.semantic_pressure)
+                with TRACER.span("send"):
+                    await self.send(whisper_msg)
+                w.last_sent_ts = now
+                if w.pending_upgrade is not None:
+                    late, w.pending_upgrade = w.pending_upgrade, None
+                    await self._upgrade_whisper(now, late)
+            except Exception as e:
+                trace.set_attribute("error", type(e).__name__)
+                logger.exception("Whisper generation/send failed: %s", e)
+            finally:
+                w.in_flight = False
+
+    def _record_tts(self, kind: str, text: str, audio_b64: str | None, start: float) -> None:
+        if self.recorder.enabled:
+            ms = round((time.perf_counter() - start) * 1000, 1)
+            self.recorder.record("tts", kind=kind, text=text, ok=bool(audio_b64), ms=ms)
+
+    def _audio_fields(self, msg: dict[str, Any], audio_b64: str) -> dict[str, Any]:
+        """Attach TTS audio to an outgoing message, tagged with its codec when not raw PCM16."""
+        msg["audio_base64"] = audio_b64
+        if self.audio_codec != "pcm16":
+            msg["audio_codec"] = self.audio_codec
+        return msg
+
+    async def _upgrade_whisper(self, whisper_ts: float, late: dict[str, str]) -> None:
+        """Model whisper arrived after a provisional local one: replace it (text only, no second audio)."""
+        w = self.whisper
+        if not self.running or w.last_whisper_ts != whisper_ts or late["text"] == w.last_whisper_text:
+            return  # a newer whisper was sent meanwhile, or nothing changed
+        if w.last_sent_ts != whisper_ts:
+            w.pending_upgrade = late  # provisional still in TTS; send right after it
+            return
+        w.last_whisper_text = late["text"]
+        logger.info("Whisper upgraded: move=%s, text=%s", late["move"], late["text"][:80])
+        await self.send({
+            "type": "whisper",
+            "text": late["text"],
+            "move": late["move"],
+            "ts": int(time.time() * 1000),
+            "replaces": int(whisper_ts * 1000),
+        })
+
+    async def whisper_loop(self) -> None:
         """Real or degraded: every 250ms check deterministic rules; send whisper from coaching.py if cooldown passed."""
-        nonlocal last_whisper_ts, last_whisper_text, prev_tension_score, last_tension_score, tension_crossed_up
-        nonlocal semantic_pressure
-        nonlocal pending_style_whisper, last_style_whisper_ts, backchannel_armed
-        nonlocal last_backchannel_ts, last_model_backchannel_ts, last_speech_ts
-        while running and (session is not None or degraded_mode):
+        while self.running and (self.live.session is not None or self.live.degraded):
             await asyncio.sleep(0.25)
             now = time.time()
-            if not running or (session is None and not degraded_mode):
+            if not self.running or (self.live.session is None and not self.live.degraded):
                 return
-            if LIVE_BACKCHANNEL and backchannel_armed and not agent_output_started:
-                # Disarm if silence lasted too long (no point saying "ok" after 5s of quiet)
-                if last_speech_ts > 0 and now - last_speech_ts > 5.0:
-                    backchannel_armed = False
-                elif (
-                    now - last_speech_ts >= BACKCHANNEL_PAUSE_SEC
-                    and now - last_backchannel_ts >= BACKCHANNEL_COOLDOWN_SEC
-                    and now - last_model_backchannel_ts >= 2.0
-                    and now - last_whisper_ts >= 8.0
-                ):
-                    backchannel_armed = False
-                    last_backchannel_ts = now
-                    text = BACKCHANNEL_TEXT_OPTIONS[int(now * 1000) % len(BACKCHANNEL_TEXT_OPTIONS)]
-                    # Generate TTS audio for the backchannel phrase
-                    bc_audio_b64 = await generate_backchannel_audio(text)
-                    if bc_audio_b64:
-                        await send_json(
-                            websocket,
-                            {"type": "backchannel_audio", "audio_base64": bc_audio_b64},
-                        )
-                    await send_json(
-                        websocket,
-                        {"type": "backchannel_text", "text": text, "ts": int(now * 1000)},
-                    )
-            transcript_text = (transcript_context or "".join(transcript_buffer)).strip()
-            if (
-                STYLE_WHISPERS_ENABLED
-                and pending_style_whisper is not None
-                and len(transcript_text) >= WHISPER_MIN_TRANSCRIPT_CHARS
-                and now - last_style_whisper_ts >= STYLE_WHISPER_COOLDOWN_SEC
-                and now - last_whisper_ts >= 2.0
-            ):
-                style = pending_style_whisper
-                pending_style_whisper = None
-                style_text = STYLE_WHISPERS.get(style)
-                if style_text:
-                    last_style_whisper_ts = now
-                    last_whisper_ts = now
-                    last_whisper_text = style_text
-                    await send_json(
-                        websocket,
-                        {
-                            "type": "whisper",
-                            "text": style_text,
-                            "move": f"style_{style}",
-                            "ts": int(now * 1000),
-                        },
-                    )
-                    continue
-            if now - last_whisper_ts < WHISPER_COOLDOWN_SEC:
-                continue
-            if len(transcript_text) < WHISPER_MIN_TRANSCRIPT_CHARS:
+            if self.draining:
                 continue
-            if last_speech_ts > 0 and now - last_speech_ts < WHISPER_AFTER_SPEECH_PAUSE_SEC:
+            await self._maybe_backchannel(now)
+            eval_start_ns = time.time_ns()
+            transcript_text = self.transcript.text()
+            if await self._maybe_style_whisper(now, transcript_text):
                 continue
-            if ESCALATION_REQUIRED_FOR_WHISPER and semantic_pressure < ESCALATION_SEMANTIC_THRESHOLD:
-                continue
-            trigger = None
-            if ESCALATION_REQUIRED_FOR_WHISPER:
-                trigger = "tension_cross"
-            else:
-                # Legacy deterministic trigger path when escalation-only mode is disabled.
-                # (a) Tension crossed upward into >= threshold
-                if tension_crossed_up and last_tension_score >= TENSION_WHISPER_THRESHOLD:
-                    tension_crossed_up = False
-                    trigger = "tension_cross"
-                elif tension_crossed_up:
-                    tension_crossed_up = False  # discard stale flag
-                # (b) Overlap heuristic: high interruption rate in last 5s
-                if trigger is None:
-                    recent = [t for t in interrupted_events if now - t <= OVERLAP_WINDOW_SEC]
-                    if len(recent) >= OVERLAP_MIN_COUNT:
-                        trigger = "barge_in"
-                # (c) Silence >2.5s and tension was >=50 in last 10s
-                if trigger is None and tension_state.silence_start is not None:
-                    silence_sec = now - tension_state.silence_start
-                    if silence_sec >= SILENCE_THRESHOLD_SEC:
-                        high_in_window = any(s >= 50 for _, s in tension_history if now - _ <= TENSION_HIGH_WINDOW_SEC)
-                        if high_in_window:
-                            trigger = "post_escalation_silence"
+            trigger = self.due_trigger(now, transcript_text)
             if trigger is not None:
-                last_whisper_ts = now
-                prev_tension_score = last_tension_score
-                logger.info("Whisper triggered: %s, tension=%d, transcript_len=%d", trigger, last_tension_score, len(transcript_text))
-                try:
-                    coaching_result = await generate_coaching(
-                        trigger=trigger,
-                        tension_score=last_tension_score,
-                        transcript_buffer=transcript_text,
-                        last_whisper=last_whisper_text,
-                        image_b64=last_frame_b64,
-                    )
-                    last_whisper_text = coaching_result["text"]
-                    # Generate TTS whisper audio (returns None if disabled or fails)
-                    audio_b64 = await generate_whisper_audio(coaching_result["text"])
-                    whisper_msg: dict[str, Any] = {
-                        "type": "whisper",
-                        "text": coaching_result["text"],
-                        "move": coaching_result["move"],
-                        "ts": int(now * 1000),
-                    }
-                    if audio_b64:
-                        whisper_msg["audio_base64"] = audio_b64
-                        logger.info("Whisper sending with TTS audio: move=%s, text=%s, semantic_pressure=%.2f",
-                                    coaching_result["move"], coaching_result["text"][:80], semantic_pressure)
-                    else:
-                        logger.info("Whisper sending (text-only, browser TTS): move=%s, text=%s, semantic_pressure=%.2f",
-                                    coaching_result["move"], coaching_result["text"][:80], semantic_pressure)
-                    await send_json(websocket, whisper_msg)
-                except Exception as e:
-                    logger.exception("Whisper generation/send failed: %s", e)
+                await self._send_coaching_whisper(trigger, now, transcript_text, eval_start_ns)
 
-    async def mock_loop() -> None:
+    async def mock_loop(self) -> None:
         """When MOCK_MODE: periodically send tension + occasional whisper."""
         import random
         idx = 0
-        while running:
+        while self.running:
             await asyncio.sleep(2.0)
-            if not running:
+            if not self.running:
                 return
             score = random.randint(20, 70)
-            await send_json(websocket, {"type": "tension", "score": score, "ts": int(time.time() * 1000)})
+            await self.send({"type": "tension", "score": score, "ts": int(time.time() * 1000)})
             idx += 1
             if idx % 3 == 0 and COACHING_MOVES:
                 move = random.choice(COACHING_MOVES)
-                await send_json(
-                    websocket,
-                    {"type": "whisper", "text": move["text"], "move": move["move"], "ts": int(time.time() * 1000)},
+                await self.send(
+                    {"type": "whisper", "text": move["text"], "move": move["move"], "ts": int(time.time() * 1000)}
                 )
 
-    mock_task: asyncio.Task | None = None
-    try:
-        while running:
-            raw = await websocket.receive_text()
+    # --- protocol ---
+
+    async def handle_start(self, msg: dict[str, Any]) -> None:
+        if self.live.session is not None:
+            await self.send({"type": "error", "message": "Already started"})
+            return
+        config = msg.get("config")
+        if isinstance(config, dict):
+            self.audio_codec = negotiate(config.get("audio_codec"))
+        ready: dict[str, Any] = {"type": "ready", "frame_policy": self.frame_sampling.initial()}
+        if self.audio_codec != "pcm16":
+            ready["audio_codec"] = self.audio_codec
+        if session_store.STORE is not None:
+            token = msg.get("resume_token")
+            if isinstance(token, str) and token:
+                ready["resumed"] = await self.resume(token)
+            self.resume_token = session_store.new_token()
+            ready["resume_token"] = self.resume_token
+        await self.send(ready)
+        STARTUP.mark("first_ready")
+        if isinstance(config, dict) and isinstance(config.get("image"), str):
+            self.handle_frame({"base64": config["image"]})  # initial webcam frame, per protocol
+        if not MOCK_MODE:
             try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
-                await send_json(websocket, {"type": "error", "message": "Invalid JSON"})
-                continue
-            t = msg.get("type")
-            if t == "start":
-                if session is not None:
-                    await send_json(websocket, {"type": "error", "message": "Already started"})
-                    continue
-                await send_json(websocket, {"type": "ready"})
-                if not MOCK_MODE:
-                    try:
-                        client = get_gemini_client()
-                        session = await client.connect(LiveSessionConfig())
-                        if hasattr(session, "recv_events"):
-                            events_task = asyncio.create_task(consume_recv_events())
-                        if hasattr(session, "agent_turns"):
-                            agent_task = asyncio.create_task(consume_agent_turns())
-                        whisper_task = asyncio.create_task(whisper_loop())
-                    except Exception as e:
-                        logger.exception("Gemini connect failed; starting degraded (local-only) mode: %s", e)
-                        await send_json(
-                            websocket,
-                            {"type": "error", "message": "Gemini unavailable; running local coaching only"},
-                        )
-                        session = None
-                        degraded_mode = True
-                        whisper_task = asyncio.create_task(whisper_loop())
-                tension_task = asyncio.create_task(run_tension_loop())
-                if MOCK_MODE:
-                    mock_task = asyncio.create_task(mock_loop())
-            elif t == "stop":
-                running = False
-                if tension_task:
-                    await telemetry_queue.put(None)
-                    tension_task.cancel()
-                    try:
-                        await tension_task
-                    except asyncio.CancelledError:
-                        pass
-                if session:
-                    await session.disconnect()
-                    session = None
-                if agent_task:
-                    agent_task.cancel()
-                    try:
-                        await agent_task
-                    except asyncio.CancelledError:
-                        pass
-                if events_task:
-                    events_task.cancel()
-                    try:
-                        await events_task
-                    except asyncio.CancelledError:
-                        pass
-                if whisper_task:
-                    whisper_task.cancel()
-                    try:
-                        await whisper_task
-                    except asyncio.CancelledError:
-                        pass
-                if mock_task:
-                    mock_task.cancel()
-                    try:
-                        await mock_task
-                    except asyncio.CancelledError:
-                        pass
-                await stop_stt()
-                await send_json(websocket, {"type": "stopped"})
-                break
-            elif t == "audio":
-                base64_audio = (msg.get("base64") or "").strip()
-                if not base64_audio:
-                    base64_audio = (msg.get("pcm_base64") or "").strip()
-                    if base64_audio:
-                        logger.warning("pcm_base64 is deprecated; use 'base64' per protocol.")
-                if not base64_audio:
+                await STARTUP.wait("google.genai")  # cold worker: let the background import finish
+                client = get_gemini_client()
+                self.live.session = await client.connect(LiveSessionConfig())
+                self.recorder.record("live_connect", ok=True)
+                if hasattr(self.live.session, "recv_events"):
+                    self._spawn("events", self.consume_recv_events())
+                if hasattr(self.live.session, "agent_turns"):
+                    self._spawn("agent", self.consume_agent_turns())
+                self._spawn("whisper", self.whisper_loop())
+            except Exception as e:
+                self.recorder.record("live_connect", ok=False, error=str(e))
+                logger.exception("Gemini connect failed; starting degraded (local-only) mode: %s", e)
+                await self.send({"type": "error", "message": "Gemini unavailable; running local coaching only"})
+                self.live.session = None
+                self.live.degraded = True
+                self._spawn("whisper", self.whisper_loop())
+        self._spawn("tension", self.run_tension_loop())
+        if MOCK_MODE:
+            self._spawn("mock", self.mock_loop())
+        if self.resume_token and session_store.SESSION_SNAPSHOT_SEC > 0:
+            self._spawn("snapshot", self.snapshot_loop())
+
+    async def handle_stop(self) -> None:
+        self.running = False
+        token, self.resume_token = self.resume_token, None  # ended on purpose: nothing to resume
+        if "tension" in self._tasks:
+            await self.tension.telemetry_queue.put(None)
+            await self._cancel("tension")
+        if self.live.session:
+            await self.live.session.disconnect()
+            self.live.session = None
+        for name in ("agent", "events", "whisper", "mock", "snapshot"):
+            await self._cancel(name)
+        if token:
+            await self.discard_snapshot(token)  # after snapshot_loop is cancelled, so nothing re-saves it
+        await self.stt.stop()
+        await self.send({"type": "stopped"})
+
+    # --- resume ---
+
+    def snapshot(self) -> dict[str, Any]:
+        """Coaching state carried across a reconnect (JSON-safe; encoded by app.session_store)."""
+        tension, transcript, w = self.tension, self.transcript, self.whisper
+        snapshot: dict[str, Any] = {
+            "v": session_store.SNAPSHOT_VERSION,
+            "saved": round(time.time(), 3),
+            "tension": {
+                "rms_ema": round(tension.rms_ema, 5),
+                "last_score": tension.last_score,
+                "prev_score": tension.prev_score,
+                "history": [[round(ts, 3), score] for ts, score in tension.history],
+                "interrupted": [round(ts, 3) for ts in tension.interrupted_events],
+                "recent_rms": [round(r, 5) for r in tension.state.recent_rms],
+                "overlaps": [round(ts, 3) for ts in tension.state.overlap_timestamps],
+            },
+            "transcript": {
+                "context": transcript.context,
+                "semantic_pressure": round(transcript.semantic_pressure, 4),
+                "style": transcript.conversation_style,
+            },
+            "whisper": {
+                "last_whisper_ts": w.last_whisper_ts,
+                "last_whisper_text": w.last_whisper_text,
+                "last_style_whisper_ts": w.last_style_whisper_ts,
+                "last_sent_ts": w.last_sent_ts,
+            },
+        }
+        frame = self.frames.current
+        if frame is not None:
+            snapshot["frame"] = {
+                "jpeg": base64.b64encode(frame.jpeg).decode("ascii"),
+                "width": frame.width,
+                "height": frame.height,
+                "dhash": frame.dhash,
+            }
+        return snapshot
+
+    def restore(self, snapshot: dict[str, Any]) -> None:
+        """Apply a snapshot() to this (fresh) session. Silence timing restarts; everything else continues."""
+        tension, transcript, w = self.tension, self.transcript, self.whisper
+        t = snapshot.get("tension") or {}
+        tension.rms_ema = float(t.get("rms_ema", 0.0))
+        tension.last_score = tension.prev_score = int(t.get("last_score", 0))
+        tension.history = deque((float(ts), int(score)) for ts, score in t.get("history", ()))
+        tension.interrupted_events = deque(float(ts) for ts in t.get("interrupted", ()))
+        tension.state.recent_rms = [float(r) for r in t.get("recent_rms", ())][-tension.state.max_rms_history:]
+        tension.state.overlap_timestamps = [float(ts) for ts in t.get("overlaps", ())]
+        tension.state.overlap_count = len(tension.state.overlap_timestamps)
+        tension.state.last_rms = tension.rms_ema
+        tr = snapshot.get("transcript") or {}
+        transcript.context = str(tr.get("context", ""))[-TRANSCRIPT_CONTEXT_MAX_CHARS:]
+        transcript.semantic_pressure = float(tr.get("semantic_pressure", 0.0))
+        transcript.conversation_style = str(tr.get("style", "unknown"))
+        ws = snapshot.get("whisper") or {}
+        w.last_whisper_ts = float(ws.get("last_whisper_ts", 0.0))
+        w.last_whisper_text = str(ws.get("last_whisper_text", ""))
+        w.last_style_whisper_ts = float(ws.get("last_style_whisper_ts", 0.0))
+        w.last_sent_ts = float(ws.get("last_sent_ts", 0.0))
+        frame = snapshot.get("frame")
+        if isinstance(frame, dict) and frame.get("jpeg"):
+            self.frames.current = PreparedFrame(
+                base64.b64decode(frame["jpeg"]), frame.get("width", 0), frame.get("height", 0), frame.get("dhash")
+            )
+
+    async def resume(self, token: str) -> bool:
+        """Restore the snapshot stored under a resume token (single use). False when unknown or expired."""
+        store = session_store.STORE
+        try:
+            blob = await store.take(token) if store is not None else None
+        except Exception as e:  # e.g. sqlite locked or corrupt: start fresh rather than fail the session
+            logger.warning("Session snapshot not loaded: %s", e)
+            return False
+        snapshot = session_store.decode_snapshot(blob) if blob else None
+        if snapshot is None:
+            return False
+        try:
+            self.restore(snapshot)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning("Session snapshot not restored: %s", e)
+            return False
+        logger.info(
+            "Session resumed: tension=%d, semantic_pressure=%.2f, transcript_len=%d, %.1fs after disconnect",
+            self.tension.last_score, self.transcript.semantic_pressure, len(self.transcript.context),
+            time.time() - snapshot.get("saved", time.time()),
+        )
+        return True
+
+    async def save_snapshot(self) -> None:
+        store = session_store.STORE
+        if store is None or not self.resume_token:
+            return
+        try:
+            await store.put(self.resume_token, session_store.encode_snapshot(self.snapshot()))
+        except Exception as e:
+            logger.warning("Session snapshot not saved: %s", e)
+
+    async def discard_snapshot(self, token: str) -> None:
+        store = session_store.STORE
+        if store is None:
+            return
+        try:
+            await store.discard(token)
+        except Exception as e:
+            logger.warning("Session snapshot not discarded: %s", e)
+
+    async def snapshot_loop(self) -> None:
+        """SESSION_SNAPSHOT_SEC > 0: keep the stored snapshot fresh while the session runs."""
+        while self.running:
+            await asyncio.sleep(session_store.SESSION_SNAPSHOT_SEC)
+            await self.save_snapshot()
+
+    async def handle_audio(self, msg: dict[str, Any]) -> None:
+        base64_audio = (msg.get("base64") or "").strip()
+        if not base64_audio:
+            base64_audio = (msg.get("pcm_base64") or "").strip()
+            if base64_audio:
+                logger.warning("pcm_base64 is deprecated; use 'base64' per protocol.")
+        if not base64_audio:
+            return
+        AUDIO_CHUNKS.inc()
+        decode_start = time.perf_counter()
+        try:
+            raw_bytes = base64.b64decode(base64_audio, validate=True)
+        except Exception:
+            AUDIO_CHUNKS_DROPPED.inc(reason="invalid")
+            return
+        AUDIO_DECODE_SECONDS.observe(time.perf_counter() - decode_start)
+        telemetry = self.chunk_telemetry(len(raw_bytes), msg.get("telemetry") or {}, time.time())
+        barge_in_trigger = telemetry.is_overlap
+        try:
+            self.tension.telemetry_queue.put_nowait(telemetry)
+        except asyncio.QueueFull:
+            AUDIO_CHUNKS_DROPPED.inc(reason="telemetry_queue_full")
+        # Feed audio to STT (lazy start on first chunk)
+        self._maybe_start_stt()
+        self.stt.feed(raw_bytes)
+        if MOCK_MODE:
+            return
+        live = self.live
+        if live.usable:
+            session = live.session
+            # Replay any buffered audio first
+            if live.replay_buffer:
+                for buffered in live.replay_buffer:
+                    await session.send_audio(buffered)
+                live.replay_buffer.clear()
+            if barge_in_trigger:
+                if hasattr(session, "stop_generation"):
+                    await session.stop_generation()
+                now_ts = time.time()
+                self.tension.record_interruption(now_ts)
+                await self.send({"type": "event", "name": "interrupted", "ts": int(now_ts * 1000)})
+                live.agent_output_started = False
+            await session.send_audio(base64_audio)
+        else:
+            # Session dead/reconnecting — buffer audio to replay after reconnect (oldest dropped when full)
+            live.replay_buffer.append(base64_audio)
+
+    def chunk_telemetry(self, raw_len: int, telemetry_in: dict[str, Any], now: float) -> AudioTelemetry:
+        """One audio chunk -> tension telemetry: client RMS (or a size stand-in), EMA, silence/speech/barge-in."""
+        rms_raw = telemetry_in.get("rms") if isinstance(telemetry_in.get("rms"), (int, float)) else None
+        if rms_raw is None:
+            rms_raw = min(1.0, raw_len / 1024.0) if raw_len else 0.0
+        else:
+            rms_raw = min(1.0, max(0.0, float(rms_raw)))
+        rms_ema = self.tension.update_rms(rms_raw)
+        if rms_ema >= BACKCHANNEL_SPEECH_RMS_THRESHOLD:
+            self.whisper.last_speech_ts = now
+            self.whisper.backchannel_armed = True
+        return AudioTelemetry(
+            rms=rms_ema,
+            is_silence=rms_ema < SILENCE_RMS_THRESHOLD,
+            is_overlap=self.live.agent_output_started and rms_ema >= BARGE_IN_RMS_THRESHOLD,
+            ts=now,
+        )
+
+    def handle_frame(self, msg: dict[str, Any]) -> None:
+        # Latest webcam frame for vision-aware coaching whispers (decoded/downscaled off the loop)
+        frame_data = (msg.get("base64") or "").strip()
+        if frame_data:
+            self.frames.submit(frame_data)
+
+    @staticmethod
+    def _message_type(raw: str) -> str | None:
+        try:
+            msg = codec.loads(raw)
+        except json.JSONDecodeError:
+            return None
+        return msg.get("type") if isinstance(msg, dict) else None
+
+    async def run(self) -> None:
+        """Receive loop: dispatch protocol messages until stop or disconnect; always cleans up."""
+        websocket = self.websocket
+        try:
+            while self.running:
+                raw = await websocket.receive_text()
+                if len(raw) > MAX_INBOUND_CHARS:
+                    # Only reached on servers without ws_max_size (tests, other ASGI hosts); uvicorn via
+                    # run.py closes with 1009 first. Parsed only to tell oversized frames apart.
+                    if self._message_type(raw) == "frame":
+                        self.frames.rejected_size += 1
+                    await self.send({"type": "error", "message": "Message too large"})
                     continue
+                self.recorder.record("in", raw=raw)
                 try:
-                    raw_bytes = base64.b64decode(base64_audio, validate=True)
-                except Exception:
+                    msg = codec.loads(raw)
+                except json.JSONDecodeError:
+                    await self.send({"type": "error", "message": "Invalid JSON"})
                     continue
-                telemetry_in = msg.get("telemetry") or {}
-                rms_raw = telemetry_in.get("rms") if isinstance(telemetry_in.get("rms"), (int, float)) else None
-                if rms_raw is None:
-                    rms_raw = min(1.0, len(raw_bytes) / 1024.0) if raw_bytes else 0.0
+                t = msg.get("type")
+                if t == "start":
+                    await self.handle_start(msg)
+                elif t == "stop":
+                    await self.handle_stop()
+                    break
+                elif t == "audio":
+                    await self.handle_audio(msg)
+                elif t == "frame":
+                    self.handle_frame(msg)
                 else:
-                    rms_raw = min(1.0, max(0.0, float(rms_raw)))
-                rms_ema_ref[0] = (1.0 - RMS_EMA_ALPHA) * rms_ema_ref[0] + RMS_EMA_ALPHA * rms_raw
-                rms_ema = rms_ema_ref[0]
-                is_silence = rms_ema < SILENCE_RMS_THRESHOLD
-                if rms_ema >= BACKCHANNEL_SPEECH_RMS_THRESHOLD:
-                    last_speech_ts = time.time()
-                    backchannel_armed = True
-                barge_in_trigger = agent_output_started and rms_ema >= BARGE_IN_RMS_THRESHOLD
-                telemetry = AudioTelemetry(
-                    rms=rms_ema,
-                    is_silence=is_silence,
-                    is_overlap=barge_in_trigger,
-                    ts=time.time(),
-                )
-                try:
-                    telemetry_queue.put_nowait(telemetry)
-                except asyncio.QueueFull:
-                    pass
-                # Feed audio to STT (lazy start on first chunk)
-                if LIVE_STT_STREAMING and stt_audio_queue is None and not stt_active:
-                    stt_ctx = start_streaming_stt_thread(sample_rate_hz=16000, language_code="en-US")
-                    if stt_ctx is not None:
-                        stt_active = True
-                        stt_thread, stt_audio_queue, stt_result_queue = stt_ctx
-                        stt_reader_task = asyncio.create_task(stt_result_reader_loop())
-                        logger.info("Streaming STT started on first audio chunk")
-                if stt_audio_queue is not None:
-                    try:
-                        stt_audio_queue.put(raw_bytes, block=False)
-                    except queue.Full:
-                        pass
-                if not MOCK_MODE:
-                    if session and not getattr(session, '_closed', False):
-                        # Replay any buffered audio first
-                        if audio_replay_buffer:
-                            for buffered in audio_replay_buffer:
-                                await session.send_audio(buffered)
-                            audio_replay_buffer.clear()
-                        if barge_in_trigger:
-                            if hasattr(session, "stop_generation"):
-                                await session.stop_generation()
-                            now_ts = time.time()
-                            interrupted_events.append(now_ts)
-                            while interrupted_events and now_ts - interrupted_events[0] > OVERLAP_WINDOW_SEC:
-                                interrupted_events.pop(0)
-                            await send_json(
-                                websocket,
-                                {"type": "event", "name": "interrupted", "ts": int(now_ts * 1000)},
-                            )
-                            agent_output_started = False
-                        await session.send_audio(base64_audio)
-                    else:
-                        # Session dead/reconnecting — buffer audio to replay after reconnect
-                        audio_replay_buffer.append(base64_audio)
-                        if len(audio_replay_buffer) > MAX_REPLAY_CHUNKS:
-                            audio_replay_buffer.pop(0)
-            elif t == "frame":
-                # Store latest webcam frame for vision-aware coaching whispers
-                frame_data = (msg.get("base64") or "").strip()
-                if frame_data:
-                    last_frame_b64 = frame_data
-            else:
-                await send_json(websocket, {"type": "error", "message": f"Unknown type: {t}"})
+                    await self.send({"type": "error", "message": f"Unknown type: {t}"})
+        finally:
+            await self.close()
 
-    finally:
-        await stop_stt()
-        if session:
+    async def begin_drain(self, retry_after_ms: int) -> None:
+        """Worker is shutting down: start no new whispers and tell the client to reconnect elsewhere."""
+        self.draining = True
+        try:
+            await self.send({"type": "reconnect", "reason": "draining", "retry_after_ms": retry_after_ms})
+        except Exception:
+            pass
+
+    async def end_drain(self) -> None:
+        """Close the socket with 1012 (service restart); run() then cleans up as on a client disconnect."""
+        try:
+            await self.websocket.close(code=1012)
+        except Exception:
+            pass
+
+    async def close(self) -> None:
+        """Release STT, the Live session and all background tasks (idempotent)."""
+        self.running = False
+        await self.stt.stop()
+        await self.frames.close()
+        if self.live.session:
             try:
-                await session.disconnect()
+                await self.live.session.disconnect()
             except Exception:
                 pass
-        if tension_task and not tension_task.done():
-            tension_task.cancel()
-            try:
-                await tension_task
-            except asyncio.CancelledError:
-                pass
-        if events_task and not events_task.done():
-            events_task.cancel()
-            try:
-                await events_task
-            except asyncio.CancelledError:
-                pass
-        if whisper_task and not whisper_task.done():
-            whisper_task.cancel()
-            try:
-                await whisper_task
-            except asyncio.CancelledError:
-                pass
-        if mock_task and not mock_task.done():
-            mock_task.cancel()
-            try:
-                await mock_task
-            except asyncio.CancelledError:
-                pass
+            self.live.session = None
+        started = bool(self._tasks)
+        for name in list(self._tasks):
+            await self._cancel(name)
+        if self.resume_token and started:
+            await self.save_snapshot()  # dropped without stop: the client may resume with its token
+            self.resume_token = None
+        await self.recorder.close()
+
+
+class SessionRegistry:
+    """Process-wide registry of active CopilotSessions, for introspection and capacity decisions."""
+
+    def __init__(self) -> None:
+        self._sessions: dict[str, CopilotSession] = {}
+
+    def add(self, session: CopilotSession) -> None:
+        self._sessions[session.id] = session
+
+    def remove(self, session: CopilotSession) -> None:
+        self._sessions.pop(session.id, None)
+
+    def get(self, session_id: str) -> CopilotSession | None:
+        return self._sessions.get(session_id)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self) -> Iterator[CopilotSession]:
+        return iter(list(self._sessions.values()))
+
+    def describe(self) -> list[dict[str, Any]]:
+        return [s.describe() for s in self]
+
+
+SESSIONS = SessionRegistry()
+
+
+def _queue_depths() -> list[tuple[dict[str, str], float]]:
+    """Scrape-time QUEUE_DEPTH: backlog per queue kind summed over live sessions."""
+    depths = {"telemetry": 0, "stt_audio": 0, "stt_results": 0, "live_replay": 0}
+    for session in SESSIONS:
+        depths["telemetry"] += session.tension.telemetry_queue.qsize()
+        if session.stt.audio_queue is not None:
+            depths["stt_audio"] += session.stt.audio_queue.qsize()
+        if session.stt.result_queue is not None:
+            depths["stt_results"] += session.stt.result_queue.qsize()
+        depths["live_replay"] += len(session.live.replay_buffer)
+    return [({"queue": name}, float(n)) for name, n in depths.items()]
+
+
+QUEUE_DEPTH.set_function(_queue_depths)
+
+
+async def handle_websocket(websocket: WebSocket) -> None:
+    session = CopilotSession(websocket)
+    SESSIONS.add(session)
+    try:
+        await session.run()
+    finally:
+        SESSIONS.remove(session)
@@ -0,0 +1,9 @@
+"""
+Microbenchmarks for server hot paths, with fixed inputs so results are comparable across commits.
+Cases live in benchmarks/cases.py; the runner (benchmarks/runner.py) times them and writes JSON.
+
+Run from apps/server:
+  python -m benchmarks                          # all cases, table
+  python -m benchmarks -k tension --json out.json
+  python -m benchmarks --compare baseline.json --threshold 0.15 --fail-on-regression
+"""
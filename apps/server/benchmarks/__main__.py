@@ -0,0 +1,69 @@
+"""CLI: python -m benchmarks [-k substr] [--json out.json] [--compare baseline.json] [--threshold 0.1] [--fail-on-regression]"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+# Allow importing app when run from apps/server
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import cases  # noqa: F401  (registers cases)
+from benchmarks.runner import CASES, compare, run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmarks for server hot paths")
+    parser.add_argument("-k", dest="select", action="append", help="only cases whose name contains this (repeatable)")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds of measurement per case")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--json", dest="json_out", help="write results to this file ('-' for stdout)")
+    parser.add_argument("--compare", help="baseline results JSON from a previous run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="median change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 if any case regressed")
+    parser.add_argument("--list", action="store_true", help="list cases and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, bench in CASES.items():
+            print(f"{name:<36}{bench.description}")
+        return
+    logging.disable(logging.WARNING)  # hot paths log at INFO/WARNING; keep output clean and timings honest
+    names = [n for n in CASES if not args.select or any(s in n for s in args.select)]
+    results = run(names, args.min_time, args.rounds)
+
+    if args.json_out == "-":
+        print(json.dumps(results, indent=2))
+    else:
+        if args.json_out:
+            with open(args.json_out, "w") as f:
+                json.dump(results, f, indent=2)
+        print(f"{'case':<36}{'median':>12}{'min':>12}{'stdev':>10}{'ops/sec':>14}")
+        for r in results["results"]:
+            print(f"{r['name']:<36}{_fmt(r['median_ns']):>12}{_fmt(r['min_ns']):>12}{_fmt(r['stdev_ns']):>10}"
+                  f"{r['ops_per_sec']:>14,.0f}  /{r['unit']}")
+
+    regressed = False
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold)
+        print(f"\nvs {args.compare} (commit {baseline.get('meta', {}).get('commit')}):", file=sys.stderr)
+        for row in rows:
+            ratio = "-" if row["ratio"] is None else f"{row['ratio']:.3f}x"
+            print(f"  {row['name']:<36}{ratio:>9}  {row['status']}", file=sys.stderr)
+        regressed = any(row["status"] == "regression" for row in rows)
+    if regressed and args.fail_on_regression:
+        sys.exit(1)
+
+
+def _fmt(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} us"
+    return f"{ns:.0f} ns"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Benchmark cases for server hot paths. Inputs are fixed (seeded) so runs are comparable:
+  - 40 ms PCM16 16 kHz mic chunks with telemetry, as the web app sends them (25/s per session)
+  - a ~2000-char argument transcript (TRANSCRIPT_CONTEXT_MAX_CHARS) for marker scanning
+  - 3 s of PCM16 24 kHz TTS output for whisper post-processing and re-encoding
+  - a Gemini Live receive() stream mixing input transcription, model text, audio parts and turn ends
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import math
+import random
+import struct
+from types import SimpleNamespace
+
+from app import websocket_handler
+from app.audio_codec import encode_b64
+from app.coaching import _apply_whisper_effect
+from app.gemini_live_client import LiveSessionConfig, RealGeminiLiveSession, StubGeminiLiveSession
+from app.tension import AudioTelemetry, TensionState, compute_tension_from_telemetry
+from app.websocket_handler import TRANSCRIPT_CONTEXT_MAX_CHARS, CopilotSession, TranscriptState
+
+from benchmarks.runner import case
+
+SEED = 1234
+MIC_RATE = 16000
+TTS_RATE = 24000
+CHUNK_SAMPLES = MIC_RATE * 40 // 1000
+
+ARGUMENT_LINES = (
+    "you never listen to what I say and it is ridiculous",
+    "I hear you but you always ignore my deadlines",
+    "whatever, I don't care anymore, this is not fair",
+    "can we just get on the same page about the plan",
+    "every single time we talk about this you blame me",
+    "I'm sorry, I want a plan that works for both of us",
+)
+
+
+def voice(seconds: float, rate: int, seed: int = SEED) -> list[int]:
+    """Deterministic speech-like samples: harmonics with syllable envelope, bursts and pauses."""
+    rng = random.Random(seed)
+    out: list[int] = []
+    total = int(seconds * rate)
+    phase = 0.0
+    while len(out) < total:
+        f0, level = rng.uniform(110, 220), rng.uniform(3000, 12000)
+        for i in range(int(rng.uniform(0.8, 2.0) * rate)):
+            phase += 2 * math.pi * f0 / rate
+            env = 0.5 - 0.5 * math.cos(2 * math.pi * 4.0 * i / rate)
+            out.append(int(level * env * (math.sin(phase) + 0.5 * math.sin(2 * phase)) / 1.5))
+        out.extend(int(rng.gauss(0, 60)) for _ in range(int(rng.uniform(0.3, 1.0) * rate)))
+    return out[:total]
+
+
+def pcm16(samples: list[int]) -> bytes:
+    return struct.pack(f"<{len(samples)}h", *samples)
+
+
+def mic_chunks(seconds: float = 10.0) -> list[tuple[bytes, float]]:
+    samples = voice(seconds, MIC_RATE)
+    chunks = []
+    for i in range(0, len(samples) - CHUNK_SAMPLES + 1, CHUNK_SAMPLES):
+        part = samples[i:i + CHUNK_SAMPLES]
+        rms = math.sqrt(sum(s * s for s in part) / len(part)) / 32768.0
+        chunks.append((pcm16(part), min(1.0, rms)))
+    return chunks
+
+
+def argument_transcript(chars: int = TRANSCRIPT_CONTEXT_MAX_CHARS) -> str:
+    rng = random.Random(SEED)
+    text = ""
+    while len(text) < chars:
+        text += rng.choice(ARGUMENT_LINES) + " "
+    return text[-chars:].strip()
+
+
+@case("tension.compute_from_telemetry", inner=250, unit="chunk")
+def bench_tension():
+    """compute_tension_from_telemetry over 10 s of mic telemetry (per chunk)."""
+    telemetry = [
+        AudioTelemetry(rms=rms, is_silence=rms < 0.02, is_overlap=i % 97 == 0, ts=1_700_000_000 + i * 0.04)
+        for i, (_, rms) in enumerate(mic_chunks())
+    ]
+
+    def run():
+        state = TensionState()
+        for t in telemetry:
+            compute_tension_from_telemetry(t, state)
+
+    return run
+
+
+@case("handler.handle_audio", inner=250, unit="chunk")
+def bench_handle_audio():
+    """CopilotSession.handle_audio (decode, telemetry, EMA, queueing, Live send) per 40 ms chunk."""
+    loop = asyncio.new_event_loop()
+    mock_mode = websocket_handler.MOCK_MODE
+    websocket_handler.MOCK_MODE = False
+    session = CopilotSession(websocket=None)
+    session.stt.active = True  # no STT thread; feed() is a no-op without a queue
+    session.live.session = StubGeminiLiveSession(LiveSessionConfig())
+    messages = [
+        {"type": "audio", "base64": base64.b64encode(raw).decode("ascii"), "telemetry": {"rms": round(rms, 4)}}
+        for raw, rms in mic_chunks()
+    ]
+
+    async def batch():
+        for msg in messages:
+            await session.handle_audio(msg)
+        session.tension.telemetry_queue = asyncio.Queue()  # what the tension loop would have drained
+
+    def cleanup():
+        websocket_handler.MOCK_MODE = mock_mode
+        loop.close()
+
+    return (lambda: loop.run_until_complete(batch())), cleanup
+
+
+@case("transcript.update_semantic_state", unit="scan")
+def bench_semantic_state():
+    """TranscriptState.update_semantic_state on a full-length argument transcript."""
+    tr = TranscriptState()
+    tr.context = argument_transcript()
+    return tr.update_semantic_state
+
+
+@case("transcript.append", inner=50, unit="delta")
+def bench_transcript_append():
+    """TranscriptState.append of STT-sized deltas (context trim + marker rescan) per delta."""
+    words = argument_transcript().split()
+    deltas = [" ".join(words[i:i + 3]) for i in range(0, 150, 3)]
+    base = argument_transcript()
+
+    def run():
+        tr = TranscriptState()
+        tr.context = base
+        for d in deltas:
+            tr.append(d)
+
+    return run
+
+
+@case("audio.whisper_effect", unit="clip")
+def bench_whisper_effect():
+    """_apply_whisper_effect on a 3 s PCM16 24 kHz TTS clip."""
+    clip = pcm16(voice(3.0, TTS_RATE))
+    return lambda: _apply_whisper_effect(clip)
+
+
+@case("audio.encode_adpcm", unit="clip")
+def bench_encode_adpcm():
+    """encode_b64 to IMA ADPCM for a 3 s PCM16 24 kHz clip (base64 in and out)."""
+    clip_b64 = base64.b64encode(pcm16(voice(3.0, TTS_RATE))).decode("ascii")
+    return lambda: encode_b64(clip_b64, "adpcm")
+
+
+class _FakeLiveStream:
+    def __init__(self, messages: list[SimpleNamespace]) -> None:
+        self.messages = messages
+
+    async def receive(self):
+        for msg in self.messages:
+            yield msg
+
+
+def live_messages(n: int = 200) -> list[SimpleNamespace]:
+    """Receive() stream: mostly input transcription, some model text, 40 ms audio parts, turn ends."""
+    rng = random.Random(SEED)
+    audio = pcm16(voice(0.04, TTS_RATE))
+    out = []
+    for i in range(n):
+        roll = rng.random()
+        sc = SimpleNamespace(
+            input_transcription=None, output_transcription=None, model_turn=None, interrupted=None, turn_complete=None
+        )
+        if roll < 0.6:
+            sc.input_transcription = SimpleNamespace(text=rng.choice(ARGUMENT_LINES)[:24])
+        elif roll < 0.8:
+            sc.model_turn = SimpleNamespace(parts=[SimpleNamespace(text="Mm-hmm.", inline_data=None)])
+        elif roll < 0.95:
+            inline = SimpleNamespace(data=audio, mime_type="audio/pcm;rate=24000")
+            sc.model_turn = SimpleNamespace(parts=[SimpleNamespace(text=None, content=None, inline_data=inline)])
+        else:
+            sc.turn_complete = True
+        out.append(SimpleNamespace(server_content=sc, text=None))
+    return out
+
+
+@case("live.receive_loop_parse", inner=200, unit="message")
+def bench_live_receive():
+    """RealGeminiLiveSession._receive_loop turning Live messages into LiveEvents, per message."""
+    loop = asyncio.new_event_loop()
+    stream = _FakeLiveStream(live_messages())
+
+    async def batch():
+        session = RealGeminiLiveSession(LiveSessionConfig(), stream, None)
+        await session._receive_loop()
+
+    return (lambda: loop.run_until_complete(batch())), loop.close
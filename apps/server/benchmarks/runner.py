@@ -0,0 +1,133 @@
+"""
+Case registry, timing and comparison for the benchmark suite.
+
+A case is a factory registered with @case: it does all setup and returns a zero-argument
+callable that performs `inner` operations (optionally with a cleanup callable). Timings are
+reported per operation in nanoseconds. Each case is calibrated so one round takes at least
+min_time / rounds seconds, then the runner takes `rounds` rounds; the median is the number to
+compare across commits.
+"""
+from __future__ import annotations
+
+import datetime
+import gc
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable
+
+Factory = Callable[[], "Callable[[], Any] | tuple[Callable[[], Any], Callable[[], Any]]"]
+
+
+class Case:
+    __slots__ = ("name", "factory", "inner", "unit", "description")
+
+    def __init__(self, name: str, factory: Factory, inner: int, unit: str, description: str) -> None:
+        self.name = name
+        self.factory = factory
+        self.inner = inner
+        self.unit = unit
+        self.description = description
+
+
+CASES: dict[str, Case] = {}
+
+
+def case(name: str, inner: int = 1, unit: str = "op") -> Callable[[Factory], Factory]:
+    """Register a benchmark factory. inner = operations performed per call of the returned callable."""
+
+    def register(factory: Factory) -> Factory:
+        if name in CASES:
+            raise ValueError(f"duplicate benchmark {name}")
+        doc = (factory.__doc__ or "").strip().splitlines()
+        CASES[name] = Case(name, factory, inner, unit, doc[0] if doc else "")
+        return factory
+
+    return register
+
+
+def measure(bench: Case, min_time: float = 1.0, rounds: int = 7) -> dict[str, Any]:
+    made = bench.factory()
+    fn, cleanup = made if isinstance(made, tuple) else (made, None)
+    try:
+        fn()  # warm-up (lazy tables, first-call imports)
+        target = min_time / rounds
+        calls = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(calls):
+                fn()
+            elapsed = time.perf_counter() - start
+            if elapsed >= target or calls >= 1 << 20:
+                break
+            calls = max(calls * 2, int(calls * target / max(elapsed, 1e-9)))
+        per_op: list[float] = []
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(rounds):
+                start = time.perf_counter_ns()
+                for _ in range(calls):
+                    fn()
+                per_op.append((time.perf_counter_ns() - start) / (calls * bench.inner))
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    finally:
+        if cleanup is not None:
+            cleanup()
+    median = statistics.median(per_op)
+    return {
+        "name": bench.name,
+        "unit": bench.unit,
+        "description": bench.description,
+        "rounds": rounds,
+        "ops_per_round": calls * bench.inner,
+        "min_ns": round(min(per_op), 1),
+        "median_ns": round(median, 1),
+        "mean_ns": round(statistics.fmean(per_op), 1),
+        "stdev_ns": round(statistics.stdev(per_op), 1) if len(per_op) > 1 else 0.0,
+        "ops_per_sec": round(1e9 / median, 1) if median else None,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run(names: list[str] | None = None, min_time: float = 1.0, rounds: int = 7) -> dict[str, Any]:
+    selected = [CASES[n] for n in names] if names is not None else list(CASES.values())
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "cpus": os.cpu_count(),
+        },
+        "results": [measure(b, min_time, rounds) for b in selected],
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float = 0.10) -> list[dict[str, Any]]:
+    """Per case: median ratio current/baseline; status is regression/improvement beyond threshold."""
+    base = {r["name"]: r for r in baseline.get("results", [])}
+    rows = []
+    for r in current["results"]:
+        b = base.get(r["name"])
+        if b is None or not b.get("median_ns"):
+            rows.append({"name": r["name"], "ratio": None, "status": "new"})
+            continue
+        ratio = r["median_ns"] / b["median_ns"]
+        status = "regression" if ratio > 1 + threshold else "improvement" if ratio < 1 - threshold else "same"
+        rows.append({"name": r["name"], "ratio": round(ratio, 3), "status": status})
+    return rows
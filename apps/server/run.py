@@ -1,11 +1,106 @@
-"""Run the backend. Usage: python run.py (local or Cloud Run). Uses PORT env when set."""
+"""
+Run the backend. Usage: python run.py (local or Cloud Run). Uses PORT env when set.
+
+Production defaults: one worker process per CPU this container may use (WEB_CONCURRENCY overrides),
+uvloop and httptools when installed, and a graceful SIGTERM drain in every worker (app.drain).
+RELOAD=1 runs a single auto-reloading process for development. With more than one worker and no
+SESSION_STORE set, resumable sessions use a SQLite file shared by the workers (a reconnect rarely
+lands on the worker that holds an in-memory snapshot).
+
+Each worker also owns an audio pool (app.audio_executor, AUDIO_EXECUTOR=process by default). With
+several workers the CPUs are shared: a worker's pool gets the cores left after one per worker
+(available_cpus() // workers - 1 processes), and when no core is left over, as with the default
+one worker per CPU, the pool falls back to a single thread instead of adding processes that only
+compete with the workers. AUDIO_EXECUTOR / AUDIO_EXECUTOR_WORKERS set explicitly are kept.
+"""
+import importlib.util
 import logging
+import math
 import os
+import tempfile
+
 import uvicorn
 
+from app.vision import MAX_INBOUND_CHARS
+
+logger = logging.getLogger("run")
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: affinity mask, capped by a cgroup v2 quota (Cloud Run, docker --cpus)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def server_options() -> dict:
+    """uvicorn.run keyword arguments from the environment."""
+    reload = os.environ.get("RELOAD", "").lower() in ("1", "true", "yes")
+    workers = int(os.environ.get("WEB_CONCURRENCY") or 0) or available_cpus()
+    return {
+        "host": os.environ.get("HOST", "0.0.0.0"),
+        "port": int(os.environ.get("PORT", "8765")),
+        "reload": reload,
+        "workers": 1 if reload else workers,
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        # Refuse oversized messages (close 1009) instead of buffering up to uvicorn's 16 MB default.
+        "ws_max_size": MAX_INBOUND_CHARS,
+        # Sockets are already closed by the app's drain; this only bounds the rest of uvicorn's shutdown.
+        "timeout_graceful_shutdown": int(os.environ.get("GRACEFUL_SHUTDOWN_SEC", "2")),
+    }
+
+
+def configure_session_store(workers: int) -> str | None:
+    """Pick a store every worker can read when several run; returns the SESSION_STORE in effect."""
+    spec = os.environ.get("SESSION_STORE")
+    if workers <= 1:
+        return spec
+    if spec is None:
+        spec = "sqlite:" + os.path.join(tempfile.gettempdir(), "copilot-sessions.db")
+        os.environ["SESSION_STORE"] = spec  # inherited by the worker processes
+        logger.info("%d workers: resumable sessions in %s", workers, spec)
+    elif spec.strip().lower() == "memory":
+        logger.warning("SESSION_STORE=memory with %d workers: most resume tokens will miss", workers)
+    return spec
+
+
+def configure_audio_executor(workers: int) -> tuple[str, int] | None:
+    """Size each worker's audio pool to the CPUs left over; returns the (mode, size) exported, if any."""
+    if workers <= 1 or "AUDIO_EXECUTOR_WORKERS" in os.environ:
+        return None
+    mode = os.environ.get("AUDIO_EXECUTOR", "process").strip().lower()
+    if mode != "process":
+        return None
+    spare = available_cpus() // workers - 1
+    if spare < 1 and "AUDIO_EXECUTOR" not in os.environ:
+        mode, size = "thread", 1
+    else:
+        size = max(1, spare)
+    os.environ["AUDIO_EXECUTOR"] = mode  # inherited by the worker processes
+    os.environ["AUDIO_EXECUTOR_WORKERS"] = str(size)
+    logger.info("%d workers on %d CPUs: audio executor %s x%d per worker", workers, available_cpus(), mode, size)
+    return mode, size
+
+
 if __name__ == "__main__":
     level = os.environ.get("LOG_LEVEL", "INFO").upper()
     logging.basicConfig(level=getattr(logging, level, logging.INFO))
-    port = int(os.environ.get("PORT", "8765"))
-    reload = os.environ.get("RELOAD", "").lower() in ("1", "true", "yes")
-    uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=reload)
+    options = server_options()
+    configure_session_store(options["workers"])
+    configure_audio_executor(options["workers"])
+    logger.info("Starting %d worker(s), loop=%s, http=%s", options["workers"], options["loop"], options["http"])
+    uvicorn.run("app.main:app", **options)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Re-score recorded calls offline: runs the server's tension / transcript / whisper-trigger
+pipeline (app.analysis) over WAV/PCM files and session recordings, one file per worker process.
+
+Writes one <name>.json per input (tension timeline, would-be whisper triggers) under --out, plus
+summary.jsonl with one line per file. --set overrides a module constant in every worker before
+scoring, so weight and threshold changes can be compared without touching the code.
+
+Run from apps/server:
+  python -m scripts.batch_analyze calls/ --out analysis/
+  python -m scripts.batch_analyze calls/ recordings/ --out analysis-v2/ --workers 8 \\
+      --set tension.RMS_WEIGHT=0.6 --set websocket_handler.TENSION_WHISPER_THRESHOLD=55
+"""
+import argparse
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Allow importing app when run as script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.analysis import analyze_file, find_inputs
+
+logger = logging.getLogger("batch_analyze")
+
+
+def _override(spec: str) -> tuple[str, str, object]:
+    """'module.NAME=value' -> (app.module, NAME, parsed value); value is JSON if it parses, else a string."""
+    target, sep, raw = spec.partition("=")
+    module, _, name = target.strip().rpartition(".")
+    if not sep or not module or not name:
+        raise argparse.ArgumentTypeError(f"expected module.NAME=VALUE, got {spec!r}")
+    try:
+        value = json.loads(raw)
+    except json.JSONDecodeError:
+        value = raw
+    return f"app.{module}", name, value
+
+
+def apply_overrides(overrides: list[tuple[str, str, object]]) -> None:
+    """Pool initializer: set each override in this process (existing constants only)."""
+    for module_name, name, value in overrides:
+        module = importlib.import_module(module_name)
+        if not hasattr(module, name):
+            raise AttributeError(f"{module_name} has no {name}")
+        setattr(module, name, value)
+
+
+def _output_name(path: str, roots: list[str]) -> str:
+    """Output file name that keeps inputs from different subdirectories apart."""
+    for root in roots:
+        if os.path.isdir(root) and os.path.abspath(path).startswith(os.path.abspath(root) + os.sep):
+            path = os.path.relpath(path, root)
+            break
+    else:
+        path = os.path.basename(path)
+    return path.replace(os.sep, "__") + ".json"
+
+
+def run(paths: list[str], roots: list[str], out_dir: str, workers: int, overrides: list) -> dict:
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.perf_counter()
+    done = failed = triggers = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=apply_overrides, initargs=(overrides,)) as pool, \
+            open(os.path.join(out_dir, "summary.jsonl"), "w", encoding="utf-8") as summary:
+        futures = {pool.submit(analyze_file, path): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                logger.warning("%s: %s", path, e)
+                summary.write(json.dumps({"path": path, "error": str(e)}) + "\n")
+                continue
+            with open(os.path.join(out_dir, _output_name(path, roots)), "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            done += 1
+            triggers += len(result["triggers"])
+            summary.write(json.dumps({
+                "path": path,
+                "duration_sec": result["duration_sec"],
+                "tension_max": result["tension_max"],
+                "tension_mean": result["tension_mean"],
+                "triggers": [t["trigger"] for t in result["triggers"]],
+            }) + "\n")
+            logger.info("%s: max %d, %d triggers", path, result["tension_max"], len(result["triggers"]))
+    return {"files": done, "failed": failed, "triggers": triggers, "wall_sec": round(time.perf_counter() - start, 2)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline tension timelines and whisper triggers for recorded calls")
+    parser.add_argument("inputs", nargs="+", help="files or directories (.wav, .pcm/.raw, .jsonl.gz recordings)")
+    parser.add_argument("--out", default="analysis", help="output directory (default analysis/)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: CPUs)")
+    parser.add_argument("--set", dest="overrides", type=_override, action="append", default=[],
+                        metavar="module.NAME=VALUE", help="override an app module constant (repeatable)")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper())
+
+    try:
+        apply_overrides(args.overrides)  # fail fast on typos before spawning workers
+    except (ImportError, AttributeError) as e:
+        parser.error(str(e))
+    paths = find_inputs(args.inputs)
+    if not paths:
+        parser.error("no .wav/.pcm/.raw/.jsonl.gz inputs found")
+    totals = run(paths, args.inputs, args.out, max(1, args.workers), args.overrides)
+    print(f"{totals['files']} files ({totals['failed']} failed), {totals['triggers']} triggers "
+          f"in {totals['wall_sec']}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
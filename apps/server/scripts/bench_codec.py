@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: WebSocket JSON codec throughput (messages/sec on one core) for each available backend.
+Uses realistic protocol messages: 40 ms audio chunks with telemetry (the bulk of inbound traffic)
+and the server message types (tension, transcript, whisper with ~3 s of PCM16 24 kHz audio).
+
+Run from apps/server:
+  python -m scripts.bench_codec
+  python -m scripts.bench_codec --seconds 2 --json
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+
+# Allow importing app when run as script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.codec import _orjson_codec, _stdlib_codec
+
+
+def make_messages() -> dict[str, dict]:
+    """Representative protocol messages, keyed by a short label."""
+    pcm_40ms = os.urandom(1280)  # 640 samples PCM16 @ 16 kHz
+    whisper_pcm = os.urandom(24000 * 2 * 3)  # 3 s PCM16 @ 24 kHz
+    return {
+        "audio_in": {
+            "type": "audio",
+            "base64": base64.b64encode(pcm_40ms).decode("ascii"),
+            "telemetry": {"rms": 0.0427},
+        },
+        "tension_out": {"type": "tension", "score": 42, "ts": 1730000000000},
+        "transcript_out": {"type": "transcript", "delta": "you never listen to what I say ", "ts": 1730000000000},
+        "whisper_out": {
+            "type": "whisper",
+            "text": "Taking a breath before the next sentence can help.",
+            "move": "tension_cross",
+            "ts": 1730000001000,
+            "audio_base64": base64.b64encode(whisper_pcm).decode("ascii"),
+        },
+    }
+
+
+def _rate(fn, arg, seconds: float) -> float:
+    """Calls per second of fn(arg), measured for roughly `seconds` of wall time."""
+    n = 0
+    batch = 64
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for _ in range(batch):
+            fn(arg)
+        n += batch
+        now = time.perf_counter()
+        if now >= deadline:
+            return n / (now - start)
+
+
+def run(seconds: float) -> list[dict]:
+    codecs = [_stdlib_codec()]
+    fast = _orjson_codec()
+    if fast is not None:
+        codecs.append(fast)
+    results: list[dict] = []
+    for label, msg in make_messages().items():
+        raw = codecs[0].dumps(msg)
+        for c in codecs:
+            if label.endswith("_in"):
+                op, rate = "loads", _rate(c.loads, raw, seconds)
+            else:
+                op, rate = "dumps", _rate(c.dumps, msg, seconds)
+            results.append({
+                "codec": c.name,
+                "message": label,
+                "op": op,
+                "bytes": len(raw),
+                "msgs_per_sec": round(rate, 1),
+            })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=1.0, help="measurement time per case")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+    results = run(args.seconds)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'message':<16}{'op':<7}{'bytes':>9}  {'codec':<8}{'msgs/sec':>14}")
+    for r in results:
+        print(f"{r['message']:<16}{r['op']:<7}{r['bytes']:>9}  {r['codec']:<8}{r['msgs_per_sec']:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
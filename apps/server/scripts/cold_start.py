@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: spawn a fresh single-worker server (python run.py), connect to /ws as soon
+as the port accepts, send `start`, and time process spawn -> first `ready`. Repeats --runs times,
+then prints the median/max and the last worker's GET /startup profile (milestones, background
+preload, slowest imports).
+
+Uses the current environment, so set upstreams as you would for the server, e.g.:
+  python -m scripts.cold_start --runs 5                          # real Gemini (credentials in env)
+  FAKE_UPSTREAMS=all python -m scripts.cold_start --runs 5      # local fakes, no credentials
+  STARTUP_PRELOAD=0 python -m scripts.cold_start                 # compare without background imports
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _first_ready(port: int, deadline: float) -> float:
+    while True:
+        try:
+            async with websockets.connect(f"ws://127.0.0.1:{port}/ws") as ws:
+                await ws.send(json.dumps({"type": "start"}))
+                while True:
+                    msg = json.loads(await ws.recv())
+                    if msg.get("type") == "ready":
+                        ready_at = time.monotonic()
+                        await ws.send(json.dumps({"type": "stop"}))
+                    elif msg.get("type") == "stopped":
+                        return ready_at
+        except OSError:
+            if time.monotonic() > deadline:
+                raise TimeoutError("server did not accept connections")
+            await asyncio.sleep(0.01)
+
+
+def run_once(timeout: float) -> tuple[float, dict]:
+    """Seconds from spawn to first ready, and the worker's /startup profile."""
+    port = _free_port()
+    env = {**os.environ, "PORT": str(port), "WEB_CONCURRENCY": "1", "RELOAD": "", "LOG_LEVEL": "WARNING"}
+    start = time.monotonic()
+    proc = subprocess.Popen([sys.executable, "run.py"], cwd=SERVER_DIR, env=env)
+    try:
+        elapsed = asyncio.run(_first_ready(port, start + timeout)) - start
+        while True:  # read the profile once the background preload is done (or skipped)
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/startup", timeout=5) as resp:
+                profile = json.load(resp)
+            if "preload_done" in profile["marks"] or not profile["preload"] or time.monotonic() > start + timeout:
+                return elapsed, profile
+            time.sleep(0.1)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure time from process spawn to first `ready`.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-run limit in seconds")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to print")
+    args = parser.parse_args()
+
+    times, profile = [], {}
+    for i in range(args.runs):
+        elapsed, profile = run_once(args.timeout)
+        times.append(elapsed)
+        print(f"run {i + 1}: spawn -> first ready {elapsed * 1000:.0f} ms")
+    print(f"median {statistics.median(times) * 1000:.0f} ms, max {max(times) * 1000:.0f} ms")
+    print("milestones (s since process start):", json.dumps(profile.get("marks", {})))
+    for module, result in profile.get("preload", {}).items():
+        print(f"  preload {module}: {result}")
+    for row in profile.get("imports", [])[: args.top]:
+        print(f"  {row['self_ms']:8.1f} ms self {row['cumulative_ms']:8.1f} ms total  {row['module']} [{row['thread']}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Load test: N concurrent simulated browser clients on /ws, each streaming PCM16 16 kHz audio in
+40 ms chunks at real-time pace with telemetry.rms, like the web app. Audio comes from WAV files
+(--wav, any 16-bit PCM; mixed to mono and resampled) or from a synthesized speech-like signal
+(voiced harmonics with syllable-rate envelope, alternating talk bursts and pauses that get
+louder over time, so tension rises).
+
+By default a local server is started with the stub Gemini client (no credentials, STT/Flash/TTS
+network paths off, local coaching), so the run is fully offline. Pass --url to target a running
+server instead (then server CPU/memory is not sampled).
+
+Latencies are measured from the client side:
+  tension:    start of a talk burst -> next tension message
+  transcript: end of a talk burst -> next transcript message
+  whisper:    end of a talk burst -> next whisper message
+The stub Live client produces no transcripts, so transcript/whisper latency is n/a unless the
+server has a transcription source: --fakes serves Live/Flash/STT/TTS from app.fakes (scripted
+transcripts, FAKE_* latency and fault injection), --mock runs MOCK=1 (timer-driven whispers).
+
+Run from apps/server:
+  python -m scripts.load_test --clients 20 --duration 30
+  python -m scripts.load_test --clients 5 --wav samples/argument.wav --json
+  FAKE_FLASH_ERROR_RATE=0.2 python -m scripts.load_test --clients 20 --fakes
+  python -m scripts.load_test --url ws://localhost:8765/ws --clients 50
+"""
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+import wave
+from array import array
+from collections import Counter
+
+# Allow importing app when run as script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import websockets
+except ImportError:  # listed in requirements.txt
+    websockets = None
+
+SAMPLE_RATE = 16000
+CHUNK_MS = 40
+CHUNK_SAMPLES = SAMPLE_RATE * CHUNK_MS // 1000
+# Chunks louder than this count as speech for burst tracking (server treats ~0.01+ as speech).
+SPEECH_RMS = 0.02
+
+# Environment for the spawned server: stub Gemini client and no network-backed paths.
+STUB_SERVER_ENV = {
+    "GOOGLE_CLOUD_PROJECT": "",
+    "GOOGLE_GENAI_API_KEY": "",
+    "GEMINI_API_KEY": "",
+    "GOOGLE_API_KEY": "",
+    "LIVE_STT_STREAMING": "0",
+    "COACHING_LIVE_AUDIO": "0",
+    "COACHING_LOCAL_FIRST": "1",
+    # Backchannel audio always tries Cloud TTS; without credentials google-auth probes the GCE
+    # metadata server synchronously and stalls the loop for seconds per attempt.
+    "LIVE_BACKCHANNEL": "0",
+    "LOG_LEVEL": "WARNING",
+}
+
+# With --fakes: every upstream served by app.fakes, so STT, Flash, TTS and backchannel run for real.
+# FAKE_* latency/error/disconnect settings are passed through from the caller's environment.
+FAKE_SERVER_ENV = {
+    "LIVE_STT_STREAMING": "1",
+    "COACHING_LIVE_AUDIO": "1",
+    "COACHING_LOCAL_FIRST": "0",
+    "LIVE_BACKCHANNEL": "1",
+}
+
+
+# --- audio sources ---
+
+
+def synth_speech(seconds: float, seed: int) -> array:
+    """Speech-like PCM16: bursts of voiced sound (f0 jitter, 3 harmonics, ~4 Hz syllables) and pauses."""
+    rng = random.Random(seed)
+    out = array("h")
+    total = int(seconds * SAMPLE_RATE)
+    phase = 0.0
+    while len(out) < total:
+        progress = len(out) / total
+        burst = int(rng.uniform(1.5, 4.0) * SAMPLE_RATE)
+        f0 = rng.uniform(110, 220)
+        level = 3000 + 9000 * progress * rng.uniform(0.7, 1.0)  # escalates over the run
+        syllable_hz = rng.uniform(3.0, 5.0)
+        for i in range(burst):
+            f = f0 * (1.0 + 0.05 * math.sin(2 * math.pi * 0.7 * i / SAMPLE_RATE))
+            phase += 2 * math.pi * f / SAMPLE_RATE
+            env = 0.5 - 0.5 * math.cos(2 * math.pi * syllable_hz * i / SAMPLE_RATE)
+            v = math.sin(phase) + 0.5 * math.sin(2 * phase) + 0.25 * math.sin(3 * phase)
+            out.append(int(max(-32767, min(32767, level * env * v / 1.75 + rng.gauss(0, 150)))))
+        pause = int(rng.uniform(0.5, 3.0) * SAMPLE_RATE)
+        out.extend(int(rng.gauss(0, 60)) for _ in range(pause))
+    del out[total:]
+    return out
+
+
+def load_wav(path: str) -> array:
+    """16-bit PCM WAV -> mono 16 kHz samples (channel average, nearest-sample resampling)."""
+    with wave.open(path, "rb") as w:
+        if w.getsampwidth() != 2:
+            raise SystemExit(f"{path}: only 16-bit PCM WAV is supported")
+        channels, rate = w.getnchannels(), w.getframerate()
+        raw = array("h")
+        raw.frombytes(w.readframes(w.getnframes()))
+    if sys.byteorder == "big":
+        raw.byteswap()
+    if channels > 1:
+        raw = array("h", (sum(raw[i:i + channels]) // channels for i in range(0, len(raw), channels)))
+    if rate != SAMPLE_RATE:
+        n = int(len(raw) * SAMPLE_RATE / rate)
+        raw = array("h", (raw[int(i * rate / SAMPLE_RATE)] for i in range(n)))
+    return raw
+
+
+def chunk_audio(samples: array) -> list[tuple[str, float]]:
+    """(base64 PCM16 LE, rms 0..1) per 40 ms chunk, precomputed so clients only pace and send."""
+    chunks = []
+    for start in range(0, len(samples) - CHUNK_SAMPLES + 1, CHUNK_SAMPLES):
+        part = samples[start:start + CHUNK_SAMPLES]
+        rms = math.sqrt(sum(s * s for s in part) / len(part)) / 32768.0
+        data = array("h", part)
+        if sys.byteorder == "big":
+            data.byteswap()
+        chunks.append((base64.b64encode(data.tobytes()).decode("ascii"), min(1.0, rms)))
+    return chunks
+
+
+# --- clients ---
+
+
+class ClientResult:
+    def __init__(self) -> None:
+        self.connected = False
+        self.busy = False
+        self.error = ""
+        self.ready_ms: float | None = None
+        self.sent = 0
+        self.send_lag_ms: list[float] = []
+        self.received: Counter = Counter()
+        self.tension_ms: list[float] = []
+        self.transcript_ms: list[float] = []
+        self.whisper_ms: list[float] = []
+
+
+async def run_client(url: str, chunks: list[tuple[str, float]], duration: float, delay: float) -> ClientResult:
+    res = ClientResult()
+    await asyncio.sleep(delay)
+    burst_start: float | None = None
+    burst_end: float | None = None
+    waiting = {"tension": False, "transcript": False, "whisper": False}
+    try:
+        async with websockets.connect(url, max_size=None) as ws:
+            res.connected = True
+            t0 = time.perf_counter()
+            await ws.send(json.dumps({"type": "start", "config": {"audio_codec": "pcm16"}}))
+            while True:
+                msg = json.loads(await ws.recv())
+                res.received[msg.get("type")] += 1
+                if msg.get("type") == "busy":
+                    res.busy = True
+                    return res
+                if msg.get("type") == "ready":
+                    res.ready_ms = (time.perf_counter() - t0) * 1000.0
+                    break
+
+            async def receive() -> None:
+                async for raw in ws:
+                    msg = json.loads(raw)
+                    kind = msg.get("type")
+                    res.received[kind] += 1
+                    now = time.perf_counter()
+                    if kind == "tension" and waiting["tension"] and burst_start is not None:
+                        res.tension_ms.append((now - burst_start) * 1000.0)
+                        waiting["tension"] = False
+                    elif kind in ("transcript", "whisper") and waiting[kind] and burst_end is not None:
+                        getattr(res, f"{kind}_ms").append((now - burst_end) * 1000.0)
+                        waiting[kind] = False
+                    if kind == "stopped":
+                        return
+
+            receiver = asyncio.create_task(receive())
+            start = time.perf_counter()
+            n_chunks = int(duration * 1000 / CHUNK_MS)
+            speaking = False
+            for i in range(n_chunks):
+                due = start + i * CHUNK_MS / 1000.0
+                wait = due - time.perf_counter()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                else:
+                    res.send_lag_ms.append(-wait * 1000.0)
+                b64, rms = chunks[i % len(chunks)]
+                await ws.send(json.dumps({"type": "audio", "base64": b64, "telemetry": {"rms": round(rms, 4)}}))
+                res.sent += 1
+                now = time.perf_counter()
+                if rms >= SPEECH_RMS and not speaking:
+                    speaking, burst_start = True, now
+                    waiting["tension"] = True
+                elif rms < SPEECH_RMS and speaking:
+                    speaking, burst_end = False, now
+                    waiting["transcript"] = waiting["whisper"] = True
+            await ws.send(json.dumps({"type": "stop"}))
+            try:
+                await asyncio.wait_for(receiver, timeout=5.0)
+            except asyncio.TimeoutError:
+                receiver.cancel()
+    except Exception as e:
+        res.error = f"{type(e).__name__}: {e}"
+    return res
+
+
+# --- server process ---
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, mock: bool, fakes: str | None = None) -> subprocess.Popen:
+    env = {**os.environ, **STUB_SERVER_ENV, "MOCK": "1" if mock else ""}
+    if fakes:
+        env.update(FAKE_SERVER_ENV, FAKE_UPSTREAMS=fakes)
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=cwd,
+        env=env,
+    )
+    deadline = time.time() + 20
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1).read()
+            return proc
+        except Exception:
+            if proc.poll() is not None:
+                raise SystemExit("server exited during startup")
+            time.sleep(0.2)
+    proc.kill()
+    raise SystemExit("server did not become healthy within 20s")
+
+
+class ProcessSampler:
+    """CPU% and RSS of a pid from /proc (Linux) or psutil when available."""
+
+    def __init__(self, pid: int) -> None:
+        self.pid = pid
+        self.cpu: list[float] = []
+        self.rss_mb: list[float] = []
+        try:
+            import psutil
+
+            self._proc = psutil.Process(pid)
+        except Exception:
+            self._proc = None
+        self._last: tuple[float, float] | None = None
+
+    def _cpu_seconds(self) -> float | None:
+        if self._proc is not None:
+            t = self._proc.cpu_times()
+            return t.user + t.system
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        except Exception:
+            return None
+
+    def _rss_mb(self) -> float | None:
+        if self._proc is not None:
+            return self._proc.memory_info().rss / 1e6
+        try:
+            with open(f"/proc/{self.pid}/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+        except Exception:
+            return None
+
+    def sample(self) -> None:
+        now, cpu = time.perf_counter(), self._cpu_seconds()
+        if cpu is not None:
+            if self._last is not None:
+                self.cpu.append(100.0 * (cpu - self._last[1]) / max(1e-6, now - self._last[0]))
+            self._last = (now, cpu)
+        rss = self._rss_mb()
+        if rss is not None:
+            self.rss_mb.append(rss)
+
+    async def run(self, interval: float = 1.0) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(interval)
+
+
+# --- report ---
+
+
+def _pct(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+
+def _latency(values: list[float]) -> dict:
+    return {"n": len(values), "p50_ms": _pct(values, 0.5), "p95_ms": _pct(values, 0.95), "p99_ms": _pct(values, 0.99)}
+
+
+def summarize(results: list[ClientResult], elapsed: float, sampler: ProcessSampler | None, health: dict | None) -> dict:
+    received: Counter = Counter()
+    for r in results:
+        received.update(r.received)
+    report = {
+        "clients": len(results),
+        "connected": sum(r.connected for r in results),
+        "busy": sum(r.busy for r in results),
+        "errors": [r.error for r in results if r.error][:10],
+        "elapsed_sec": round(elapsed, 1),
+        "chunks_sent_per_sec": round(sum(r.sent for r in results) / elapsed, 1),
+        "messages_received_per_sec": round(sum(received.values()) / elapsed, 1),
+        "received_by_type": dict(received),
+        "ready": _latency([r.ready_ms for r in results if r.ready_ms is not None]),
+        "client_send_lag": _latency([v for r in results for v in r.send_lag_ms]),
+        "tension": _latency([v for r in results for v in r.tension_ms]),
+        "transcript": _latency([v for r in results for v in r.transcript_ms]),
+        "whisper": _latency([v for r in results for v in r.whisper_ms]),
+    }
+    if sampler is not None:
+        report["server"] = {
+            "cpu_pct_mean": round(statistics.fmean(sampler.cpu), 1) if sampler.cpu else None,
+            "cpu_pct_max": round(max(sampler.cpu), 1) if sampler.cpu else None,
+            "rss_mb_max": round(max(sampler.rss_mb), 1) if sampler.rss_mb else None,
+        }
+    if health:
+        report["server_loop"] = health.get("loop")
+    return report
+
+
+def print_report(report: dict) -> None:
+    print(f"clients: {report['connected']}/{report['clients']} connected, {report['busy']} busy, "
+          f"{len(report['errors'])} errors, {report['elapsed_sec']}s")
+    print(f"throughput: {report['chunks_sent_per_sec']} chunks/s sent, "
+          f"{report['messages_received_per_sec']} msgs/s received {report['received_by_type']}")
+    print(f"{'latency':<18}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for key in ("ready", "tension", "transcript", "whisper", "client_send_lag"):
+        lat = report[key]
+        cells = "".join(f"{'n/a' if lat[k] is None else lat[k]:>10}" for k in ("p50_ms", "p95_ms", "p99_ms"))
+        print(f"{key:<18}{lat['n']:>7}{cells}")
+    if "server" in report:
+        s = report["server"]
+        print(f"server: cpu mean {s['cpu_pct_mean']}% max {s['cpu_pct_max']}%, rss max {s['rss_mb_max']} MB")
+    if report.get("server_loop"):
+        print(f"server loop: {report['server_loop']}")
+    for err in report["errors"]:
+        print(f"  error: {err}")
+
+
+def _health(url: str) -> dict | None:
+    http = url.replace("ws://", "http://").replace("wss://", "https://").rsplit("/ws", 1)[0]
+    try:
+        return json.loads(urllib.request.urlopen(f"{http}/health", timeout=2).read())
+    except Exception:
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.wav:
+        sources = [chunk_audio(load_wav(path)) for path in args.wav]
+    else:
+        sources = [chunk_audio(synth_speech(min(args.duration, 60.0), seed=i)) for i in range(min(args.clients, 8))]
+    proc = None
+    sampler = None
+    url = args.url
+    if not url:
+        port = _free_port()
+        proc = start_server(port, args.mock, args.fakes)
+        url = f"ws://127.0.0.1:{port}/ws"
+        sampler = ProcessSampler(proc.pid)
+    sampler_task = asyncio.create_task(sampler.run()) if sampler else None
+    try:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            run_client(url, sources[i % len(sources)], args.duration, args.ramp * i / max(1, args.clients))
+            for i in range(args.clients)
+        ))
+        elapsed = time.perf_counter() - start
+        health = _health(url)
+    finally:
+        if sampler_task:
+            sampler_task.cancel()
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    return summarize(results, elapsed, sampler, health)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=10, help="concurrent simulated clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of audio each client streams")
+    parser.add_argument("--ramp", type=float, default=5.0, help="spread client starts over this many seconds")
+    parser.add_argument("--wav", action="append", help="16-bit PCM WAV to stream (repeatable; default: synthesized)")
+    parser.add_argument("--url", help="target a running server (ws://host:port/ws) instead of starting one")
+    parser.add_argument("--mock", action="store_true", help="start the local server with MOCK=1")
+    parser.add_argument(
+        "--fakes", nargs="?", const="all", metavar="UPSTREAMS",
+        help="start the local server with fake upstreams (FAKE_UPSTREAMS; default all)",
+    )
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+    if websockets is None:
+        raise SystemExit("the websockets package is required (pip install -r requirements.txt)")
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
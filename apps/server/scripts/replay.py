@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Replay session recordings (RECORD_DIR=... on the server, see app.recorder) through
+handle_websocket with every upstream served from the recording (app.replay). No credentials or
+network needed.
+
+Prints, per recording: wall and CPU time, frames per CPU second, outbound message counts and the
+whisper timeline, recorded vs replayed. Use --speed 1 (default) to reproduce behaviour and
+--speed max to measure processing cost; run the same recordings before and after a change and
+compare (--json).
+
+Run from apps/server:
+  python -m scripts.replay recordings/20260101-120000-abcdef012345.jsonl.gz
+  python -m scripts.replay --speed max --json recordings/*.jsonl.gz
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+# Allow importing app when run as script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.replay import Recording, replay
+
+
+def _speed(value: str) -> float:
+    return 0.0 if value == "max" else float(value)
+
+
+def print_report(path: str, result: dict) -> None:
+    print(f"\n{path}  (session {result['session']}, speed {result['speed']})")
+    print(f"  recorded {result['recorded_sec']:.1f}s, replayed in {result['wall_sec']:.2f}s wall / "
+          f"{result['cpu_sec']:.2f}s CPU, {result['frames']} frames ({result['frames_per_cpu_sec']} per CPU s)")
+    types = sorted(set(result["recorded_out"]) | set(result["replayed_out"]))
+    print(f"  {'outbound':<20}{'recorded':>10}{'replayed':>10}")
+    for t in types:
+        print(f"  {t:<20}{result['recorded_out'].get(t, 0):>10}{result['replayed_out'].get(t, 0):>10}")
+    for label in ("recorded", "replayed"):
+        print(f"  {label} whispers:")
+        for w in result[f"{label}_whispers"] or [{"t": None}]:
+            print("    (none)" if w["t"] is None else f"    {w['t']:>8.2f}s  {w['move']}: {w['text']}")
+
+
+async def run(paths: list[str], speed: float) -> list[dict]:
+    results = []
+    for path in paths:
+        result = await replay(Recording.load(path), speed)
+        results.append({"path": path, **result})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded /ws sessions against recording-driven fakes")
+    parser.add_argument("recordings", nargs="+", help=".jsonl.gz files written with RECORD_DIR")
+    parser.add_argument("--speed", type=_speed, default=1.0, help="playback speed factor, or 'max' (default 1)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper())
+
+    results = asyncio.run(run(args.recordings, args.speed))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        print_report(result["path"], result)
+
+
+if __name__ == "__main__":
+    main()
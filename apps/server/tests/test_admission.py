@@ -0,0 +1,110 @@
+"""
+Tests for admission control: CapacitySlots semantics, busy reject on /ws, /health load payload.
+"""
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import codec
+from app.admission import AdmissionController, CapacitySlots
+from app.main import app
+
+
+def test_slots_limit_and_release():
+    """try_acquire succeeds up to the limit; release frees a slot."""
+    slots = CapacitySlots("x", 2)
+    assert slots.try_acquire() and slots.try_acquire()
+    assert not slots.try_acquire()
+    slots.release()
+    assert slots.try_acquire()
+    assert slots.snapshot() == {"in_use": 2, "limit": 2, "waiting": 0}
+
+
+def test_slots_zero_limit_is_unlimited():
+    """A limit of 0 never rejects."""
+    slots = CapacitySlots("x", 0)
+    assert all(slots.try_acquire() for _ in range(100))
+    assert not slots.full
+
+
+@pytest.mark.asyncio
+async def test_slots_acquire_waits_for_release():
+    """A waiter gets the slot handed over on release; in_use stays at the limit."""
+    slots = CapacitySlots("x", 1)
+    assert await slots.acquire()
+    waiter = asyncio.create_task(slots.acquire(timeout=1.0))
+    await asyncio.sleep(0.01)
+    assert slots.waiting == 1
+    slots.release()
+    assert await waiter is True
+    assert slots.in_use == 1
+
+
+@pytest.mark.asyncio
+async def test_slots_acquire_times_out():
+    """acquire returns False when no slot frees up in time; zero timeout never waits."""
+    slots = CapacitySlots("x", 1)
+    slots.try_acquire()
+    assert await slots.acquire(timeout=0.02) is False
+    assert await slots.acquire(timeout=0) is False
+    assert slots.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_slots_handover_racing_timeout_keeps_slot(monkeypatch):
+    """A slot handed over in the same tick the wait times out is kept, not leaked."""
+    slots = CapacitySlots("x", 1)
+    slots.try_acquire()
+
+    async def release_then_time_out(fut, timeout):
+        slots.release()  # resolves fut ...
+        raise asyncio.TimeoutError  # ... and the timeout fires before the waiter resumes
+
+    monkeypatch.setattr(asyncio, "wait_for", release_then_time_out)
+    assert await slots.acquire(timeout=0.01) is True
+    assert slots.in_use == 1 and slots.waiting == 0
+    slots.release()
+    assert slots.in_use == 0
+
+
+def test_ws_rejects_with_busy_when_full():
+    """With max_sessions=1, a second connection gets a busy message while the first is open."""
+    controller = AdmissionController(max_sessions=1, queue_sec=0)
+    with patch.dict(os.environ, {"MOCK": "1"}), patch("app.websocket_handler.MOCK_MODE", True), \
+            patch("app.main.ADMISSION", controller):
+        client = TestClient(app)
+        with client.websocket_connect("/ws") as first:
+            first.send_json({"type": "start"})
+            assert first.receive_json()["type"] == "ready"
+            with client.websocket_connect("/ws") as second:
+                busy = second.receive_json()
+            assert busy["type"] == "busy"
+            assert busy["max_sessions"] == 1
+            assert busy["retry_after_ms"] > 0
+        assert controller.rejected == 1
+    assert controller.sessions.in_use == 0
+
+
+def test_admission_rejects_go_through_app_codec():
+    """busy messages from /ws admission use app.codec like every other outbound message."""
+    controller = AdmissionController(max_sessions=1, queue_sec=0)
+    controller.sessions.try_acquire()
+    with patch("app.main.ADMISSION", controller), patch.object(codec, "dumps", wraps=codec.dumps) as dumps:
+        with TestClient(app).websocket_connect("/ws") as ws:
+            busy = ws.receive_json()
+    assert busy["type"] == "busy"
+    assert dumps.call_args.args[0]["type"] == "busy"
+
+
+def test_health_reports_load():
+    """/health returns status plus per-resource load."""
+    client = TestClient(app)
+    data = client.get("/health").json()
+    assert data["status"] in ("ok", "busy")
+    for key in ("sessions", "stt_streams", "tts_calls"):
+        assert set(data[key]) == {"in_use", "limit", "waiting"}
+    assert "coaching_calls" not in data and "flash" in data  # Flash calls are gated by FLASH_LIMITER only
+    assert 0.0 <= data["utilization"] <= 1.0
@@ -0,0 +1,116 @@
+"""
+Unit tests for offline analysis: audio and recording inputs through the session's tension and
+whisper-trigger pipeline on virtual time, and the batch CLI's process pool with overrides.
+"""
+import gzip
+import json
+import math
+import struct
+import wave
+
+import pytest
+
+from app import analysis, tension
+from scripts import batch_analyze
+
+LINES = [
+    (1.0, "I told you this already"),
+    (3.0, "you never listen to me and you always do this"),
+    (5.0, "this is ridiculous and I am done"),
+]
+
+
+def _write_wav(path, segments, rate=16000, channels=1):
+    """segments: (seconds, amplitude) tone/silence spans."""
+    frames = []
+    for seconds, amp in segments:
+        for i in range(int(seconds * rate)):
+            frames.extend([int(amp * math.sin(2 * math.pi * 200 * i / rate))] * channels)
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(struct.pack(f"<{len(frames)}h", *frames))
+
+
+def _write_sidecar(path, lines=LINES):
+    path.write_text("".join(f"{t} {text}\n" for t, text in lines))
+
+
+def test_wav_rms_and_stereo_mixdown(tmp_path):
+    mono, stereo = tmp_path / "mono.wav", tmp_path / "stereo.wav"
+    _write_wav(mono, [(1.0, 8000), (1.0, 0)])
+    _write_wav(stereo, [(1.0, 8000), (1.0, 0)], rate=8000, channels=2)
+    for path in (mono, stereo):
+        events = analysis.audio_events(str(path))
+        assert len(events) == 50
+        loud, quiet = events[10][2]["rms"], events[40][2]["rms"]
+        assert loud == pytest.approx(8000 / math.sqrt(2) / 32768, rel=0.02) and quiet == 0.0
+
+
+def test_loud_argument_triggers_whisper_after_pause(tmp_path):
+    path = tmp_path / "call.wav"
+    _write_wav(path, [(6.0, 9000), (3.0, 0)])
+    _write_sidecar(tmp_path / "call.txt")
+    result = analysis.analyze_file(str(path))
+    assert result["chunks"] == 225 and result["transcript_events"] == 3
+    assert result["tension_max"] >= 35
+    assert [p["t"] for p in result["timeline"][:2]] == [0.5, 1.0]
+    [trigger] = result["triggers"]
+    # Escalation mode: fires once the markers push semantic pressure over the bar and the speaker pauses.
+    assert trigger["trigger"] == "tension_cross"
+    assert 6.0 <= trigger["t"] <= 7.5 and trigger["semantic_pressure"] >= 0.45
+
+
+def test_calm_call_has_no_triggers(tmp_path):
+    path = tmp_path / "calm.pcm"
+    path.write_bytes(struct.pack("<16000h", *(int(300 * math.sin(i / 5)) for i in range(16000))) * 4)
+    _write_sidecar(tmp_path / "calm.txt", [(1.0, "thanks, that sounds like a good plan to me")])
+    result = analysis.analyze_file(str(path))
+    assert result["duration_sec"] == pytest.approx(3.96)
+    assert result["triggers"] == [] and result["tension_max"] < 35
+
+
+def test_recording_uses_client_telemetry_and_sent_transcript(tmp_path):
+    path = tmp_path / "session.jsonl.gz"
+    records = [{"v": 1, "session": "s1", "started": 0}]
+    for i in range(250):
+        rms = 0.09 if i < 125 else 0.0
+        msg = {"type": "audio", "base64": "AAAA", "telemetry": {"rms": rms}}
+        records.append({"t": round(0.04 * i, 2), "k": "in", "raw": json.dumps(msg)})
+    for t, text in LINES:
+        records.append({"t": t, "k": "out", "type": "transcript", "delta": " " + text})
+    records.sort(key=lambda r: r.get("t", -1))
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("\n".join(json.dumps(r) for r in records) + "\n")
+    events = analysis.recording_events(str(path))
+    assert sum(1 for e in events if e[1] == "text") == 3
+    result = analysis.analyze_file(str(path))
+    assert result["tension_max"] >= 35 and [t["trigger"] for t in result["triggers"]] == ["tension_cross"]
+
+
+def test_find_inputs(tmp_path):
+    (tmp_path / "a").mkdir()
+    for name in ("a/x.wav", "a/x.txt", "b.pcm", "c.jsonl.gz", "notes.md"):
+        (tmp_path / name).write_bytes(b"")
+    found = analysis.find_inputs([str(tmp_path)])
+    assert [p[len(str(tmp_path)) + 1:] for p in found] == ["a/x.wav", "b.pcm", "c.jsonl.gz"]
+
+
+def test_batch_cli_pool_and_overrides(tmp_path):
+    calls = tmp_path / "calls"
+    calls.mkdir()
+    _write_wav(calls / "call.wav", [(6.0, 9000), (3.0, 0)])
+    _write_sidecar(calls / "call.txt")
+    (calls / "broken.wav").write_bytes(b"not a wav")
+    overrides = [batch_analyze._override("tension.RMS_WEIGHT=0.1")]
+    totals = batch_analyze.run(analysis.find_inputs([str(calls)]), [str(calls)], str(tmp_path / "out"), 2, overrides)
+    assert totals["files"] == 1 and totals["failed"] == 1
+    result = json.loads((tmp_path / "out" / "call.wav.json").read_text())
+    assert result["tension_max"] < 35  # the override reached the worker process
+    assert tension.RMS_WEIGHT == 0.55
+    summary = [json.loads(line) for line in (tmp_path / "out" / "summary.jsonl").read_text().splitlines()]
+    assert sorted("error" in s for s in summary) == [False, True]
+
+    with pytest.raises(AttributeError):
+        batch_analyze.apply_overrides([batch_analyze._override("tension.NO_SUCH_WEIGHT=1")])
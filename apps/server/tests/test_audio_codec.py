@@ -0,0 +1,99 @@
+"""
+Unit tests for whisper audio encodings (μ-law, IMA ADPCM), codec negotiation and the TTS audio cache.
+"""
+import base64
+import math
+import struct
+
+import pytest
+
+from app.audio_codec import (
+    TtsAudioCache,
+    adpcm_decode,
+    adpcm_encode,
+    encode_b64,
+    mulaw_decode,
+    mulaw_encode,
+    negotiate,
+)
+
+
+def _tone(n: int = 2400, amplitude: int = 12000) -> bytes:
+    return struct.pack(f"<{n}h", *(int(amplitude * math.sin(i * 2 * math.pi * 220 / 24000)) for i in range(n)))
+
+
+def _rms_error(a: bytes, b: bytes) -> float:
+    n = len(a) // 2
+    xa, xb = struct.unpack(f"<{n}h", a), struct.unpack(f"<{n}h", b[: n * 2])
+    return math.sqrt(sum((x - y) ** 2 for x, y in zip(xa, xb)) / n)
+
+
+def test_mulaw_halves_size_and_round_trips_closely():
+    pcm = _tone()
+    encoded = mulaw_encode(pcm)
+    assert len(encoded) == len(pcm) // 2
+    assert _rms_error(pcm, mulaw_decode(encoded)) < 300
+
+
+def test_mulaw_known_values():
+    """G.711 reference points: silence is 0xFF, full-scale positive/negative clip to 0x80/0x00."""
+    assert mulaw_encode(struct.pack("<3h", 0, 32767, -32768)) == bytes([0xFF, 0x80, 0x00])
+
+
+def test_adpcm_quarters_size_and_tracks_signal():
+    pcm = _tone()
+    encoded = adpcm_encode(pcm)
+    assert len(encoded) == len(pcm) // 4
+    decoded = adpcm_decode(encoded, samples=len(pcm) // 2)
+    assert len(decoded) == len(pcm)
+    assert _rms_error(pcm, decoded) < 500
+
+
+def test_adpcm_odd_sample_count_is_padded():
+    pcm = _tone(n=5)
+    assert len(adpcm_encode(pcm)) == 3
+    assert len(adpcm_decode(adpcm_encode(pcm), samples=5)) == 10
+
+
+@pytest.mark.parametrize("requested,expected", [
+    ("adpcm", "adpcm"), ("MULAW", "mulaw"), ("opus", "pcm16"), (None, "pcm16"), (3, "pcm16"),
+])
+def test_negotiate(requested, expected):
+    assert negotiate(requested) == expected
+
+
+def test_encode_b64_pcm16_is_passthrough():
+    b64 = base64.b64encode(_tone(10)).decode("ascii")
+    assert encode_b64(b64, "pcm16") is b64
+    assert len(base64.b64decode(encode_b64(b64, "mulaw"))) == 10
+
+
+def test_tts_audio_cache_keeps_forms_per_phrase_and_evicts_lru():
+    cache = TtsAudioCache(max_entries=2)
+    cache.put("backchannel", "Ok.", "pcm16", "PCM")
+    cache.put("backchannel", "Ok.", "adpcm", "ADPCM")
+    assert cache.get("backchannel", "Ok.", "adpcm") == "ADPCM"
+    assert cache.get("backchannel", "Ok.", "mulaw") is None
+    assert cache.pcm("backchannel", "Ok.") == "PCM"
+    cache.put("whisper", "a", "pcm16", "A")
+    cache.put("whisper", "b", "pcm16", "B")
+    assert cache.pcm("backchannel", "Ok.") is None
+    assert cache.stats()["entries"] == 2
+
+
+async def test_backchannel_audio_synthesized_once_then_served_encoded(monkeypatch):
+    """Second request for the same phrase hits the cache; encoded form is derived from cached PCM."""
+    from app import coaching
+
+    calls = []
+
+    async def fake_synthesize(text):
+        calls.append(text)
+        return base64.b64encode(_tone(100)).decode("ascii")
+
+    monkeypatch.setattr(coaching, "TTS_AUDIO_CACHE", TtsAudioCache())
+    monkeypatch.setattr(coaching.BACKCHANNEL_TTS, "synthesize", fake_synthesize)
+    pcm = await coaching.generate_backchannel_audio("I see.")
+    adpcm = await coaching.generate_backchannel_audio("I see.", "adpcm")
+    assert calls == ["I see."]
+    assert len(base64.b64decode(adpcm)) == len(base64.b64decode(pcm)) // 4
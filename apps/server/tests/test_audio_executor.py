@@ -0,0 +1,89 @@
+"""
+Unit tests for the audio executor (inline threshold, thread/process offload) and whisper rendering.
+"""
+import base64
+import struct
+import threading
+
+from app.audio_executor import AudioExecutor
+from app.coaching import _apply_whisper_effect, _strip_wav_header, render_whisper_audio
+
+
+def _pcm(n: int = 4000) -> bytes:
+    return struct.pack(f"<{n}h", *((i * 37) % 20000 - 10000 for i in range(n)))
+
+
+def _wav(pcm: bytes, extra_chunk: bool = False) -> bytes:
+    fmt = b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, 24000, 48000, 2, 16)
+    lst = b"LIST" + struct.pack("<I", 5) + b"INFO!" + b"\x00" if extra_chunk else b""
+    data = b"data" + struct.pack("<I", len(pcm)) + pcm
+    body = b"WAVE" + fmt + lst + data
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _thread_name() -> str:
+    return threading.current_thread().name
+
+
+async def test_small_jobs_run_inline():
+    pool = AudioExecutor(mode="thread", inline_max_bytes=1024)
+    assert await pool.run(_thread_name, size=100) == threading.current_thread().name
+    assert pool.stats()["inline"] == 1 and pool.stats()["offloaded"] == 0
+
+
+async def test_large_jobs_offload_to_thread():
+    pool = AudioExecutor(mode="thread", inline_max_bytes=1024)
+    try:
+        name = await pool.run(_thread_name, size=4096)
+    finally:
+        pool.shutdown()
+    assert name.startswith("audio")
+    assert pool.stats()["offloaded"] == 1 and pool.stats()["in_flight"] == 0
+
+
+async def test_inline_mode_never_offloads():
+    pool = AudioExecutor(mode="inline", inline_max_bytes=0)
+    assert await pool.run(_thread_name, size=1 << 20) == threading.current_thread().name
+
+
+async def test_process_pool_matches_inline_render():
+    pcm = _pcm()
+    pool = AudioExecutor(mode="process", workers=1, inline_max_bytes=0)
+    try:
+        out = await pool.run(render_whisper_audio, pcm, size=len(pcm))
+    finally:
+        pool.shutdown()
+    assert out == render_whisper_audio(pcm)
+
+
+def test_unknown_mode_falls_back_to_process():
+    assert AudioExecutor(mode="gpu").mode == "process"
+    assert AudioExecutor().mode in ("process", "thread", "inline")
+
+
+async def test_warm_starts_process_pool_ahead_of_first_job():
+    pool = AudioExecutor(mode="process", workers=1, inline_max_bytes=0)
+    try:
+        pool.warm("app.coaching")
+        assert pool._pool is not None
+        pcm = _pcm()
+        assert await pool.run(render_whisper_audio, pcm, size=len(pcm)) == render_whisper_audio(pcm)
+    finally:
+        pool.shutdown()
+    thread_pool = AudioExecutor(mode="thread")
+    thread_pool.warm("app.coaching")
+    assert thread_pool._pool is None
+
+
+def test_strip_wav_header_finds_data_chunk():
+    pcm = _pcm(100)
+    assert _strip_wav_header(_wav(pcm)) == pcm
+    assert _strip_wav_header(_wav(pcm, extra_chunk=True)) == pcm
+    assert _strip_wav_header(pcm) == pcm
+
+
+def test_render_whisper_audio_applies_effect():
+    pcm = _pcm(100)
+    expected = base64.b64encode(_apply_whisper_effect(pcm)).decode("ascii")
+    assert render_whisper_audio(pcm) == expected
+    assert render_whisper_audio(_wav(pcm)) == expected
@@ -0,0 +1,30 @@
+"""
+Smoke tests for the benchmark suite: every case runs on its fixed inputs, results are JSON-ready,
+and baseline comparison classifies changes.
+"""
+import json
+
+from app import websocket_handler
+from benchmarks import cases  # noqa: F401  (registers cases)
+from benchmarks.runner import CASES, compare, measure
+
+
+def test_every_case_runs_and_cleans_up():
+    mock_mode = websocket_handler.MOCK_MODE
+    for bench in CASES.values():
+        result = measure(bench, min_time=0.001, rounds=2)
+        assert result["median_ns"] > 0 and result["ops_per_round"] >= bench.inner
+        json.dumps(result)
+    assert websocket_handler.MOCK_MODE == mock_mode
+
+
+def test_inputs_are_deterministic():
+    assert cases.mic_chunks(1.0) == cases.mic_chunks(1.0)
+    assert len(cases.argument_transcript()) <= websocket_handler.TRANSCRIPT_CONTEXT_MAX_CHARS
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": [{"name": "a", "median_ns": 100.0}, {"name": "b", "median_ns": 100.0}]}
+    current = {"results": [{"name": "a", "median_ns": 130.0}, {"name": "b", "median_ns": 102.0}, {"name": "c", "median_ns": 1.0}]}
+    rows = {r["name"]: r["status"] for r in compare(current, baseline, threshold=0.1)}
+    assert rows == {"a": "regression", "b": "same", "c": "new"}
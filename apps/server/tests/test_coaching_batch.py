@@ -0,0 +1,110 @@
+"""
+Tests for cross-session coaching micro-batching: batch collection, splitting, fallback.
+"""
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.coaching import FALLBACK_MOVES, _generate_coaching_batch, _split_batch_response, generate_coaching
+from app.coaching_batch import BatchItem, CoachingBatcher
+
+
+@pytest.mark.asyncio
+async def test_batcher_groups_requests_within_window():
+    """Concurrent submissions in one window go out as a single batch; identical items share a slot."""
+    seen: list[list[BatchItem]] = []
+
+    async def send(items):
+        seen.append(items)
+        return [f"whisper for {item.trigger}" for item in items]
+
+    batcher = CoachingBatcher(send, window_ms=5, max_batch=8)
+    a = BatchItem("tension_cross", 50, "you never listen")
+    b = BatchItem("barge_in", 60, "stop interrupting me")
+    results = await asyncio.gather(batcher.submit(a), batcher.submit(b), batcher.submit(a))
+    assert results == ["whisper for tension_cross", "whisper for barge_in", "whisper for tension_cross"]
+    assert len(seen) == 1 and len(seen[0]) == 2
+    assert batcher.stats()["batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batcher_flushes_at_max_batch():
+    """Reaching max_batch flushes immediately instead of waiting for the window."""
+    sizes: list[int] = []
+
+    async def send(items):
+        sizes.append(len(items))
+        return ["ok"] * len(items)
+
+    batcher = CoachingBatcher(send, window_ms=10_000, max_batch=2)
+    items = [BatchItem("tension_cross", i, "text") for i in range(2)]
+    assert await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in items)), 1.0) == ["ok", "ok"]
+    assert sizes == [2]
+
+
+@pytest.mark.asyncio
+async def test_batcher_failure_resolves_none():
+    """A failing batch call resolves every caller with None (caller falls back)."""
+    async def send(items):
+        raise RuntimeError("quota")
+
+    batcher = CoachingBatcher(send, window_ms=1)
+    assert await batcher.submit(BatchItem("barge_in", 10, "x")) is None
+
+
+@pytest.mark.asyncio
+async def test_batcher_holds_in_flight_batches_and_close_awaits_them():
+    """In-flight batches are referenced by the batcher (not only weakly by the loop) until done."""
+    release = asyncio.Event()
+
+    async def send(items):
+        await release.wait()
+        return ["late"] * len(items)
+
+    batcher = CoachingBatcher(send, window_ms=10_000, max_batch=8)
+    pending = asyncio.ensure_future(batcher.submit(BatchItem("barge_in", 10, "x")))
+    await asyncio.sleep(0)
+    assert not batcher._tasks  # still inside the window
+    closing = asyncio.ensure_future(batcher.close())  # flushes the open window
+    await asyncio.sleep(0)
+    assert len(batcher._tasks) == 1 and not closing.done()
+    release.set()
+    await closing
+    assert await pending == "late" and not batcher._tasks
+
+
+def test_split_batch_response_tolerates_short_or_wrapped_reply():
+    """Surrounding text is ignored; missing/non-string entries become None."""
+    reply = 'Here you go:\n["Pause and breathe before you answer them.", 3]'
+    assert _split_batch_response(reply, 3) == ["Pause and breathe before you answer them.", None, None]
+
+
+@pytest.mark.asyncio
+async def test_generate_coaching_batched_splits_per_session():
+    """With COACHING_BATCH=1, two sessions' requests use one Flash call and get their own whisper."""
+    whispers = ["Try asking what matters most to them right now.", "Pause here and let them finish their thought."]
+    response = MagicMock()
+    response.text = json.dumps(whispers)
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value=response)
+    batcher = CoachingBatcher(_generate_coaching_batch, window_ms=5)
+    with patch("app.coaching._get_flash_client", return_value=client), \
+            patch("app.coaching.COACHING_BATCH", True), patch("app.coaching.COACHING_BATCHER", batcher):
+        r1, r2 = await asyncio.gather(
+            generate_coaching(trigger="tension_cross", tension_score=40, transcript_buffer="you always do this"),
+            generate_coaching(trigger="barge_in", tension_score=70, transcript_buffer="let me finish"),
+        )
+    assert client.aio.models.generate_content.await_count == 1
+    assert r1 == {"move": "tension_cross", "text": whispers[0]}
+    assert r2 == {"move": "barge_in", "text": whispers[1]}
+
+
+@pytest.mark.asyncio
+async def test_generate_coaching_batched_failure_uses_fallback():
+    """If the batch call fails, each caller gets its trigger's fallback phrase."""
+    with patch("app.coaching._get_flash_client", side_effect=RuntimeError("no key")), \
+            patch("app.coaching.COACHING_BATCH", True):
+        result = await generate_coaching(trigger="barge_in", tension_score=70, transcript_buffer="let me finish")
+    assert result["move"] == FALLBACK_MOVES["barge_in"]
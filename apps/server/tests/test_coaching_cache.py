@@ -0,0 +1,75 @@
+"""
+Unit tests for the coaching response cache: key normalization, don't-repeat rotation, TTL and LRU.
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.coaching import generate_coaching
+from app.coaching_cache import CoachingCache, make_key, normalize_transcript
+
+
+def test_make_key_ignores_case_punctuation_and_nearby_tension():
+    """Near-identical contexts share a key; a different trigger or image does not."""
+    a = make_key("tension_cross", 71, "You NEVER listen to me!!", bucket=10)
+    b = make_key("tension_cross", 78, "you never   listen to me", bucket=10)
+    assert a == b
+    assert make_key("barge_in", 71, "you never listen to me", bucket=10) != a
+    assert make_key("tension_cross", 71, "you never listen to me", "img1", bucket=10) != a
+    assert make_key("tension_cross", 85, "you never listen to me", bucket=10) != a
+
+
+def test_normalize_transcript_keeps_whole_word_tail():
+    assert normalize_transcript("Hello, there. How ARE you?", tail_chars=100) == "hello there how are you"
+    assert normalize_transcript("alpha beta gamma", tail_chars=8) == "gamma"
+
+
+def test_cache_rotates_candidates_and_skips_last_whisper():
+    """get never returns the session's last whisper; with one candidate equal to it, it misses."""
+    cache = CoachingCache(max_entries=10, ttl_sec=60, candidates=3)
+    key = make_key("tension_cross", 70, "you always do this")
+    cache.put(key, "Take a breath before you answer.", now=0)
+    assert cache.get(key, last_whisper="Take a breath before you answer.", now=1) is None
+    cache.put(key, "Ask what they need right now.", now=1)
+    assert cache.get(key, last_whisper="take a breath before you answer", now=2) == "Ask what they need right now."
+    assert cache.get(key, last_whisper="Ask what they need right now.", now=3) == "Take a breath before you answer."
+    assert cache.stats()["hits"] == 2
+
+
+def test_cache_ttl_and_lru_eviction():
+    cache = CoachingCache(max_entries=2, ttl_sec=10, candidates=2)
+    k1, k2, k3 = (make_key("barge_in", 50, t) for t in ("one", "two", "three"))
+    cache.put(k1, "w1", now=0)
+    cache.put(k2, "w2", now=0)
+    assert cache.get(k1, now=1) == "w1"  # k1 now most recently used
+    cache.put(k3, "w3", now=1)
+    assert cache.get(k2, now=1) is None
+    assert cache.get(k1, now=1) == "w1"
+    assert cache.get(k1, now=11) is None  # expired
+    assert cache.stats()["evictions"] == 1
+
+
+async def test_generate_coaching_cache_hit_skips_flash():
+    """With COACHING_CACHE on, the second identical request is served without a Flash call."""
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(
+        return_value=SimpleNamespace(text="Pause and ask what they need from you.")
+    )
+    cache = CoachingCache()
+    with patch("app.coaching.COACHING_CACHE", True), \
+            patch("app.coaching.COACHING_RESPONSE_CACHE", cache), \
+            patch("app.coaching._get_flash_client", return_value=client):
+        first = await generate_coaching("barge_in", 70, "you never let me finish")
+        second = await generate_coaching("barge_in", 72, "You never let me finish!")
+        third = await generate_coaching("barge_in", 72, "you never let me finish", last_whisper=first["text"])
+    assert first == second == {"move": "barge_in", "text": "Pause and ask what they need from you."}
+    assert client.aio.models.generate_content.await_count == 2  # third must not repeat the whisper
+    assert third["move"] == "barge_in"
+
+
+async def test_generate_coaching_does_not_cache_fallbacks():
+    cache = CoachingCache()
+    with patch("app.coaching.COACHING_CACHE", True), \
+            patch("app.coaching.COACHING_RESPONSE_CACHE", cache), \
+            patch("app.coaching._get_flash_client", side_effect=RuntimeError("no creds")):
+        await generate_coaching("tension_cross", 70, "hello")
+    assert len(cache) == 0
@@ -0,0 +1,89 @@
+"""
+Tests for latency-budget coaching: provisional local whisper and late upgrade.
+"""
+import asyncio
+from unittest.mock import patch
+
+from app.coaching import FALLBACK_MOVES, generate_coaching_hedged
+from app.limiter import PriorityLimiter
+
+
+def _slow_result(delay: float, text: str = "Ask what they need before you explain yourself."):
+    async def fake(*args, **kwargs):
+        await asyncio.sleep(delay)
+        return {"move": "barge_in", "text": text, "source": "ai"}
+    return fake
+
+
+async def test_hedged_returns_model_whisper_within_budget():
+    with patch("app.coaching._coaching_result", _slow_result(0.0)):
+        result = await generate_coaching_hedged("barge_in", 60, "you never listen", budget_ms=200)
+    assert result == {"move": "barge_in", "text": "Ask what they need before you explain yourself."}
+
+
+async def test_hedged_sends_local_then_upgrades_late():
+    """Over budget: local whisper now (provisional), model whisper via on_late when it lands."""
+    upgrades = []
+
+    async def on_late(late):
+        upgrades.append(late)
+
+    with patch("app.coaching._coaching_result", _slow_result(0.05)):
+        result = await generate_coaching_hedged("barge_in", 60, "you never listen", budget_ms=5, on_late=on_late)
+        assert result["provisional"] is True
+        assert result["move"] == FALLBACK_MOVES["barge_in"]
+        await asyncio.sleep(0.1)
+    assert upgrades == [{"move": "barge_in", "text": "Ask what they need before you explain yourself."}]
+
+
+async def test_hedged_skips_upgrade_outside_window():
+    upgrades = []
+
+    async def on_late(late):
+        upgrades.append(late)
+
+    with patch("app.coaching._coaching_result", _slow_result(0.05)), \
+            patch("app.coaching.COACHING_UPGRADE_WINDOW_SEC", 0.01):
+        await generate_coaching_hedged("barge_in", 60, "", budget_ms=5, on_late=on_late)
+        await asyncio.sleep(0.1)
+    assert upgrades == []
+
+
+def _limited_result(limiter: PriorityLimiter, delay: float):
+    """_coaching_result stand-in that goes through a Flash limiter like the real call."""
+    async def fake(*args, **kwargs):
+        async def call():
+            await asyncio.sleep(delay)
+            return {"move": "barge_in", "text": "Slow down and ask what they mean.", "source": "ai"}
+        return await limiter.run(call, priority=0)
+    return fake
+
+
+async def test_hedged_budget_includes_limiter_queueing():
+    """The budget clock starts before the call waits for a Flash slot."""
+    limiter = PriorityLimiter(max_concurrency=1)
+    blocker = asyncio.ensure_future(limiter.run(lambda: asyncio.sleep(0.3)))
+    await asyncio.sleep(0)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    with patch("app.coaching._coaching_result", _limited_result(limiter, 0.0)):
+        result = await generate_coaching_hedged("barge_in", 60, "you never listen", budget_ms=50, on_late=None)
+    assert result["provisional"] is True and loop.time() - start < 0.2
+    await blocker
+    assert limiter.in_flight == 0
+
+
+async def test_late_call_keeps_its_flash_slot_until_done():
+    """After the provisional whisper, the still-running Flash call counts against the limiter."""
+    limiter = PriorityLimiter(max_concurrency=1)
+    upgrades = []
+
+    async def on_late(late):
+        upgrades.append(late)
+
+    with patch("app.coaching._coaching_result", _limited_result(limiter, 0.1)):
+        result = await generate_coaching_hedged("barge_in", 60, "you never listen", budget_ms=5, on_late=on_late)
+        assert result["provisional"] is True
+        assert limiter.in_flight == 1
+        await asyncio.sleep(0.2)
+    assert limiter.in_flight == 0 and len(upgrades) == 1
@@ -0,0 +1,52 @@
+"""
+Unit tests for the WebSocket JSON codec: stdlib/orjson round-trips and fallback selection.
+"""
+import json
+
+import pytest
+
+from app.codec import _orjson_codec, _stdlib_codec, get_codec
+
+MESSAGES = [
+    {"type": "audio", "base64": "AAAA", "telemetry": {"rms": 0.25}},
+    {"type": "whisper", "text": "Take a breath — then ask.", "move": "tension_cross", "ts": 1730000001000},
+    {"type": "ready"},
+]
+
+
+def _available_codecs():
+    codecs = [_stdlib_codec()]
+    fast = _orjson_codec()
+    if fast is not None:
+        codecs.append(fast)
+    return codecs
+
+
+@pytest.mark.parametrize("codec", _available_codecs(), ids=lambda c: c.name)
+def test_codec_round_trip(codec):
+    """dumps returns compact text that loads (and stdlib json) decode back to the same object."""
+    for msg in MESSAGES:
+        raw = codec.dumps(msg)
+        assert isinstance(raw, str)
+        assert codec.loads(raw) == msg
+        assert json.loads(raw) == msg
+        assert ", " not in raw and '": ' not in raw
+
+
+@pytest.mark.parametrize("codec", _available_codecs(), ids=lambda c: c.name)
+def test_codec_invalid_json_raises_json_decode_error(codec):
+    """Invalid input raises json.JSONDecodeError so the handler can catch one exception type."""
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads("not json")
+
+
+def test_get_codec_unknown_name_falls_back_to_stdlib():
+    """An unknown WS_JSON_CODEC value uses stdlib json."""
+    assert get_codec("nope").name == "json"
+    assert get_codec("json").name == "json"
+
+
+def test_get_codec_auto_prefers_orjson_when_installed():
+    """auto picks orjson if importable, stdlib otherwise."""
+    expected = "orjson" if _orjson_codec() is not None else "json"
+    assert get_codec("auto").name == expected
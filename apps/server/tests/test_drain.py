@@ -0,0 +1,128 @@
+"""
+Tests for graceful drain: reconnect notice, waiting for in-flight whispers up to the deadline,
+rejecting new sessions while draining, SIGTERM chaining, and the launcher's worker sizing.
+"""
+import asyncio
+import json
+import os
+import signal
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+import run
+from app import drain
+from app.admission import AdmissionController
+from app.drain import Drainer
+from app.main import app
+from app.vision import MAX_INBOUND_CHARS
+from app.websocket_handler import CopilotSession
+
+
+class _Socket:
+    def __init__(self) -> None:
+        self.sent: list[dict] = []
+        self.close_code: int | None = None
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+    async def close(self, code: int = 1000) -> None:
+        self.close_code = code
+
+
+def _session(in_flight: bool = False) -> CopilotSession:
+    session = CopilotSession(_Socket())
+    session.whisper.in_flight = in_flight
+    return session
+
+
+async def test_drain_waits_for_in_flight_whisper(monkeypatch):
+    monkeypatch.setattr(drain, "ADMISSION", AdmissionController())
+    idle, busy = _session(), _session(in_flight=True)
+    asyncio.get_running_loop().call_later(0.15, setattr, busy.whisper, "in_flight", False)
+    result = await Drainer(deadline_sec=2.0, retry_after_ms=250).drain([idle, busy])
+    assert drain.ADMISSION.draining
+    assert result["sessions"] == 2 and result["whispers_cut"] == 0 and 0.1 <= result["sec"] < 1.0
+    for session in (idle, busy):
+        assert session.draining
+        assert session.websocket.sent == [{"type": "reconnect", "reason": "draining", "retry_after_ms": 250}]
+        assert session.websocket.close_code == 1012
+
+
+async def test_drain_deadline_cuts_stuck_whisper(monkeypatch):
+    monkeypatch.setattr(drain, "ADMISSION", AdmissionController())
+    stuck = _session(in_flight=True)
+    result = await Drainer(deadline_sec=0.2).drain([stuck])
+    assert result["whispers_cut"] == 1 and result["sec"] < 0.5
+    assert stuck.websocket.close_code == 1012
+
+
+async def test_sigterm_drains_then_forwards(monkeypatch):
+    monkeypatch.setattr(drain, "ADMISSION", AdmissionController())
+    monkeypatch.setattr(drain, "DRAIN_ON_SIGTERM", True)
+    forwarded = []
+    original = signal.signal(signal.SIGTERM, lambda sig, frame: forwarded.append(sig))
+    drainer = Drainer(deadline_sec=0.2)
+    try:
+        assert drainer.install(asyncio.get_running_loop())
+        with patch("app.websocket_handler.SESSIONS", [_session()]):
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.sleep(0.05)
+            await asyncio.wait_for(drainer._task, 1.0)
+        assert forwarded == [signal.SIGTERM]
+        assert drainer.stats() == {**drainer.stats(), "draining": True, "sessions": 1}
+        drainer.uninstall()
+        assert signal.getsignal(signal.SIGTERM) is not drainer._on_signal
+    finally:
+        signal.signal(signal.SIGTERM, original)
+
+
+def test_ws_rejected_while_draining():
+    controller = AdmissionController()
+    controller.draining = True
+    with patch("app.main.ADMISSION", controller):
+        with TestClient(app).websocket_connect("/ws") as ws:
+            busy = ws.receive_json()
+    assert busy["type"] == "busy" and busy["draining"] is True and busy["retry_after_ms"] == 0
+    assert controller.load()["status"] == "draining" and controller.sessions.in_use == 0
+
+
+def test_server_options(monkeypatch):
+    monkeypatch.delenv("RELOAD", raising=False)
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    options = run.server_options()
+    assert options["workers"] == 3 and not options["reload"]
+    assert options["loop"] in ("uvloop", "asyncio") and options["http"] in ("httptools", "h11")
+    assert options["ws_max_size"] == MAX_INBOUND_CHARS < 16 * 1024 * 1024
+
+    monkeypatch.delenv("WEB_CONCURRENCY")
+    assert run.server_options()["workers"] == run.available_cpus() >= 1
+    monkeypatch.setenv("RELOAD", "1")
+    assert run.server_options()["workers"] == 1
+
+
+def test_configure_session_store(monkeypatch):
+    monkeypatch.delenv("SESSION_STORE", raising=False)
+    assert run.configure_session_store(1) is None and "SESSION_STORE" not in os.environ
+    spec = run.configure_session_store(4)
+    assert spec.startswith("sqlite:") and os.environ["SESSION_STORE"] == spec
+    monkeypatch.setenv("SESSION_STORE", "off")
+    assert run.configure_session_store(4) == "off"
+
+
+def test_configure_audio_executor(monkeypatch):
+    monkeypatch.delenv("AUDIO_EXECUTOR", raising=False)
+    monkeypatch.delenv("AUDIO_EXECUTOR_WORKERS", raising=False)
+    monkeypatch.setattr(run, "available_cpus", lambda: 8)
+    assert run.configure_audio_executor(1) is None and "AUDIO_EXECUTOR" not in os.environ
+    assert run.configure_audio_executor(8) == ("thread", 1)  # one worker per CPU: no spare cores
+    assert os.environ["AUDIO_EXECUTOR"] == "thread" and os.environ["AUDIO_EXECUTOR_WORKERS"] == "1"
+
+    monkeypatch.delenv("AUDIO_EXECUTOR")
+    monkeypatch.delenv("AUDIO_EXECUTOR_WORKERS")
+    assert run.configure_audio_executor(2) == ("process", 3)
+    monkeypatch.delenv("AUDIO_EXECUTOR_WORKERS")
+    monkeypatch.setenv("AUDIO_EXECUTOR", "process")  # asked for explicitly: kept, one process each
+    assert run.configure_audio_executor(8) == ("process", 1)
+    assert run.configure_audio_executor(8) is None  # AUDIO_EXECUTOR_WORKERS now set: left alone
@@ -0,0 +1,167 @@
+"""
+Unit tests for the local upstream fakes: latency specs, fault injection, VAD-driven transcripts,
+and each fake wired in through the real client factories.
+"""
+import asyncio
+import base64
+import math
+import queue
+import random
+import struct
+
+import pytest
+
+from app import coaching, fakes, gemini_live_client, streaming_stt
+from app.gemini_live_client import LiveSessionConfig
+
+
+def _chunks(speech_sec: float, silence_sec: float, rate: int = 16000) -> list[bytes]:
+    """40 ms PCM16 chunks: a loud tone, then silence."""
+    n = rate * 40 // 1000
+    loud = struct.pack(f"<{n}h", *(int(8000 * math.sin(2 * math.pi * 200 * i / rate)) for i in range(n)))
+    quiet = bytes(2 * n)
+    return [loud] * int(speech_sec / 0.04) + [quiet] * int(silence_sec / 0.04)
+
+
+@pytest.fixture
+def quick(monkeypatch):
+    """All fakes on, no latency, no errors."""
+    monkeypatch.setattr(fakes, "FAKE_UPSTREAMS", frozenset(fakes.UPSTREAMS))
+    for name in fakes.UPSTREAMS:
+        monkeypatch.setitem(fakes.FAULTS, name, fakes.Fault(name, rng=random.Random(7)))
+    return fakes.FAULTS
+
+
+def test_latency_specs():
+    rng = random.Random(1)
+    assert fakes.Latency("250").sample(rng) == 0.25
+    assert all(0.1 <= fakes.Latency("100-400").sample(rng) <= 0.4 for _ in range(50))
+    draws = sorted(fakes.Latency("ln:300:0.5").sample(rng) for _ in range(401))
+    assert 0.25 < draws[200] < 0.36
+    with pytest.raises(ValueError):
+        fakes.Latency("fast")
+
+
+def test_parse_upstreams():
+    assert fakes._parse_upstreams("all") == frozenset(fakes.UPSTREAMS)
+    assert fakes._parse_upstreams("flash, TTS,bogus") == {"flash", "tts"}
+    assert fakes._parse_upstreams("") == frozenset()
+
+
+async def test_fault_error_rate_and_counters():
+    always = fakes.Fault("flash", error_rate=1.0)
+    with pytest.raises(fakes.FakeUpstreamError):
+        await always.wait("generate_content")
+    never = fakes.Fault("flash")
+    await never.wait("generate_content")
+    assert always.stats()["errors"] == 1 and never.stats() == {**never.stats(), "calls": 1, "errors": 0}
+    assert never.time_to_disconnect() is None
+
+
+def test_vad_reports_end_of_utterance():
+    vad = fakes.Utterances()
+    results = [vad.feed(c) for c in _chunks(1.0, 0.6)]
+    assert results.count("end") == 1
+    assert vad.offset_sec == pytest.approx(1.6, abs=0.05)
+    assert [vad.feed(c) for c in _chunks(0.0, 1.0)].count("end") == 0
+
+
+async def test_fake_live_transcribes_script_and_disconnects(quick):
+    client = gemini_live_client.get_gemini_client()
+    assert isinstance(client, fakes.FakeGeminiLiveClient)
+    session = await client.connect(LiveSessionConfig())
+    for chunk in _chunks(1.0, 0.6):
+        await session.send_audio(base64.b64encode(chunk).decode("ascii"))
+    events = session.recv_events()
+    line = fakes.TRANSCRIPT_LINES[0]
+    deltas = [(await events.__anext__()).text for _ in range(0, len(line.split()), 3)]
+    assert "".join(deltas).strip() == line
+
+    session._drop()  # what FAKE_LIVE_DISCONNECT_SEC schedules: the stream ends and the handler reconnects
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(events.__anext__(), 1.0)
+    await session.close()
+
+
+async def test_fake_live_connect_failure(quick):
+    quick["live"].error_rate = 1.0
+    with pytest.raises(ConnectionError):
+        await gemini_live_client.get_gemini_client().connect(LiveSessionConfig())
+
+
+async def test_fake_flash_drives_coaching(quick, monkeypatch):
+    monkeypatch.setattr(coaching, "COACHING_LOCAL_FIRST", False)
+    monkeypatch.setattr(coaching, "COACHING_CACHE", False)
+    monkeypatch.setattr(coaching, "COACHING_BATCH", False)
+    result = await coaching._coaching_result("tension_cross", 70, "you never listen")
+    assert result["source"] == "ai" and result["text"] in fakes.FAKE_WHISPERS
+
+    quick["flash"].error_rate = 1.0
+    result = await coaching._coaching_result("tension_cross", 70, "you always interrupt me")
+    assert result["source"] == "fallback"
+
+
+async def test_fake_flash_batch_returns_one_whisper_per_item(quick):
+    from app.coaching_batch import BatchItem
+
+    items = [BatchItem("tension_cross", 70, f"line {i}", "") for i in range(3)]
+    whispers = await coaching._generate_coaching_batch(items)
+    assert len(whispers) == 3 and all(w in fakes.FAKE_WHISPERS for w in whispers)
+
+
+async def test_fake_tts_backends_return_audio(quick):
+    text = "Take a breath before you answer"
+    cloud = await coaching._generate_whisper_audio_cloud_tts(text)
+    assert len(base64.b64decode(cloud)) == len(fakes.speech_audio(text))  # WAV header stripped
+    live = await coaching._generate_whisper_audio_live(text)
+    assert len(base64.b64decode(live)) >= len(fakes.speech_audio(text))  # the prompt wraps the text
+
+    quick["tts"].error_rate = 1.0
+    assert await coaching._generate_whisper_audio_cloud_tts("Take a breath") is None
+
+
+def test_fake_stt_streams_interims_and_final(quick, monkeypatch):
+    audio_q: queue.Queue = queue.Queue()
+    results: queue.Queue = queue.Queue()
+    for chunk in _chunks(1.2, 0.6):
+        audio_q.put(chunk)
+    audio_q.put(None)
+    streaming_stt.run_streaming_stt(audio_q, results)
+    out = []
+    while not results.empty():
+        out.append(results.get())
+    assert out[-1] == (None, False)
+    finals = [text for text, final in out if final]
+    assert finals == [fakes.TRANSCRIPT_LINES[0]]
+    interims = [text for text, final in out[:-1] if not final]
+    assert interims and all(fakes.TRANSCRIPT_LINES[0].startswith(t) for t in interims)
+
+
+def test_fake_stt_disconnect_ends_stream(quick, monkeypatch):
+    monkeypatch.setattr(quick["stt"], "time_to_disconnect", lambda: 0.5)
+    audio_q: queue.Queue = queue.Queue()
+    results: queue.Queue = queue.Queue()
+    for chunk in _chunks(1.2, 0.6):
+        audio_q.put(chunk)
+    streaming_stt.run_streaming_stt(audio_q, results)  # no None sentinel needed: the stream aborts
+    out = []
+    while not results.empty():
+        out.append(results.get())
+    assert out[-1] == (None, False)
+    assert not any(final for _, final in out)
+
+
+def test_fake_stt_is_chosen_per_stream(monkeypatch):
+    """Fake mode is decided for each stream and leaves nothing behind for later (real) sessions."""
+    monkeypatch.setattr(fakes, "FAKE_UPSTREAMS", frozenset({"stt"}))
+    assert streaming_stt._speech_api().client is fakes.speech_client
+    monkeypatch.setattr(fakes, "FAKE_UPSTREAMS", frozenset())
+    real = streaming_stt._speech_api()
+    assert real is None or real.client is not fakes.speech_client
+    assert streaming_stt._SPEECH_API is real
+
+
+def test_load_transcript(tmp_path):
+    script = tmp_path / "script.txt"
+    script.write_text("# argument\nfirst line\n\n second line \n")
+    assert fakes.load_transcript(str(script)) == ("first line", "second line")
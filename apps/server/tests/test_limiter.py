@@ -0,0 +1,121 @@
+"""
+Tests for PriorityLimiter: concurrency bound, priority order, deadline, coalescing, queue cap.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.coaching import FALLBACK_MOVES, generate_coaching
+from app.limiter import LimiterFull, PriorityLimiter, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_limiter_bounds_concurrency():
+    """No more than max_concurrency calls run at once."""
+    limiter = PriorityLimiter(max_concurrency=2)
+    running = 0
+    peak = 0
+
+    async def call():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return 1
+
+    results = await asyncio.gather(*(limiter.run(call) for _ in range(8)))
+    assert results == [1] * 8
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_serves_higher_priority_first():
+    """Queued waiters are served lowest priority number first."""
+    limiter = PriorityLimiter(max_concurrency=1)
+    order: list[str] = []
+    gate = asyncio.Event()
+
+    async def blocker():
+        await gate.wait()
+
+    def make(name):
+        async def call():
+            order.append(name)
+        return call
+
+    first = asyncio.create_task(limiter.run(blocker))
+    await asyncio.sleep(0)
+    low = asyncio.create_task(limiter.run(make("post_escalation_silence"), priority=2))
+    high = asyncio.create_task(limiter.run(make("barge_in"), priority=0))
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(first, low, high)
+    assert order == ["barge_in", "post_escalation_silence"]
+
+
+@pytest.mark.asyncio
+async def test_limiter_deadline_raises_timeout():
+    """A call exceeding its deadline raises TimeoutError and is counted."""
+    limiter = PriorityLimiter(max_concurrency=1)
+    with pytest.raises(asyncio.TimeoutError):
+        await limiter.run(lambda: asyncio.sleep(1.0), deadline=0.02)
+    assert limiter.timeouts == 1
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_coalesces_identical_keys():
+    """Concurrent calls with the same key share one underlying call."""
+    limiter = PriorityLimiter(max_concurrency=4)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "same"
+
+    results = await asyncio.gather(*(limiter.run(call, key="k") for _ in range(5)))
+    assert results == ["same"] * 5
+    assert calls == 1
+    assert limiter.coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_limiter_rejects_when_queue_full():
+    """With max_queue reached, new callers get LimiterFull instead of waiting."""
+    limiter = PriorityLimiter(max_concurrency=1, max_queue=1)
+    gate = asyncio.Event()
+    t1 = asyncio.create_task(limiter.run(gate.wait))
+    await asyncio.sleep(0)
+    t2 = asyncio.create_task(limiter.run(gate.wait))
+    await asyncio.sleep(0)
+    with pytest.raises(LimiterFull):
+        await limiter.run(gate.wait)
+    gate.set()
+    await asyncio.gather(t1, t2)
+
+
+def test_token_bucket_waits_when_empty():
+    """After the burst is spent, the bucket reports a positive wait."""
+    bucket = TokenBucket(rate=10.0, burst=2)
+    bucket.take()
+    bucket.take()
+    assert 0 < bucket.time_until_token() <= 0.1
+
+
+@pytest.mark.asyncio
+async def test_generate_coaching_falls_back_on_deadline():
+    """A Flash call slower than COACHING_DEADLINE_SEC yields the trigger's fallback phrase."""
+    async def slow(**_kwargs):
+        await asyncio.sleep(1.0)
+
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(side_effect=slow)
+    with patch("app.coaching._get_flash_client", return_value=client), \
+            patch("app.coaching.COACHING_DEADLINE_SEC", 0.02):
+        result = await generate_coaching(trigger="barge_in", tension_score=60, transcript_buffer="you never listen")
+    assert result["move"] == FALLBACK_MOVES["barge_in"]
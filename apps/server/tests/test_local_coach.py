@@ -0,0 +1,89 @@
+"""
+Unit tests for the local whisper generator: phrase bank shape, cue detection, bands and rotation.
+Runs fully offline.
+"""
+from unittest.mock import patch
+
+from app import websocket_handler
+from app.coaching import FALLBACK_MOVES, fallback_coaching, fallback_move, generate_coaching
+from app.local_coach import CUE_MARKERS, MOVES, PHRASES, LocalCoach, detect_cue, tension_band
+
+
+def test_phrase_bank_covers_every_move_and_band_with_short_whispers():
+    """Every move has rising/high phrases, and every phrase is a 8-12 word whisper."""
+    for move in MOVES:
+        assert PHRASES[(move, "rising")] and PHRASES[(move, "high")]
+    for phrases in PHRASES.values():
+        for text in phrases:
+            assert 8 <= len(text.split()) <= 12, text
+
+
+def test_detect_cue_and_band():
+    assert detect_cue("honestly you never listen, you always do this") == "absolute"
+    assert detect_cue("whatever, this is ridiculous") == "dismissive"
+    assert detect_cue("I'm sorry, I want us on the same page") == "repair"
+    assert detect_cue("let's review the timeline") is None
+    assert tension_band(40) == "rising" and tension_band(85) == "high"
+
+
+def test_compose_prefers_cue_phrases_and_rotates_without_repeats():
+    """Marker-driven phrases come first; consecutive calls never repeat the previous whisper."""
+    coach = LocalCoach()
+    text = "you never listen to me"
+    first = coach.compose("slow_down", 50, text)
+    assert first in PHRASES[("slow_down", "absolute")]
+    seen = [first]
+    for _ in range(6):
+        seen.append(coach.compose("slow_down", 50, text, avoid=(seen[-1],)))
+    assert all(a != b for a, b in zip(seen, seen[1:]))
+
+
+def test_compose_uses_high_band_phrases_at_high_tension():
+    coach = LocalCoach()
+    assert coach.compose("deescalate_tone", 90) in PHRASES[("deescalate_tone", "high")]
+
+
+def test_fallback_coaching_keeps_trigger_move_mapping():
+    for trigger, move in FALLBACK_MOVES.items():
+        result = fallback_coaching(trigger, 60, "let's go over the timeline again", last_whisper="")
+        assert result["move"] == move
+        assert result["text"]
+
+
+def test_fallback_move_follows_transcript_cues():
+    assert fallback_move("tension_cross", "this is ridiculous") == "deescalate_tone"
+    assert fallback_move("barge_in", "I hear you, let's get on the same page") == "invite_perspective"
+    assert fallback_move("barge_in", "you never listen") == "reflect_back"
+    result = fallback_coaching("post_escalation_silence", 40, "whatever, not my problem")
+    assert result == {"move": "invite_perspective", "text": PHRASES[("invite_perspective", "dismissive")][0]}
+
+
+def test_every_phrase_set_is_reachable():
+    """Each (move, cue/band) bank can be chosen by some trigger, transcript and tension."""
+    reachable = set()
+    for trigger in FALLBACK_MOVES:
+        for transcript in ("", *(markers[0] for markers in CUE_MARKERS.values())):
+            cue = detect_cue(transcript)
+            for tension in (10, 90):
+                move = fallback_move(trigger, transcript)
+                reachable.add((move, tension_band(tension)))
+                if cue:
+                    reachable.add((move, cue))
+    assert reachable == set(PHRASES)
+    assert set(MOVES) == {move for move, _ in PHRASES}
+
+
+def test_escalation_markers_are_shared_with_the_tension_tracker():
+    for marker in websocket_handler.ESCALATION_MARKERS:
+        assert detect_cue(marker) in ("absolute", "dismissive", "grievance")
+    for marker in websocket_handler.CALMING_MARKERS:
+        assert detect_cue(marker) == "repair"
+
+
+async def test_generate_coaching_local_first_skips_flash():
+    """COACHING_LOCAL_FIRST answers from the phrase bank without touching the Flash client."""
+    with patch("app.coaching.COACHING_LOCAL_FIRST", True), \
+            patch("app.coaching._get_flash_client", side_effect=AssertionError("no network")):
+        result = await generate_coaching("barge_in", 80, "you always interrupt me")
+    assert result["move"] == FALLBACK_MOVES["barge_in"]
+    assert 8 <= len(result["text"].split()) <= 12
@@ -0,0 +1,51 @@
+"""
+Unit tests for the event-loop monitor: lag sampling, stall detection with the blocking stack, stats.
+"""
+import asyncio
+import time
+
+from app.loop_monitor import LoopMonitor
+from app.metrics import LOOP_LAG_SECONDS, LOOP_STALLS
+
+
+def _block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def test_samples_lag_while_idle():
+    before = LOOP_LAG_SECONDS.count()
+    monitor = LoopMonitor(interval_sec=0.01, slow_ms=500)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+    finally:
+        monitor.stop()
+    stats = monitor.stats()
+    assert stats["samples"] >= 3 and stats["stalls"] == 0
+    assert stats["p50_ms"] is not None and stats["p50_ms"] <= stats["max_ms"]
+    assert LOOP_LAG_SECONDS.count() > before
+    assert not monitor.running
+
+
+async def test_stall_captures_blocking_stack():
+    stalls = LOOP_STALLS.value()
+    monitor = LoopMonitor(interval_sec=0.01, slow_ms=30)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.03)
+        _block_the_loop(0.2)
+        await asyncio.sleep(0.1)
+    finally:
+        monitor.stop()
+    assert monitor.stall_count >= 1 and LOOP_STALLS.value() >= stalls + 1
+    stall = monitor.stalls[0]
+    assert stall["duration_ms"] >= 100
+    assert any("_block_the_loop" in line for line in stall["stack"])
+    assert monitor.stats()["last_stall_ms"] is not None
+
+
+def test_disabled_monitor_does_not_start():
+    monitor = LoopMonitor(interval_sec=0)
+    monitor.start()  # returns before looking for a running loop
+    assert not monitor.running
+    assert monitor.stats()["p99_ms"] is None
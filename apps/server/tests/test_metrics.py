@@ -0,0 +1,120 @@
+"""
+Unit tests for the metrics registry (text exposition, labels, histograms, callback gauges)
+and the /metrics endpoint.
+"""
+import base64
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.metrics import (
+    AUDIO_CHUNKS,
+    AUDIO_CHUNKS_DROPPED,
+    STT_LATENCY_SECONDS,
+    Registry,
+)
+from app.streaming_stt import _observe_latency
+
+
+def test_counter_renders_help_type_and_labels():
+    reg = Registry()
+    c = reg.counter("x_total", "Things.", ("reason",))
+    c.inc(reason="a")
+    c.inc(2, reason='b"q')
+    text = reg.render()
+    assert "# HELP x_total Things.\n# TYPE x_total counter" in text
+    assert 'x_total{reason="a"} 1' in text
+    assert 'x_total{reason="b\\"q"} 2' in text
+
+
+def test_unlabelled_counter_starts_at_zero():
+    reg = Registry()
+    reg.counter("y_total", "Y.")
+    assert "y_total 0" in reg.render()
+
+
+def test_wrong_labels_raise():
+    c = Registry().counter("z_total", "Z.", ("kind",))
+    with pytest.raises(ValueError):
+        c.inc(other="x")
+
+
+def test_duplicate_registration_raises():
+    reg = Registry()
+    reg.counter("d_total", "D.")
+    with pytest.raises(ValueError):
+        reg.counter("d_total", "D.")
+
+
+def test_histogram_buckets_are_cumulative():
+    reg = Registry()
+    h = reg.histogram("h_seconds", "H.", buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.5, 3.0):
+        h.observe(v)
+    text = reg.render()
+    assert 'h_seconds_bucket{le="0.1"} 1' in text
+    assert 'h_seconds_bucket{le="1"} 3' in text
+    assert 'h_seconds_bucket{le="+Inf"} 4' in text
+    assert "h_seconds_count 4" in text
+    assert "h_seconds_sum 4.05" in text
+
+
+def test_gauge_callback_read_at_scrape_time():
+    reg = Registry()
+    g = reg.gauge("q_depth", "Q.", ("queue",))
+    depth = {"n": 1}
+    g.set_function(lambda: [({"queue": "stt"}, depth["n"])])
+    assert 'q_depth{queue="stt"} 1' in reg.render()
+    depth["n"] = 7
+    assert 'q_depth{queue="stt"} 7' in reg.render()
+
+
+def test_gauge_callback_failure_renders_no_samples():
+    reg = Registry()
+    g = reg.gauge("bad", "B.")
+    g.set_function(lambda: 1 / 0)
+    assert reg.render().strip().endswith("# TYPE bad gauge")
+
+
+def test_metrics_endpoint_counts_audio(monkeypatch):
+    monkeypatch.setattr("app.websocket_handler.MOCK_MODE", True)
+    chunks = AUDIO_CHUNKS.value()
+    invalid = AUDIO_CHUNKS_DROPPED.value(reason="invalid")
+    client = TestClient(app)
+    with client.websocket_connect("/ws") as ws:
+        ws.send_json({"type": "start"})
+        ws.receive_json()  # ready
+        ws.send_json({"type": "audio", "base64": base64.b64encode(b"\x00\x01" * 160).decode("ascii")})
+        ws.send_json({"type": "audio", "base64": "not base64!"})
+        ws.send_json({"type": "stop"})
+        while ws.receive_json().get("type") != "stopped":
+            pass
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert AUDIO_CHUNKS.value() == chunks + 2
+    assert AUDIO_CHUNKS_DROPPED.value(reason="invalid") == invalid + 1
+    for name in ("copilot_audio_decode_seconds", "copilot_active_sessions", "copilot_queue_depth"):
+        assert f"# TYPE {name}" in resp.text
+
+
+def test_stt_latency_uses_result_end_offset():
+    before = STT_LATENCY_SECONDS.count(final="true")
+    result = SimpleNamespace(is_final=True, result_end_time=timedelta(seconds=2.0))
+    _observe_latency(result, time.time() - 2.5)
+    _observe_latency(SimpleNamespace(is_final=True), time.time())  # no offset: skipped
+    assert STT_LATENCY_SECONDS.count(final="true") == before + 1
+
+
+def test_stats_endpoints_run_on_the_event_loop():
+    """Sync handlers would run in the threadpool and race the loop over SESSIONS / admission state."""
+    import inspect
+
+    from app import main
+
+    for endpoint in (main.health, main.metrics, main.startup):
+        assert inspect.iscoroutinefunction(endpoint), endpoint.__name__
@@ -0,0 +1,62 @@
+"""
+Unit tests for the coaching prompt builder: tail format, per-call system instruction, prompt size.
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.coaching import generate_coaching
+from app.prompts import (
+    COACHING_SYSTEM_PROMPT,
+    TRIGGER_DESCRIPTIONS,
+    build_coaching_tail,
+    build_system_instruction,
+)
+
+TRANSCRIPT = "you never listen to me, that is not what I said and now you're leaving " * 10
+
+
+def _baseline_prompt(trigger: str, tension: int, transcript: str, last_whisper: str) -> str:
+    """What generate_coaching sent before the builder: the full system prompt plus this tail."""
+    avoid = f'\nPrevious whisper (DO NOT repeat): "{last_whisper}"\n' if last_whisper else ""
+    return COACHING_SYSTEM_PROMPT + (
+        f"Trigger: {trigger}\n"
+        f"Current tension: {tension}/100\n"
+        f"Recent transcript:\n{transcript[-500:]}\n"
+        f"{avoid}\n"
+        f"Generate one coaching whisper (8-12 words):"
+    )
+
+
+def test_build_coaching_tail_includes_only_changing_fields():
+    """The tail carries trigger (with its description), tension, transcript and the don't-repeat line."""
+    tail = build_coaching_tail("barge_in", 72, "you never listen", last_whisper="Slow down.")
+    assert tail.startswith(f"Trigger: barge_in ({TRIGGER_DESCRIPTIONS['barge_in']})\nCurrent tension: 72/100\n")
+    assert "you never listen" in tail
+    assert 'DO NOT repeat): "Slow down."' in tail
+    assert "Sage" not in tail and "tension_cross" not in tail
+    assert "DO NOT repeat" not in build_coaching_tail("barge_in", 72, "x")
+    assert build_coaching_tail("style_shift", 10, "x").startswith("Trigger: style_shift\n")
+
+
+def test_system_instruction_sections():
+    assert build_system_instruction(vision=True, trigger_types=True) == COACHING_SYSTEM_PROMPT
+    text_only = build_system_instruction()
+    assert "body language" not in text_only and "Trigger types" not in text_only
+    assert text_only.endswith("- Output ONLY the whisper phrase, nothing else")
+    assert "body language" in build_system_instruction(vision=True)
+
+
+async def test_whisper_prompt_is_smaller_than_before():
+    """Measured on what is actually sent to Flash: text-only whispers lose ~150 tokens, frames do not grow."""
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value=SimpleNamespace(text="Pause and ask what they need."))
+    with patch("app.coaching._get_flash_client", return_value=client):
+        await generate_coaching("barge_in", 72, TRANSCRIPT, last_whisper="Slow down and breathe.")
+    call = client.aio.models.generate_content.await_args.kwargs
+    sent = call["config"].system_instruction + call["contents"][0]
+    before = _baseline_prompt("barge_in", 72, TRANSCRIPT, "Slow down and breathe.")
+    assert len(before) // 4 - len(sent) // 4 >= 140  # ~4 characters per token
+    assert len(sent) < len(before) * 0.8
+
+    with_frame = build_system_instruction(vision=True) + build_coaching_tail("barge_in", 72, TRANSCRIPT[-500:])
+    assert len(with_frame) < len(_baseline_prompt("barge_in", 72, TRANSCRIPT, ""))
@@ -0,0 +1,79 @@
+"""
+Unit tests for the session recorder: record layout, audio stripping, truncated files, and a
+recorded /ws session.
+"""
+import gzip
+import os
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import recorder
+from app.main import app
+from app.recorder import NULL_RECORDER, SessionRecorder, load_recording, open_recorder
+
+
+async def test_records_round_trip(tmp_path):
+    path = str(tmp_path / "rec" / "s.jsonl.gz")
+    rec = SessionRecorder(path, "abc", flush_every=2)
+    rec.record("in", raw='{"type":"start"}')
+    rec.outbound({"type": "whisper", "text": "Slow down", "audio_base64": "AAAA"})
+    rec.record("live", kind="user_transcript_delta", text=" you never")
+    await rec.close()
+    rec.record("in", raw="ignored after close")
+
+    header, records = load_recording(path)
+    assert header["v"] == recorder.FORMAT_VERSION and header["session"] == "abc"
+    assert [r["k"] for r in records] == ["in", "out", "live"]
+    assert records[1] == {**records[1], "type": "whisper", "audio_bytes": 3} and "audio_base64" not in records[1]
+    assert records[2]["kind"] == "user_transcript_delta"
+    assert all(r["t"] >= 0 for r in records)
+
+
+async def test_truncated_recording_is_readable(tmp_path):
+    path = str(tmp_path / "s.jsonl.gz")
+    rec = SessionRecorder(path, "abc", flush_every=1)
+    for i in range(50):
+        rec.record("in", raw=f"frame {i}")
+    await rec.close()
+    data = open(path, "rb").read()
+    with open(path, "wb") as f:
+        f.write(data[: len(data) - 20])  # crash mid-write
+    _, records = load_recording(path)
+    assert 0 < len(records) <= 50
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.jsonl.gz"
+    with gzip.open(path, "wt") as f:
+        f.write('{"hello": 1}\n')
+    with pytest.raises(ValueError):
+        load_recording(str(path))
+
+
+def test_recording_is_opt_in(monkeypatch, tmp_path):
+    monkeypatch.setattr(recorder, "RECORD_DIR", "")
+    assert open_recorder("abc") is NULL_RECORDER
+    monkeypatch.setattr(recorder, "RECORD_DIR", str(tmp_path))
+    monkeypatch.setattr(recorder, "RECORD_SAMPLE", 0.0)
+    assert open_recorder("abc") is NULL_RECORDER
+    monkeypatch.setattr(recorder, "RECORD_SAMPLE", 1.0)
+    assert open_recorder("abc").enabled
+
+
+def test_ws_session_is_recorded(monkeypatch, tmp_path):
+    monkeypatch.setattr(recorder, "RECORD_DIR", str(tmp_path))
+    with patch.dict(os.environ, {"MOCK": "1"}), patch("app.websocket_handler.MOCK_MODE", True):
+        with TestClient(app).websocket_connect("/ws") as ws:
+            ws.send_json({"type": "start"})
+            assert ws.receive_json()["type"] == "ready"
+            ws.send_json({"type": "audio", "base64": "AAAAAA==", "telemetry": {"rms": 0.1}})
+            ws.send_json({"type": "stop"})
+            while ws.receive_json()["type"] != "stopped":
+                pass
+    (name,) = os.listdir(tmp_path)
+    _, records = load_recording(str(tmp_path / name))
+    inbound = [r["raw"] for r in records if r["k"] == "in"]
+    assert len(inbound) == 3 and '"audio"' in inbound[1]
+    assert {"ready", "stopped"} <= {r.get("type") for r in records if r["k"] == "out"}
@@ -0,0 +1,81 @@
+"""
+Unit tests for session replay: clock pacing and a recording driven back through handle_websocket
+with recorded Live events, Flash whispers and TTS outcomes.
+"""
+import asyncio
+import base64
+import json
+import time
+
+import pytest
+
+from app import fakes, websocket_handler
+from app.replay import Recording, ReplayClock, replay, replay_upstreams
+
+AUDIO = base64.b64encode(bytes(1280)).decode("ascii")
+
+
+def _recording() -> Recording:
+    records = [{"t": 0.0, "k": "in", "raw": json.dumps({"type": "start"})}, {"t": 0.01, "k": "live_connect", "ok": True}]
+    records += [
+        {"t": round(0.04 * i, 2), "k": "in", "raw": json.dumps({"type": "audio", "base64": AUDIO})} for i in range(1, 26)
+    ]
+    records += [
+        {"t": 0.3, "k": "live", "kind": "user_transcript_delta", "text": " you never"},
+        {"t": 0.5, "k": "live", "kind": "user_transcript_delta", "text": " listen"},
+        {"t": 0.6, "k": "out", "type": "transcript", "delta": " you never"},
+        {"t": 1.1, "k": "in", "raw": json.dumps({"type": "stop"})},
+    ]
+    records.sort(key=lambda r: r["t"])
+    return Recording({"v": 1, "session": "s1"}, records)
+
+
+async def test_clock_real_time_and_max():
+    clock = ReplayClock(speed=4.0)
+    clock.start()
+    start = time.monotonic()
+    await clock.wait_until(0.2)
+    assert 0.04 <= time.monotonic() - start < 0.2 and clock.now() >= 0.2
+
+    virtual = ReplayClock(speed=0)
+    waiter = asyncio.ensure_future(virtual.wait_until(1.0))
+    await virtual.reach(0.5)
+    assert not waiter.done()
+    await virtual.reach(1.5)
+    await asyncio.wait_for(waiter, 1.0)
+    assert virtual.now() == 1.5
+
+
+async def test_replay_reproduces_live_transcript(monkeypatch):
+    monkeypatch.setattr(websocket_handler, "MOCK_MODE", False)
+    monkeypatch.setattr(websocket_handler, "LIVE_STT_STREAMING", False)
+    saved = (fakes.FAKE_UPSTREAMS, fakes.LIVE_CLIENT)
+    result = await replay(_recording(), speed=4.0)
+    assert result["frames"] == 27
+    assert result["replayed_out"]["ready"] == 1 and result["replayed_out"]["stopped"] == 1
+    assert result["replayed_out"]["transcript"] == 2
+    assert result["recorded_out"] == {"transcript": 1}
+    assert (fakes.FAKE_UPSTREAMS, fakes.LIVE_CLIENT) == saved
+
+
+async def test_replay_upstreams_serve_recorded_results():
+    recording = Recording({"v": 1}, [
+        {"t": 0.0, "k": "coaching", "move": "tension_cross", "text": "Name what you both want", "ms": 0},
+        {"t": 0.1, "k": "tts", "kind": "whisper", "text": "Name what you both want", "ok": True, "ms": 0},
+        {"t": 0.2, "k": "tts", "kind": "whisper", "text": "Breathe", "ok": False, "ms": 0},
+        {"t": 0.3, "k": "live_connect", "ok": False, "error": "quota"},
+    ])
+    clock = ReplayClock(speed=0)
+    saved = fakes.LIVE_CLIENT
+    with replay_upstreams(recording, clock):
+        assert fakes.enabled("flash") and fakes.enabled("live")
+        response = await fakes.GENAI_CLIENT.aio.models.generate_content(contents=["prompt"])
+        assert response.text == "Name what you both want"
+        audio = await fakes.TTS_CLIENT.speak("Whisper this: Name what you both want")
+        assert audio == fakes.speech_audio("Name what you both want")
+        for text in ("Breathe", "Breathe", "Unknown"):  # recorded failure, then nothing left, then unknown
+            with pytest.raises(fakes.FakeUpstreamError):
+                await fakes.TTS_CLIENT.speak(text)
+        with pytest.raises(fakes.FakeUpstreamError, match="quota"):
+            await fakes.LIVE_CLIENT.connect(None)
+    assert fakes.LIVE_CLIENT is saved
@@ -0,0 +1,83 @@
+"""
+Unit tests for per-connection session state: transcript markers, tension crossings, registry.
+"""
+import pytest
+
+from app.websocket_handler import (
+    SESSIONS,
+    TENSION_WHISPER_THRESHOLD,
+    CopilotSession,
+    SessionRegistry,
+    TensionTracker,
+    TranscriptState,
+)
+
+
+def test_transcript_escalation_markers_raise_pressure():
+    """Escalation markers split across deltas are detected on the full context."""
+    tr = TranscriptState()
+    tr.append("you")
+    tr.append("always do this")
+    assert tr.conversation_style == "escalated"
+    assert tr.semantic_pressure >= 0.45
+    assert tr.text() == "you always do this"
+
+
+def test_transcript_calming_markers_lower_pressure():
+    """Calming markers reduce pressure and switch style to calm."""
+    tr = TranscriptState()
+    tr.append("this is ridiculous")
+    high = tr.semantic_pressure
+    tr.context = ""
+    tr.append("let's get on the same page")
+    assert tr.semantic_pressure < high
+    assert tr.conversation_style == "calm"
+
+
+def test_transcript_append_without_buffer():
+    """Final-only updates extend context but not the delta buffer."""
+    tr = TranscriptState()
+    tr.append("hello there", to_buffer=False)
+    assert tr.context == "hello there"
+    assert tr.buffer == []
+
+
+def test_tension_tracker_detects_upward_crossing():
+    """crossed_up is set on an upward threshold crossing and cleared when tension drops."""
+    tt = TensionTracker()
+    tt.record_score(TENSION_WHISPER_THRESHOLD - 1, 1000.0)
+    assert not tt.crossed_up
+    tt.record_score(TENSION_WHISPER_THRESHOLD + 5, 1000.5)
+    assert tt.crossed_up
+    tt.record_score(0, 1001.0)
+    assert not tt.crossed_up
+
+
+def test_tension_tracker_history_window():
+    """Score history keeps only the high-tension window."""
+    tt = TensionTracker()
+    tt.record_score(10, 0.0)
+    tt.record_score(20, 100.0)
+    assert list(tt.history) == [(100.0, 20)]
+
+
+def test_session_state_is_slotted():
+    """Sessions and components reject ad-hoc attributes (fixed per-session footprint)."""
+    session = CopilotSession(websocket=None)
+    with pytest.raises(AttributeError):
+        session.extra = 1
+    with pytest.raises(AttributeError):
+        session.tension.extra = 1
+
+
+def test_registry_add_remove_describe():
+    """Registry tracks sessions by id and describes them."""
+    reg = SessionRegistry()
+    s = CopilotSession(websocket=None)
+    reg.add(s)
+    assert len(reg) == 1
+    assert reg.get(s.id) is s
+    assert reg.describe()[0]["id"] == s.id
+    reg.remove(s)
+    assert len(reg) == 0
+    assert len(SESSIONS) == 0
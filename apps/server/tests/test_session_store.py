@@ -0,0 +1,158 @@
+"""
+Tests for session resume: snapshot encoding, the in-memory and SQLite stores, restoring a session's
+coaching state, and resume over /ws with the token from `ready`.
+"""
+import sqlite3
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import session_store
+from app.main import app
+from app.session_store import InMemorySessionStore, SQLiteSessionStore, decode_snapshot, encode_snapshot
+from app.vision import PreparedFrame
+from app.websocket_handler import WHISPER_MIN_TRANSCRIPT_CHARS, CopilotSession
+
+ARGUMENT = "you never listen to me and you always do this, this is ridiculous"
+
+
+def _heated_session() -> CopilotSession:
+    session = CopilotSession(websocket=None)
+    now = time.time()
+    for i in range(30):
+        session.tension.update_rms(0.08)
+        session.tension.state.recent_rms.append(0.08)
+        if i % 10 == 0:
+            session.tension.record_score(55, now - 3 + i * 0.1)
+    session.transcript.append(ARGUMENT)
+    session.whisper.last_whisper_ts = now - 60
+    session.whisper.last_whisper_text = "Pause and name what you heard"
+    session.frames.current = PreparedFrame(b"\xff\xd8jpeg", 64, 48, 12345)
+    return session
+
+
+async def test_memory_store_single_use_expiry_and_eviction():
+    store = InMemorySessionStore(max_entries=2)
+    await store.put("a", b"1")
+    assert await store.take("a") == b"1"
+    assert await store.take("a") is None
+    await store.put("old", b"x", ttl_sec=-1)
+    assert await store.take("old") is None
+    for token in ("t1", "t2", "t3"):
+        await store.put(token, b"x")
+    assert len(store) == 2 and await store.take("t1") is None
+    assert store.stats() == {**store.stats(), "saved": 5, "resumed": 1, "missed": 3}
+
+
+async def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first, second = SQLiteSessionStore(path), SQLiteSessionStore(path)
+    await first.put("tok", b"\x00blob")
+    await first.put("stale", b"x", ttl_sec=-1)
+    assert await second.take("tok") == b"\x00blob"
+    assert await first.take("tok") is None
+    assert await second.take("stale") is None
+    await first.put("gone", b"x")
+    await second.discard("gone")
+    assert await first.take("gone") is None
+    await first.close()
+    await second.close()
+
+
+def test_make_store():
+    assert session_store.make_store("off") is None
+    assert isinstance(session_store.make_store("memory"), InMemorySessionStore)
+    assert decode_snapshot(b"garbage") is None
+    assert decode_snapshot(encode_snapshot({"v": 0})) is None
+
+
+def test_snapshot_roundtrip_restores_coaching_state():
+    source = _heated_session()
+    blob = encode_snapshot(source.snapshot())
+    assert len(blob) < 1024
+    restored = CopilotSession(websocket=None)
+    restored.restore(decode_snapshot(blob))
+    assert restored.transcript.text() == source.transcript.text()
+    assert restored.transcript.semantic_pressure == pytest.approx(source.transcript.semantic_pressure, abs=1e-3)
+    assert restored.tension.last_score == 55 and restored.tension.rms_ema == pytest.approx(source.tension.rms_ema)
+    assert list(restored.tension.history) == [(round(ts, 3), s) for ts, s in source.tension.history]
+    assert restored.tension.state.recent_rms == source.tension.state.recent_rms
+    assert restored.tension.state.silence_start is None
+    assert restored.whisper.last_whisper_text == "Pause and name what you heard"
+    assert restored.frames.current.jpeg == b"\xff\xd8jpeg" and restored.frames.current.dhash == 12345
+
+
+def test_resumed_session_coaches_immediately():
+    fresh = CopilotSession(websocket=None)
+    now = time.time()
+    assert fresh.due_trigger(now, fresh.transcript.text()) is None
+    resumed = CopilotSession(websocket=None)
+    resumed.restore(_heated_session().snapshot())
+    assert len(resumed.transcript.text()) >= WHISPER_MIN_TRANSCRIPT_CHARS
+    assert resumed.due_trigger(now, resumed.transcript.text()) == "tension_cross"
+
+    cooling = _heated_session()
+    cooling.whisper.last_whisper_ts = now - 1  # cooldown carries over too
+    resumed.restore(cooling.snapshot())
+    assert resumed.due_trigger(now, resumed.transcript.text()) is None
+
+
+def test_ws_resume_with_token():
+    store = InMemorySessionStore()
+    with patch("app.websocket_handler.MOCK_MODE", True), patch.object(session_store, "STORE", store):
+        client = TestClient(app)
+        with client.websocket_connect("/ws") as ws:
+            ws.send_json({"type": "start"})
+            ready = ws.receive_json()
+        token = ready["resume_token"]
+        assert "resumed" not in ready and store.saved == 1  # dropped without stop: snapshot saved
+
+        with client.websocket_connect("/ws") as ws:
+            ws.send_json({"type": "start", "resume_token": token})
+            resumed = ws.receive_json()
+            ws.send_json({"type": "stop"})
+        assert resumed["resumed"] is True and resumed["resume_token"] != token
+        assert store.saved == 1 and len(store) == 0  # stopped on purpose: nothing kept
+
+        with client.websocket_connect("/ws") as ws:
+            ws.send_json({"type": "start", "resume_token": token})  # single use
+            assert ws.receive_json()["resumed"] is False
+
+
+def test_ws_stop_discards_periodic_snapshot():
+    """A snapshot written by snapshot_loop is deleted on stop, so the token cannot resume stale state."""
+    store = InMemorySessionStore()
+    with patch("app.websocket_handler.MOCK_MODE", True), patch.object(session_store, "STORE", store), \
+            patch.object(session_store, "SESSION_SNAPSHOT_SEC", 0.01):
+        client = TestClient(app)
+        with client.websocket_connect("/ws") as ws:
+            ws.send_json({"type": "start"})
+            token = ws.receive_json()["resume_token"]
+            deadline = time.time() + 2
+            while not len(store) and time.time() < deadline:
+                time.sleep(0.01)
+            assert len(store) == 1  # the periodic snapshot is stored while the session runs
+            ws.send_json({"type": "stop"})
+            while ws.receive_json()["type"] != "stopped":
+                pass
+        assert len(store) == 0
+
+        with client.websocket_connect("/ws") as ws:
+            ws.send_json({"type": "start", "resume_token": token})
+            assert ws.receive_json()["resumed"] is False
+            ws.send_json({"type": "stop"})
+
+
+def test_ws_resume_store_error_starts_fresh():
+    class BrokenStore(InMemorySessionStore):
+        async def take(self, token):
+            raise sqlite3.OperationalError("database is locked")
+
+    with patch("app.websocket_handler.MOCK_MODE", True), patch.object(session_store, "STORE", BrokenStore()):
+        with TestClient(app).websocket_connect("/ws") as ws:
+            ws.send_json({"type": "start", "resume_token": "tok"})
+            ready = ws.receive_json()
+            ws.send_json({"type": "stop"})
+    assert ready["type"] == "ready" and ready["resumed"] is False and ready["resume_token"]
@@ -0,0 +1,82 @@
+"""
+Tests for the cold-start subsystem: per-module import timing, the background preload (pending /
+wait while a module is still importing), and the startup milestones reported by GET /startup.
+"""
+import builtins
+import sys
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.startup import _BUILTIN_IMPORT, STARTUP, ImportProfile, StartupProfile
+
+
+def _write_modules(tmp_path, monkeypatch, prefix: str) -> None:
+    (tmp_path / f"{prefix}_outer.py").write_text(f"import time\ntime.sleep(0.05)\nimport {prefix}_inner\n")
+    (tmp_path / f"{prefix}_inner.py").write_text("import time\ntime.sleep(0.1)\n")
+    (tmp_path / f"{prefix}_slow.py").write_text("import time\ntime.sleep(0.3)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+
+def test_import_profile_self_and_cumulative(tmp_path, monkeypatch):
+    _write_modules(tmp_path, monkeypatch, "cs_profile")
+    original = builtins.__import__
+    profile = ImportProfile()
+    profile.install()
+    try:
+        import cs_profile_outer  # noqa: F401
+        import cs_profile_outer as again  # noqa: F401  (already loaded: not timed again)
+    finally:
+        profile.uninstall()
+    assert builtins.__import__ is original and not profile.installed
+    outer_self, outer_total, thread = profile.modules["cs_profile_outer"]
+    inner_self, inner_total, _ = profile.modules["cs_profile_inner"]
+    assert thread == "MainThread"
+    assert inner_self == inner_total >= 0.1
+    assert 0.05 <= outer_self < 0.1 and outer_total >= 0.15
+    assert profile.top(1)[0]["module"] == "cs_profile_inner"
+
+
+async def test_preload_pending_and_wait(tmp_path, monkeypatch):
+    _write_modules(tmp_path, monkeypatch, "cs_preload")
+    startup = StartupProfile(preload_modules=("cs_preload_slow", "cs_missing_sdk"))
+    assert not startup.pending("cs_preload_slow")  # nothing scheduled yet
+    startup.start_preload()
+    assert startup.pending("cs_preload_slow")
+    assert await startup.wait("cs_preload_slow", timeout=0.05) is False
+    assert await startup.wait("cs_missing_sdk", timeout=2.0) is True
+    startup._thread.join(1.0)
+    preload = startup.profile()["preload"]
+    assert preload["cs_preload_slow"]["ok"] and preload["cs_preload_slow"]["ms"] >= 300
+    assert preload["cs_missing_sdk"]["ok"] is False and "ModuleNotFoundError" in preload["cs_missing_sdk"]["error"]
+    assert "preload_done" in startup.marks and "cs_preload_slow" in sys.modules
+
+
+def test_stt_waits_for_speech_preload():
+    from app.websocket_handler import CopilotSession
+
+    session = CopilotSession(websocket=None)
+    with patch("app.websocket_handler.LIVE_STT_STREAMING", True), \
+            patch.object(STARTUP, "pending", lambda module: module == "google.cloud.speech"), \
+            patch("app.websocket_handler.start_streaming_stt_thread") as start_stt:
+        session._maybe_start_stt()
+    start_stt.assert_not_called()
+    assert not session.stt.active
+
+
+def test_ws_marks_first_ready():
+    # Marks are first-occurrence only; earlier tests may already have run sessions (e.g. replays).
+    with patch("app.websocket_handler.MOCK_MODE", True), patch.dict(STARTUP.marks):
+        STARTUP.marks.pop("first_connect", None)
+        STARTUP.marks.pop("first_ready", None)
+        client = TestClient(app)
+        with client.websocket_connect("/ws") as ws:
+            ws.send_json({"type": "start"})
+            assert ws.receive_json()["type"] == "ready"
+            ws.send_json({"type": "stop"})
+        profile = client.get("/startup").json()
+    marks = profile["marks"]
+    assert builtins.__import__ is _BUILTIN_IMPORT  # hook only lived while app.main imported
+    assert marks["app_imported"] <= marks["first_connect"] <= marks["first_ready"]
+    assert profile["pid"] > 0 and isinstance(profile["imports"], list)
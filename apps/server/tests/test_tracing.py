@@ -0,0 +1,101 @@
+"""
+Unit tests for tracing: no-op default, span nesting and IDs, the in-memory exporter, and the
+per-stage whisper trace whose ID is attached to the outbound whisper message.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.tracing import NOOP_SPAN, TRACER, InMemoryExporter, Tracer, make_tracer
+from app.websocket_handler import CopilotSession
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exp = InMemoryExporter()
+    monkeypatch.setattr(TRACER, "exporter", exp)
+    return exp
+
+
+def test_disabled_tracer_yields_noop_span():
+    tracer = Tracer()
+    with tracer.trace("whisper") as span:
+        assert span is NOOP_SPAN
+        assert span.trace_id == ""
+    tracer.record("x", 0, 1)  # no-op
+
+
+def test_unknown_mode_disables_tracing():
+    assert not make_tracer("zipkin").enabled
+    assert make_tracer("memory").enabled
+
+
+def test_spans_nest_and_share_trace_id():
+    exp = InMemoryExporter()
+    tracer = Tracer(exp)
+    with tracer.trace("whisper", trigger="barge_in") as root:
+        with tracer.span("flash") as child:
+            pass
+        tracer.record("trigger_eval", root.start_ns, root.start_ns + 1000)
+    assert len(root.trace_id) == 32 and len(root.span_id) == 16
+    assert child.trace_id == root.trace_id and child.parent_id == root.span_id
+    assert [s.name for s in exp.spans(root.trace_id)] == ["flash", "trigger_eval", "whisper"]
+    assert root.parent_id is None and root.attributes == {"trigger": "barge_in"}
+    assert root.end_ns >= child.end_ns
+
+
+def test_new_trace_inside_span_starts_fresh():
+    tracer = Tracer(InMemoryExporter())
+    with tracer.trace("outer") as outer:
+        with tracer.trace("inner") as inner:
+            pass
+    assert inner.trace_id != outer.trace_id and inner.parent_id is None
+
+
+def test_error_marks_span():
+    exp = InMemoryExporter()
+    tracer = Tracer(exp)
+    with pytest.raises(RuntimeError):
+        with tracer.trace("whisper"):
+            raise RuntimeError("boom")
+    span = exp.spans()[0]
+    assert span.status == "error" and span.attributes["error"] == "RuntimeError"
+    assert span.to_dict()["duration_ms"] >= 0
+
+
+async def test_child_spans_follow_tasks():
+    exp = InMemoryExporter()
+    tracer = Tracer(exp)
+
+    async def stage():
+        with tracer.span("stage"):
+            await asyncio.sleep(0)
+
+    with tracer.trace("root") as root:
+        await asyncio.create_task(stage())
+    assert exp.spans()[0].parent_id == root.span_id
+
+
+async def test_whisper_trace_covers_stages_and_tags_message(exporter, monkeypatch):
+    sent = []
+
+    async def fake_send(self, obj):
+        sent.append(obj)
+
+    async def fake_coaching(**kwargs):
+        return {"move": "slow_down", "text": "Take a breath before you answer that one."}
+
+    async def fake_audio(text, codec="pcm16"):
+        return None
+
+    monkeypatch.setattr(CopilotSession, "send", fake_send)
+    monkeypatch.setattr("app.websocket_handler.generate_coaching_hedged", fake_coaching)
+    monkeypatch.setattr("app.websocket_handler.generate_whisper_audio", fake_audio)
+    session = CopilotSession(websocket=None)
+    await session._send_coaching_whisper("tension_cross", time.time(), "you never listen", time.time_ns())
+
+    whisper = sent[-1]
+    assert whisper["type"] == "whisper" and len(whisper["trace_id"]) == 32
+    names = {s.name for s in exporter.spans(whisper["trace_id"])}
+    assert names == {"whisper", "trigger_eval", "coaching", "tts", "send"}
@@ -0,0 +1,133 @@
+"""
+Unit tests for TTS backend racing: sequential/hedged/parallel/auto strategies and latency stats.
+"""
+import asyncio
+import itertools
+
+import pytest
+
+from app.tts_race import BackendStats, LatencyHistogram, TtsRacer, backend_stats
+
+_ids = itertools.count()
+
+
+def _name(label: str) -> str:
+    """Unique backend names so process-wide stats don't leak between tests."""
+    return f"{label}-{next(_ids)}"
+
+
+def _backend(result, delay=0.0, calls=None, cancelled=None):
+    async def synth(text):
+        if calls is not None:
+            calls.append(text)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.set()
+            raise
+        return result
+    return synth
+
+
+def test_latency_histogram_quantiles():
+    h = LatencyHistogram(bounds=(10, 100, 1000))
+    assert h.quantile(0.5) is None
+    for ms in (5, 6, 7, 50, 2000):
+        h.observe(ms)
+    assert h.quantile(0.5) == 10
+    assert h.quantile(0.8) == 100
+    assert h.quantile(1.0) == 2000
+
+
+def test_backend_stats_success_rate_window():
+    stats = BackendStats("x", window=4)
+    for ok in (False, False, True, True, True, True):
+        stats.record(ok, 100)
+    assert stats.success_rate == 1.0
+    assert stats.failures == 2 and stats.successes == 4
+
+
+async def test_sequential_only_tries_next_after_failure():
+    calls = []
+    racer = TtsRacer([(_name("a"), _backend(None, calls=calls)), (_name("b"), _backend("B", calls=calls))])
+    assert await racer.synthesize("hi") == "B"
+    assert calls == ["hi", "hi"]
+
+
+async def test_hedged_starts_second_backend_after_delay_and_cancels_loser():
+    cancelled = asyncio.Event()
+    racer = TtsRacer(
+        [(_name("slow"), _backend("A", delay=1.0, cancelled=cancelled)), (_name("fast"), _backend("B"))],
+        strategy="hedged",
+        hedge_ms=10,
+    )
+    assert await racer.synthesize("hi") == "B"
+    await asyncio.wait_for(cancelled.wait(), 1.0)
+
+
+async def test_hedged_primary_within_delay_never_starts_secondary():
+    calls = []
+    racer = TtsRacer(
+        [(_name("a"), _backend("A")), (_name("b"), _backend("B", calls=calls))], strategy="hedged", hedge_ms=50
+    )
+    assert await racer.synthesize("hi") == "A"
+    assert calls == []
+
+
+async def test_parallel_first_audio_wins_even_if_listed_second():
+    racer = TtsRacer(
+        [(_name("a"), _backend("A", delay=0.2)), (_name("b"), _backend("B", delay=0.01))], strategy="parallel"
+    )
+    assert await racer.synthesize("hi") == "B"
+
+
+async def test_all_backends_failing_returns_none():
+    racer = TtsRacer([(_name("a"), _backend(None)), (_name("b"), _backend(None))], strategy="parallel")
+    assert await racer.synthesize("hi") is None
+
+
+async def test_backend_timeout_counts_as_failure():
+    name = _name("hang")
+    racer = TtsRacer([(name, _backend("A", delay=1.0)), (_name("b"), _backend("B"))], timeout_sec=0.02)
+    assert await racer.synthesize("hi") == "B"
+    assert backend_stats(name).failures == 1
+
+
+async def test_auto_prefers_faster_healthy_backend():
+    """auto puts the backend with the lower median latency first, skipping unhealthy ones."""
+    slow, fast, broken = _name("slow"), _name("fast"), _name("broken")
+    for _ in range(5):
+        backend_stats(slow).record(True, 2000)
+        backend_stats(fast).record(True, 90)
+        backend_stats(broken).record(False, 10)
+    calls = []
+    racer = TtsRacer(
+        [
+            (broken, _backend(None, calls=calls)),
+            (slow, _backend("S", calls=calls)),
+            (fast, _backend("F", calls=calls)),
+        ],
+        strategy="auto",
+    )
+    assert [name for name, _ in racer._ordered()] == [fast, slow, broken]
+    assert await racer.synthesize("hi") == "F"
+    assert racer.stats()["wins"][fast] == 1
+
+
+def test_auto_puts_measured_backend_before_untried_one():
+    """A backend without latency samples goes after measured ones, not first."""
+    untried, measured = _name("untried"), _name("measured")
+    for _ in range(5):
+        backend_stats(measured).record(True, 1500)
+    racer = TtsRacer([(untried, _backend("U")), (measured, _backend("M"))], strategy="auto")
+    assert [name for name, _ in racer._ordered()] == [measured, untried]
+
+
+def test_unknown_strategy_falls_back_to_sequential():
+    assert TtsRacer([], strategy="fastest").strategy == "sequential"
+
+
+@pytest.mark.parametrize("strategy", ["sequential", "hedged", "parallel", "auto"])
+async def test_no_backends_returns_none(strategy):
+    assert await TtsRacer([], strategy=strategy).synthesize("hi") is None
@@ -0,0 +1,143 @@
+"""
+Tests for the webcam frame pipeline: downscaling, perceptual dedup, pass-through without Pillow.
+"""
+import base64
+import io
+from unittest.mock import patch
+
+import pytest
+
+from app.vision import (
+    FRAME_IDLE_INTERVAL_MS,
+    FRAME_INTERVAL_MS,
+    FramePipeline,
+    FrameSampling,
+    PreparedFrame,
+    prepare_frame,
+)
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _jpeg(width: int, height: int, shade: int = 0) -> bytes:
+    """Gradient test image (so the difference hash is not all zeros)."""
+    img = Image.new("RGB", (width, height))
+    img.putdata([((x * 255 // width + shade) % 256, (y * 255 // height) % 256, 128)
+                 for y in range(height) for x in range(width)])
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=95)
+    return out.getvalue()
+
+
+def test_prepare_frame_downscales_to_max_dim():
+    """Large frames are resized so the longest side is max_dim and get smaller."""
+    raw = _jpeg(640, 480)
+    frame = prepare_frame(raw, max_dim=320)
+    assert (frame.width, frame.height) == (320, 240)
+    assert len(frame.jpeg) < len(raw)
+    assert frame.dhash is not None
+
+
+def test_near_duplicate_detection():
+    """Slightly different frames are near-duplicates; very different ones are not."""
+    a = prepare_frame(_jpeg(160, 120))
+    b = prepare_frame(_jpeg(160, 120, shade=2))
+    c = prepare_frame(_jpeg(160, 120, shade=128))
+    assert b.is_near_duplicate(a)
+    assert not c.is_near_duplicate(a)
+
+
+def test_prepare_frame_without_pillow_passes_through():
+    """Without Pillow the JPEG is kept as-is and only exact duplicates can be detected."""
+    raw = _jpeg(64, 48)
+    with patch("app.vision._load_pil", return_value=None):
+        frame = prepare_frame(raw)
+    assert frame.jpeg == raw and frame.dhash is None
+    assert frame.is_near_duplicate(PreparedFrame(raw))
+
+
+def test_prepare_frame_never_passes_non_jpeg_through():
+    """A tiny PNG re-encodes to a bigger JPEG, but the PNG bytes must not be sent as image/jpeg."""
+    out = io.BytesIO()
+    Image.new("RGB", (8, 8), (200, 30, 30)).save(out, format="PNG")
+    png = out.getvalue()
+    frame = prepare_frame(png)
+    assert frame.jpeg.startswith(b"\xff\xd8") and frame.jpeg != png
+    with patch("app.vision._load_pil", return_value=None), pytest.raises(ValueError):
+        prepare_frame(png)
+
+
+def test_prepare_frame_rejects_too_many_pixels_before_decoding():
+    raw = _jpeg(200, 100)
+    with pytest.raises(ValueError, match="pixels"):
+        prepare_frame(raw, max_pixels=200 * 100 - 1)
+
+
+def test_prepare_frame_decodes_large_jpeg_at_reduced_scale():
+    """draft() makes the JPEG decoder scale down while decoding; the result still fits max_dim."""
+    from PIL import JpegImagePlugin
+
+    raw = _jpeg(1280, 960)
+    drafts = []
+    original = JpegImagePlugin.JpegImageFile.draft
+
+    def spy(self, mode, size):
+        result = original(self, mode, size)
+        drafts.append(self.size)
+        return result
+
+    with patch.object(JpegImagePlugin.JpegImageFile, "draft", spy):
+        frame = prepare_frame(raw, max_dim=160)
+    assert drafts == [(160, 120)]  # decoded at 1/8 scale instead of 1280x960
+    assert (frame.width, frame.height) == (160, 120)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_processes_and_skips_duplicates():
+    """submit decodes once; the exact same frame again is skipped without reprocessing."""
+    pipeline = FramePipeline()
+    b64 = base64.b64encode(_jpeg(640, 480)).decode("ascii")
+    assert pipeline.submit(b64, now=100.0)
+    await pipeline._task
+    assert pipeline.current is not None
+    assert pipeline.submit(b64, now=110.0) is False
+    assert pipeline.stats()["skipped"] == 1
+    assert pipeline.submit("not base64!", now=120.0) is False
+    assert pipeline.stats()["failed"] == 1
+    await pipeline.close()
+
+
+async def test_pipeline_rejects_oversized_and_too_frequent_frames(monkeypatch):
+    """Frames over FRAME_MAX_BYTES or faster than FRAME_MAX_FPS are dropped before decoding."""
+    monkeypatch.setattr("app.vision.FRAME_MAX_BYTES", 1024)
+    monkeypatch.setattr("app.vision.FRAME_MAX_FPS", 1.0)
+    pipeline = FramePipeline()
+    assert pipeline.submit("A" * 4096, now=10.0) is False
+    assert pipeline.stats()["rejected_size"] == 1
+    assert pipeline.stats()["received"] == 0
+    small = base64.b64encode(b"abc").decode("ascii")
+    assert pipeline.admit(small, now=20.0)
+    assert pipeline.admit(small, now=20.5) is False
+    assert pipeline.stats()["rejected_rate"] == 1
+    assert pipeline.admit(small, now=21.0)
+    await pipeline.close()
+
+
+def test_frame_sampling_fixed_never_changes():
+    """fixed mode: initial policy only, tension changes send nothing."""
+    sampling = FrameSampling("fixed")
+    policy = sampling.initial()
+    assert policy["interval_ms"] == FRAME_INTERVAL_MS
+    assert "type" not in policy
+    assert sampling.on_tension(90, 60) is None
+
+
+def test_frame_sampling_tension_switches_once_per_crossing():
+    """tension mode: slow while calm, fast above threshold, a message only when the interval changes."""
+    sampling = FrameSampling("tension")
+    assert sampling.initial()["interval_ms"] == FRAME_IDLE_INTERVAL_MS
+    assert sampling.on_tension(30, 60) is None
+    msg = sampling.on_tension(70, 60)
+    assert msg["type"] == "frame_policy" and msg["interval_ms"] == FRAME_INTERVAL_MS
+    assert sampling.on_tension(80, 60) is None
+    assert sampling.on_tension(20, 60)["interval_ms"] == FRAME_IDLE_INTERVAL_MS
@@ -111,3 +111,69 @@ def test_ws_frame_message_accepted(mock_mode):
         messages = _collect_messages(ws, max_messages=3)
     assert not any(m.get("type") == "error" for m in messages)
     assert any(m.get("type") in ("tension", "whisper") for m in messages)
+
+
+def test_ws_oversized_message_returns_error(mock_mode):
+    """A text frame larger than MAX_INBOUND_CHARS is rejected before parsing; the socket stays open."""
+    from app.websocket_handler import MAX_INBOUND_CHARS
+
+    client = TestClient(app)
+    with client.websocket_connect("/ws") as ws:
+        ws.send_text('{"type":"frame","base64":"' + "A" * MAX_INBOUND_CHARS + '"}')
+        data = ws.receive_json()
+        assert data.get("type") == "error"
+        assert "too large" in data.get("message", "")
+        ws.send_text('{"type":"audio","base64":"' + "A" * MAX_INBOUND_CHARS + '"}')
+        assert "too large" in ws.receive_json().get("message", "")
+        ws.send_json({"type": "start"})
+        ready = ws.receive_json()
+    assert ready.get("type") == "ready"
+    assert ready["frame_policy"]["interval_ms"] > 0
+
+
+async def test_oversized_non_frame_messages_not_counted_as_frames():
+    """Only oversized `frame` messages count toward the frame pipeline's rejected_size."""
+    from fastapi import WebSocketDisconnect
+
+    from app.websocket_handler import MAX_INBOUND_CHARS, CopilotSession
+
+    class _Socket:
+        def __init__(self, inbound):
+            self.inbound = list(inbound)
+            self.sent = []
+
+        async def receive_text(self):
+            if not self.inbound:
+                raise WebSocketDisconnect()
+            return self.inbound.pop(0)
+
+        async def send_text(self, text):
+            self.sent.append(text)
+
+    pad = "A" * MAX_INBOUND_CHARS
+    socket = _Socket([
+        '{"type":"audio","base64":"' + pad + '"}',
+        '{"type":"stop","x":"' + pad + '"}',
+        '{"type":"frame","base64":"' + pad + '"}',
+        '{"base64": "' + pad + '", "type": "frame"}',  # key order / spacing must not matter
+        '{"type":"frame","base64":"' + pad,  # truncated: not counted as a frame
+    ])
+    session = CopilotSession(socket)
+    with pytest.raises(WebSocketDisconnect):
+        await session.run()
+    assert session.frames.rejected_size == 2
+    assert sum("too large" in m for m in socket.sent) == 5
+
+
+def test_ws_start_negotiates_audio_codec(mock_mode):
+    """A supported config.audio_codec is echoed in ready; unknown codecs fall back to raw PCM16."""
+    client = TestClient(app)
+    with client.websocket_connect("/ws") as ws:
+        ws.send_json({"type": "start", "config": {"audio_codec": "adpcm"}})
+        ready = ws.receive_json()
+    assert ready.get("type") == "ready"
+    assert ready.get("audio_codec") == "adpcm"
+    with client.websocket_connect("/ws") as ws:
+        ws.send_json({"type": "start", "config": {"audio_codec": "opus"}})
+        ready = ws.receive_json()
+    assert "audio_codec" not in ready
@@ -2,6 +2,7 @@ import { useCallback, useEffect, useRef, useState } from 'react'
 import { useWebSocket } from './useWebSocket'
 import { startAudioCapture, listAudioDevices } from './audioCapture'
 import { useWebcam, CAPTURE_INTERVAL_MS } from './useWebcam'
+import { decodeAudio } from './audioCodec'
 import TensionVisualizer from './TensionVisualizer'
 import RmsLevelMeter from './RmsLevelMeter'
 import CoachingWhisperOverlay from './CoachingWhisperOverlay'
@@ -98,15 +99,10 @@ function speakBackchannel(text) {
 let currentWhisperAudioCtx = null
 let lastWhisperPlayedAt = 0
 
-function playWhisperAudio(base64Pcm) {
+function playWhisperAudio(base64Audio, codec) {
   try {
-    const raw = atob(base64Pcm)
-    const buf = new ArrayBuffer(raw.length)
-    const view = new Uint8Array(buf)
-    for (let i = 0; i < raw.length; i += 1) view[i] = raw.charCodeAt(i)
-
-    // Guard against odd-length buffers (must be divisible by 2 for Int16)
-    if (buf.byteLength % 2 !== 0) return false
+    const float32 = decodeAudio(base64Audio, codec)
+    if (!float32) return false
 
     const AudioCtx = window.AudioContext || window.webkitAudioContext
     if (!AudioCtx) return false
@@ -122,12 +118,6 @@ function playWhisperAudio(base64Pcm) {
     const ctx = new AudioCtx({ sampleRate: 24000 })
     currentWhisperAudioCtx = ctx
 
-    const int16 = new Int16Array(buf)
-    const float32 = new Float32Array(int16.length)
-    for (let i = 0; i < int16.length; i += 1) {
-      float32[i] = int16[i] / 32768
-    }
-
     const audioBuffer = ctx.createBuffer(1, float32.length, 24000)
     audioBuffer.getChannelData(0).set(float32)
 
@@ -150,17 +140,13 @@ function playWhisperAudio(base64Pcm) {
 
 let currentBackchannelCtx = null
 
-function playBackchannelAudio(base64Pcm) {
+function playBackchannelAudio(base64Audio, codec) {
   try {
     // Suppress if a coaching whisper played in the last 5 seconds
     if (Date.now() - lastWhisperPlayedAt < 5000) return true // swallow silently
 
-    const raw = atob(base64Pcm)
-    const buf = new ArrayBuffer(raw.length)
-    const view = new Uint8Array(buf)
-    for (let i = 0; i < raw.length; i += 1) view[i] = raw.charCodeAt(i)
-
-    if (buf.byteLength % 2 !== 0) return false
+    const float32 = decodeAudio(base64Audio, codec)
+    if (!float32) return false
 
     const AudioCtx = window.AudioContext || window.webkitAudioContext
     if (!AudioCtx) return false
@@ -178,12 +164,6 @@ function playBackchannelAudio(base64Pcm) {
     const ctx = new AudioCtx({ sampleRate: 24000 })
     currentBackchannelCtx = ctx
 
-    const int16 = new Int16Array(buf)
-    const float32 = new Float32Array(int16.length)
-    for (let i = 0; i < int16.length; i += 1) {
-      float32[i] = int16[i] / 32768
-    }
-
     const audioBuffer = ctx.createBuffer(1, float32.length, 24000)
     audioBuffer.getChannelData(0).set(float32)
 
@@ -227,6 +207,7 @@ export default function App() {
   const [overlayExiting, setOverlayExiting] = useState(false)
   const [audioDevices, setAudioDevices] = useState([])
   const [selectedDeviceId, setSelectedDeviceId] = useState('')
+  const [framePolicy, setFramePolicy] = useState({ interval_ms: CAPTURE_INTERVAL_MS, max_width: null })
   const { showOverlay: showCoachingOverlay } = useCoachingOverlay(tension)
   const captureRef = useRef(null)
   const webcam = useWebcam()
@@ -247,17 +228,22 @@ export default function App() {
   const onMessage = useCallback((msg) => {
     if (msg.type === 'ready') {
       setSessionActive(true)
-      addLog('in', { type: 'ready' })
+      if (msg.frame_policy) setFramePolicy(msg.frame_policy)
+      addLog('in', { type: 'ready', resumed: msg.resumed === true })
     } else if (msg.type === 'tension') {
       setTension(msg.score ?? 0)
       addLog('in', { type: 'tension', score: msg.score })
+    } else if (msg.type === 'whisper' && msg.replaces != null) {
+      // Model whisper that arrived after a provisional local one: swap the text, don't replay audio
+      setWhisper({ text: msg.text, move: msg.move })
+      addLog('in', { type: 'whisper', text: msg.text, move: msg.move, replaces: msg.replaces })
     } else if (msg.type === 'whisper') {
       setWhisper({ text: msg.text, move: msg.move })
       lastWhisperPlayedAt = Date.now()
       // Play Gemini Live TTS audio only — natural human-like whisper voice.
       // Browser Web Speech removed: its robotic tone clashed with Live TTS.
       if (msg.audio_base64) {
-        playWhisperAudio(msg.audio_base64)
+        playWhisperAudio(msg.audio_base64, msg.audio_codec)
       }
       addLog('in', { type: 'whisper', text: msg.text, move: msg.move })
     } else if (msg.type === 'stopped') {
@@ -272,7 +258,7 @@ export default function App() {
         setTranscript((prev) => (prev + msg.delta).slice(-MAX_TRANSCRIPT_LEN))
       }
     } else if (msg.type === 'backchannel_audio') {
-      if (msg.audio_base64) playBackchannelAudio(msg.audio_base64)
+      if (msg.audio_base64) playBackchannelAudio(msg.audio_base64, msg.audio_codec)
     } else if (msg.type === 'backchannel_text') {
       // Log only — TTS backchannel sounds robotic; rely on Gemini Live native audio instead
       addLog('in', { type: 'backchannel_text', text: msg.text })
@@ -280,6 +266,14 @@ export default function App() {
       addLog('in', { type: 'event', name: msg.name })
     } else if (msg.type === 'error') {
       addLog('in', { type: 'error', message: msg.message })
+    } else if (msg.type === 'busy') {
+      addLog('in', { type: 'busy', queued: msg.queued, retry_after_ms: msg.retry_after_ms })
+    } else if (msg.type === 'reconnect') {
+      addLog('in', { type: 'reconnect', reason: msg.reason })
+    } else if (msg.type === 'frame_policy') {
+      // Server-requested webcam cadence (e.g. faster while tension is high)
+      setFramePolicy(msg)
+      addLog('in', { type: 'frame_policy', interval_ms: msg.interval_ms })
     }
   }, [addLog])
 
@@ -380,15 +374,17 @@ export default function App() {
   useEffect(() => {
     if (!sessionActive || useMock || !useVision || !webcam.active) return
     const id = setInterval(() => {
-      const frame = webcam.captureFrame()
-      if (frame) send({ type: 'frame', base64: frame })
-    }, CAPTURE_INTERVAL_MS)
+      const frame = webcam.captureFrame(framePolicy.max_width)
+      if (frame && (!framePolicy.max_bytes || frame.length * 0.75 <= framePolicy.max_bytes)) {
+        send({ type: 'frame', base64: frame })
+      }
+    }, Math.max(1000, framePolicy.interval_ms || CAPTURE_INTERVAL_MS))
     frameIntervalRef.current = id
     return () => {
       clearInterval(id)
       frameIntervalRef.current = null
     }
-  }, [sessionActive, useMock, useVision, webcam.active, webcam.captureFrame, send])
+  }, [sessionActive, useMock, useVision, webcam.active, webcam.captureFrame, send, framePolicy])
 
   const handleStart = async () => {
     if (useVision) {
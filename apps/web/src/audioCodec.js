@@ -0,0 +1,73 @@
+/**
+ * Decoders for whisper/backchannel audio from the backend (24 kHz mono).
+ * Codec is negotiated in `start` (config.audio_codec) and echoed in `ready` / each audio message:
+ * pcm16 (raw), mulaw (G.711, 2x smaller), adpcm (IMA, 4x smaller, low nibble first).
+ */
+
+export const AUDIO_CODEC = (import.meta.env.VITE_AUDIO_CODEC || 'adpcm').trim().toLowerCase()
+
+const IMA_INDEX = [-1, -1, -1, -1, 2, 4, 6, 8, -1, -1, -1, -1, 2, 4, 6, 8]
+const IMA_STEPS = [
+  7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45, 50, 55, 60, 66,
+  73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230, 253, 279, 307, 337, 371, 408, 449,
+  494, 544, 598, 658, 724, 796, 876, 963, 1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272,
+  2499, 2749, 3024, 3327, 3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493,
+  10442, 11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794, 32767,
+]
+
+function base64ToBytes(b64) {
+  const raw = atob(b64)
+  const bytes = new Uint8Array(raw.length)
+  for (let i = 0; i < raw.length; i += 1) bytes[i] = raw.charCodeAt(i)
+  return bytes
+}
+
+function decodePcm16(bytes) {
+  // Guard against odd-length buffers (must be divisible by 2 for Int16)
+  if (bytes.byteLength % 2 !== 0) return null
+  const int16 = new Int16Array(bytes.buffer)
+  const out = new Float32Array(int16.length)
+  for (let i = 0; i < int16.length; i += 1) out[i] = int16[i] / 32768
+  return out
+}
+
+function decodeMulaw(bytes) {
+  const out = new Float32Array(bytes.length)
+  for (let i = 0; i < bytes.length; i += 1) {
+    const u = ~bytes[i] & 0xff
+    const exponent = (u >> 4) & 0x07
+    const magnitude = (((u & 0x0f) << 3) + 0x84) << exponent
+    out[i] = (u & 0x80 ? 0x84 - magnitude : magnitude - 0x84) / 32768
+  }
+  return out
+}
+
+function decodeAdpcm(bytes) {
+  const out = new Float32Array(bytes.length * 2)
+  let predicted = 0
+  let index = 0
+  let n = 0
+  for (let i = 0; i < bytes.length; i += 1) {
+    for (const code of [bytes[i] & 0x0f, bytes[i] >> 4]) {
+      const step = IMA_STEPS[index]
+      let delta = step >> 3
+      if (code & 4) delta += step
+      if (code & 2) delta += step >> 1
+      if (code & 1) delta += step >> 2
+      predicted += code & 8 ? -delta : delta
+      predicted = Math.max(-32768, Math.min(32767, predicted))
+      index = Math.max(0, Math.min(88, index + IMA_INDEX[code]))
+      out[n] = predicted / 32768
+      n += 1
+    }
+  }
+  return out
+}
+
+/** Base64 audio in `codec` -> Float32 samples in [-1, 1], or null if malformed. */
+export function decodeAudio(base64Audio, codec = 'pcm16') {
+  const bytes = base64ToBytes(base64Audio)
+  if (codec === 'mulaw') return decodeMulaw(bytes)
+  if (codec === 'adpcm') return decodeAdpcm(bytes)
+  return decodePcm16(bytes)
+}
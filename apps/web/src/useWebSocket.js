@@ -3,6 +3,7 @@
  * If VITE_WS_URL is set, use it as the WebSocket endpoint (ws/wss corrected). Otherwise use proxy for localhost dev.
  */
 import { useCallback, useEffect, useRef, useState } from 'react'
+import { AUDIO_CODEC } from './audioCodec'
 
 const RAW_WS_URL = (import.meta.env.VITE_WS_URL || '').trim() || null
 const USE_MOCK = import.meta.env.VITE_USE_MOCK_WS === 'true'
@@ -93,6 +94,9 @@ export function useWebSocket({ onMessage, onOutbound, useMock = USE_MOCK }) {
   const lastStartConfigRef = useRef(null)
   const reconnectTimeoutRef = useRef(null)
   const reconnectAttemptRef = useRef(0)
+  const retryAfterMsRef = useRef(null)
+  // Single-use token from the latest `ready`; sent with `start` on reconnect to resume coaching state.
+  const resumeTokenRef = useRef(null)
   onMessageRef.current = onMessage
   onOutboundRef.current = onOutbound
 
@@ -105,9 +109,16 @@ export function useWebSocket({ onMessage, onOutbound, useMock = USE_MOCK }) {
       lastStartConfigRef.current = initialStartConfig
     }
     const startConfig = lastStartConfigRef.current
-    const startPayload = startConfig && typeof startConfig === 'object'
-      ? { type: 'start', config: startConfig }
-      : { type: 'start' }
+    // Always ask for compact whisper audio; the server falls back to pcm16 if it doesn't support the codec
+    const startPayload = {
+      type: 'start',
+      config: { ...(startConfig && typeof startConfig === 'object' ? startConfig : {}), audio_codec: AUDIO_CODEC },
+    }
+    if (isReconnect && resumeTokenRef.current) {
+      startPayload.resume_token = resumeTokenRef.current
+    } else {
+      resumeTokenRef.current = null
+    }
 
     if (useMock) {
       const mock = createMockWebSocket((msg) => onMessageRef.current?.(msg))
@@ -125,11 +136,14 @@ export function useWebSocket({ onMessage, onOutbound, useMock = USE_MOCK }) {
       if (intentionalCloseRef.current || !sessionRequestedRef.current) return
       if (reconnectAttemptRef.current >= RECONNECT_MAX_ATTEMPTS) return
       reconnectAttemptRef.current += 1
-      setLastError('Connection lost. Reconnecting…')
+      // Server at capacity sends `busy` with retry_after_ms before closing; honour it.
+      const delay = retryAfterMsRef.current ?? RECONNECT_DELAY_MS
+      setLastError(retryAfterMsRef.current != null ? 'Server busy. Retrying…' : 'Connection lost. Reconnecting…')
+      retryAfterMsRef.current = null
       if (reconnectTimeoutRef.current) clearTimeout(reconnectTimeoutRef.current)
       reconnectTimeoutRef.current = setTimeout(() => {
         connect(lastStartConfigRef.current, true)
-      }, RECONNECT_DELAY_MS)
+      }, delay)
     }
 
     ws.onopen = () => {
@@ -156,6 +170,13 @@ export function useWebSocket({ onMessage, onOutbound, useMock = USE_MOCK }) {
     ws.onmessage = (ev) => {
       try {
         const msg = JSON.parse(ev.data)
+        // `reconnect`: the worker is draining and will close this socket; come back on another instance.
+        if ((msg.type === 'busy' && !msg.queued) || msg.type === 'reconnect') {
+          retryAfterMsRef.current = msg.retry_after_ms ?? RECONNECT_DELAY_MS
+        }
+        if (msg.type === 'ready') {
+          resumeTokenRef.current = msg.resume_token ?? null
+        }
         onMessageRef.current?.(msg)
       } catch (_) {}
     }
@@ -174,6 +195,7 @@ export function useWebSocket({ onMessage, onOutbound, useMock = USE_MOCK }) {
       wsRef.current = null
     }
     lastStartConfigRef.current = null
+    resumeTokenRef.current = null
     reconnectAttemptRef.current = RECONNECT_MAX_ATTEMPTS
     setConnected(false)
     setLastError(null)
@@ -46,15 +46,17 @@ export function useWebcam() {
     setError(null)
   }, [])
 
-  const captureFrame = useCallback(() => {
+  // maxWidth (from the server's frame_policy) downscales before encoding to keep frames small
+  const captureFrame = useCallback((maxWidth) => {
     const video = videoRef.current
     if (!video || !streamRef.current || video.readyState < 2) return null
+    const scale = maxWidth && video.videoWidth > maxWidth ? maxWidth / video.videoWidth : 1
     const canvas = document.createElement('canvas')
-    canvas.width = video.videoWidth
-    canvas.height = video.videoHeight
+    canvas.width = Math.round(video.videoWidth * scale)
+    canvas.height = Math.round(video.videoHeight * scale)
     const ctx = canvas.getContext('2d')
     if (!ctx) return null
-    ctx.drawImage(video, 0, 0)
+    ctx.drawImage(video, 0, 0, canvas.width, canvas.height)
     const dataUrl = canvas.toDataURL('image/jpeg', JPEG_QUALITY)
     const base64 = dataUrl.replace(/^data:image\/jpeg;base64,/, '')
     return base64